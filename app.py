@@ -1,77 +1,200 @@
 import streamlit as st
-from googletrans import Translator, LANGUAGES
-from gtts import gTTS
-import speech_recognition as sr
-import pytesseract
-from PIL import Image
 import os
 import time
-import base64
-import datetime
-import language_tool_python  # For grammar checking
-from streamlit_cropper import st_cropper  # For cropping images
+import importlib
+import functools
+import uuid
+from vocalite.translation_memory import parse_bilingual
+from vocalite.image_intake import ImageIntake
+from vocalite.factory import (
+    CACHE_DIR,
+    TM_REUSE_THRESHOLD,
+    TRANSLATE_ROUTES,
+    create_audio_cache,
+    create_backends,
+    create_grammar_pool,
+    create_pipeline,
+    create_translation_cache,
+    create_translation_memory,
+)
+from vocalite.pipeline import build_history_item
+from vocalite.history import HistoryStore
+from vocalite.speech import (
+    StreamingTranscriber,
+    format_timestamp,
+    pcm_chunks,
+    read_audio_file,
+    split_on_silence,
+    start_microphone_transcriber,
+    stitch_transcript,
+    timestamped_transcript,
+    transcribe_chunks,
+)
+from vocalite.lazy import LazyBackend, load_googletrans_languages, startup_report, unwrap
+from vocalite.document_ocr import DOCUMENT_EXTENSIONS, count_pages, iter_pages, ocr_pages, summarize_pages
+from vocalite.batch import SUPPORTED_EXTENSIONS, parse_document, translate_segments
+from vocalite.metrics import JsonLinesExporter, Metrics, cache_collector
+from vocalite.tts_stream import concat_mp3, mp3_duration
+from vocalite.resilience import ResilientBackend
 
+@st.cache_resource
+def init_grammar_pool():
+    """Creates the process-wide pool of grammar tools and warms up the configured languages."""
+    return create_grammar_pool()
 
-# Initialize translator and grammar tool
-translator = Translator()
+grammar_pool = init_grammar_pool()
 
 @st.cache_resource
-def init_grammar_tool():
-    """Initializes the grammar checking tool and caches it."""
-    try:
-        return language_tool_python.LanguageTool('en-US')
-    except Exception as e:
-        st.error(f"Error initializing grammar tool: {e}. Please check your internet connection and try again.")
-        return None
-
-tool = init_grammar_tool()
-
-def get_lang_code(lang_name):
-    """Gets the language code from the language name."""
-    for code, name in LANGUAGES.items():
-        if name.lower() == lang_name.lower():
-            return code
-    return 'en'
-
-# Language tool mapping for grammar correction
-LANG_TOOL_MAPPING = {
-    'english': 'en-US',
-    'german': 'de-DE',
-    'french': 'fr-FR',
-    'spanish': 'es-ES',
-    'portuguese': 'pt-PT',
-    'italian': 'it-IT',
-    'dutch': 'nl-NL',
-    'polish': 'pl-PL',
-    'russian': 'ru-RU',
-    'arabic': 'ar',
-    'chinese': 'zh-CN',
-    'japanese': 'ja-JP',
-}
+def init_translation_cache():
+    """Creates the translation cache shared by every session."""
+    return create_translation_cache()
+
+translation_cache = init_translation_cache()
+
+@st.cache_resource
+def init_audio_cache():
+    """Creates the synthesized audio cache shared by every session."""
+    return create_audio_cache()
+
+audio_cache = init_audio_cache()
+
+@st.cache_resource
+def init_image_intake():
+    """Creates the upload preview cache shared by every session, so reruns never decode a photo again."""
+    return ImageIntake(max_bytes=64 * 1024 * 1024)
+
+image_intake = init_image_intake()
+
+@st.cache_resource
+def init_history_store():
+    """Opens the persistent translation history shared by every session."""
+    return HistoryStore(os.path.join(CACHE_DIR, "history.sqlite3"))
+
+history_store = init_history_store()
+
+@st.cache_resource
+def init_translation_memory():
+    """Opens the translation memory shared by every session."""
+    return create_translation_memory()
+
+translation_memory = init_translation_memory()
+
+@st.cache_resource
+def init_languages():
+    """Loads the googletrans language table without importing googletrans itself."""
+    return load_googletrans_languages()
+
+LANGUAGES = init_languages()
+
+@st.cache_resource
+def init_language_names():
+    """Sorts the language names for the pickers once per process."""
+    return sorted(LANGUAGES.values())
+
+LANGUAGE_NAMES = init_language_names()
+
+# Append a metrics snapshot to this JSON-lines file every VOCALITE_METRICS_INTERVAL seconds
+METRICS_JSONL = os.environ.get("VOCALITE_METRICS_JSONL")
+METRICS_INTERVAL = float(os.environ.get("VOCALITE_METRICS_INTERVAL", "60"))
+
+@st.cache_resource
+def init_metrics():
+    """Creates the process-wide metrics registry and starts the JSON-lines exporter if configured."""
+    metrics = Metrics()
+    metrics.add_collector(cache_collector("translation", translation_cache))
+    metrics.add_collector(cache_collector("audio", audio_cache))
+    metrics.add_collector(cache_collector("image_intake", image_intake))
+    metrics.add_collector(cache_collector("translation_memory", translation_memory))
+    if METRICS_JSONL:
+        JsonLinesExporter(metrics, METRICS_JSONL, interval=METRICS_INTERVAL).start()
+    return metrics
+
+metrics = init_metrics()
+
+@st.cache_resource
+def init_backends():
+    """Creates lazy backends; each is imported and built on first use or background warm-up."""
+    return {
+        **create_backends(metrics),
+        # Module proxies: the import happens the first time an attribute is used
+        "speech_recognition": LazyBackend("speech_recognition", lambda: importlib.import_module("speech_recognition")),
+        "cropper": LazyBackend("streamlit_cropper", lambda: importlib.import_module("streamlit_cropper")),
+    }
+
+backends = init_backends()
+sr = backends["speech_recognition"]
+
+def st_cropper(*args, **kwargs):
+    """Calls streamlit_cropper.st_cropper, importing it on first use."""
+    return backends["cropper"].st_cropper(*args, **kwargs)
+
+def crop_upload(upload):
+    """Shows the cropper on a bounded preview of an uploaded photo; returns the decoded upload and crop box.
+
+    The box is in preview pixels; IntakeImage.crop maps it onto the original.
+    """
+    intake = image_intake.get(upload.getvalue())
+    st.markdown("✂ Crop the area with text before OCR")
+    box = st_cropper(intake.preview, aspect_ratio=None, box_color="#4CAF50", return_type="box")
+    st.image(intake.crop_preview(box), caption="Cropped Image", use_column_width=True)
+    return intake, box
+
+@st.cache_resource
+def init_pipeline():
+    """Builds the translation pipeline shared by every session."""
+    return create_pipeline(
+        backends,
+        grammar_pool,
+        metrics,
+        LANGUAGES,
+        translation_cache=translation_cache,
+        audio_cache=audio_cache,
+        translation_memory=translation_memory,
+    )
+
+pipeline = init_pipeline()
+get_lang_code = pipeline.get_lang_code
+
+def remember_translations(history_items, owner):
+    """Adds owner's history items to the translation memory, grouped by language pair.
+
+    Each browser's history is private, so its segments are stored under its
+    owner and are never suggested or reused for another browser.
+    """
+    by_pair = {}
+    for item in history_items:
+        pair = (get_lang_code(item["src_lang"]), get_lang_code(item["dest_lang"]))
+        by_pair.setdefault(pair, []).append((item.get("corrected") or item["original"], item["translated"]))
+    for (src, dest), pairs in by_pair.items():
+        translation_memory.add_many(pairs, src, dest, origin="history", owner=owner)
+
+@st.cache_resource
+def seed_translation_memory():
+    """Builds the memory from the saved history, per owner, the first time it is opened empty."""
+    if len(translation_memory):
+        return
+    batches = {}
+    for owner, item in history_store.iter_all():
+        batch = batches.setdefault(owner, [])
+        batch.append(item)
+        if len(batch) >= 1000:
+            remember_translations(batch, owner)
+            batch.clear()
+    for owner, batch in batches.items():
+        remember_translations(batch, owner)
+
+seed_translation_memory()
+
+def memory_options():
+    """Returns the translation memory owner and reuse threshold of this session, for pipeline.translate."""
+    return {"owner": st.session_state.history_owner, "reuse_threshold": st.session_state.tm_reuse_threshold}
 
 def correct_grammar(text, lang_name):
-    """Corrects grammar for the given text using LanguageTool."""
-    if not text or not text.strip() or not tool:
-        return text
-    
-    lang_code = LANG_TOOL_MAPPING.get(lang_name.lower(), 'en-US')
-    
+    """Corrects grammar for the given text using a pooled LanguageTool."""
     try:
-        # Check if the tool's language needs to be changed
-        if tool._language != lang_code:
-            try:
-                # Create a local instance for a different language to avoid a cached mix-up
-                local_tool = language_tool_python.LanguageTool(lang_code)
-                corrected = local_tool.correct(text)
-                local_tool.close()
-                return corrected
-            except:
-                # Fallback to the default English tool if the specific language tool fails
-                return tool.correct(text)
-        else:
-            return tool.correct(text)
+        return pipeline.correct_grammar(text, lang_name)
     except Exception as e:
-        st.error(f"Grammar correction failed: {str(e)}")
+        st.error(f"Grammar correction failed: {str(e)}. Please check your internet connection and try again.")
         return text
 
 # ---- Session State Initialization ----
@@ -81,14 +204,25 @@ if "corrected_text" not in st.session_state:
     st.session_state.corrected_text = ""
 if "show_popup" not in st.session_state:
     st.session_state.show_popup = True
-if "history" not in st.session_state:
-    st.session_state.history = []
+if "history_owner" not in st.session_state:
+    # History is kept per browser: the id lives in the URL, so reloads and bookmarks keep it
+    st.session_state.history_owner = st.query_params.get("h") or uuid.uuid4().hex
+    st.query_params["h"] = st.session_state.history_owner
+if "history_cursors" not in st.session_state:
+    # before_id of every page visited so far; the last one is the current page
+    st.session_state.history_cursors = [None]
+if "history_export" not in st.session_state:
+    st.session_state.history_export = None
 if "show_grammar_correction" not in st.session_state:
     st.session_state.show_grammar_correction = False
 if "last_src" not in st.session_state:
     st.session_state.last_src = "english"
 if "last_dest" not in st.session_state:
     st.session_state.last_dest = "spanish"
+if "input_lang_select" not in st.session_state:
+    st.session_state.input_lang_select = st.session_state.last_src
+if "output_lang_select" not in st.session_state:
+    st.session_state.output_lang_select = st.session_state.last_dest
 if "last_translated" not in st.session_state:
     st.session_state.last_translated = ""
 if "cropped_image" not in st.session_state:
@@ -101,6 +235,21 @@ if "camera_photo_key" not in st.session_state:
     st.session_state.camera_photo_key = 0
 if "uploaded_file_key" not in st.session_state:
     st.session_state.uploaded_file_key = 0
+if "batch_job" not in st.session_state:
+    st.session_state.batch_job = None
+if "last_extra_translations" not in st.session_state:
+    st.session_state.last_extra_translations = []
+if "transcriber" not in st.session_state:
+    st.session_state.transcriber = None
+if "translate_pending" not in st.session_state:
+    # Set when Translate saved to history and reran the page; the rerun does the translation
+    st.session_state.translate_pending = False
+if "tm_reuse_threshold" not in st.session_state:
+    # Per session: the memory is shared, so the threshold is passed with every translation
+    st.session_state.tm_reuse_threshold = TM_REUSE_THRESHOLD
+if "tm_suggestion" not in st.session_state:
+    # (text, src, dest) the suggestion was looked up for, and the match (or None)
+    st.session_state.tm_suggestion = (None, None)
     
 # Theme initialization
 if "theme" not in st.session_state:
@@ -116,40 +265,56 @@ theme_colors = {
 
 # ----------------- FUNCTIONS -----------------
 def save_to_history():
-    """Saves the last successful translation to the history list."""
+    """Saves the last successful translation to the persistent history; returns True when one was saved."""
     input_text = st.session_state.spoken_text.strip()
     corrected_text = st.session_state.corrected_text.strip() if st.session_state.corrected_text else ""
 
     if input_text and st.session_state.last_translated:
-        history_item = {
-            "original": input_text,
-            "src_lang": st.session_state.last_src,
-            "translated": st.session_state.last_translated,
-            "dest_lang": st.session_state.last_dest,
-            "time": datetime.datetime.now().strftime("%H:%M:%S")
-        }
-        # Only add corrected field if grammar correction was applied
-        if corrected_text and corrected_text != input_text:
-            history_item["corrected"] = corrected_text
+        history_item = build_history_item(
+            input_text,
+            st.session_state.last_translated,
+            st.session_state.last_src,
+            st.session_state.last_dest,
+            corrected=corrected_text,
+        )
 
-        st.session_state.history.append(history_item)
-        if len(st.session_state.history) > 10:
-            st.session_state.history.pop(0)
+        history_items = [history_item]
+        # Extra targets from a multi-language translation get their own entries
+        for dest_lang, translated in st.session_state.last_extra_translations:
+            history_items.append(build_history_item(
+                input_text,
+                translated,
+                st.session_state.last_src,
+                dest_lang,
+                corrected=corrected_text,
+            ))
+        history_store.extend(history_items, owner=st.session_state.history_owner)
+        remember_translations(history_items, st.session_state.history_owner)
+        st.session_state.history_cursors = [None]
+        return True
+    return False
             
+def append_transcripts(transcriber):
+    """Appends transcript pieces that arrived since the last poll to the input text."""
+    for piece in transcriber.new_transcripts():
+        st.session_state.spoken_text = f"{st.session_state.spoken_text} {piece}".strip()
+
 def clear_inputs():
     """Clears the input text and related session states."""
     save_to_history()
+    if st.session_state.transcriber is not None:
+        st.session_state.transcriber.stop()
+        st.session_state.transcriber = None
     st.session_state.spoken_text = ""
     st.session_state.corrected_text = ""
     st.session_state.show_grammar_correction = False
     if "typed_text" in st.session_state:
         st.session_state.typed_text = ""
     st.session_state.cropped_image = None
+    st.session_state.batch_job = None
     # Reset the keys of the camera and file uploader widgets
     st.session_state.camera_photo_key += 1
     st.session_state.uploaded_file_key += 1
-    # Rerun the script to apply the changes
-    st.rerun()
 # ----------------- END FUNCTIONS -----------------
 
 # ----------------- Splash Screen -----------------
@@ -161,6 +326,10 @@ if st.session_state.show_popup:
             0% {opacity: 0;}
             100% {opacity: 1;}
         }
+        @keyframes splashOut {
+            0% {opacity: 1; visibility: visible;}
+            100% {opacity: 0; visibility: hidden; pointer-events: none;}
+        }
         @keyframes pulse {
             0% {transform: scale(1);}
             50% {transform: scale(1.05);}
@@ -180,7 +349,7 @@ if st.session_state.show_popup:
             color: #e6f0ff;
             text-align: center;
             font-family: 'Segoe UI', sans-serif;
-            animation: fadeIn 2s ease-in-out;
+            animation: fadeIn 2s ease-in-out, splashOut 0.6s ease-in 2.5s forwards;
             z-index: 9999; /* Ensure it's on top */
         }
         .splash-title {
@@ -215,75 +384,79 @@ if st.session_state.show_popup:
         """,
         unsafe_allow_html=True
     )
-    time.sleep(2.5)
+    # The overlay hides itself via CSS, so the page renders underneath without blocking the script
     st.session_state.show_popup = False
-    st.rerun()
 
 
 
 # Apply selected theme
-selected_theme = theme_colors.get(st.session_state.theme, theme_colors["Ocean"])
+@functools.lru_cache(maxsize=None)
+def theme_css(theme):
+    """Builds the theme stylesheet once per theme."""
+    selected_theme = theme_colors.get(theme, theme_colors["Ocean"])
+    return f"""
+    <style>
+    .stApp {{
+        background-color: {selected_theme['bg']};
+        color: {selected_theme['text']};
+    }}
+    .stSidebar {{
+        background-color: {selected_theme['bg']};
+        color: {selected_theme['text']};
+    }}
+    h1, h2, h3, h4, h5, h6 {{
+        color: {selected_theme['primary']};
+    }}
+    div.stTextInput > div > div > input,
+    div.stTextArea > div > textarea {{
+        border: 2px solid {selected_theme['border_color']};
+        border-radius: 8px;
+        background-color: transparent !important;
+        color: {selected_theme['input_text_color']} !important;
+    }}
+    div.stTextInput > div > div > input:focus,
+    div.stTextArea > div > textarea:focus {{
+        border: 2px solid {selected_theme['primary']};
+    }}
+    .stButton>button {{
+        background-color: {selected_theme['primary']};
+        color: white;
+        border: 2px solid {selected_theme['primary']};
+        border-radius: 8px;
+    }}
+    .stButton>button:hover {{
+        background-color: {selected_theme['text']};
+        color: {selected_theme['primary']};
+        border-color: {selected_theme['primary']};
+    }}
+    .method-btn {{
+        border-color: {selected_theme['primary']} !important;
+    }}
+    .method-selected {{
+        background-color: {selected_theme['primary']} !important;
+    }}
+    .how-to-use-box {{
+        border-left: 5px solid {selected_theme['primary']};
+        padding: 10px;
+        margin-bottom: 10px;
+        background-color: rgba(255, 255, 255, 0.05);
+        border-radius: 5px;
+    }}
+    .no-history-box {{
+        background-color: rgba(255, 255, 255, 0.1) !important;
+        border: 1px solid {selected_theme['primary']};
+        color: {selected_theme['input_text_color']};
+        padding: 10px;
+        border-radius: 8px;
+        text-align: center;
+        font-size: 14px;
+        margin-top: 10px;
+    }}
+    </style>
+    """
 
-st.markdown(f"""
-<style>
-.stApp {{
-    background-color: {selected_theme['bg']};
-    color: {selected_theme['text']};
-}}
-.stSidebar {{
-    background-color: {selected_theme['bg']};
-    color: {selected_theme['text']};
-}}
-h1, h2, h3, h4, h5, h6 {{
-    color: {selected_theme['primary']};
-}}
-div.stTextInput > div > div > input,
-div.stTextArea > div > textarea {{
-    border: 2px solid {selected_theme['border_color']};
-    border-radius: 8px;
-    background-color: transparent !important;
-    color: {selected_theme['input_text_color']} !important;
-}}
-div.stTextInput > div > div > input:focus,
-div.stTextArea > div > textarea:focus {{
-    border: 2px solid {selected_theme['primary']};
-}}
-.stButton>button {{
-    background-color: {selected_theme['primary']};
-    color: white;
-    border: 2px solid {selected_theme['primary']};
-    border-radius: 8px;
-}}
-.stButton>button:hover {{
-    background-color: {selected_theme['text']};
-    color: {selected_theme['primary']};
-    border-color: {selected_theme['primary']};
-}}
-.method-btn {{
-    border-color: {selected_theme['primary']} !important;
-}}
-.method-selected {{
-    background-color: {selected_theme['primary']} !important;
-}}
-.how-to-use-box {{
-    border-left: 5px solid {selected_theme['primary']};
-    padding: 10px;
-    margin-bottom: 10px;
-    background-color: rgba(255, 255, 255, 0.05);
-    border-radius: 5px;
-}}
-.no-history-box {{
-    background-color: rgba(255, 255, 255, 0.1) !important;
-    border: 1px solid {selected_theme['primary']};
-    color: {selected_theme['input_text_color']};
-    padding: 10px;
-    border-radius: 8px;
-    text-align: center;
-    font-size: 14px;
-    margin-top: 10px;
-}}
-</style>
-""", unsafe_allow_html=True)
+selected_theme = theme_colors.get(st.session_state.theme, theme_colors["Ocean"])
+st.markdown(theme_css(st.session_state.theme), unsafe_allow_html=True)
 
 # ----------------- Sidebar -----------------
 # Sidebar "How to Use" as an expander with styled boxes
@@ -294,7 +467,7 @@ with st.sidebar.expander("📘 How to Use"):
             1. Select input and output languages
         </div>
         <div class="how-to-use-box">
-            2. Choose input method: Type / Speak / Camera / Upload Image
+            2. Choose input method: Type / Speak / Camera / Upload Image / Upload File
         </div>
         <div class="how-to-use-box">
             3. Enter text, speak, or capture/upload image
@@ -310,47 +483,191 @@ with st.sidebar.expander("📘 How to Use"):
     )
 
 st.sidebar.markdown("### ⚙ Settings")
-auto_play = st.sidebar.checkbox("🔊 Auto-play Audio after Translate", value=True)
-grammar_check = st.sidebar.checkbox("✅ Enable Grammar Correction", value=True)
+# Panels read these through session state, so they stay current on fragment reruns
+st.sidebar.checkbox("🔊 Auto-play Audio after Translate", value=True, key="auto_play")
+st.sidebar.checkbox("✅ Enable Grammar Correction", value=True, key="grammar_check")
+
+# Theme selection; the widget writes st.session_state.theme before the stylesheet above is built
+st.sidebar.selectbox("🎨 Choose Theme", list(theme_colors.keys()), key="theme")
 
-# Theme selection
-theme_choice = st.sidebar.selectbox("🎨 Choose Theme", list(theme_colors.keys()), 
-                                   index=list(theme_colors.keys()).index(st.session_state.theme), 
-                                   key="theme_selector")
+with st.sidebar.expander("⏱ Backend Startup"):
+    for backend_name, entry in startup_report().items():
+        timing = ""
+        if entry["import_s"] is not None:
+            timing = f" · import {entry['import_s'] * 1000:.0f} ms · init {entry['init_s'] * 1000:.0f} ms"
+        st.markdown(f"`{backend_name}`: {entry['state']}{timing}")
 
-if theme_choice != st.session_state.theme:
-    st.session_state.theme = theme_choice
-    st.rerun()
+with st.sidebar.expander("📊 Translation Cache"):
+    cache_stats = translation_cache.stats()
+    st.markdown(
+        f"Hit rate: **{cache_stats['hit_rate']:.0%}**  \n"
+        f"Memory hits: {cache_stats['memory_hits']} · Disk hits: {cache_stats['disk_hits']}  \n"
+        f"Misses: {cache_stats['misses']} · Coalesced: {cache_stats['coalesced']}  \n"
+        f"Entries: {cache_stats['memory_entries']}/{cache_stats['memory_capacity']} in memory, "
+        f"{cache_stats['disk_entries']} on disk"
+    )
+
+with st.sidebar.expander("🧠 Translation Memory"):
+    tm_stats = translation_memory.stats()
+    st.markdown(
+        f"Hit rate: **{tm_stats['hit_rate']:.0%}** · Reused: **{tm_stats['reuse_rate']:.0%}**  \n"
+        f"Lookups: {tm_stats['lookups']} · Exact: {tm_stats['exact_hits']} · Fuzzy: {tm_stats['fuzzy_hits']}  \n"
+        f"Segments: {tm_stats['segments']}"
+    )
+    st.slider("Reuse stored translations from this match", 0.5, 1.0, step=0.05, key="tm_reuse_threshold")
+    tm_file = st.file_uploader("Import bilingual file", type=["tmx", "csv", "tsv"], key="tm_file")
+    if tm_file is not None:
+        src_code = get_lang_code(st.session_state.last_src)
+        dest_code = get_lang_code(st.session_state.last_dest)
+        st.caption(f"CSV/TSV rows are read as {st.session_state.last_src} → {st.session_state.last_dest}")
+        if st.button("📥 Import into memory"):
+            try:
+                pairs = parse_bilingual(tm_file.name, tm_file.getvalue(), src_code, dest_code)
+                stored = translation_memory.add_many(pairs, src_code, dest_code, origin=tm_file.name,
+                                                     owner=st.session_state.history_owner)
+                st.success(f"Imported {stored} segments.")
+            except Exception as e:
+                st.error(f"❌ Could not import file: {str(e)}")
+
+if st.sidebar.checkbox("🩺 Show diagnostics", key="show_diagnostics"):
+    with st.sidebar.expander("🩺 Diagnostics", expanded=True):
+        stage_rows = [
+            {
+                "stage": stage,
+                "calls": entry["calls"],
+                "errors": entry["errors"],
+                "mean ms": round(entry["mean_s"] * 1000, 1),
+                "p95 ms": round(entry["p95_s"] * 1000, 1),
+            }
+            for stage, entry in sorted(metrics.stage_summary().items())
+        ]
+        if stage_rows:
+            st.dataframe(stage_rows, hide_index=True, use_container_width=True)
+        else:
+            st.caption("No stages timed yet.")
+        router = backends["translator"]
+        router_stats = router.stats()
+        st.markdown(
+            f"Routes: `{TRANSLATE_ROUTES}`  \n"
+            f"Hedged: {router_stats['hedged']} (won {router_stats['hedge_wins']}) · "
+            f"Failovers: {router_stats['failovers']} · Failed: {router_stats['failed']}"
+        )
+        st.dataframe(
+            [
+                {
+                    "backend": name,
+                    "calls": entry["total"],
+                    "error rate": f"{entry['error_rate']:.0%}",
+                    "p50 ms": round(entry["p50_s"] * 1000, 1) if entry["p50_s"] is not None else None,
+                    "p95 ms": round(entry["p95_s"] * 1000, 1) if entry["p95_s"] is not None else None,
+                }
+                for name, entry in router_stats["backends"].items()
+            ],
+            hide_index=True,
+            use_container_width=True,
+        )
+        resilient = [router.registry.get(name) for name in router.registry.names()] + [backends["tts"]]
+        st.markdown(
+            "  \n".join(
+                f"`{backend.name}` circuit: {backend.breaker.state} ({backend.breaker.trips} trips)"
+                for backend in resilient if isinstance(backend, ResilientBackend)
+            )
+        )
+        st.download_button(
+            "⬇️ Prometheus metrics",
+            metrics.to_prometheus(),
+            file_name="vocalite_metrics.prom",
+            mime="text/plain",
+        )
 
 
 # ----------------- Sidebar History -----------------
-st.sidebar.markdown("### 📜 Translation History")
-
-if st.session_state.history:
-    for item in reversed(st.session_state.history):  # latest first
-        with st.sidebar.expander(f"{item['src_lang']} → {item['dest_lang']} | {item['time']}"):
-            if "corrected" in item:
-                st.markdown(f"Corrected ({item['src_lang']}):")
-                st.info(item['corrected'])
-            else:
-                st.markdown(f"Original ({item['src_lang']}):")
-                st.info(item['original'])
+HISTORY_PAGE_SIZE = 10
+ALL_PAIRS = "All language pairs"
 
-            st.markdown(f"Translated ({item['dest_lang']}):")
-            st.success(item['translated'])
+def reset_history_pages():
+    """Goes back to the first page when the search or filter changes."""
+    st.session_state.history_cursors = [None]
+    st.session_state.history_export = None
 
-    if st.sidebar.button("🧹 Clear History"):
-        st.session_state.history = []
-        st.rerun()  
-else:
-    st.sidebar.markdown(
-        f"""
-        <div class="no-history-box">
-            No translation history yet. Press Clear after translating to save.
-        </div>
-        """,
-        unsafe_allow_html=True
-    )
+@st.fragment
+def history_panel():
+    """Renders one page of the persistent history with search, filters and export."""
+    st.markdown("### 📜 Translation History")
+    owner = st.session_state.history_owner
+
+    query = st.text_input("🔎 Search history", key="history_query", on_change=reset_history_pages,
+                          placeholder="Words from the original or translation")
+    # Labels leave out the counts so the selection survives new entries
+    pairs = {f"{src} → {dest}": (src, dest) for src, dest, _ in history_store.language_pairs(owner)}
+    pair_label = st.selectbox("Language pair", [ALL_PAIRS] + list(pairs), key="history_pair",
+                              on_change=reset_history_pages)
+    src_filter, dest_filter = pairs.get(pair_label, (None, None))
+    filters = {"query": query, "src_lang": src_filter, "dest_lang": dest_filter}
+
+    cursors = st.session_state.history_cursors
+    items, next_cursor = history_store.page(owner, HISTORY_PAGE_SIZE, before_id=cursors[-1], **filters)
+
+    if items:
+        # Only the current page is rendered, however long the history is
+        for item in items:
+            with st.expander(f"{item['src_lang']} → {item['dest_lang']} | {item['time']}"):
+                if "corrected" in item:
+                    st.markdown(f"Corrected ({item['src_lang']}):")
+                    st.info(item['corrected'])
+                else:
+                    st.markdown(f"Original ({item['src_lang']}):")
+                    st.info(item['original'])
+
+                st.markdown(f"Translated ({item['dest_lang']}):")
+                st.success(item['translated'])
+
+        col_prev, col_page, col_next = st.columns([1, 1, 1])
+        with col_prev:
+            if st.button("◀", key="history_prev", disabled=len(cursors) == 1):
+                cursors.pop()
+                st.rerun(scope="fragment")
+        with col_page:
+            st.caption(f"Page {len(cursors)}")
+        with col_next:
+            if st.button("▶", key="history_next", disabled=next_cursor is None):
+                cursors.append(next_cursor)
+                st.rerun(scope="fragment")
+
+        with st.expander("⬇ Export history"):
+            export_format = st.radio("Format", ["jsonl", "csv"], horizontal=True, key="history_export_format")
+            # Exports can be large, so they are built on request rather than on every rerun
+            if st.button("Prepare export", key="history_prepare_export"):
+                st.session_state.history_export = (
+                    export_format, history_store.export(export_format, owner, **filters)
+                )
+            if st.session_state.history_export is not None:
+                prepared_format, data = st.session_state.history_export
+                st.download_button(
+                    f"⬇ Download {prepared_format.upper()}",
+                    data,
+                    file_name=f"vocalite_history.{prepared_format}",
+                    mime="text/csv" if prepared_format == "csv" else "application/jsonl",
+                )
+
+        if st.button("🧹 Clear History"):
+            history_store.clear(owner)
+            reset_history_pages()
+            st.rerun(scope="fragment")
+    elif query or src_filter:
+        st.caption("No history entries match.")
+    else:
+        st.markdown(
+            f"""
+            <div class="no-history-box">
+                No translation history yet. Press Clear after translating to save.
+            </div>
+            """,
+            unsafe_allow_html=True
+        )
+
+with st.sidebar:
+    history_panel()
 
 # ----------------- App UI -----------------
 st.markdown(
@@ -367,192 +684,560 @@ st.markdown(
 )
 st.markdown("---")
 
-st.subheader("🌐 Language Selection")
-col1, col_swap, col2 = st.columns([2, 0.3, 2])
+# ----------------- Language Selection -----------------
+def swap_languages():
+    """Swaps the two language selections before the widgets are drawn again."""
+    state = st.session_state
+    state.input_lang_select, state.output_lang_select = state.output_lang_select, state.input_lang_select
 
-with col1:
-    input_lang = st.selectbox(
-        "From", 
-        sorted(list(LANGUAGES.values())), 
-        index=sorted(list(LANGUAGES.values())).index(st.session_state.last_src),
-        key="input_lang_select",
-        help="Select the language of your input text"
-    )
+def selected_output_langs():
+    """Returns the main output language followed by any extra fan-out targets."""
+    output_lang = st.session_state.last_dest
+    extra_langs = st.session_state.get("extra_output_langs", []) if st.session_state.get("multi_target") else []
+    return [output_lang] + [lang for lang in extra_langs if lang != output_lang]
+
+@st.fragment
+def language_panel():
+    """Language pickers and the swap button; changing them reruns only this panel."""
+    st.subheader("🌐 Language Selection")
+    col1, col_swap, col2 = st.columns([2, 0.3, 2])
+
+    with col1:
+        input_lang = st.selectbox(
+            "From", 
+            LANGUAGE_NAMES, 
+            key="input_lang_select",
+            help="Select the language of your input text"
+        )
+
+    with col_swap:
+        st.write("")
+        st.write("")
+        st.button("🔄", help="Swap languages", on_click=swap_languages)
+
+    with col2:
+        output_lang = st.selectbox(
+            "To", 
+            LANGUAGE_NAMES, 
+            key="output_lang_select",
+            help="Select the language you want to translate to"
+        )
+
+    multi_target = st.checkbox("🌍 Translate into several languages at once", key="multi_target")
+    if multi_target:
+        st.multiselect(
+            "Also translate to",
+            [lang for lang in LANGUAGE_NAMES if lang != output_lang],
+            key="extra_output_langs",
+            help="Each extra language is translated and voiced in parallel with the main one"
+        )
+
+    st.session_state.last_src = input_lang
+    st.session_state.last_dest = output_lang
+
+language_panel()
+
+
+# ----------------- Input Panel -----------------
+def set_input_method(method):
+    st.session_state.input_method = method
 
-with col_swap:
-    st.write("")
-    st.write("")
-    if st.button("🔄", help="Swap languages"):
-        temp_lang = st.session_state.last_src
-        st.session_state.last_src = st.session_state.last_dest
-        st.session_state.last_dest = temp_lang
+@st.fragment(run_every=0.5)
+def transcript_poller():
+    """Shows partial transcripts while audio is being captured; reruns on its own every half second.
+
+    The panel only calls it while the transcriber runs, so once capture ends
+    one page rerun shows the final transcript and the polling stops.
+    """
+    transcriber = st.session_state.transcriber
+    if transcriber is None:
+        return
+    append_transcripts(transcriber)
+    if not transcriber.running:
         st.rerun()
+    st.info(f"🎧 Listening... Speak clearly into your microphone.\n\n{st.session_state.spoken_text}")
 
-with col2:
-    output_lang = st.selectbox(
-        "To", 
-        sorted(list(LANGUAGES.values())), 
-        index=sorted(list(LANGUAGES.values())).index(st.session_state.last_dest), 
-        key="output_lang_select",
-        help="Select the language you want to translate to"
-    )
+@st.fragment
+def input_panel():
+    """Input method buttons, the active input and grammar correction; reruns on its own."""
+    input_lang = st.session_state.last_src
+    output_lang = st.session_state.last_dest
+    grammar_check = st.session_state.grammar_check
+
+    st.subheader("📥 Input Method")
+    st.markdown("Choose Input Method")
+    cols = st.columns(5)
+    methods = ["Type", "Speak", "Camera", "Upload Image", "Upload File"]
+    emojis = ["⌨", "🎤", "📷", "🖼", "📄"]
+
+    for i, method in enumerate(methods):
+        with cols[i]:
+            st.button(f"{emojis[i]} {method}", key=f"method_{method}", on_click=set_input_method, args=(method,))
+    input_method = st.session_state.input_method
 
-st.session_state.last_src = input_lang
-st.session_state.last_dest = output_lang
-
-
-# ----------------- CUSTOM UI BUTTONS FOR INPUT METHOD -----------------
-st.subheader("📥 Input Method")
-st.markdown("Choose Input Method")
-cols = st.columns(4)
-methods = ["Type", "Speak", "Camera", "Upload Image"]
-emojis = ["⌨", "🎤", "📷", "🖼"]
-
-for i, method in enumerate(methods):
-    with cols[i]:
-        if st.button(f"{emojis[i]} {method}", key=f"method_{method}"):
-            st.session_state.input_method = method
-            st.rerun()
-input_method = st.session_state.input_method
-
-# ---------- INPUT LOGIC ----------
-if input_method == "Type":
-    st.session_state.spoken_text = st.text_area("💬 Type your message here", key="typed_text", height=150,placeholder="Type or paste text here to translate...")
-
-elif input_method == "Speak":
-    if st.button("🎙 Speak Now"):
-        r = sr.Recognizer()
-        try:
-            with sr.Microphone() as source:
-                st.info("🎧 Listening... Speak clearly into your microphone.")
-                r.adjust_for_ambient_noise(source)
-                audio = r.listen(source, timeout=5)
-                spoken_text = r.recognize_google(audio)
-                st.session_state.spoken_text = spoken_text
-                st.success(f"✅ You said: {spoken_text}")
-        except Exception as e:
-            st.error(f"⚠ Error: {str(e)}")
-
-elif input_method == "Camera":
-    camera_photo = st.camera_input("📷 Capture a photo with text", key=st.session_state.camera_photo_key)
-    if camera_photo:
-        image = Image.open(camera_photo)
-        st.markdown("✂ Crop the area with text before OCR")
-        cropped_img = st_cropper(image, aspect_ratio=None, box_color="#4CAF50")
-        st.image(cropped_img, caption="Cropped Image", use_column_width=True)
-        if st.button("Extract Text from Cropped Image"):
-            with st.spinner("🔍 Extracting text from image..."):
+    # Warm up the backends this input method needs on background threads
+    if input_method == "Speak":
+        backends["speech_recognition"].warm_up()
+        backends["recognizer"].warm_up()
+    elif input_method in ("Camera", "Upload Image"):
+        backends["cropper"].warm_up()
+        backends["ocr"].warm_up()
+
+    # Input logic
+    if input_method == "Type":
+        st.session_state.spoken_text = st.text_area("💬 Type your message here", key="typed_text", height=150,placeholder="Type or paste text here to translate...")
+
+    elif input_method == "Speak":
+        speak_mode = st.radio(
+            "Speech source",
+            ["🎙 Microphone", "📁 Audio File (WAV/FLAC)", "🗂 Long Recording"],
+            horizontal=True,
+            key="speak_mode",
+        )
+        transcriber = st.session_state.transcriber
+
+        if speak_mode == "🎙 Microphone":
+            col_start, col_stop = st.columns(2)
+            with col_start:
+                start_clicked = st.button("🎙 Speak Now", disabled=transcriber is not None and transcriber.running)
+            with col_stop:
+                stop_clicked = st.button("⏹ Stop", disabled=transcriber is None or not transcriber.running)
+
+            if stop_clicked and transcriber is not None:
+                transcriber.stop()
+                with st.spinner("📝 Finishing transcription..."):
+                    transcriber.join(timeout=15)
+            if start_clicked:
                 try:
-                    extracted_text = pytesseract.image_to_string(cropped_img).strip()
-                    if extracted_text:
-                        st.session_state.spoken_text = extracted_text
-                        st.success(f"✅ Extracted Text: {st.session_state.spoken_text}")
-                    else:
-                        st.warning("⚠ No text detected. Try cropping more accurately.")
+                    transcriber = start_microphone_transcriber(sr, pipeline.recognize)
+                    st.session_state.transcriber = transcriber
+                    st.session_state.spoken_text = ""
                 except Exception as e:
-                    st.error(f"❌ OCR Error: {str(e)}")
-
-elif input_method == "Upload Image":
-    uploaded_file = st.file_uploader("📂 Upload an image (JPG, PNG, etc.)", type=["jpg", "jpeg", "png"], key=st.session_state.uploaded_file_key)
-    if uploaded_file:
-        image = Image.open(uploaded_file)
-        st.markdown("✂ Crop the area with text before OCR")
-        cropped_img = st_cropper(image, aspect_ratio=None, box_color="#4CAF50")
-        st.image(cropped_img, caption="Cropped Image", use_column_width=True)
-        if st.button("Extract Text from Cropped Image"):
-            with st.spinner("🔍 Extracting text from image..."):
+                    st.error(f"⚠ Error: {str(e)}")
+        elif speak_mode == "🗂 Long Recording":
+            # Meetings and voicemails: split on silence and transcribe the chunks in parallel
+            long_upload = st.file_uploader(
+                "🗂 Upload a long recording (WAV, FLAC)",
+                type=["wav", "flac"],
+                key=f"long_audio_{st.session_state.uploaded_file_key}",
+            )
+            long_workers = st.slider("Parallel transcriptions", 1, 16, 4)
+            if long_upload and st.button("📝 Transcribe Long Recording"):
                 try:
-                    extracted_text = pytesseract.image_to_string(cropped_img).strip()
-                    if extracted_text:
-                        st.session_state.spoken_text = extracted_text
-                        st.success(f"✅ Extracted Text: {st.session_state.spoken_text}")
-                    else:
-                        st.warning("⚠ No text detected. Try cropping more accurately.")
+                    with st.spinner("✂ Splitting recording on silence..."):
+                        pcm, sample_rate, sample_width = read_audio_file(long_upload.getvalue(), long_upload.name)
+                        audio_chunks = split_on_silence(pcm, sample_rate, sample_width, max_chunk_s=30)
+                    progress = st.progress(0.0, text=f"Transcribing {len(audio_chunks)} chunks...")
+                    started = time.perf_counter()
+                    chunk_results = transcribe_chunks(
+                        audio_chunks,
+                        sample_rate,
+                        sample_width,
+                        pipeline.recognize,
+                        workers=long_workers,
+                        on_result=lambda result, done, total: progress.progress(
+                            done / total, text=f"Transcribed {done}/{total} chunks"
+                        ),
+                    )
+                    elapsed = time.perf_counter() - started
+                    duration = len(pcm) / (sample_rate * sample_width)
+                    failed = [result for result in chunk_results if result["error"] is not None]
+                    st.caption(
+                        f"{format_timestamp(duration)} of audio in {elapsed:.1f} s "
+                        f"(real-time factor {elapsed / max(duration, 1e-9):.2f}) · {len(audio_chunks)} chunks"
+                    )
+                    if failed:
+                        st.warning(f"⚠ {len(failed)} chunks could not be transcribed: {str(failed[0]['error'])}")
+                    with st.expander("🕒 Timestamped transcript", expanded=True):
+                        st.text(timestamped_transcript(chunk_results))
+                    st.session_state.transcriber = None
+                    st.session_state.spoken_text = stitch_transcript(chunk_results)
+                    if st.session_state.spoken_text:
+                        st.success("✅ Transcript ready. Press Translate to translate it.")
                 except Exception as e:
-                    st.error(f"❌ OCR Error: {str(e)}")
+                    st.error(f"⚠ Error: {str(e)}")
+        else:
+            audio_upload = st.file_uploader(
+                "📁 Upload a recording (WAV, FLAC)",
+                type=["wav", "flac"],
+                key=f"audio_file_{st.session_state.uploaded_file_key}",
+            )
+            if audio_upload and st.button("📝 Transcribe Recording"):
+                try:
+                    pcm, sample_rate, sample_width = read_audio_file(audio_upload.getvalue(), audio_upload.name)
+                    transcriber = StreamingTranscriber(pipeline.recognize).start(
+                        pcm_chunks(pcm, sample_rate, sample_width), sample_rate, sample_width
+                    )
+                    st.session_state.transcriber = transcriber
+                    st.session_state.spoken_text = ""
+                except Exception as e:
+                    st.error(f"⚠ Error: {str(e)}")
 
-# Grammar correction
-if st.session_state.spoken_text and grammar_check:
-    st.markdown("### ✏ Grammar Correction")
-    st.write("Original text:")
-    st.info(st.session_state.spoken_text)
-    
-    if st.button("Check Grammar"):
-        with st.spinner("Checking grammar..."):
-            st.session_state.corrected_text = correct_grammar(st.session_state.spoken_text, input_lang)
-            st.session_state.show_grammar_correction = True
+        if transcriber is not None and transcriber.running:
+            transcript_poller()
+        elif transcriber is not None:
+            append_transcripts(transcriber)
+            for error in transcriber.errors:
+                st.error(f"⚠ Error: {str(error)}")
+            if st.session_state.spoken_text:
+                st.success(f"✅ You said: {st.session_state.spoken_text}")
+
+    elif input_method == "Camera":
+        camera_photo = st.camera_input("📷 Capture a photo with text", key=st.session_state.camera_photo_key)
+        if camera_photo:
+            intake, crop_box = crop_upload(camera_photo)
+            if st.button("Extract Text from Cropped Image"):
+                with st.spinner("🔍 Extracting text from image..."):
+                    try:
+                        extracted_text, ocr_timings = pipeline.extract_text_timed(intake.crop(crop_box))
+                        st.caption(" · ".join(f"{stage} {seconds * 1000:.0f} ms" for stage, seconds in ocr_timings.items()))
+                        if extracted_text:
+                            st.session_state.spoken_text = extracted_text
+                            st.success(f"✅ Extracted Text: {st.session_state.spoken_text}")
+                        else:
+                            st.warning("⚠ No text detected. Try cropping more accurately.")
+                    except Exception as e:
+                        st.error(f"❌ OCR Error: {str(e)}")
+
+    elif input_method == "Upload Image":
+        uploaded_file = st.file_uploader(
+            "📂 Upload an image or scanned document (JPG, PNG, TIFF, PDF)",
+            type=["jpg", "jpeg", "png"] + DOCUMENT_EXTENSIONS,
+            key=st.session_state.uploaded_file_key,
+        )
+        if uploaded_file:
+            is_document = uploaded_file.name.lower().endswith(tuple(DOCUMENT_EXTENSIONS))
+            document_pages = 1
+            if is_document:
+                try:
+                    document_pages = count_pages(uploaded_file.name, uploaded_file.getvalue())
+                except Exception as e:
+                    document_pages = 0
+                    st.error(f"❌ Could not read document: {str(e)}")
+
+            if is_document and (document_pages > 1 or uploaded_file.name.lower().endswith(".pdf")):
+                # Multi-page documents are OCR'd page by page on a process pool
+                st.markdown(f"📄 {document_pages} pages detected")
+                translate_pages = st.checkbox("🌐 Translate pages as they finish", value=True)
+                if st.button("Extract Text from All Pages"):
+                    src_lang = get_lang_code(input_lang)
+                    dest_lang = get_lang_code(output_lang)
+                    progress = st.progress(0.0, text=f"Extracting text from {document_pages} pages...")
+                    page_slots = [st.empty() for _ in range(document_pages)]
+                    page_results = []
+                    page_translations = {}
+                    started = time.perf_counter()
+                    try:
+                        for result in ocr_pages(
+                            iter_pages(uploaded_file.name, uploaded_file.getvalue()),
+                            unwrap(getattr(pipeline.ocr, "backend", pipeline.ocr)),
+                        ):
+                            page_results.append(result)
+                            with page_slots[result["page"]].container():
+                                st.markdown(f"**Page {result['page'] + 1}** · {result['seconds']:.2f} s")
+                                if result["error"] is not None:
+                                    st.error(f"❌ OCR Error: {str(result['error'])}")
+                                else:
+                                    st.info(result["text"] or "No text detected on this page.")
+                                    if translate_pages and result["text"]:
+                                        page_placeholder = st.empty()
+                                        for page_translation in pipeline.translate_streaming(
+                                            result["text"], src_lang, dest_lang, **memory_options()
+                                        ):
+                                            page_placeholder.success(page_translation)
+                                        page_translations[result["page"]] = page_translation
+                            progress.progress(
+                                len(page_results) / max(document_pages, 1),
+                                text=f"Extracted {len(page_results)}/{document_pages} pages",
+                            )
+                    except Exception as e:
+                        st.error(f"❌ OCR Error: {str(e)}")
+
+                    report = summarize_pages(page_results, time.perf_counter() - started)
+                    st.caption(
+                        f"{report['pages']} pages in {report['wall_s']} s · {report['pages_per_s']} pages/sec"
+                        + (f" · {report['failed']} failed" if report["failed"] else "")
+                    )
+                    page_texts = [result["text"] for result in sorted(page_results, key=lambda r: r["page"]) if result["text"]]
+                    if page_texts:
+                        st.session_state.spoken_text = "\n\n".join(page_texts)
+                        if page_translations:
+                            st.session_state.last_translated = "\n\n".join(
+                                page_translations[page] for page in sorted(page_translations)
+                            )
+                    else:
+                        st.warning("⚠ No text detected in the document.")
+            elif document_pages:
+                intake, crop_box = crop_upload(uploaded_file)
+                if st.button("Extract Text from Cropped Image"):
+                    with st.spinner("🔍 Extracting text from image..."):
+                        try:
+                            extracted_text, ocr_timings = pipeline.extract_text_timed(intake.crop(crop_box))
+                            st.caption(" · ".join(f"{stage} {seconds * 1000:.0f} ms" for stage, seconds in ocr_timings.items()))
+                            if extracted_text:
+                                st.session_state.spoken_text = extracted_text
+                                st.success(f"✅ Extracted Text: {st.session_state.spoken_text}")
+                            else:
+                                st.warning("⚠ No text detected. Try cropping more accurately.")
+                        except Exception as e:
+                            st.error(f"❌ OCR Error: {str(e)}")
+
+    elif input_method == "Upload File":
+        batch_file = st.file_uploader(
+            "📄 Upload a file to translate (CSV, TXT, JSONL)",
+            type=SUPPORTED_EXTENSIONS,
+            key=f"batch_file_{st.session_state.uploaded_file_key}",
+        )
+        if batch_file:
+            try:
+                document = parse_document(batch_file.name, batch_file.getvalue())
+            except Exception as e:
+                document = None
+                st.error(f"❌ Could not read file: {str(e)}")
+
+            if document is not None:
+                batch_field = None
+                if document.fields:
+                    batch_field = st.selectbox("Column to translate", document.fields, key="batch_field")
+                segments = document.segments(batch_field)
+
+                batch_col1, batch_col2 = st.columns(2)
+                with batch_col1:
+                    batch_concurrency = st.slider("Parallel requests", 1, 16, 4)
+                with batch_col2:
+                    batch_rate = st.slider("Rate limit (requests/sec, 0 = unlimited)", 0, 50, 10)
+                st.caption(f"{len(segments)} segments · {input_lang} → {output_lang}")
+
+                job_id = (batch_file.name, batch_file.size, batch_field, input_lang, output_lang)
+                job = st.session_state.batch_job
+                if job is not None and job["id"] != job_id:
+                    job = None
+
+                start_clicked = st.button("📄 Translate File")
+                retry_clicked = False
+                if job is not None and job["errors"]:
+                    retry_clicked = st.button(f"🔁 Retry {len(job['errors'])} failed segments")
+
+                if start_clicked or retry_clicked:
+                    if start_clicked:
+                        job = {"id": job_id, "translations": [None] * len(segments), "errors": {}}
+                        indexes = None
+                    else:
+                        indexes = sorted(job["errors"])
+                        job["errors"] = {}
+                    src_lang = get_lang_code(input_lang)
+                    dest_lang = get_lang_code(output_lang)
+                    # Read on this thread: the worker threads have no access to session state
+                    options = memory_options()
+                    total = len(segments) if indexes is None else len(indexes)
+                    progress = st.progress(0.0, text=f"Translating {total} segments...")
+                    preview = st.empty()
+                    done = 0
+                    for index, translated, error in translate_segments(
+                        segments,
+                        lambda text: pipeline.translate(text, src_lang, dest_lang, **options),
+                        concurrency=batch_concurrency,
+                        rate_limit=batch_rate,
+                        indexes=indexes,
+                    ):
+                        done += 1
+                        if error is None:
+                            job["translations"][index] = translated
+                        else:
+                            job["errors"][index] = str(error)
+                        progress.progress(done / max(total, 1), text=f"Translated {done}/{total} segments")
+                        if done % 25 == 0 or done == total:
+                            preview.dataframe(
+                                [
+                                    {"Row": i + 1, "Original": segments[i], "Translated": t}
+                                    for i, t in enumerate(job["translations"]) if t is not None
+                                ][:200],
+                                use_container_width=True,
+                            )
+                    st.session_state.batch_job = job
+
+                if job is not None:
+                    translations = [
+                        translated if translated is not None else segments[i]
+                        for i, translated in enumerate(job["translations"])
+                    ]
+                    if job["errors"]:
+                        st.warning(f"⚠ {len(job['errors'])} segments failed and were left untranslated.")
+                    else:
+                        st.success(f"✅ Translated {len(segments)} segments.")
+                    st.download_button(
+                        "⬇ Download translated file",
+                        document.render(batch_field, translations),
+                        file_name=f"translated_{batch_file.name}",
+                        mime={"csv": "text/csv", "jsonl": "application/jsonl"}.get(document.kind, "text/plain"),
+                    )
+
+    # Once there is text to translate, get the translator and TTS ready in the background
+    if st.session_state.spoken_text:
+        backends["translator"].warm_up()
+        backends["tts"].warm_up()
+
+    # Offer a similar past translation straight away
+    if st.session_state.spoken_text:
+        lookup_key = (st.session_state.spoken_text, get_lang_code(input_lang), get_lang_code(output_lang))
+        if st.session_state.tm_suggestion[0] != lookup_key:
+            st.session_state.tm_suggestion = (
+                lookup_key, translation_memory.lookup(*lookup_key, owner=st.session_state.history_owner)
+            )
+        match = st.session_state.tm_suggestion[1]
+        if match is not None:
+            st.info(
+                f"💡 Translation memory ({match['score']:.0%} match): {match['adapted'] or match['target']}  \n"
+                f"Stored for: {match['source']}"
+            )
+
+    # Grammar correction
+    if st.session_state.spoken_text and grammar_check:
+        st.markdown("### ✏ Grammar Correction")
+        st.write("Original text:")
+        st.info(st.session_state.spoken_text)
     
-    if st.session_state.show_grammar_correction and st.session_state.corrected_text:
-        st.write("Corrected text:")
-        st.success(st.session_state.corrected_text)
-        if st.button("Use Corrected Text"):
-            st.session_state.spoken_text = st.session_state.corrected_text
-            st.rerun()
-
-
-# ----------------- BUTTONS -----------------
-col_translate, col_clear, _ = st.columns([2, 2, 6])
-with col_translate:
-    translate_clicked = st.button("🌐 Translate", use_container_width=True)
-with col_clear:
-    clear_clicked = st.button("🧹 Clear", use_container_width=True, on_click=clear_inputs)
-
-# ----------------- TRANSLATION LOGIC -----------------
-if translate_clicked:
-    # Save the previous translation to history before starting a new one
-    save_to_history()  
+        if st.button("Check Grammar"):
+            with st.spinner("Checking grammar..."):
+                st.session_state.corrected_text = correct_grammar(st.session_state.spoken_text, input_lang)
+                st.session_state.show_grammar_correction = True
     
-    input_text = st.session_state.spoken_text.strip()
-    if not input_text:
-        st.warning("⚠ Please enter, speak, or capture/upload some text first.")
-    else:
-        src_lang = get_lang_code(input_lang)
-        dest_lang = get_lang_code(output_lang)
-        
-        with st.spinner(f"🌐 Translating from {input_lang} to {output_lang}..."):
-            try:
-                final_input = st.session_state.corrected_text if (
-                    st.session_state.corrected_text and 
-                    st.session_state.corrected_text != input_text and
-                    grammar_check
-                ) else input_text
-                
-                translation = translator.translate(final_input, src=src_lang, dest=dest_lang)
-                st.session_state.last_translated = translation.text
+        if st.session_state.show_grammar_correction and st.session_state.corrected_text:
+            st.write("Corrected text:")
+            st.success(st.session_state.corrected_text)
+            if st.button("Use Corrected Text"):
+                st.session_state.spoken_text = st.session_state.corrected_text
+                st.rerun(scope="fragment")
+
+input_panel()
+
+
+# ----------------- Result Panel -----------------
+@st.fragment
+def result_panel():
+    """Translate / Clear buttons and the translation output; reruns on its own."""
+    input_lang = st.session_state.last_src
+    output_lang = st.session_state.last_dest
+    output_langs = selected_output_langs()
+    extra_langs = output_langs[1:]
+    grammar_check = st.session_state.grammar_check
+    auto_play = st.session_state.auto_play
+
+    col_translate, col_clear, _ = st.columns([2, 2, 6])
+    with col_translate:
+        translate_clicked = st.button("🌐 Translate", use_container_width=True)
+    with col_clear:
+        clear_clicked = st.button("🧹 Clear", use_container_width=True, on_click=clear_inputs)
+    if clear_clicked:
+        # Clearing saves to history and resets every panel, so rerun the whole page
+        st.rerun()
+
+    # Save the previous translation to history before starting a new one. The history panel is
+    # its own fragment, so rerun the whole page once to list it there and translate in that run
+    if translate_clicked and save_to_history():
+        st.session_state.translate_pending = True
+        st.rerun()
+    if st.session_state.translate_pending:
+        st.session_state.translate_pending = False
+        translate_clicked = True
+
+    # Translation logic
+    if translate_clicked:
+        input_text = st.session_state.spoken_text.strip()
+        if not input_text:
+            st.warning("⚠ Please enter, speak, or capture/upload some text first.")
+        else:
+            src_lang = get_lang_code(input_lang)
+            dest_lang = get_lang_code(output_lang)
+            final_input = st.session_state.corrected_text if (
+                st.session_state.corrected_text and 
+                st.session_state.corrected_text != input_text and
+                grammar_check
+            ) else input_text
+            st.session_state.last_extra_translations = []
 
+            if extra_langs:
+                # Fan out: every target translates and synthesizes on its own worker
+                target_names = {get_lang_code(lang): lang for lang in output_langs}
                 st.markdown("### 📝 Translation Result")
                 col1, col2 = st.columns(2)
                 with col1:
                     st.markdown(f"##### {input_lang.capitalize()}")
                     st.info(final_input)
                 with col2:
-                    st.markdown(f"##### {output_lang.capitalize()}")
-                    translated_text = translation.text
-                    st.success(translated_text)
-                    
+                    placeholders = {code: st.empty() for code in target_names}
+                for code, lang in target_names.items():
+                    placeholders[code].info(f"⏳ Translating to {lang}...")
 
-                st.markdown("### 🔊 Audio Output")
-                
-                with st.spinner("🔊 Generating audio..."):
-                    tts = gTTS(translated_text, lang=dest_lang)
-                    audio_file = f"translation_{int(time.time())}.mp3"
-                    tts.save(audio_file)
-                    audio_bytes = open(audio_file, 'rb').read()
-                    b64 = base64.b64encode(audio_bytes).decode()
-                    
-                    st.audio(audio_bytes, format='audio/mp3')
+                for result in pipeline.fan_out(final_input, src_lang, list(target_names), **memory_options()):
+                    lang = target_names[result["dest"]]
+                    with placeholders[result["dest"]].container():
+                        st.markdown(f"##### {lang.capitalize()}")
+                        if result["error"] is not None:
+                            st.error(f"❌ Translation failed. Error: {str(result['error'])}")
+                            continue
+                        st.success(result["translated"])
+                        if result["audio_error"] is not None:
+                            st.warning(f"🔇 Audio unavailable: {str(result['audio_error'])}")
+                        else:
+                            st.audio(result["audio"], format='audio/mp3', autoplay=auto_play and lang == output_lang)
+                    if lang == output_lang:
+                        st.session_state.last_translated = result["translated"]
+                    else:
+                        st.session_state.last_extra_translations.append((lang, result["translated"]))
+            else:
+                with st.spinner(f"🌐 Translating from {input_lang} to {output_lang}..."):
+                    try:
+                        st.markdown("### 📝 Translation Result")
+                        col1, col2 = st.columns(2)
+                        with col1:
+                            st.markdown(f"##### {input_lang.capitalize()}")
+                            st.info(final_input)
+                        with col2:
+                            st.markdown(f"##### {output_lang.capitalize()}")
+                            result_placeholder = st.empty()
+                            # Long inputs are translated in chunks; show each finished prefix right away
+                            for translated_text in pipeline.translate_streaming(
+                                final_input, src_lang, dest_lang, **memory_options()
+                            ):
+                                result_placeholder.success(translated_text)
+                        st.session_state.last_translated = translated_text
+                        
+
+                        st.markdown("### 🔊 Audio Output")
                     
-                    if auto_play:
-                        audio_html = f"""
-                            <audio autoplay>
-                                <source src="data:audio/mp3;base64,{b64}" type="audio/mp3">
-                            </audio>
-                        """
-                        st.markdown(audio_html, unsafe_allow_html=True)
-                    os.remove(audio_file)
+                        with st.spinner("🔊 Generating audio..."):
+                            # Long translations are synthesized sentence by sentence; the first
+                            # part is playable while the rest is still being generated
+                            pieces = []
+                            part_player = st.empty()
+                            for index, count, piece in pipeline.synthesize_streaming(translated_text, dest_lang):
+                                pieces.append(piece)
+                                if index == 0 and count > 1:
+                                    part_started = time.monotonic()
+                                    with part_player.container():
+                                        st.caption(f"▶ Part 1 of {count}, ready while the rest is synthesized")
+                                        st.audio(piece, format='audio/mp3', autoplay=auto_play)
+                            audio_bytes = concat_mp3(pieces)
 
-            except Exception as e:
-                st.error(f"❌ Translation failed. Error: {str(e)}")
+                            # st.audio registers the clip once with Streamlit's media endpoint and sends
+                            # only its URL, so auto-play needs no second inline copy of the audio
+                            start_time = 0
+                            if len(pieces) > 1:
+                                # The full clip replaces the part 1 player, so the page holds one clip
+                                # and Streamlit can release part 1's media file when this run ends
+                                part_player.empty()
+                                if auto_play:
+                                    # Part 1 has been playing since it was shown: carry on from there,
+                                    # at the latest from where part 1 ends
+                                    start_time = int(min(time.monotonic() - part_started,
+                                                         mp3_duration(pieces[0])))
+                            st.audio(audio_bytes, format='audio/mp3', start_time=start_time, autoplay=auto_play)
+
+                    except Exception as e:
+                        st.error(f"❌ Translation failed. Error: {str(e)}")
+
+result_panel()
 
 # Add the "Features Overview" section from the image
 st.markdown("---")
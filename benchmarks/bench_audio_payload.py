@@ -0,0 +1,146 @@
+"""Audio delivery benchmark: bytes sent and server memory held per translation, inline base64 versus media URL.
+
+Run from the repo root:
+
+    python -m benchmarks.bench_audio_payload --sentences 1 4 12 --repeat 5
+
+Translations of each length (in sentences) are synthesized with the fake MP3
+synthesizer through pipeline.synthesize_streaming, then delivered the way the
+result panel does it, with auto-play on:
+
+- ``inline``: the previous panel. st.audio registers the clip with the media
+  endpoint, and for single-part clips the same bytes are also sent as a
+  base64 ``data:`` URI inside an ``<audio autoplay>`` markdown block. A
+  multi-part clip keeps its part 1 player next to the full clip
+- ``media_url``: the current panel. Every clip goes through st.audio once and
+  auto-play uses its media URL; the part 1 player is dropped once the full
+  clip is shown
+
+The figures are modelled, not measured against a running Streamlit server:
+``Session`` stands in for one session's run, storing media files by content
+hash as Streamlit's media file manager does and keeping every markdown
+message. ``payload_bytes`` is what reaches the browser: each media file
+(fetched once from the media endpoint, part 1 included, since auto-play
+starts it) plus the markdown HTML (sent over the websocket). ``held_bytes``
+is what the server keeps after the run: the media files the final page
+still shows, plus the markdown messages in the forward-message cache for
+reconnects. That Streamlit releases the other files at the end of the run,
+and a session's remaining ones when it ends, is how its media file manager
+is documented to work; it is not verified here. ``peak_alloc_bytes`` is the
+tracemalloc peak while preparing the delivery.
+"""
+import argparse
+import base64
+import hashlib
+import random
+import tracemalloc
+
+from benchmarks.fakes import FakeMp3Synthesizer
+from benchmarks.stats import emit
+from vocalite.pipeline import VocalitePipeline
+from vocalite.tts_cache import AudioCache
+from vocalite.tts_stream import concat_mp3
+
+WORDS = ("el rápido zorro marrón salta sobre perro perezoso mientras escribimos frases largas sobre tiempo viaje "
+         "comida música familia trabajo escuela ciudad río montaña mañana tarde amigo mercado").split()
+
+
+def translation(sentences, rng):
+    return " ".join(
+        " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 18))).capitalize() + "."
+        for _ in range(sentences)
+    )
+
+
+class Session:
+    """What one session's run leaves behind: media files by content hash, and the markdown messages."""
+
+    def __init__(self):
+        self.media = {}
+        self.shown = set()
+        self.messages = []
+
+    def audio(self, data):
+        # Streamlit names media files by a hash of their content, so the same clip is stored once
+        key = hashlib.sha224(data + b"audio/mp3").hexdigest()
+        self.media.setdefault(key, data)
+        self.shown.add(key)
+        return key
+
+    def drop(self, key):
+        # An element emptied during the run no longer references its file when the run ends
+        self.shown.discard(key)
+
+    def markdown(self, body):
+        self.messages.append(body.encode("utf-8"))
+
+    def payload_bytes(self):
+        return sum(map(len, self.media.values())) + sum(map(len, self.messages))
+
+    def held_bytes(self):
+        return sum(len(self.media[key]) for key in self.shown) + sum(map(len, self.messages))
+
+
+def deliver_inline(session, pieces, auto_play=True):
+    if len(pieces) > 1:
+        session.audio(pieces[0])
+    audio_bytes = concat_mp3(pieces)
+    b64 = base64.b64encode(audio_bytes).decode()
+    session.audio(audio_bytes)
+    if auto_play and len(pieces) == 1:
+        session.markdown(f"""
+            <audio autoplay>
+                <source src="data:audio/mp3;base64,{b64}" type="audio/mp3">
+            </audio>
+        """)
+
+
+def deliver_media_url(session, pieces, auto_play=True):
+    part = session.audio(pieces[0]) if len(pieces) > 1 else None
+    full = session.audio(concat_mp3(pieces))
+    if part is not None and part != full:
+        session.drop(part)
+
+
+def measure(pieces, deliver):
+    tracemalloc.start()
+    session = Session()
+    deliver(session, pieces)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return {"payload_bytes": session.payload_bytes(), "held_bytes": session.held_bytes(), "peak_alloc_bytes": peak}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sentences", type=int, nargs="+", default=[1, 4, 12])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    pipeline = VocalitePipeline(translator=None, tts=FakeMp3Synthesizer(seed=args.seed), audio_cache=AudioCache())
+    results = {"config": vars(args), "lengths": {}}
+    for sentences in args.sentences:
+        totals = {"audio_bytes": 0, "parts": 0, "inline": {}, "media_url": {}}
+        for _ in range(args.repeat):
+            text = translation(sentences, rng)
+            pieces = [piece for _, _, piece in pipeline.synthesize_streaming(text, "es")]
+            totals["audio_bytes"] += len(concat_mp3(pieces))
+            totals["parts"] = max(totals["parts"], len(pieces))
+            for mode, deliver in (("inline", deliver_inline), ("media_url", deliver_media_url)):
+                for key, value in measure(pieces, deliver).items():
+                    totals[mode][key] = totals[mode].get(key, 0) + value
+        entry = {"parts": totals["parts"], "audio_bytes": round(totals["audio_bytes"] / args.repeat)}
+        for mode in ("inline", "media_url"):
+            entry[mode] = {key: round(value / args.repeat) for key, value in totals[mode].items()}
+            entry[mode]["payload_x_audio"] = round(entry[mode]["payload_bytes"] / entry["audio_bytes"], 2)
+        entry["payload_saved_bytes"] = entry["inline"]["payload_bytes"] - entry["media_url"]["payload_bytes"]
+        entry["held_saved_bytes"] = entry["inline"]["held_bytes"] - entry["media_url"]["held_bytes"]
+        results["lengths"][str(sentences)] = entry
+    emit(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
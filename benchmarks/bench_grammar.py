@@ -0,0 +1,103 @@
+"""Grammar checking benchmark: whole-text checks versus incremental sentence-level checks.
+
+Run from the repo root:
+
+    python -m benchmarks.bench_grammar --sentences 400 --edits 20
+
+A synthetic document of --sentences sentences (some with doubled words for the
+checker to fix) is checked by a fake LanguageTool whose cost is --latency-ms
+per call plus --per-char-us per character. The script times:
+
+- ``whole_text``: the previous behaviour, the full document in one call
+- ``incremental_cold``: every sentence checked, --workers at a time
+- ``incremental_after_edit``: one word changed in one sentence, --edits times
+- ``incremental_unchanged``: the same text checked again
+
+and confirms the incremental result matches the whole-text correction.
+"""
+import argparse
+import random
+import time
+
+from benchmarks.fakes import FakeLanguageTool
+from benchmarks.stats import emit, summarize
+from vocalite.grammar_cache import IncrementalGrammar
+
+WORDS = ("the quick brown fox jumps over a lazy dog while we write some longer sentences about weather travel "
+         "food music family work school city river mountain morning evening friend market").split()
+
+
+def document(sentences, rng):
+    lines = []
+    for i in range(sentences):
+        words = [rng.choice(WORDS) for _ in range(rng.randint(8, 20))]
+        if i % 7 == 0:
+            at = rng.randrange(len(words))
+            words.insert(at, words[at])  # a doubled word to correct
+        sentence = " ".join(words).capitalize() + "."
+        lines.append(sentence + ("\n\n" if i % 10 == 9 else " "))
+    return "".join(lines).strip()
+
+
+def edit_one_word(text, rng):
+    words = text.split(" ")
+    at = rng.randrange(len(words))
+    words[at] = rng.choice(WORDS) + ("." if words[at].endswith(".") else "")
+    return " ".join(words)
+
+
+def timed(fn):
+    start = time.perf_counter()
+    result = fn()
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sentences", type=int, default=400)
+    parser.add_argument("--edits", type=int, default=20)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=15.0, help="fixed cost of one LanguageTool call")
+    parser.add_argument("--per-char-us", type=float, default=20.0, help="cost per checked character")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    text = document(args.sentences, rng)
+    results = {"config": vars(args), "chars": len(text)}
+
+    whole = FakeLanguageTool(args.latency_ms, args.per_char_us)
+    seconds, expected = timed(lambda: whole.correct(text, "english"))
+    results["whole_text"] = summarize([seconds])
+
+    tool = FakeLanguageTool(args.latency_ms, args.per_char_us)
+    grammar = IncrementalGrammar(tool, max_workers=args.workers)
+    seconds, corrected = timed(lambda: grammar.correct(text, "english"))
+    results["incremental_cold"] = {**summarize([seconds]), "checker_calls": tool.calls,
+                                   "matches_whole_text": corrected == expected}
+
+    samples, calls, chars, mismatches, whole_samples = [], [], [], 0, []
+    for _ in range(args.edits):
+        text = edit_one_word(text, rng)
+        before_calls, before_chars = tool.calls, tool.chars
+        seconds, corrected = timed(lambda: grammar.correct(text, "english"))
+        samples.append(seconds)
+        calls.append(tool.calls - before_calls)
+        chars.append(tool.chars - before_chars)
+        whole_seconds, expected = timed(lambda: whole.correct(text, "english"))
+        whole_samples.append(whole_seconds)
+        mismatches += corrected != expected
+    results["whole_text_after_edit"] = summarize(whole_samples)
+    results["incremental_after_edit"] = {**summarize(samples), "checker_calls_per_edit": max(calls),
+                                         "chars_checked_per_edit": max(chars), "mismatches": mismatches}
+
+    before_calls = tool.calls
+    seconds, _ = timed(lambda: grammar.correct(text, "english"))
+    results["incremental_unchanged"] = {**summarize([seconds]), "checker_calls": tool.calls - before_calls}
+    results["cache"] = grammar.stats()
+    emit(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,125 @@
+"""History store benchmark: append, paging, search, filters and export at scale.
+
+Run from the repo root:
+
+    python -m benchmarks.bench_history --entries 300000
+
+Fills a fresh SQLite history with --entries synthetic translations across a
+few language pairs (in batches, timing a sample of single appends along the
+way), then times the sidebar's queries: the first and a deep page, a
+language-pair filter, full-text searches for a rare and a common word, counts,
+and a full export. --no-fts repeats the searches with LIKE scans for
+comparison.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.stats import emit, summarize
+from vocalite.history import HistoryStore
+
+PAIRS = [("english", "french"), ("english", "spanish"), ("german", "english"), ("english", "japanese"),
+         ("french", "english"), ("spanish", "german")]
+WORDS = ("the quick brown fox jumps over lazy dog hello world please translate this sentence about weather "
+         "travel food music family work school city river mountain morning evening friend market").split()
+
+
+def synthetic_items(count, seed):
+    rng = random.Random(seed)
+    for i in range(count):
+        src_lang, dest_lang = rng.choice(PAIRS)
+        original = " ".join(rng.choice(WORDS) for _ in range(rng.randint(4, 16)))
+        if i % 5000 == 0:
+            original += " zanzibar"  # rare search term
+        yield {
+            "original": original,
+            "translated": original[::-1],
+            "src_lang": src_lang,
+            "dest_lang": dest_lang,
+            "time": "12:00:00",
+        }
+
+
+def timed(fn, repeat):
+    samples = []
+    result = None
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = fn()
+        samples.append(time.perf_counter() - start)
+    return summarize(samples), result
+
+
+def bench_queries(store, owner, repeat):
+    results = {}
+    results["first_page"], (_, cursor) = timed(lambda: store.page(owner, 10), repeat)
+    # Walk 1000 pages deep, then time a page there
+    for _ in range(1000):
+        if cursor is None:
+            break
+        _, cursor = store.page(owner, 10, cursor)
+    results["page_1000_deep"], _ = timed(lambda: store.page(owner, 10, cursor), repeat)
+    results["pair_filter_page"], _ = timed(lambda: store.page(owner, 10, src_lang="german", dest_lang="english"),
+                                           repeat)
+    results["search_rare_page"], (items, _) = timed(lambda: store.page(owner, 10, query="zanzibar"), repeat)
+    results["search_rare_hits"] = len(items)
+    results["search_common_page"], _ = timed(lambda: store.page(owner, 10, query="weather"), repeat)
+    results["search_two_words_page"], _ = timed(lambda: store.page(owner, 10, query="river morn"), repeat)
+    results["count_all"], _ = timed(lambda: store.count(owner), repeat)
+    results["count_search_rare"], _ = timed(lambda: store.count(owner, query="zanzibar"), repeat)
+    results["language_pairs"], _ = timed(lambda: store.language_pairs(owner), repeat)
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--entries", type=int, default=300_000)
+    parser.add_argument("--batch", type=int, default=5000)
+    parser.add_argument("--repeat", type=int, default=20)
+    parser.add_argument("--no-fts", action="store_true", help="also time searches without the FTS index")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    owner = "bench"
+    with tempfile.TemporaryDirectory() as tmp:
+        store = HistoryStore(os.path.join(tmp, "history.sqlite3"))
+        results = {"config": vars(args), "fts": store.fts}
+
+        start = time.perf_counter()
+        batch = []
+        single_appends = []
+        for i, item in enumerate(synthetic_items(args.entries, args.seed)):
+            if i % 1000 == 0:
+                # A sample of one-at-a-time appends, as the app does them
+                append_start = time.perf_counter()
+                store.append(item, owner)
+                single_appends.append(time.perf_counter() - append_start)
+                continue
+            batch.append(item)
+            if len(batch) >= args.batch:
+                store.extend(batch, owner)
+                batch = []
+        store.extend(batch, owner)
+        results["fill_s"] = round(time.perf_counter() - start, 2)
+        results["single_append"] = summarize(single_appends)
+        results["db_mb"] = round(os.path.getsize(os.path.join(tmp, "history.sqlite3")) / 1e6, 1)
+
+        results["queries"] = bench_queries(store, owner, args.repeat)
+        export_stats, exported = timed(lambda: store.export("jsonl", owner), 1)
+        results["export_jsonl"] = {**export_stats, "mb": round(len(exported.encode("utf-8")) / 1e6, 1)}
+
+        if args.no_fts and store.fts:
+            store.fts = False
+            results["queries_without_fts"] = {
+                name: stats for name, stats in bench_queries(store, owner, max(1, args.repeat // 4)).items()
+                if name.startswith(("search", "count_search"))
+            }
+        store.close()
+    emit(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""Image intake benchmark: rerun latency and peak RSS for large photos, decode-every-rerun versus decode-once.
+
+Run from the repo root:
+
+    python -m benchmarks.bench_image_intake --megapixels 3 12 24 --reruns 10
+
+A synthetic JPEG photo of each size, tagged with EXIF orientation 6 (rotated
+90 degrees, as phones save portrait shots), is pushed through the work one
+rerun of the crop panel does:
+
+- ``per_rerun``: the previous panel. Image.open on the upload, the cropper
+  resizing the full image to its 700 px canvas and serializing the pixels,
+  and the crop of that canvas shown with st.image
+- ``decode_once``: ImageIntake.get (a reduced-scale decode on the first
+  rerun, a content-hash lookup after that), the cropper serializing the
+  bounded preview, and the preview crop
+
+After the reruns, the OCR input is cut once: the previous panel OCR'd the
+crop of the 700 px canvas, the current one decodes the original and maps the
+box onto it. Each mode runs in a fresh process so its peak RSS (ru_maxrss,
+minus the process's RSS after imports) is its own; it is reported after the
+reruns and again after cutting the OCR input.
+"""
+import argparse
+import io
+import multiprocessing
+import resource
+import sys
+import time
+
+from PIL import Image, ImageDraw
+
+from benchmarks.stats import emit, summarize
+from vocalite.image_intake import ImageIntake, make_preview
+
+# The box a user drags on the cropper canvas, as fractions of the canvas
+BOX = (0.1, 0.3, 0.8, 0.25)
+
+
+def make_photo(megapixels, seed=7):
+    """Returns JPEG bytes of a text-like landscape image whose EXIF says to rotate it upright."""
+    height = int((megapixels * 1e6 * 3 / 4) ** 0.5)
+    width = int(height * 4 / 3)
+    image = Image.new("RGB", (width, height), (235, 230, 220))
+    draw = ImageDraw.Draw(image)
+    for line in range(0, height, max(40, height // 60)):
+        draw.text((width // 20, line), f"Sample line {line} of a synthetic photo, seed {seed}", fill=(20, 20, 20))
+    exif = Image.Exif()
+    exif[0x0112] = 6
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", quality=90, exif=exif)
+    return buffer.getvalue()
+
+
+def canvas_box(canvas):
+    left, top, width, height = BOX
+    return {"left": int(canvas.width * left), "top": int(canvas.height * top),
+            "width": int(canvas.width * width), "height": int(canvas.height * height)}
+
+
+def serialize_canvas(canvas):
+    """What streamlit_cropper sends the browser on every rerun: the canvas as a flat RGBA pixel list."""
+    return len(list(canvas.convert("RGBA").tobytes()))
+
+
+def rerun_per_rerun(data):
+    image = Image.open(io.BytesIO(data))
+    canvas = make_preview(image)
+    serialize_canvas(canvas)
+    box = canvas_box(canvas)
+    shown = canvas.crop((box["left"], box["top"], box["left"] + box["width"], box["top"] + box["height"]))
+    shown.tobytes()
+    return lambda: shown
+
+
+def rerun_decode_once(data, intake):
+    entry = intake.get(data)
+    serialize_canvas(entry.preview)
+    box = canvas_box(entry.preview)
+    entry.crop_preview(box).tobytes()
+    return lambda: entry.crop(box)
+
+
+def run_mode(mode, data, reruns):
+    """Runs in a child process; returns rerun latencies, the OCR input size and RSS figures in MiB."""
+    baseline = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    intake = ImageIntake()
+    latencies = []
+    for _ in range(reruns):
+        start = time.perf_counter()
+        ocr_input = rerun_per_rerun(data) if mode == "per_rerun" else rerun_decode_once(data, intake)
+        latencies.append(time.perf_counter() - start)
+    reruns_peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    cropped = ocr_input()
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is in KiB on Linux and bytes on macOS
+    unit = 1024 * 1024 if sys.platform == "darwin" else 1024
+    return {
+        "first_rerun": summarize(latencies[:1]),
+        "later_reruns": summarize(latencies[1:]),
+        "ocr_input": f"{cropped.width}x{cropped.height}",
+        "peak_rss_mib": round(peak / unit, 1),
+        "reruns_peak_rss_over_baseline_mib": round((reruns_peak - baseline) / unit, 1),
+        "peak_rss_over_baseline_mib": round((peak - baseline) / unit, 1),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--megapixels", type=float, nargs="+", default=[3, 12, 24])
+    parser.add_argument("--reruns", type=int, default=10)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    results = {"config": vars(args), "photos": {}}
+    context = multiprocessing.get_context("spawn")
+    for megapixels in args.megapixels:
+        data = make_photo(megapixels)
+        entry = {"jpeg_bytes": len(data)}
+        for mode in ("per_rerun", "decode_once"):
+            with context.Pool(1) as pool:
+                entry[mode] = pool.apply(run_mode, (mode, data, args.reruns))
+        entry["later_rerun_speedup_p50"] = round(
+            entry["per_rerun"]["later_reruns"]["p50_ms"] / entry["decode_once"]["later_reruns"]["p50_ms"], 1)
+        results["photos"][f"{megapixels:g}MP"] = entry
+    emit(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
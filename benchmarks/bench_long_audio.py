@@ -0,0 +1,114 @@
+"""Long-recording transcription benchmark: real-time factor per worker count.
+
+Run from the repo root:
+
+    python -m benchmarks.bench_long_audio --minutes 10 --workers 1 2 4 8
+
+A synthetic recording of tone bursts separated by silence is split on silence
+and transcribed with a fake recognizer whose latency is a fixed overhead plus
+a fraction of the chunk's duration. --failure-rate makes some calls fail so
+per-chunk retries are exercised. Real-time factor is processing time divided
+by audio duration (lower is better).
+"""
+import argparse
+import math
+import random
+import struct
+import threading
+import time
+
+from benchmarks.stats import emit
+from vocalite.speech import split_on_silence, transcribe_chunks
+
+SAMPLE_RATE = 16000
+SAMPLE_WIDTH = 2
+
+
+class FakeAudio:
+    def __init__(self, pcm, sample_rate, sample_width):
+        self.duration = len(pcm) / (sample_rate * sample_width)
+
+
+class FakeLongRecognizer:
+    """Sleeps overhead_ms + duration * speed_factor and fails with the given probability."""
+
+    def __init__(self, overhead_ms, speed_factor, failure_rate, seed):
+        self.overhead_s = overhead_ms / 1000
+        self.speed_factor = speed_factor
+        self.failure_rate = failure_rate
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.calls = 0
+
+    def recognize(self, audio):
+        with self._lock:
+            self.calls += 1
+            fail = self._rng.random() < self.failure_rate
+        time.sleep(self.overhead_s + audio.duration * self.speed_factor)
+        if fail:
+            raise ConnectionError("injected recognizer failure")
+        return f"words for {audio.duration:.1f} seconds"
+
+
+def synthetic_recording(minutes, seed):
+    """Tone bursts of 2-12 s separated by 0.8-2 s of near-silence."""
+    rng = random.Random(seed)
+    tone_cycle = [int(8000 * math.sin(2 * math.pi * 220 * i / SAMPLE_RATE)) for i in range(SAMPLE_RATE)]
+    tone = struct.pack(f"<{len(tone_cycle)}h", *tone_cycle)
+    quiet = bytes(SAMPLE_RATE * SAMPLE_WIDTH)
+    parts = []
+    total = 0.0
+    while total < minutes * 60:
+        speech_s = rng.uniform(2, 12)
+        silence_s = rng.uniform(0.8, 2)
+        parts.append((tone * math.ceil(speech_s))[: int(speech_s * SAMPLE_RATE) * SAMPLE_WIDTH])
+        parts.append((quiet * math.ceil(silence_s))[: int(silence_s * SAMPLE_RATE) * SAMPLE_WIDTH])
+        total += speech_s + silence_s
+    return b"".join(parts)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--minutes", type=float, default=10.0)
+    parser.add_argument("--workers", type=int, nargs="+", default=[1, 2, 4, 8])
+    parser.add_argument("--overhead-ms", type=float, default=150.0, help="fixed latency per recognizer call")
+    parser.add_argument("--speed-factor", type=float, default=0.05, help="latency per second of audio")
+    parser.add_argument("--failure-rate", type=float, default=0.05)
+    parser.add_argument("--max-chunk-s", type=float, default=30.0)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    pcm = synthetic_recording(args.minutes, args.seed)
+    duration = len(pcm) / (SAMPLE_RATE * SAMPLE_WIDTH)
+    start = time.perf_counter()
+    chunks = split_on_silence(pcm, SAMPLE_RATE, SAMPLE_WIDTH, max_chunk_s=args.max_chunk_s)
+    split_s = time.perf_counter() - start
+
+    results = {
+        "config": vars(args),
+        "audio_s": round(duration, 1),
+        "chunks": len(chunks),
+        "split_s": round(split_s, 3),
+        "runs": [],
+    }
+    for workers in args.workers:
+        recognizer = FakeLongRecognizer(args.overhead_ms, args.speed_factor, args.failure_rate, args.seed)
+        start = time.perf_counter()
+        transcript = transcribe_chunks(
+            chunks, SAMPLE_RATE, SAMPLE_WIDTH, recognizer.recognize,
+            make_audio=FakeAudio, workers=workers, backoff_s=0.05,
+        )
+        elapsed = time.perf_counter() - start
+        results["runs"].append({
+            "workers": workers,
+            "transcribe_s": round(elapsed, 3),
+            "real_time_factor": round((elapsed + split_s) / duration, 4),
+            "recognizer_calls": recognizer.calls,
+            "failed_chunks": sum(1 for chunk in transcript if chunk["error"] is not None),
+        })
+    emit(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
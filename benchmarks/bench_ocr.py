@@ -0,0 +1,98 @@
+"""OCR preprocessing and cache benchmark over a folder of sample images.
+
+Run from the repo root:
+
+    python -m benchmarks.bench_ocr --images samples/ --backend tesseract
+    python -m benchmarks.bench_ocr --synthetic 20 --backend fake
+
+Each image is OCR'd raw (the previous behaviour) and through OcrProcessor
+(preprocessing + result cache) for --passes passes; the report has per-stage
+timings and the cache hit rate. The fake backend charges --ms-per-mpx of
+latency per megapixel so the effect of resizing shows up without Tesseract.
+"""
+import argparse
+import os
+import time
+
+from PIL import Image, ImageDraw
+
+from benchmarks.stats import emit, summarize
+from vocalite.ocr import OcrProcessor
+
+IMAGE_EXTENSIONS = (".png", ".jpg", ".jpeg", ".tif", ".tiff", ".bmp")
+
+
+class PixelCostOCR:
+    """Fake OCR whose latency grows with image area, like Tesseract's."""
+
+    def __init__(self, ms_per_mpx):
+        self.ms_per_mpx = ms_per_mpx
+
+    def image_to_string(self, image, config=""):
+        time.sleep(image.width * image.height / 1e6 * self.ms_per_mpx / 1000)
+        return f"{image.width}x{image.height}"
+
+
+def load_images(folder):
+    for name in sorted(os.listdir(folder)):
+        if name.lower().endswith(IMAGE_EXTENSIONS):
+            with Image.open(os.path.join(folder, name)) as image:
+                image.load()
+                yield name, image.copy()
+
+
+def synthetic_images(count):
+    for i in range(count):
+        image = Image.new("RGB", (3024, 4032), (235, 230, 220))
+        draw = ImageDraw.Draw(image)
+        for line in range(40):
+            draw.text((150, 150 + line * 90), f"Sample line {line} of synthetic page {i}", fill=(20, 20, 20))
+        yield f"synthetic_{i}.png", image
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    source = parser.add_mutually_exclusive_group(required=True)
+    source.add_argument("--images", help="folder of sample images")
+    source.add_argument("--synthetic", type=int, help="generate this many 12MP text images instead")
+    parser.add_argument("--backend", choices=["tesseract", "fake"], default="fake")
+    parser.add_argument("--ms-per-mpx", type=float, default=150.0, help="fake backend cost per megapixel")
+    parser.add_argument("--passes", type=int, default=2, help="passes over the images; later passes hit the cache")
+    parser.add_argument("--deskew", action="store_true")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    if args.backend == "tesseract":
+        from vocalite.backends import TesseractOCR
+
+        backend = TesseractOCR()
+    else:
+        backend = PixelCostOCR(args.ms_per_mpx)
+
+    images = list(load_images(args.images) if args.images else synthetic_images(args.synthetic))
+    processor = OcrProcessor(backend, deskew=args.deskew)
+
+    raw = []
+    stages = {}
+    for _ in range(args.passes):
+        for name, image in images:
+            start = time.perf_counter()
+            backend.image_to_string(image)
+            raw.append(time.perf_counter() - start)
+
+            _, timings = processor.extract(image)
+            for stage, seconds in timings.items():
+                stages.setdefault(stage, []).append(seconds)
+
+    results = {
+        "config": vars(args),
+        "images": len(images),
+        "raw": summarize(raw),
+        "preprocessed": {stage: summarize(samples) for stage, samples in stages.items()},
+        "cache": processor.stats(),
+    }
+    emit(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,157 @@
+"""OCR engine benchmark: per-image latency and throughput of pytesseract versus the pooled tesserocr engines.
+
+Run from the repo root:
+
+    python -m benchmarks.bench_ocr_engine --crops 40 --threads 1 4 8 --backend tesseract
+    python -m benchmarks.bench_ocr_engine --crops 40 --threads 1 4 8 --backend fake
+
+Sample crops (a few lines of text each, the size a user drags on the
+cropper) are OCR'd through two paths:
+
+- ``subprocess``: TesseractOCR, the previous path. pytesseract writes each
+  crop to a temp file, starts the tesseract binary, which loads the
+  traineddata, and reads the text back
+- ``pooled``: TesserocrOCR. The crop's pixels go to a warm engine from a
+  TesseractEnginePool of --pool-size engines (one per core by default)
+
+Each path is timed one crop at a time (per-image latency) and then with
+every --threads count working through the crops (throughput). The pooled
+path also reports its pool counters and how many calls fell back to
+pytesseract; when tesserocr is not installed, all of them do.
+
+The fake backend stands in for both without Tesseract: every subprocess
+call pays --startup-ms before --ms-per-mpx of recognition, and a pooled
+engine pays --startup-ms once, when it is created.
+"""
+import argparse
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from PIL import Image, ImageDraw
+
+from benchmarks.stats import emit, summarize
+from vocalite.backends import TesseractOCR, TesserocrOCR
+from vocalite.ocr_pool import TesseractEnginePool
+
+
+class FakeSubprocessOCR:
+    """Fake pytesseract: every call starts an engine, then recognizes."""
+
+    def __init__(self, startup_ms, ms_per_mpx):
+        self.startup_ms = startup_ms
+        self.ms_per_mpx = ms_per_mpx
+
+    def image_to_string(self, image, config=""):
+        time.sleep(self.startup_ms / 1000)
+        time.sleep(image.width * image.height / 1e6 * self.ms_per_mpx / 1000)
+        return f"{image.width}x{image.height}"
+
+
+class FakeEngine:
+    """Fake PyTessBaseAPI: pays the startup cost when created, then only recognition per image."""
+
+    def __init__(self, startup_ms, ms_per_mpx):
+        time.sleep(startup_ms / 1000)
+        self.ms_per_mpx = ms_per_mpx
+        self.size = None
+
+    def SetImageBytes(self, data, width, height, bytes_per_pixel, bytes_per_line):
+        self.size = (width, height)
+
+    def SetSourceResolution(self, dpi):
+        pass
+
+    def GetUTF8Text(self):
+        time.sleep(self.size[0] * self.size[1] / 1e6 * self.ms_per_mpx / 1000)
+        return f"{self.size[0]}x{self.size[1]}"
+
+    def Clear(self):
+        self.size = None
+
+    def End(self):
+        pass
+
+
+def sample_crops(count):
+    """Returns grayscale text crops of varying width, like the selections made on the cropper."""
+    crops = []
+    for i in range(count):
+        width, lines = 400 + (i % 5) * 200, 1 + i % 4
+        image = Image.new("L", (width, 30 + lines * 40), 245)
+        draw = ImageDraw.Draw(image)
+        for line in range(lines):
+            draw.text((15, 15 + line * 40), f"Crop {i} line {line}: the quick brown fox", fill=20)
+        crops.append(image)
+    return crops
+
+
+def build_paths(args):
+    if args.backend == "fake":
+        def factory(lang, oem=None, psm=None, variables=None):
+            return FakeEngine(args.startup_ms, args.ms_per_mpx)
+
+        subprocess_path = FakeSubprocessOCR(args.startup_ms, args.ms_per_mpx)
+        pool = TesseractEnginePool(args.pool_size, factory=factory)
+    else:
+        subprocess_path = TesseractOCR(args.lang)
+        pool = TesseractEnginePool(args.pool_size)
+    return subprocess_path, TesserocrOCR(args.lang, pool=pool, fallback=subprocess_path)
+
+
+def measure(backend, crops, threads):
+    """OCRs every crop with threads workers; returns per-image latencies and wall seconds."""
+    def run(crop):
+        start = time.perf_counter()
+        backend.image_to_string(crop)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    if threads == 1:
+        latencies = [run(crop) for crop in crops]
+    else:
+        with ThreadPoolExecutor(max_workers=threads) as pool:
+            latencies = list(pool.map(run, crops))
+    return latencies, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--crops", type=int, default=40)
+    parser.add_argument("--threads", type=int, nargs="+", default=[1, 4, 8])
+    parser.add_argument("--pool-size", type=int, help="engines per language set (default: one per core)")
+    parser.add_argument("--lang", default="eng")
+    parser.add_argument("--backend", choices=["tesseract", "fake"], default="fake")
+    parser.add_argument("--startup-ms", type=float, default=120.0, help="fake engine start cost")
+    parser.add_argument("--ms-per-mpx", type=float, default=150.0, help="fake recognition cost per megapixel")
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    crops = sample_crops(args.crops)
+    subprocess_path, pooled = build_paths(args)
+    # Engines start before timing, as the app's warm-up starts them before the first photo
+    pooled.warm_up(count=min(max(args.threads), pooled.pool.size), background=False)
+
+    results = {"config": vars(args), "crops": len(crops), "paths": {}}
+    for name, backend in (("subprocess", subprocess_path), ("pooled", pooled)):
+        entry = {}
+        for threads in args.threads:
+            latencies, wall_s = measure(backend, crops, threads)
+            entry[f"threads_{threads}"] = summarize(latencies, wall_s)
+        results["paths"][name] = entry
+    results["paths"]["pooled"]["engine"] = pooled.stats()
+    if pooled.fallbacks:
+        results["note"] = "pooled calls fell back to pytesseract; install tesserocr to measure the engine pool"
+    results["speedup"] = {
+        f"threads_{threads}": {
+            "p50_latency": round(results["paths"]["subprocess"][f"threads_{threads}"]["p50_ms"]
+                                 / (results["paths"]["pooled"][f"threads_{threads}"]["p50_ms"] or 1e-9), 1),
+            "throughput": round(results["paths"]["pooled"][f"threads_{threads}"]["throughput_per_s"]
+                                / (results["paths"]["subprocess"][f"threads_{threads}"]["throughput_per_s"] or 1e-9), 1),
+        }
+        for threads in args.threads
+    }
+    emit(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,141 @@
+"""Per-stage and end-to-end pipeline benchmark against deterministic fake backends.
+
+Run from the repo root:
+
+    python -m benchmarks.bench_pipeline --requests 400 --concurrency 16 --output pipeline.json
+
+Stage latencies are configured in milliseconds; results report p50/p95/p99
+latency and throughput for each stage on its own and for the full Translate
+flow (grammar, translate, TTS) under the requested concurrency.
+"""
+import argparse
+import random
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fakes import (
+    FAKE_LANGUAGES,
+    FakeGrammar,
+    FakeOCR,
+    FakeRecognizer,
+    FakeSynthesizer,
+    FakeTranslator,
+)
+from benchmarks.stats import emit, summarize
+from vocalite.pipeline import VocalitePipeline
+from vocalite.translation_cache import TranslationCache
+from vocalite.tts_cache import AudioCache
+
+
+def build_pipeline(args):
+    translation_cache = audio_cache = None
+    if args.cache:
+        translation_cache = TranslationCache(max_entries=args.requests)
+        audio_cache = AudioCache(max_bytes=256 * 1024 * 1024)
+    return VocalitePipeline(
+        translator=FakeTranslator(args.translate_ms, args.jitter_ms, args.seed),
+        tts=FakeSynthesizer(args.tts_ms, args.jitter_ms, args.seed + 1),
+        grammar=FakeGrammar(args.grammar_ms, args.jitter_ms, args.seed + 2),
+        ocr=FakeOCR(args.ocr_ms, args.jitter_ms, args.seed + 3),
+        recognizer=FakeRecognizer(args.recognize_ms, args.jitter_ms, args.seed + 4),
+        languages=FAKE_LANGUAGES,
+        translation_cache=translation_cache,
+        audio_cache=audio_cache,
+    )
+
+
+def run_concurrently(fn, items, concurrency):
+    """Calls fn on every item with a bounded pool; returns (latencies, wall seconds)."""
+    def timed(item):
+        start = time.perf_counter()
+        fn(item)
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        latencies = list(pool.map(timed, items))
+    return latencies, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--concurrency", type=int, default=16)
+    parser.add_argument("--distinct", type=int, default=100, help="distinct input phrases in the workload")
+    parser.add_argument("--grammar-ms", type=float, default=20.0)
+    parser.add_argument("--translate-ms", type=float, default=40.0)
+    parser.add_argument("--tts-ms", type=float, default=60.0)
+    parser.add_argument("--ocr-ms", type=float, default=80.0)
+    parser.add_argument("--recognize-ms", type=float, default=100.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--targets", type=int, default=5, help="destination languages for the fan-out run")
+    parser.add_argument("--cache", action="store_true", help="put the translation and audio caches in front")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    langs = [name for code, name in FAKE_LANGUAGES.items() if code != "en"]
+    workload = [
+        (f"sentence number {rng.randrange(args.distinct)} to translate", "english", rng.choice(langs))
+        for _ in range(args.requests)
+    ]
+    pipeline = build_pipeline(args)
+
+    stages = {
+        "grammar": lambda job: pipeline.correct_grammar(job[0], job[1]),
+        "translate": lambda job: pipeline.translate(job[0], "en", pipeline.get_lang_code(job[2])),
+        "tts": lambda job: pipeline.synthesize(job[0], pipeline.get_lang_code(job[2])),
+        "ocr": lambda job: pipeline.extract_text(job),
+        "recognize": lambda job: pipeline.recognize(job),
+    }
+    results = {"config": vars(args), "stages": {}}
+    for name, fn in stages.items():
+        latencies, wall_s = run_concurrently(fn, workload, args.concurrency)
+        results["stages"][name] = summarize(latencies, wall_s)
+
+    # Fresh backends and caches so the stage runs do not warm the end-to-end run
+    pipeline = build_pipeline(args)
+    stage_samples = {}
+
+    def end_to_end(job):
+        result = pipeline.run(job[0], job[1], job[2])
+        for stage, seconds in result["timings"].items():
+            stage_samples.setdefault(stage, []).append(seconds)
+
+    latencies, wall_s = run_concurrently(end_to_end, workload, args.concurrency)
+    results["end_to_end"] = summarize(latencies, wall_s)
+    results["end_to_end"]["stages"] = {
+        stage: summarize(samples) for stage, samples in stage_samples.items() if stage != "total"
+    }
+
+    # Multi-target fan-out: one text into several languages, concurrently vs one after another
+    pipeline = build_pipeline(args)
+    dests = [code for code in FAKE_LANGUAGES if code != "en"][: args.targets]
+    fan_out_samples = []
+    sequential_samples = []
+    for i in range(min(args.requests, 50)):
+        text = f"fan-out sentence {i}"
+        start = time.perf_counter()
+        list(pipeline.fan_out(text, "en", dests))
+        fan_out_samples.append(time.perf_counter() - start)
+        start = time.perf_counter()
+        for dest in dests:
+            pipeline.synthesize(pipeline.translate(f"sequential sentence {i}", "en", dest), dest)
+        sequential_samples.append(time.perf_counter() - start)
+    results["fan_out"] = {
+        "targets": len(dests),
+        "concurrent": summarize(fan_out_samples),
+        "sequential": summarize(sequential_samples),
+    }
+
+    if args.cache:
+        results["cache"] = {
+            "translation": pipeline.translation_cache.stats(),
+            "audio": pipeline.audio_cache.stats(),
+        }
+    emit(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
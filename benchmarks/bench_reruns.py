@@ -0,0 +1,131 @@
+"""Rerun cost per UI interaction, measured with Streamlit's AppTest.
+
+Run from the repo root:
+
+    python -m benchmarks.bench_reruns --repeat 10
+    python -m benchmarks.bench_reruns --repeat 10 --baseline HEAD~1
+
+Each interaction (theme change, language swap, picking a language, switching
+input method, typing, toggling multi-language output) is replayed --repeat
+times against a session whose history is full, and the script-run time is
+summarized. The history is seeded both as session state (older versions) and
+in a scratch history store (current version). --baseline REV also runs
+app.py as it was at that git revision, so the before/after numbers come from
+the same machine and session setup. Widgets are found by label, which both
+versions share.
+
+AppTest replays every interaction as a run of the whole script, so for
+interactions that the page scopes to a fragment these numbers are an upper
+bound on what a browser session pays.
+"""
+import argparse
+import os
+import subprocess
+import tempfile
+import time
+
+from benchmarks.stats import emit, summarize
+from vocalite.history import HistoryStore
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HISTORY_OWNER = "bench-reruns"
+
+HISTORY = [
+    {
+        "original": f"Sample sentence number {i} for the history panel.",
+        "src_lang": "english",
+        "translated": f"Phrase d'exemple numéro {i} pour le panneau d'historique.",
+        "dest_lang": "french",
+        "time": f"12:{i:02d}:00",
+    }
+    for i in range(10)
+]
+
+
+def _widget(widgets, label):
+    for widget in widgets:
+        if widget.label == label:
+            return widget
+    raise LookupError(f"no widget labelled {label!r}")
+
+
+def interactions():
+    """(name, action) pairs; each action takes the AppTest and the repeat index."""
+    return [
+        ("theme_change", lambda at, i: _widget(at.selectbox, "🎨 Choose Theme").set_value(
+            "Pink" if i % 2 == 0 else "Ocean")),
+        ("swap_languages", lambda at, i: _widget(at.button, "🔄").click()),
+        ("pick_output_language", lambda at, i: _widget(at.selectbox, "To").set_value(
+            "german" if i % 2 == 0 else "french")),
+        ("switch_input_method", lambda at, i: _widget(at.button, "🎤 Speak" if i % 2 == 0 else "⌨ Type").click()),
+        ("type_text", lambda at, i: _widget(at.text_area, "💬 Type your message here").input(
+            f"Hello number {i}, how are you today?")),
+        ("toggle_multi_target", lambda at, i: _widget(
+            at.checkbox, "🌍 Translate into several languages at once").set_value(i % 2 == 0)),
+    ]
+
+
+def measure(script_path, repeat, timeout):
+    from streamlit.testing.v1 import AppTest
+
+    at = AppTest.from_file(script_path, default_timeout=timeout)
+    at.session_state["history"] = list(HISTORY)
+    at.query_params["h"] = HISTORY_OWNER
+    start = time.perf_counter()
+    at.run()
+    results = {"initial_run_ms": round((time.perf_counter() - start) * 1000, 3)}
+    for name, action in interactions():
+        samples = []
+        for i in range(repeat):
+            # Typing only exists in the Type input method
+            if name == "type_text" and at.session_state["input_method"] != "Type":
+                _widget(at.button, "⌨ Type").click().run()
+            element = action(at, i)
+            start = time.perf_counter()
+            element.run()
+            samples.append(time.perf_counter() - start)
+        results[name] = summarize(samples)
+    results["exceptions"] = [str(e.value) for e in at.exception]
+    return results
+
+
+def baseline_script(rev):
+    """Writes app.py as of rev next to the current one (so vocalite imports resolve)."""
+    source = subprocess.run(["git", "show", f"{rev}:app.py"], capture_output=True, text=True, check=True,
+                            cwd=REPO_ROOT).stdout
+    path = os.path.join(REPO_ROOT, f".bench_reruns_{rev.replace('/', '_').replace('~', '_')}.py")
+    with open(path, "w", encoding="utf-8") as f:
+        f.write(source)
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=10)
+    parser.add_argument("--baseline", help="git revision whose app.py to measure as the 'before' numbers")
+    parser.add_argument("--timeout", type=float, default=60.0)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+    # Keep LanguageTool (a Java server) out of the measurement, and the caches in a scratch directory
+    os.environ.setdefault("VOCALITE_GRAMMAR_WARMUP", "")
+    cache_dir = tempfile.mkdtemp(prefix="vocalite-bench-")
+    os.environ["VOCALITE_CACHE_DIR"] = cache_dir
+    HistoryStore(os.path.join(cache_dir, "history.sqlite3")).extend(HISTORY, owner=HISTORY_OWNER)
+
+    results = {"config": vars(args), "current": measure(os.path.join(REPO_ROOT, "app.py"), args.repeat, args.timeout)}
+    if args.baseline:
+        path = baseline_script(args.baseline)
+        try:
+            results["baseline"] = measure(path, args.repeat, args.timeout)
+        finally:
+            os.remove(path)
+        results["speedup_p50"] = {
+            name: round(results["baseline"][name]["p50_ms"] / results["current"][name]["p50_ms"], 2)
+            for name, _ in interactions()
+            if results["current"][name]["p50_ms"]
+        }
+    emit(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""Translation routing benchmark: one backend versus the latency-aware router, with and without hedging.
+
+Run from the repo root:
+
+    python -m benchmarks.bench_routing --requests 2000 --threads 8
+
+Three offline backends are built from the local DictionaryTranslator with
+injected behaviour:
+
+- ``fast_tail``: usually --fast-ms, but --tail-rate of calls take --tail-ms
+- ``steady``: always --steady-ms
+- ``flaky``: --fast-ms, but every call fails inside the --outage window
+
+The same load is sent to ``fast_tail`` alone, then through LatencyRouter over
+all three without hedging and with hedging. Every answer is checked, and the
+router's hedge and failover counts are reported with the latency summary.
+"""
+import argparse
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.stats import emit, summarize
+from vocalite.backends import DictionaryTranslator
+from vocalite.routing import BackendRegistry, LatencyRouter
+
+
+class Shaped:
+    """Adds seeded latency, a slow tail and an outage window to a translator."""
+
+    def __init__(self, translator, latency_ms, tail_ms=0.0, tail_rate=0.0, outage=None, seed=0):
+        self.translator = translator
+        self.latency_s = latency_ms / 1000
+        self.tail_s = tail_ms / 1000
+        self.tail_rate = tail_rate
+        self.outage = outage
+        self.started = time.monotonic()
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def translate(self, text, src, dest):
+        with self._lock:
+            slow = self._rng.random() < self.tail_rate
+        elapsed = time.monotonic() - self.started
+        time.sleep(self.tail_s if slow else self.latency_s)
+        if self.outage and self.outage[0] <= elapsed < self.outage[1]:
+            raise ConnectionError("injected outage")
+        return self.translator.translate(text, src, dest)
+
+
+def backends(args):
+    local = DictionaryTranslator({"en-es": {"hello": "hola"}}, prefix="[{dest}] ")
+    return {
+        "fast_tail": Shaped(local, args.fast_ms, args.tail_ms, args.tail_rate, seed=args.seed),
+        "steady": Shaped(local, args.steady_ms, seed=args.seed + 1),
+        "flaky": Shaped(local, args.fast_ms, outage=args.outage, seed=args.seed + 2),
+    }
+
+
+def run_load(translator, requests_count, threads):
+    jobs = [f"hello request {i}" for i in range(requests_count)]
+    counts = {"ok": 0, "errors": 0, "mismatched": 0}
+    lock = threading.Lock()
+
+    def one(text):
+        start = time.perf_counter()
+        try:
+            outcome = "ok" if translator.translate(text, "en", "es") == f"[es] hola request {text.split()[-1]}" \
+                else "mismatched"
+        except Exception:
+            outcome = "errors"
+        with lock:
+            counts[outcome] += 1
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        latencies = list(pool.map(one, jobs))
+    return latencies, time.perf_counter() - start, counts
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--fast-ms", type=float, default=10.0)
+    parser.add_argument("--tail-ms", type=float, default=300.0)
+    parser.add_argument("--tail-rate", type=float, default=0.03)
+    parser.add_argument("--steady-ms", type=float, default=30.0)
+    parser.add_argument("--outage", default="0.5:1.5", help="start:end seconds during which 'flaky' fails")
+    parser.add_argument("--hedge-after-ms", type=float, help="fixed hedge deadline (default: primary's p95)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+    args.outage = tuple(float(part) for part in args.outage.split(":")) if args.outage else None
+
+    results = {"config": vars(args), "modes": {}}
+    for mode in ("single_backend", "router", "router_hedged"):
+        shaped = backends(args)
+        if mode == "single_backend":
+            translator, router = shaped["fast_tail"], None
+        else:
+            registry = BackendRegistry()
+            for name, backend in shaped.items():
+                registry.register(name, backend)
+            registry.set_routes({"*": list(shaped)})
+            hedge_after = args.hedge_after_ms / 1000 if args.hedge_after_ms else None
+            translator = router = LatencyRouter(registry, hedge=mode == "router_hedged", hedge_after=hedge_after,
+                                                seed=args.seed)
+        latencies, wall_s, counts = run_load(translator, args.requests, args.threads)
+        results["modes"][mode] = {**summarize(latencies, wall_s), **counts}
+        if router is not None:
+            stats = router.stats()
+            results["modes"][mode]["router"] = {
+                **{key: value for key, value in stats.items() if key != "backends"},
+                "calls_per_backend": {name: entry["total"] for name, entry in stats["backends"].items()},
+            }
+            router.close()
+    emit(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
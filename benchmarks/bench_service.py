@@ -0,0 +1,211 @@
+"""Headless service load test: sustained requests/sec through the HTTP API and the JSONL reader.
+
+Run from the repo root:
+
+    python -m benchmarks.bench_service --requests 2000 --clients 64 --concurrency 16
+
+The service runs the Translate flow on a pipeline of fake backends (grammar
+--grammar-ms, translation --translate-ms, TTS --tts-ms for the --audio-rate
+of requests that ask for audio) with the translation and audio caches on.
+--duplicate-rate of the requests repeat an earlier text, as clients
+re-sending the same phrase do. Modes:
+
+- ``sequential``: pipeline.run called in a loop, the one-at-a-time baseline
+- ``http``: --clients keep-alive connections POSTing one request each time
+  to an in-process HttpApi on a free localhost port
+- ``http_batch``: clients sending --client-batch requests per POST (at most
+  as many clients as leaves all their requests room in the queue)
+- ``jsonl``: run_jsonl over the requests as JSON lines
+- ``overload``: the http mode again with --overload-queue as max_queue, to
+  show 503s being returned while accepted requests still complete
+
+Every mode reports wall time, requests/sec, answered (non-503) requests/sec
+and status counts; the HTTP modes also report client-side latency.
+"""
+import argparse
+import asyncio
+import http.client
+import io
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from benchmarks.fakes import FAKE_LANGUAGES, FakeGrammar, FakeSynthesizer, FakeTranslator
+from benchmarks.stats import emit, summarize
+from vocalite.pipeline import VocalitePipeline
+from vocalite.service import HttpApi, TranslationService, run_jsonl
+from vocalite.translation_cache import TranslationCache
+from vocalite.tts_cache import AudioCache
+
+TARGETS = [name for name in FAKE_LANGUAGES.values() if name != "english"]
+
+
+def build_pipeline(args):
+    return VocalitePipeline(
+        translator=FakeTranslator(args.translate_ms, args.jitter_ms, args.seed),
+        tts=FakeSynthesizer(args.tts_ms, args.jitter_ms, args.seed + 1),
+        grammar=FakeGrammar(args.grammar_ms, args.jitter_ms, args.seed + 2),
+        languages=FAKE_LANGUAGES,
+        translation_cache=TranslationCache(max_entries=args.requests * 2),
+        audio_cache=AudioCache(max_bytes=256 * 1024 * 1024),
+    )
+
+
+def make_requests(args):
+    rng = random.Random(args.seed)
+    requests = []
+    for i in range(args.requests):
+        if requests and rng.random() < args.duplicate_rate:
+            requests.append(dict(rng.choice(requests), id=i))
+            continue
+        requests.append({
+            "id": i,
+            "text": f"request number {i} asks for a translation of this sentence",
+            "input_lang": "english",
+            "output_lang": rng.choice(TARGETS),
+            "audio": rng.random() < args.audio_rate,
+        })
+    return requests
+
+
+class ServiceThread:
+    """Runs a TranslationService and its HttpApi on an event loop in a background thread."""
+
+    def __init__(self, pipeline, args, max_queue):
+        self.loop = asyncio.new_event_loop()
+        threading.Thread(target=self.loop.run_forever, name="service-loop", daemon=True).start()
+
+        async def start():
+            service = await TranslationService(pipeline, args.concurrency, max_queue, args.batch_size,
+                                               args.batch_wait_ms / 1000).start()
+            server = await HttpApi(service).serve("127.0.0.1", 0)
+            return service, server
+
+        self.service, self.server = self.call(start())
+        self.port = self.server.sockets[0].getsockname()[1]
+
+    def call(self, coro):
+        return asyncio.run_coroutine_threadsafe(coro, self.loop).result()
+
+    def stop(self):
+        async def stop():
+            self.server.close()
+            await self.server.wait_closed()
+            await self.service.close()
+
+        self.call(stop())
+        self.loop.call_soon_threadsafe(self.loop.stop)
+
+
+def run_http(port, requests, clients, client_batch):
+    """Sends requests from clients keep-alive connections; returns (latencies, wall seconds, status counts)."""
+    chunks = [requests[i:i + client_batch] for i in range(0, len(requests), client_batch)]
+    local = threading.local()
+    statuses = {}
+    lock = threading.Lock()
+
+    def send(chunk):
+        connection = getattr(local, "connection", None)
+        if connection is None:
+            connection = local.connection = http.client.HTTPConnection("127.0.0.1", port, timeout=60)
+        body = json.dumps(chunk if client_batch > 1 else chunk[0]).encode("utf-8")
+        start = time.perf_counter()
+        connection.request("POST", "/v1/translate", body, {"Content-Type": "application/json"})
+        response = connection.getresponse()
+        payload = json.loads(response.read())
+        elapsed = time.perf_counter() - start
+        if response.status == 200:
+            results = payload["results"] if client_batch > 1 else [payload]
+            ok = all(result["translated"].startswith("[") for result in results if "error" not in result)
+            key = "200" if ok else "200_mismatched"
+        else:
+            key = str(response.status)
+        with lock:
+            statuses[key] = statuses.get(key, 0) + len(chunk)
+        return elapsed
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as pool:
+        latencies = list(pool.map(send, chunks))
+    return latencies, time.perf_counter() - start, statuses
+
+
+def mode_result(count, wall_s, statuses, latencies=None, service=None):
+    answered = statuses.get("200", 0) + statuses.get("ok", 0)
+    result = {"requests": count, "wall_s": round(wall_s, 4),
+              "requests_per_s": round(count / wall_s, 1) if wall_s else 0.0,
+              "answered_per_s": round(answered / wall_s, 1) if wall_s else 0.0, "statuses": statuses}
+    if latencies is not None:
+        result["latency"] = summarize(latencies)
+    if service is not None:
+        stats = service.stats()
+        result["service"] = {key: stats[key] for key in ("completed", "failed", "rejected", "batches", "coalesced")}
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--clients", type=int, default=64)
+    parser.add_argument("--client-batch", type=int, default=8, help="requests per POST in http_batch mode")
+    parser.add_argument("--concurrency", type=int, default=16, help="pipeline runs in flight")
+    parser.add_argument("--max-queue", type=int, default=256)
+    parser.add_argument("--overload-queue", type=int, default=8)
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--batch-wait-ms", type=float, default=2.0)
+    parser.add_argument("--grammar-ms", type=float, default=15.0)
+    parser.add_argument("--translate-ms", type=float, default=40.0)
+    parser.add_argument("--tts-ms", type=float, default=60.0)
+    parser.add_argument("--jitter-ms", type=float, default=10.0)
+    parser.add_argument("--audio-rate", type=float, default=0.2)
+    parser.add_argument("--duplicate-rate", type=float, default=0.1)
+    parser.add_argument("--sequential-requests", type=int, default=100,
+                        help="requests for the sequential baseline (it is slow)")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    requests = make_requests(args)
+    results = {"config": vars(args), "modes": {}}
+
+    pipeline = build_pipeline(args)
+    sample = requests[:args.sequential_requests]
+    start = time.perf_counter()
+    for request in sample:
+        pipeline.run(request["text"], request["input_lang"], request["output_lang"], with_audio=request["audio"])
+    results["modes"]["sequential"] = mode_result(len(sample), time.perf_counter() - start, {"200": len(sample)})
+
+    for mode, client_batch, max_queue in (("http", 1, args.max_queue), ("http_batch", args.client_batch, args.max_queue),
+                                          ("overload", 1, args.overload_queue)):
+        service = ServiceThread(build_pipeline(args), args, max_queue)
+        try:
+            # Batching clients are capped so that their requests fit in the queue together
+            clients = min(args.clients, max(1, max_queue // client_batch)) if client_batch > 1 else args.clients
+            latencies, wall_s, statuses = run_http(service.port, requests, clients, client_batch)
+            results["modes"][mode] = mode_result(len(requests), wall_s, statuses, latencies, service.service)
+        finally:
+            service.stop()
+
+    async def jsonl():
+        async with TranslationService(build_pipeline(args), args.concurrency, args.max_queue, args.batch_size,
+                                      args.batch_wait_ms / 1000) as service:
+            infile = io.StringIO("".join(json.dumps(request) + "\n" for request in requests))
+            outfile = io.StringIO()
+            start = time.perf_counter()
+            lines, errors = await run_jsonl(service, infile, outfile)
+            wall_s = time.perf_counter() - start
+            return mode_result(lines, wall_s, {"ok": lines - errors, "errors": errors}, service=service)
+
+    results["modes"]["jsonl"] = asyncio.run(jsonl())
+    base = results["modes"]["sequential"]["requests_per_s"]
+    results["speedup_vs_sequential"] = {
+        mode: round(entry["answered_per_s"] / base, 1) for mode, entry in results["modes"].items()
+        if mode not in ("sequential", "overload") and base
+    }
+    emit(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
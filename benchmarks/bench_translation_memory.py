@@ -0,0 +1,152 @@
+"""Translation memory benchmark: fuzzy lookup latency at scale and hit rate on near-duplicate input.
+
+Run from the repo root:
+
+    python -m benchmarks.bench_translation_memory --segments 1000000
+
+Fills a fresh on-disk translation memory with --segments synthetic segments
+(random sentences plus many filled-in templates such as "Hello <name>, your
+order <number> has shipped."), then times lookups for exact repeats,
+template variants with a new name or number, and unseen sentences.
+
+Finally a stream of --stream requests, --near-dup of them template variants,
+goes through the pipeline twice with a fake translator: once with only the
+exact-match cache and once with the memory as well, reporting upstream calls,
+the memory's hit and reuse rates, and wall time.
+"""
+import argparse
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.fakes import FakeTranslator
+from benchmarks.stats import emit, summarize
+from vocalite.pipeline import VocalitePipeline
+from vocalite.translation_cache import TranslationCache
+from vocalite.translation_memory import TranslationMemory
+
+TEMPLATES = [
+    "Hello {name}, your order {number} has shipped.",
+    "Dear {name}, your appointment is confirmed for {number} pm.",
+    "{name} sent you {number} new messages.",
+    "Your verification code is {number}, {name}.",
+    "Room {number} is ready for {name}.",
+    "Flight {number} to {name} is delayed by two hours.",
+    "Please call {name} back before {number} o'clock.",
+    "Invoice {number} for {name} is overdue.",
+]
+NAMES = ["Anna", "Ben", "Carla", "Dmitri", "Elif", "Femi", "Grace", "Hiro", "Ines", "Jonas", "Kofi", "Lena",
+         "Mateo", "Nadia", "Omar", "Priya", "Quinn", "Rosa", "Sami", "Tariq", "Uma", "Vera", "Wen", "Yara", "Zoe"]
+
+
+def vocabulary(size, rng):
+    letters = "abcdefghijklmnopqrstuvwxyz"
+    return ["".join(rng.choice(letters) for _ in range(rng.randint(3, 9))) for _ in range(size)]
+
+
+def random_sentence(words, rng):
+    return " ".join(rng.choice(words) for _ in range(rng.randint(5, 14))).capitalize() + "."
+
+
+def template_sentence(rng, templates):
+    return rng.choice(templates).format(name=rng.choice(NAMES), number=rng.randint(1, 99999))
+
+
+def fake_translation(text, dest="es"):
+    return FakeTranslator().translate(text, "en", dest)
+
+
+def fill(tm, count, words, templates, rng, sample_size, batch=5000):
+    """Adds count segments, one in ten a filled-in template; returns (seconds, a sample of the sources)."""
+    start = time.perf_counter()
+    pairs = []
+    sample = []
+    for i in range(count):
+        text = template_sentence(rng, templates) if i % 10 == 0 else random_sentence(words, rng)
+        pairs.append((text, fake_translation(text)))
+        if i % 10 and len(sample) < sample_size and rng.random() < 4 * sample_size / count:
+            sample.append(text)
+        if len(pairs) >= batch:
+            tm.add_many(pairs, "en", "es")
+            pairs = []
+    tm.add_many(pairs, "en", "es")
+    return time.perf_counter() - start, sample
+
+
+def time_lookups(tm, texts):
+    samples, hits, adapted = [], 0, 0
+    for text in texts:
+        start = time.perf_counter()
+        match = tm.lookup(text, "en", "es")
+        samples.append(time.perf_counter() - start)
+        hits += match is not None
+        adapted += match is not None and match["adapted"] is not None
+    return {**summarize(samples), "hits": hits, "adaptable": adapted}
+
+
+def replay(texts, translation_memory, latency_ms):
+    translator = FakeTranslator(latency_ms=latency_ms)
+    pipeline = VocalitePipeline(translator, translation_cache=TranslationCache(max_entries=4096),
+                                translation_memory=translation_memory)
+    if translation_memory is not None:
+        before = translation_memory.stats()
+    start = time.perf_counter()
+    wrong = 0
+    for text in texts:
+        wrong += pipeline.translate(text, "en", "es") != fake_translation(text)
+    result = {"wall_s": round(time.perf_counter() - start, 3), "upstream_calls": translator.calls,
+              "wrong_translations": wrong}
+    if translation_memory is not None:
+        after = translation_memory.stats()
+        lookups = after["lookups"] - before["lookups"]
+        result["memory_lookups"] = lookups
+        result["memory_reused"] = after["reused"] - before["reused"]
+        result["memory_hit_rate"] = round(1 - (after["misses"] - before["misses"]) / lookups, 3) if lookups else 0.0
+        result["memory_reuse_rate"] = round(result["memory_reused"] / lookups, 3) if lookups else 0.0
+    return result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--segments", type=int, default=1_000_000)
+    parser.add_argument("--vocabulary", type=int, default=20_000)
+    parser.add_argument("--queries", type=int, default=2000)
+    parser.add_argument("--stream", type=int, default=2000)
+    parser.add_argument("--near-dup", type=float, default=0.6, help="share of the stream that are template variants")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="fake upstream latency per call")
+    parser.add_argument("--reuse-threshold", type=float, default=0.85)
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    words = vocabulary(args.vocabulary, rng)
+    results = {"config": vars(args)}
+    with tempfile.TemporaryDirectory() as tmp:
+        path = os.path.join(tmp, "memory.sqlite3")
+        tm = TranslationMemory(path, reuse_threshold=args.reuse_threshold)
+        fill_s, stored = fill(tm, args.segments, words, TEMPLATES, rng, args.queries)
+        results["fill_s"] = round(fill_s, 2)
+        results["segments_stored"] = len(tm)
+        results["db_mb"] = round(os.path.getsize(path) / 1e6, 1)
+
+        results["lookup_exact_repeat"] = time_lookups(tm, stored)
+        results["lookup_template_variant"] = time_lookups(
+            tm, [template_sentence(rng, TEMPLATES) for _ in range(args.queries)])
+        results["lookup_one_word_edit"] = time_lookups(tm, [
+            " ".join(word if i != 2 else rng.choice(words) for i, word in enumerate(text.split()))
+            for text in stored
+        ])
+        results["lookup_unseen"] = time_lookups(tm, [random_sentence(words, rng) for _ in range(args.queries)])
+
+        stream = [template_sentence(rng, TEMPLATES) if rng.random() < args.near_dup else random_sentence(words, rng)
+                  for _ in range(args.stream)]
+        results["stream_exact_cache_only"] = replay(stream, None, args.latency_ms)
+        results["stream_with_memory"] = replay(stream, tm, args.latency_ms)
+        tm.close()
+    emit(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
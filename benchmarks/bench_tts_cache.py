@@ -0,0 +1,105 @@
+"""Compares the original temp-file TTS path with the in-memory cached path.
+
+Run from the repo root:
+
+    python -m benchmarks.bench_tts_cache --requests 500 --phrases 50 --latency-ms 5
+"""
+import argparse
+import base64
+import io
+import os
+import random
+import tempfile
+import time
+
+from benchmarks.stats import emit, summarize
+from vocalite.tts_cache import AudioCache
+
+
+class FakeTTS:
+    """Stands in for gTTS: sleeps for the configured latency and emits deterministic bytes."""
+
+    def __init__(self, text, lang, latency_s, size):
+        self.text = text
+        self.lang = lang
+        self.latency_s = latency_s
+        self.size = size
+
+    def _payload(self):
+        seed = f"{self.lang}:{self.text}".encode("utf-8")
+        return (seed * (self.size // len(seed) + 1))[: self.size]
+
+    def write_to_fp(self, fp):
+        time.sleep(self.latency_s)
+        fp.write(self._payload())
+
+    def save(self, path):
+        with open(path, "wb") as f:
+            self.write_to_fp(f)
+
+
+def original_path(text, lang, workdir, latency_s, size):
+    """Mirrors the previous app.py flow: save to a temp file, read it back, base64, delete."""
+    tts = FakeTTS(text, lang, latency_s, size)
+    audio_file = os.path.join(workdir, f"translation_{int(time.time())}.mp3")
+    tts.save(audio_file)
+    audio_bytes = open(audio_file, "rb").read()
+    b64 = base64.b64encode(audio_bytes).decode()
+    os.remove(audio_file)
+    return audio_bytes, b64
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=500)
+    parser.add_argument("--phrases", type=int, default=50, help="distinct (text, lang) pairs in the workload")
+    parser.add_argument("--latency-ms", type=float, default=5.0, help="fake synthesis latency")
+    parser.add_argument("--audio-kb", type=int, default=40, help="size of each fake clip")
+    parser.add_argument("--budget-kb", type=int, default=1024, help="in-memory cache budget")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    langs = ["es", "de", "fr", "it"]
+    phrases = [(f"phrase number {i}", langs[i % len(langs)]) for i in range(args.phrases)]
+    workload = [rng.choice(phrases) for _ in range(args.requests)]
+    latency_s = args.latency_ms / 1000
+    size = args.audio_kb * 1024
+
+    with tempfile.TemporaryDirectory() as workdir:
+        original = []
+        for text, lang in workload:
+            start = time.perf_counter()
+            original_path(text, lang, workdir, latency_s, size)
+            original.append(time.perf_counter() - start)
+
+        def synthesize(text, lang):
+            buffer = io.BytesIO()
+            FakeTTS(text, lang, latency_s, size).write_to_fp(buffer)
+            return buffer.getvalue()
+
+        cache = AudioCache(
+            max_bytes=args.budget_kb * 1024,
+            spill_dir=os.path.join(workdir, "spill"),
+            synthesize=synthesize,
+        )
+        cached = []
+        for text, lang in workload:
+            start = time.perf_counter()
+            cache.get_or_synthesize(text, lang)
+            cached.append(time.perf_counter() - start)
+
+        results = {
+            "config": vars(args),
+            "original": summarize(original),
+            "cached": summarize(cached),
+            "cache_stats": cache.stats(),
+        }
+
+    results["speedup"] = round(sum(original) / sum(cached), 2)
+    emit(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,103 @@
+"""Streaming TTS benchmark: time to first audio for whole-text versus sentence-level synthesis.
+
+Run from the repo root:
+
+    python -m benchmarks.bench_tts_stream --sentences 2 8 20 --repeat 5
+
+For translations of each length (in sentences), a fake MP3 synthesizer whose
+cost grows with the text (--latency-ms per call plus --per-char-ms per
+character, like gTTS) is driven two ways:
+
+- ``whole``: one synthesize call for the whole text; the first audio is the
+  full clip
+- ``streaming``: pipeline.synthesize_streaming, with pieces synthesized
+  --workers at a time; the first audio is the first piece
+
+Each run uses a fresh audio cache. The joined streaming clip is checked to be
+one continuous run of MP3 frames, with no ID3 tag left inside and one frame
+per spoken character.
+"""
+import argparse
+import random
+import time
+
+from benchmarks.fakes import FakeMp3Synthesizer
+from benchmarks.stats import emit, summarize
+from vocalite.chunking import split_chunks
+from vocalite.pipeline import VocalitePipeline
+from vocalite.tts_cache import AudioCache
+from vocalite.tts_stream import DEFAULT_PIECE_CHARS, concat_mp3, iter_frames, strip_id3, strip_info_frame
+
+WORDS = ("el rápido zorro marrón salta sobre perro perezoso mientras escribimos frases largas sobre tiempo viaje "
+         "comida música familia trabajo escuela ciudad río montaña mañana tarde amigo mercado").split()
+
+
+def translation(sentences, rng):
+    return " ".join(
+        " ".join(rng.choice(WORDS) for _ in range(rng.randint(8, 18))).capitalize() + "."
+        for _ in range(sentences)
+    )
+
+
+def frame_count(clip):
+    clip = strip_info_frame(strip_id3(clip))
+    frames = list(iter_frames(clip))
+    contiguous = sum(length for _, length in frames) == len(clip)
+    return len(frames), contiguous
+
+
+def run(text, args, streaming):
+    synthesizer = FakeMp3Synthesizer(args.latency_ms, args.per_char_ms, seed=args.seed)
+    pipeline = VocalitePipeline(translator=None, tts=synthesizer, audio_cache=AudioCache())
+    start = time.perf_counter()
+    if not streaming:
+        clip = pipeline.synthesize(text, "es")
+        elapsed = time.perf_counter() - start
+        return elapsed, elapsed, clip, 1
+    first = None
+    pieces = []
+    for index, count, audio in pipeline.synthesize_streaming(text, "es", max_workers=args.workers):
+        if index == 0:
+            first = time.perf_counter() - start
+        pieces.append(audio)
+    return first, time.perf_counter() - start, concat_mp3(pieces), len(pieces)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sentences", type=int, nargs="+", default=[2, 8, 20])
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("--workers", type=int, default=4)
+    parser.add_argument("--latency-ms", type=float, default=150.0, help="fixed cost of one synthesize call")
+    parser.add_argument("--per-char-ms", type=float, default=1.5, help="cost per character synthesized")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    rng = random.Random(args.seed)
+    results = {"config": vars(args), "lengths": {}}
+    for sentences in args.sentences:
+        texts = [translation(sentences, rng) for _ in range(args.repeat)]
+        entry = {"chars": round(sum(map(len, texts)) / len(texts))}
+        for mode in ("whole", "streaming"):
+            first, total, checks = [], [], {"pieces": 0, "frames_match": True, "contiguous": True}
+            for text in texts:
+                first_s, total_s, clip, pieces = run(text, args, mode == "streaming")
+                first.append(first_s)
+                total.append(total_s)
+                frames, contiguous = frame_count(clip)
+                # The fake speaks one frame per character; whitespace between pieces is not spoken
+                expected = len(text) if mode == "whole" else sum(
+                    len(chunk.text) for chunk in split_chunks(text, DEFAULT_PIECE_CHARS)[1])
+                checks["pieces"] = max(checks["pieces"], pieces)
+                checks["frames_match"] &= frames == expected
+                checks["contiguous"] &= contiguous and (mode == "whole" or b"ID3" not in clip)
+            entry[mode] = {"time_to_first_audio": summarize(first), "total": summarize(total), **checks}
+        entry["first_audio_speedup_p50"] = round(
+            entry["whole"]["time_to_first_audio"]["p50_ms"] / entry["streaming"]["time_to_first_audio"]["p50_ms"], 2)
+        results["lengths"][str(sentences)] = entry
+    emit(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
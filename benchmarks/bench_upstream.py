@@ -0,0 +1,227 @@
+"""Upstream client benchmark against a local HTTP stand-in with injected latency and failures.
+
+Run from the repo root:
+
+    python -m benchmarks.bench_upstream --requests 400 --threads 16 --failure-rate 0.05 --outage 2:4
+
+A threaded HTTP server on localhost answers the same translate and TTS
+endpoints the HTTP backends call, sleeping a random latency and returning 503
+for --failure-rate of requests (and for every request inside the --outage
+window, given as start:end seconds into the run). The same load is sent
+through:
+
+- ``per_call``: a new session per request and no retries (how gTTS connects)
+- ``pooled``: one keep-alive session shared by every thread, wrapped in
+  ResilientBackend (retries with backoff and jitter, circuit breaker)
+
+Every response is checked against the request it answers, so cross-talk
+between threads sharing the session would show up as ``mismatched``.
+"""
+import argparse
+import base64
+import json
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+from benchmarks.stats import emit, summarize
+from vocalite.backends import GoogleHttpSynthesizer, GoogleHttpTranslator
+from vocalite.resilience import CircuitBreaker, ResilientBackend, pooled_session
+
+
+class StandIn:
+    """Serves translate_a/single and the TTS batchexecute RPC on a free localhost port."""
+
+    def __init__(self, latency_ms=(20, 80), failure_rate=0.0, outage=None, seed=0):
+        self.latency_ms = latency_ms
+        self.failure_rate = failure_rate
+        self.outage = outage
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self.connections = 0
+        self.requests = 0
+        self.failures = 0
+        self.started = time.monotonic()
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = "HTTP/1.1"
+
+            def setup(self):
+                super().setup()
+                with stand_in._lock:
+                    stand_in.connections += 1
+
+            def log_message(self, *args):
+                pass
+
+            def do_POST(self):
+                body = self.rfile.read(int(self.headers.get("Content-Length", 0))).decode("utf-8")
+                if not stand_in._admit():
+                    self._send(503, b"upstream degraded", "text/plain")
+                    return
+                url = urlparse(self.path)
+                form = parse_qs(body)
+                if url.path == "/translate_a/single":
+                    query = parse_qs(url.query)
+                    text = form["q"][0]
+                    payload = [[[f"[{query['tl'][0]}] {text}", text, None, None]], None, query["sl"][0]]
+                    self._send(200, json.dumps(payload).encode("utf-8"), "application/json")
+                elif url.path.endswith("/batchexecute"):
+                    text, lang = json.loads(json.loads(form["f.req"][0])[0][0][1])[:2]
+                    audio = base64.b64encode(f"{lang}:{text}".encode("utf-8")).decode("ascii")
+                    compact = (",", ":")
+                    line = json.dumps(
+                        [["wrb.fr", "jQ1olc", json.dumps([audio], separators=compact), None, None, None, "generic"]],
+                        separators=compact,
+                    )
+                    self._send(200, f")]}}'\n\n{len(line)}\n{line}\n".encode("utf-8"), "application/json")
+                else:
+                    self._send(404, b"not found", "text/plain")
+
+            def _send(self, status, body, content_type):
+                self.send_response(status)
+                self.send_header("Content-Type", content_type)
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+        self.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        self.server.daemon_threads = True
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+
+    def _admit(self):
+        """Sleeps the injected latency and decides whether this request fails."""
+        with self._lock:
+            self.requests += 1
+            latency = self._rng.uniform(*self.latency_ms) / 1000
+            fail = self._rng.random() < self.failure_rate
+        elapsed = time.monotonic() - self.started
+        if self.outage and self.outage[0] <= elapsed < self.outage[1]:
+            fail = True
+        time.sleep(latency)
+        if fail:
+            with self._lock:
+                self.failures += 1
+        return not fail
+
+    def start(self):
+        threading.Thread(target=self.server.serve_forever, name="stand-in", daemon=True).start()
+        return self
+
+    def stop(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class PerCallClient:
+    """Builds a fresh client (and so a fresh connection) for every request."""
+
+    def __init__(self, client_class, url):
+        self.client_class = client_class
+        self.url = url
+
+    def _client(self):
+        import requests
+
+        return self.client_class(self.url, session=requests.Session())
+
+    def translate(self, text, src, dest):
+        client = self._client()
+        try:
+            return client.translate(text, src, dest)
+        finally:
+            client.session.close()
+
+    def synthesize(self, text, lang):
+        client = self._client()
+        try:
+            return client.synthesize(text, lang)
+        finally:
+            client.session.close()
+
+
+def run_load(translator, tts, requests_count, threads, seed):
+    """Sends translate+TTS requests from a thread pool; returns latencies and outcome counts."""
+    rng = random.Random(seed)
+    jobs = [(f"sentence {i} {rng.randint(0, 10 ** 6)}", rng.choice(["fr", "de", "es", "ja"]))
+            for i in range(requests_count)]
+    counts = {"ok": 0, "errors": 0, "mismatched": 0}
+    errors = {}
+    lock = threading.Lock()
+
+    def one(job):
+        text, dest = job
+        start = time.perf_counter()
+        try:
+            translated = translator.translate(text, "en", dest)
+            audio = tts.synthesize(translated, dest)
+            outcome = "ok" if (translated == f"[{dest}] {text}"
+                               and audio == f"{dest}:{translated}".encode("utf-8")) else "mismatched"
+        except Exception as e:
+            outcome = "errors"
+            with lock:
+                errors[type(e).__name__] = errors.get(type(e).__name__, 0) + 1
+        with lock:
+            counts[outcome] += 1
+        return time.perf_counter() - start
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=threads) as pool:
+        latencies = list(pool.map(one, jobs))
+    return latencies, time.perf_counter() - start, counts, errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--requests", type=int, default=400)
+    parser.add_argument("--threads", type=int, default=16)
+    parser.add_argument("--latency-ms", type=float, nargs=2, default=[20.0, 80.0], metavar=("MIN", "MAX"))
+    parser.add_argument("--failure-rate", type=float, default=0.05)
+    parser.add_argument("--outage", help="start:end seconds into each run during which every request fails")
+    parser.add_argument("--max-retries", type=int, default=2)
+    parser.add_argument("--timeout", type=float, default=2.0, help="per-call read timeout in seconds")
+    parser.add_argument("--seed", type=int, default=7)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+    outage = tuple(float(part) for part in args.outage.split(":")) if args.outage else None
+
+    results = {"config": vars(args), "modes": {}}
+    for mode in ("per_call", "pooled"):
+        stand_in = StandIn(tuple(args.latency_ms), args.failure_rate, outage, args.seed).start()
+        try:
+            timeout = (1.0, args.timeout)
+            breakers = {}
+            if mode == "per_call":
+                translator = PerCallClient(lambda url, session: GoogleHttpTranslator(url, session, timeout),
+                                           stand_in.url)
+                tts = PerCallClient(lambda url, session: GoogleHttpSynthesizer(url, session, timeout),
+                                    stand_in.url)
+            else:
+                session = pooled_session(pool_size=args.threads)
+                breakers = {"translate": CircuitBreaker(reset_timeout=1.0), "tts": CircuitBreaker(reset_timeout=1.0)}
+                translator = ResilientBackend(GoogleHttpTranslator(stand_in.url, session, timeout), "translate",
+                                              max_retries=args.max_retries, backoff_s=0.05,
+                                              breaker=breakers["translate"])
+                tts = ResilientBackend(GoogleHttpSynthesizer(stand_in.url, session, timeout), "synthesize",
+                                       max_retries=args.max_retries, backoff_s=0.05, breaker=breakers["tts"])
+            latencies, wall_s, counts, errors = run_load(translator, tts, args.requests, args.threads, args.seed)
+        finally:
+            stand_in.stop()
+        results["modes"][mode] = {
+            **summarize(latencies, wall_s),
+            **counts,
+            "error_types": errors,
+            "upstream_requests": stand_in.requests,
+            "upstream_failures": stand_in.failures,
+            "connections_opened": stand_in.connections,
+            "breaker_trips": {name: breaker.trips for name, breaker in breakers.items()},
+        }
+    emit(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,173 @@
+"""Deterministic local stand-ins for the Vocalite backends.
+
+Every fake sleeps for a configurable latency (plus optional seeded jitter) and
+returns output derived only from its input, so benchmark runs are repeatable
+and need no network, Java, Tesseract or microphone.
+"""
+import hashlib
+import random
+import re
+import threading
+import time
+
+
+class _Latency:
+    """Sleeps for base_ms plus up to jitter_ms of seeded random jitter."""
+
+    def __init__(self, base_ms=0.0, jitter_ms=0.0, seed=0):
+        self.base_s = base_ms / 1000
+        self.jitter_s = jitter_ms / 1000
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def wait(self):
+        delay = self.base_s
+        if self.jitter_s:
+            with self._lock:
+                delay += self._rng.uniform(0, self.jitter_s)
+        if delay > 0:
+            time.sleep(delay)
+
+
+class FakeTranslator:
+    """Tags the text with the target language instead of translating it."""
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, seed=0):
+        self.latency = _Latency(latency_ms, jitter_ms, seed)
+        self.calls = 0
+
+    def translate(self, text, src, dest):
+        self.latency.wait()
+        self.calls += 1
+        return f"[{dest}] {text}"
+
+
+class FakeSynthesizer:
+    """Returns deterministic pseudo-MP3 bytes of a fixed size per call."""
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, seed=0, size=16 * 1024):
+        self.latency = _Latency(latency_ms, jitter_ms, seed)
+        self.size = size
+        self.calls = 0
+
+    def synthesize(self, text, lang):
+        self.latency.wait()
+        self.calls += 1
+        digest = hashlib.sha256(f"{lang}:{text}".encode("utf-8")).digest()
+        return (digest * (self.size // len(digest) + 1))[: self.size]
+
+
+class FakeMp3Synthesizer:
+    """Returns a structurally valid MP3 (ID3v2 tag, Xing frame, silent frames) sized by the text.
+
+    Like gTTS, the cost grows with the text: each call sleeps latency_ms plus
+    per_char_ms per character. Every character becomes one 24 ms frame of
+    MPEG-2 layer III silence (24 kHz, 32 kbps, mono), so concatenation can be
+    checked by counting frames.
+    """
+
+    # MPEG-2 layer III, no CRC / 32 kbps, 24 kHz / mono, original
+    HEADER = bytes([0xFF, 0xF3, 0x44, 0xC4])
+    FRAME_BYTES = 96
+
+    def __init__(self, latency_ms=0.0, per_char_ms=0.0, jitter_ms=0.0, seed=0):
+        self.latency = _Latency(latency_ms, jitter_ms, seed)
+        self.per_char_s = per_char_ms / 1000
+        self.calls = 0
+        self._lock = threading.Lock()
+
+    @classmethod
+    def frame(cls, payload=b""):
+        return cls.HEADER + payload.ljust(cls.FRAME_BYTES - len(cls.HEADER), b"\x00")
+
+    def synthesize(self, text, lang):
+        self.latency.wait()
+        time.sleep(self.per_char_s * len(text))
+        with self._lock:
+            self.calls += 1
+        title = f"{lang}:{text[:32]}".encode("utf-8")
+        tag_body = b"TIT2" + (len(title) + 1).to_bytes(4, "big") + b"\x00\x00\x03" + title
+        size = len(tag_body)
+        id3 = b"ID3\x04\x00\x00" + bytes([(size >> 21) & 0x7F, (size >> 14) & 0x7F, (size >> 7) & 0x7F, size & 0x7F])
+        # Side information of a mono MPEG-2 frame is 9 bytes; the Xing tag follows it
+        xing = self.frame(b"\x00" * 9 + b"Xing" + (0x01).to_bytes(4, "big") + len(text).to_bytes(4, "big"))
+        return id3 + tag_body + xing + self.frame() * len(text)
+
+
+class FakeGrammar:
+    """Capitalizes the first letter, which is enough to look like a correction."""
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, seed=0):
+        self.latency = _Latency(latency_ms, jitter_ms, seed)
+        self.calls = 0
+
+    def correct(self, text, lang_name):
+        self.latency.wait()
+        self.calls += 1
+        return text[:1].upper() + text[1:]
+
+
+class FakeLanguageTool:
+    """Flags doubled words ("the the") like LanguageTool would, at a cost that grows with text length.
+
+    Each check sleeps latency_ms plus per_char_us per character of the text.
+    """
+
+    _DOUBLED = re.compile(r"\b(\w+)(\s+)\1\b", re.IGNORECASE)
+
+    def __init__(self, latency_ms=0.0, per_char_us=0.0, jitter_ms=0.0, seed=0):
+        self.latency = _Latency(latency_ms, jitter_ms, seed)
+        self.per_char_s = per_char_us / 1e6
+        self.calls = 0
+        self.chars = 0
+        self._lock = threading.Lock()
+
+    def matches(self, text, lang_name):
+        self.latency.wait()
+        time.sleep(self.per_char_s * len(text))
+        with self._lock:
+            self.calls += 1
+            self.chars += len(text)
+        return [(m.start(), m.end() - m.start(), m.group(1)) for m in self._DOUBLED.finditer(text)]
+
+    def correct(self, text, lang_name):
+        from vocalite.grammar_cache import apply_edits
+
+        return apply_edits(text, self.matches(text, lang_name))
+
+
+class FakeOCR:
+    """Returns the image's ``text`` attribute, or a fixed string for other objects."""
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, seed=0):
+        self.latency = _Latency(latency_ms, jitter_ms, seed)
+        self.calls = 0
+
+    def image_to_string(self, image, config=""):
+        self.latency.wait()
+        self.calls += 1
+        return getattr(image, "text", "sample extracted text\n")
+
+
+class FakeRecognizer:
+    """Returns the audio's ``transcript`` attribute, or a fixed string for other objects."""
+
+    def __init__(self, latency_ms=0.0, jitter_ms=0.0, seed=0):
+        self.latency = _Latency(latency_ms, jitter_ms, seed)
+        self.calls = 0
+
+    def recognize(self, audio):
+        self.latency.wait()
+        self.calls += 1
+        return getattr(audio, "transcript", "sample spoken text")
+
+
+FAKE_LANGUAGES = {
+    "en": "english",
+    "es": "spanish",
+    "de": "german",
+    "fr": "french",
+    "it": "italian",
+    "pt": "portuguese",
+    "ja": "japanese",
+}
@@ -0,0 +1,118 @@
+"""Startup profiler: per-backend import and init time, and time to first interactive.
+
+Run from the repo root:
+
+    python -m benchmarks.profile_startup --output startup.json
+
+Each backend module is imported in a fresh interpreter so the numbers are
+cold-import costs. "eager" imports everything app.py used to import at the
+top; "lazy" imports only what the page needs before its first render. With
+--init, every lazy backend is also built in-process (LanguageTool only with
+--grammar, since it boots a Java server), and with --app the first script run
+of app.py is timed through Streamlit's AppTest.
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+
+from benchmarks.stats import emit
+
+BACKEND_MODULES = [
+    "streamlit",
+    "googletrans",
+    "gtts",
+    "speech_recognition",
+    "pytesseract",
+    "language_tool_python",
+    "streamlit_cropper",
+    "PIL.Image",
+]
+
+# What app.py imported at module level before backends were made lazy
+EAGER_IMPORTS = BACKEND_MODULES
+# What app.py imports before its first render now
+LAZY_IMPORTS = ["streamlit", "PIL.Image", "vocalite.pipeline", "vocalite.ocr", "vocalite.lazy"]
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def cold_import(modules):
+    """Imports modules in a fresh interpreter; returns seconds or an error string."""
+    code = (
+        "import importlib, json, time\n"
+        f"modules = {modules!r}\n"
+        "start = time.perf_counter()\n"
+        "for name in modules:\n"
+        "    importlib.import_module(name)\n"
+        "print(json.dumps(time.perf_counter() - start))\n"
+    )
+    proc = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, cwd=REPO_ROOT)
+    if proc.returncode != 0:
+        return {"error": proc.stderr.strip().splitlines()[-1] if proc.stderr.strip() else "failed"}
+    return {"seconds": round(json.loads(proc.stdout), 4)}
+
+
+def init_backends(include_grammar):
+    from vocalite.backends import GoogleSpeechRecognizer, GoogleTranslator, GTTSSynthesizer, TesseractOCR
+    from vocalite.grammar_pool import create_language_tool
+    from vocalite.lazy import LazyBackend, load_googletrans_languages, startup_report
+
+    lazies = [
+        LazyBackend("googletrans", GoogleTranslator, modules=("googletrans",)),
+        LazyBackend("gtts", GTTSSynthesizer, modules=("gtts",)),
+        LazyBackend("pytesseract", TesseractOCR, modules=("pytesseract",)),
+        LazyBackend("google_recognizer", GoogleSpeechRecognizer, modules=("speech_recognition",)),
+    ]
+    if include_grammar:
+        lazies.append(LazyBackend("language_tool_python", lambda: create_language_tool("en-US"),
+                                  modules=("language_tool_python",)))
+    try:
+        load_googletrans_languages()
+    except Exception:
+        pass
+    for lazy in lazies:
+        try:
+            lazy.get()
+        except Exception:
+            pass
+    return startup_report()
+
+
+def first_app_run(timeout):
+    from streamlit.testing.v1 import AppTest
+
+    start = time.perf_counter()
+    app = AppTest.from_file(os.path.join(REPO_ROOT, "app.py"), default_timeout=timeout)
+    app.run()
+    return {"seconds": round(time.perf_counter() - start, 4), "exceptions": [str(e.value) for e in app.exception]}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--init", action="store_true", help="also build each backend and time its init")
+    parser.add_argument("--grammar", action="store_true", help="include LanguageTool in --init (starts Java)")
+    parser.add_argument("--app", action="store_true", help="time the first run of app.py with AppTest")
+    parser.add_argument("--timeout", type=float, default=120.0)
+    parser.add_argument("--output", help="write results as JSON to this path")
+    args = parser.parse_args()
+
+    results = {
+        "imports": {module: cold_import([module]) for module in BACKEND_MODULES},
+        "eager_startup_imports": cold_import(EAGER_IMPORTS),
+        "lazy_startup_imports": cold_import(LAZY_IMPORTS),
+    }
+    if args.init:
+        results["init"] = init_backends(args.grammar)
+    if args.app:
+        try:
+            results["first_app_run"] = first_app_run(args.timeout)
+        except ImportError as e:
+            results["first_app_run"] = {"error": str(e)}
+    emit(results, args.output)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+"""Latency summaries shared by the benchmarks."""
+import json
+import math
+
+
+def percentile(sorted_samples, pct):
+    """Nearest-rank percentile of an already sorted list."""
+    if not sorted_samples:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_samples)))
+    return sorted_samples[rank - 1]
+
+
+def summarize(samples, wall_s=None):
+    """Summarizes latency samples (seconds) as milliseconds, plus throughput when wall_s is given."""
+    samples = sorted(samples)
+    summary = {
+        "count": len(samples),
+        "mean_ms": round(sum(samples) / len(samples) * 1000, 3) if samples else 0.0,
+        "p50_ms": round(percentile(samples, 50) * 1000, 3),
+        "p95_ms": round(percentile(samples, 95) * 1000, 3),
+        "p99_ms": round(percentile(samples, 99) * 1000, 3),
+        "max_ms": round(samples[-1] * 1000, 3) if samples else 0.0,
+    }
+    if wall_s is not None:
+        summary["wall_s"] = round(wall_s, 4)
+        summary["throughput_per_s"] = round(len(samples) / wall_s, 2) if wall_s else 0.0
+    return summary
+
+
+def emit(results, output=None):
+    """Prints results as JSON and optionally writes them to output."""
+    text = json.dumps(results, indent=2)
+    print(text)
+    if output:
+        with open(output, "w") as f:
+            f.write(text + "\n")
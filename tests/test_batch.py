@@ -0,0 +1,23 @@
+"""parse_document and Document.render round trips."""
+import pytest
+
+from vocalite.batch import parse_document
+
+
+def test_csv_round_trip_adds_translated_column():
+    document = parse_document("rows.csv", b"id,text\n1,hello\n2,\n")
+
+    assert document.segments("text") == ["hello", ""]
+    rendered = document.render("text", ["hola", ""]).decode("utf-8")
+    assert rendered.splitlines() == ["id,text,text_translated", "1,hello,hola", "2,,"]
+
+
+def test_csv_row_with_more_cells_than_header_is_rejected():
+    with pytest.raises(ValueError, match="Line 3 has 3 cells but the header has 2"):
+        parse_document("rows.csv", b"id,text\n1,hello\n2,hi,extra\n")
+
+
+def test_csv_short_row_renders_blank_cells():
+    document = parse_document("rows.csv", b"id,text,note\n1,hello\n")
+
+    assert document.render("text", ["hola"]).decode("utf-8").splitlines()[1] == "1,hello,,hola"
@@ -0,0 +1,106 @@
+"""Chunk splitting and reassembly for long translation inputs."""
+import threading
+import time
+
+import pytest
+
+from vocalite.chunking import _hard_split, assemble, split_chunks, split_sentences, stream_translation
+from vocalite.pipeline import VocalitePipeline
+from vocalite.translation_cache import TranslationCache
+
+TEXTS = [
+    "One sentence.",
+    "  Leading spaces.  Two  spaces inside.\tA tab. Trailing spaces.   ",
+    "First paragraph. Still first!\n\nSecond paragraph?\n \n\nThird, after a blank-ish gap.\n",
+    "Windows\r\nline endings.\r\n\r\nNext paragraph.",
+    '"Quoted sentence." (Bracketed one.) «Guillemets.» Done',
+    "\n\n   \n",
+    "",
+]
+
+
+@pytest.mark.parametrize("text", TEXTS)
+@pytest.mark.parametrize("max_chars", [12, 40, 2000])
+def test_identity_translation_rebuilds_the_input_exactly(text, max_chars):
+    prefix, chunks = split_chunks(text, max_chars)
+
+    assert assemble(prefix, chunks, [chunk.text for chunk in chunks]) == text
+    assert all(len(chunk.text) <= max_chars for chunk in chunks)
+
+
+@pytest.mark.parametrize("text", TEXTS)
+def test_sentence_split_rebuilds_the_input_exactly(text):
+    prefix, chunks = split_sentences(text)
+
+    assert assemble(prefix, chunks, [chunk.text for chunk in chunks]) == text
+
+
+def test_chunks_never_span_paragraphs():
+    prefix, chunks = split_chunks("Short one. Short two.\n\nShort three.", max_chars=2000)
+
+    assert prefix == ""
+    assert [(chunk.text, chunk.trailing) for chunk in chunks] == [
+        ("Short one. Short two.", "\n\n"),
+        ("Short three.", ""),
+    ]
+
+
+def test_line_breaks_inside_a_paragraph_are_kept_in_the_chunk():
+    _, chunks = split_chunks("Roses are red\nviolets are blue.", max_chars=2000)
+
+    assert [chunk.text for chunk in chunks] == ["Roses are red\nviolets are blue."]
+
+
+def test_over_long_sentence_is_cut_at_spaces():
+    sentence = "word " * 9 + "end"
+
+    parts = _hard_split(sentence, "  ", max_chars=12)
+
+    assert [text for text, _ in parts] == ["word word", "word word", "word word", "word word", "word end"]
+    assert "".join(text + separator for text, separator in parts) == sentence + "  "
+
+
+def test_over_long_word_is_cut_anywhere():
+    parts = _hard_split("x" * 25, "", max_chars=10)
+
+    assert parts == [("x" * 10, ""), ("x" * 10, ""), ("x" * 5, "")]
+
+
+def test_chunks_are_reassembled_in_order_when_they_finish_out_of_order():
+    text = " ".join(f"Sentence number {i} is here." for i in range(8))
+    prefix, chunks = split_chunks(text, max_chars=60)
+    assert len(chunks) == 4
+    finished = []
+    lock = threading.Lock()
+
+    def translate(chunk):
+        # Later chunks finish first
+        time.sleep(0.01 * (len(chunks) - [c.text for c in chunks].index(chunk)))
+        with lock:
+            finished.append(chunk)
+        return chunk.upper()
+
+    prefixes = list(stream_translation(text, translate, max_chars=60, max_workers=4))
+
+    assert finished != [chunk.text for chunk in chunks]
+    assert prefixes[-1] == text.upper()
+    assert len(prefixes) == len(chunks)
+    for shorter, longer in zip(prefixes, prefixes[1:]):
+        assert longer.startswith(shorter)
+
+
+def test_cached_translation_receives_the_chunk_as_typed():
+    seen = []
+
+    class RecordingTranslator:
+        def translate(self, text, src, dest):
+            seen.append(text)
+            return text
+
+    pipeline = VocalitePipeline(RecordingTranslator(), translation_cache=TranslationCache())
+    text = "A  table:\n  col one   col two.\n\nNext  paragraph."
+
+    translated = list(pipeline.translate_streaming(text, "en", "es", max_chars=2000))[-1]
+
+    assert seen == ["A  table:\n  col one   col two.", "Next  paragraph."]
+    assert translated == text
@@ -0,0 +1,102 @@
+"""Multi-frame TIFF page iteration and process-pool OCR ordering with a bounded number of pages in flight."""
+import io
+import sys
+
+import pytest
+from PIL import Image
+
+from vocalite.document_ocr import count_pages, iter_pages, ocr_pages, summarize_pages
+
+PAGE_WIDTHS = [200, 240, 280, 320, 360, 400, 440]
+
+
+def tiff(widths):
+    """A multi-frame TIFF whose pages are told apart by their width."""
+    frames = [Image.new("L", (width, 100), 255) for width in widths]
+    buffer = io.BytesIO()
+    frames[0].save(buffer, "TIFF", save_all=True, append_images=frames[1:], dpi=(150, 150))
+    return buffer.getvalue()
+
+
+class WidthBackend:
+    """Reads a page's width back as its text; pickled into the worker processes."""
+
+    def __init__(self, fail_width=None):
+        self.fail_width = fail_width
+
+    def image_to_string(self, image, config=""):
+        if image.width == self.fail_width:
+            raise ValueError("unreadable page")
+        return f" {image.width} {config}\n"
+
+
+def test_tiff_pages_are_counted_and_decoded_one_at_a_time():
+    data = tiff(PAGE_WIDTHS)
+
+    pages = iter_pages("scan.tiff", data)
+    first = next(pages)
+
+    assert count_pages("scan.tiff", data) == len(PAGE_WIDTHS)
+    assert first.size == (200, 100)
+    assert [page.width for page in pages] == PAGE_WIDTHS[1:]
+
+
+def test_single_image_is_one_page():
+    buffer = io.BytesIO()
+    Image.new("L", (50, 50)).save(buffer, "PNG")
+
+    assert count_pages("photo.png", buffer.getvalue()) == 1
+    assert len(list(iter_pages("photo.png", buffer.getvalue()))) == 1
+
+
+def test_ocr_pages_yields_every_page_with_its_index():
+    data = tiff(PAGE_WIDTHS)
+
+    results = list(ocr_pages(iter_pages("scan.tif", data), WidthBackend(), workers=2, config="--psm 6",
+                             grayscale=False, threshold=False, min_side=1, target_dpi=150))
+
+    by_page = {result["page"]: result for result in results}
+    assert sorted(by_page) == list(range(len(PAGE_WIDTHS)))
+    # Pages already at the target DPI are not resized, and the text is stripped
+    assert [by_page[i]["text"] for i in range(len(PAGE_WIDTHS))] == [f"{w} --psm 6" for w in PAGE_WIDTHS]
+    assert all(result["error"] is None for result in results)
+
+    summary = summarize_pages(results, wall_s=2.0)
+    assert (summary["pages"], summary["failed"], summary["pages_per_s"]) == (7, 0, 3.5)
+    assert len(summary["page_seconds"]) == 7
+
+
+def test_ocr_pages_keeps_at_most_two_pages_per_worker_in_flight():
+    pulled = []
+
+    def pages():
+        for width in PAGE_WIDTHS:
+            pulled.append(width)
+            yield Image.new("L", (width, 100), 255)
+
+    in_flight = []
+    for result in ocr_pages(pages(), WidthBackend(), workers=2, threshold=False, grayscale=False,
+                            min_side=1, target_dpi=150):
+        in_flight.append(len(pulled) - len(in_flight))
+
+    assert len(in_flight) == len(PAGE_WIDTHS)
+    assert max(in_flight) == 4
+
+
+def test_a_failing_page_reports_its_error_without_stopping_the_rest():
+    results = list(ocr_pages(iter_pages("scan.tif", tiff(PAGE_WIDTHS[:3])), WidthBackend(fail_width=240),
+                             workers=1, threshold=False, grayscale=False, min_side=1, target_dpi=150))
+
+    errors = {result["page"]: result["error"] for result in results}
+    assert sorted(errors) == [0, 1, 2]
+    assert isinstance(errors[1], ValueError)
+    assert errors[0] is None and errors[2] is None
+    assert summarize_pages(results, wall_s=0)["failed"] == 1
+    assert summarize_pages(results, wall_s=0)["pages_per_s"] == 0.0
+
+
+def test_pdf_without_pypdfium2_explains_the_missing_dependency(monkeypatch):
+    monkeypatch.setitem(sys.modules, "pypdfium2", None)
+
+    with pytest.raises(RuntimeError, match="pypdfium2"):
+        next(iter_pages("doc.pdf", b"%PDF-1.4"))
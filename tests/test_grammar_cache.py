@@ -0,0 +1,117 @@
+"""IncrementalGrammar re-checks only edited sentences and keeps edit offsets right."""
+import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from vocalite.grammar_cache import IncrementalGrammar, apply_edits
+from vocalite.pipeline import VocalitePipeline
+
+FIXES = {"teh": "the", "alot": "a lot", "dont": "don't", "i": "I"}
+_MISTAKE = re.compile(r"\b(" + "|".join(FIXES) + r")\b")
+
+
+class CountingTool:
+    """A LanguageTool stand-in: fixes a few known mistakes and records every text it is asked to check."""
+
+    def __init__(self):
+        self.checked = []
+        self._lock = threading.Lock()
+
+    def matches(self, text, lang_name):
+        with self._lock:
+            self.checked.append(text)
+        return [(match.start(), len(match.group()), FIXES[match.group()]) for match in _MISTAKE.finditer(text)]
+
+    def correct(self, text, lang_name):
+        return apply_edits(text, self.matches(text, lang_name))
+
+
+class CorrectOnlyTool:
+    """A backend without ``matches``, which IncrementalGrammar checks one sentence per call."""
+
+    def __init__(self):
+        self.checked = []
+        self._lock = threading.Lock()
+
+    def correct(self, text, lang_name):
+        with self._lock:
+            self.checked.append(text)
+        return _MISTAKE.sub(lambda match: FIXES[match.group()], text)
+
+
+TEXT = "i think teh plan works. We have alot of time!\n\nBut i dont know. Teh end is near?  Yes."
+
+
+def test_an_edit_re_checks_only_the_sentence_it_touched():
+    tool = CountingTool()
+    grammar = IncrementalGrammar(tool, batch_chars=10_000)
+
+    first = grammar.correct(TEXT, "english")
+    assert first == "I think the plan works. We have a lot of time!\n\nBut I don't know. Teh end is near?  Yes."
+    # Cold: neighbouring sentences go to the tool together, in one batch here
+    assert len(tool.checked) == 1
+
+    tool.checked.clear()
+    edited = TEXT.replace("We have alot of time!", "We have alot of tea!")
+    assert grammar.correct(edited, "english").startswith("I think the plan works. We have a lot of tea!")
+    assert tool.checked == ["We have alot of tea!"]
+
+    tool.checked.clear()
+    grammar.correct(edited, "german")
+    assert len(tool.checked) == 1, "results are cached per language"
+
+    stats = grammar.stats()
+    assert (stats["sentences"], stats["checked"], stats["hits"]) == (15, 11, 4)
+
+
+def test_backends_without_matches_are_checked_sentence_by_sentence():
+    tool = CorrectOnlyTool()
+    grammar = IncrementalGrammar(tool)
+
+    assert grammar.correct(TEXT, "english") == CountingTool().correct(TEXT, "english")
+    assert sorted(tool.checked) == sorted(["i think teh plan works.", "We have alot of time!", "But i dont know.",
+                                           "Teh end is near?", "Yes."])
+
+    tool.checked.clear()
+    grammar.correct(TEXT.replace("Yes.", "No."), "english")
+    assert tool.checked == ["No."]
+
+
+@pytest.mark.parametrize("text", [
+    TEXT,
+    "  teh start.  Then alot.\n\n\n i dont.\tteh\nend i",
+    "alot alot alot. i i i! dont?",
+])
+def test_edit_offsets_point_into_the_whole_text(text):
+    grammar = IncrementalGrammar(CountingTool(), batch_chars=12)
+
+    edits = grammar.matches(text, "english")
+
+    assert edits == CountingTool().matches(text, "english")
+    assert apply_edits(text, edits) == grammar.correct(text, "english") == CountingTool().correct(text, "english")
+
+
+def test_apply_edits_sorts_and_skips_overlaps():
+    text = "abcdefghij"
+
+    assert apply_edits(text, [(6, 2, "GH"), (0, 3, "X"), (2, 2, "overlap"), (9, 1, "JJJ")]) == "Xdef" + "GHi" + "JJJ"
+
+
+def test_a_shared_executor_is_left_running_on_close():
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        grammar = IncrementalGrammar(CountingTool(), executor=executor)
+        grammar.correct(TEXT, "english")
+        grammar.close()
+        assert executor.submit(lambda: "still up").result() == "still up"
+
+
+def test_close_shuts_down_its_own_pool():
+    grammar = IncrementalGrammar(CountingTool())
+    pipeline = VocalitePipeline(translator=None, grammar=grammar)
+
+    pipeline.close()
+
+    with pytest.raises(RuntimeError):
+        grammar.correct("teh new sentence.", "english")
@@ -0,0 +1,192 @@
+"""LanguageToolPool behaviour against a stub tool factory."""
+import threading
+import time
+
+import pytest
+
+from vocalite.grammar_pool import LanguageToolPool
+
+
+class StubTool:
+    def __init__(self, lang_code):
+        self.lang_code = lang_code
+        self.closed = False
+
+    def close(self):
+        self.closed = True
+
+
+class StubFactory:
+    """Builds StubTools, counting starts per language; can fail or stall a start."""
+
+    def __init__(self, delay=0.0, fail=()):
+        self.delay = delay
+        self.fail = set(fail)
+        self.starts = {}
+        self.tools = []
+        self._lock = threading.Lock()
+
+    def __call__(self, lang_code):
+        with self._lock:
+            self.starts[lang_code] = self.starts.get(lang_code, 0) + 1
+        if self.delay:
+            time.sleep(self.delay)
+        if lang_code in self.fail:
+            raise RuntimeError(f"cannot start {lang_code}")
+        tool = StubTool(lang_code)
+        with self._lock:
+            self.tools.append(tool)
+        return tool
+
+
+def test_reuses_one_tool_per_language():
+    factory = StubFactory()
+    pool = LanguageToolPool(factory, max_instances=3)
+
+    with pool.checkout("en-US") as first:
+        pass
+    with pool.checkout("en-US") as second:
+        pass
+    with pool.checkout("de-DE") as other:
+        pass
+
+    assert first is second
+    assert other is not first
+    assert factory.starts == {"en-US": 1, "de-DE": 1}
+    stats = pool.stats()
+    assert stats["starts"] == 2
+    assert stats["hits"] == 1
+    assert stats["live"] == ["de-DE", "en-US"]
+
+
+def test_evicts_least_recently_used_at_max_instances():
+    factory = StubFactory()
+    pool = LanguageToolPool(factory, max_instances=2)
+
+    with pool.checkout("en-US") as english:
+        pass
+    with pool.checkout("de-DE"):
+        pass
+    # en-US is now the most recently used, so de-DE goes first
+    with pool.checkout("en-US"):
+        pass
+    with pool.checkout("fr"):
+        pass
+
+    stats = pool.stats()
+    assert stats["live"] == ["en-US", "fr"]
+    assert stats["evictions"] == 1
+    assert not english.closed
+    assert [tool.lang_code for tool in factory.tools if tool.closed] == ["de-DE"]
+
+
+def test_full_pool_of_checked_out_tools_waits_then_raises():
+    pool = LanguageToolPool(StubFactory(), max_instances=1, checkout_timeout=0.05)
+
+    with pool.checkout("en-US") as held:
+        with pytest.raises(RuntimeError, match="No LanguageTool slot free"):
+            with pool.checkout("de-DE"):
+                pass
+    assert not held.closed
+
+
+def test_evict_idle_closes_idle_tools_but_never_a_checked_out_one():
+    factory = StubFactory()
+    pool = LanguageToolPool(factory, max_instances=3, idle_timeout=0)
+
+    with pool.checkout("de-DE") as idle:
+        pass
+    with pool.checkout("en-US") as busy:
+        time.sleep(0.01)
+        assert pool.evict_idle() == 1
+        assert idle.closed
+        assert not busy.closed
+        assert pool.stats()["live"] == ["en-US"]
+
+    time.sleep(0.01)
+    assert pool.evict_idle() == 1
+    assert busy.closed
+    assert pool.stats()["live"] == []
+
+
+def test_start_error_is_not_cached():
+    factory = StubFactory(fail={"xx"})
+    pool = LanguageToolPool(factory, max_instances=2)
+
+    for _ in range(2):
+        with pytest.raises(RuntimeError, match="cannot start xx"):
+            with pool.checkout("xx"):
+                pass
+
+    assert factory.starts["xx"] == 2
+    stats = pool.stats()
+    assert stats["start_errors"] == 2
+    assert stats["live"] == []
+
+    factory.fail.clear()
+    with pool.checkout("xx") as tool:
+        assert tool.lang_code == "xx"
+
+
+def test_concurrent_checkouts_start_one_tool_per_language():
+    factory = StubFactory(delay=0.05)
+    pool = LanguageToolPool(factory, max_instances=4)
+    barrier = threading.Barrier(16)
+    seen = {}
+    lock = threading.Lock()
+
+    def worker(lang_code):
+        barrier.wait()
+        with pool.checkout(lang_code) as tool:
+            with lock:
+                seen.setdefault(lang_code, set()).add(id(tool))
+
+    threads = [threading.Thread(target=worker, args=("en-US" if i % 2 else "de-DE",)) for i in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert factory.starts == {"en-US": 1, "de-DE": 1}
+    assert {lang: len(ids) for lang, ids in seen.items()} == {"en-US": 1, "de-DE": 1}
+    stats = pool.stats()
+    assert stats["starts"] == 2
+    assert stats["hits"] == 14
+    assert stats["in_use"] == 0
+
+
+def test_reaper_evicts_idle_tools_until_stopped():
+    factory = StubFactory()
+    pool = LanguageToolPool(factory, max_instances=2, idle_timeout=0)
+    with pool.checkout("en-US") as tool:
+        pass
+
+    reaper = pool.start_reaper(interval=0.01)
+    assert pool.start_reaper(interval=0.01) is reaper
+    deadline = time.monotonic() + 5
+    while not tool.closed and time.monotonic() < deadline:
+        time.sleep(0.01)
+    pool.stop_reaper(timeout=5)
+
+    assert tool.closed
+    assert not reaper.is_alive()
+    with pool.checkout("de-DE") as kept:
+        pass
+    time.sleep(0.05)
+    assert not kept.closed
+
+
+def test_close_stops_the_reaper_and_closes_idle_tools():
+    pool = LanguageToolPool(StubFactory(), max_instances=2)
+    with pool.checkout("en-US") as tool:
+        pass
+    # A long interval: close must not wait for the next tick
+    reaper = pool.start_reaper(interval=60)
+
+    started = time.monotonic()
+    pool.close()
+
+    assert time.monotonic() - started < 5
+    assert not reaper.is_alive()
+    assert tool.closed
+    assert pool.stats()["live"] == []
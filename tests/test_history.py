@@ -0,0 +1,127 @@
+"""HistoryStore search, keyset paging and export against an on-disk database."""
+import csv
+import io
+import json
+
+import pytest
+
+from vocalite.history import HISTORY_FIELDS, HistoryStore
+
+
+def entry(original, translated, src="english", dest="spanish", corrected=None):
+    item = {"time": "2024-05-01 10:00:00", "src_lang": src, "dest_lang": dest, "original": original,
+            "translated": translated}
+    if corrected:
+        item["corrected"] = corrected
+    return item
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = HistoryStore(str(tmp_path / "history" / "history.sqlite3"))
+    yield store
+    store.close()
+
+
+def test_search_finds_entries_as_soon_as_they_are_stored(store):
+    assert store.fts
+    store.append(entry("Where is the train station?", "¿Dónde está la estación de tren?"), owner="a")
+    store.append(entry("I would like a coffee", "Quisiera un café", corrected="I would like a coffee."), owner="a")
+    store.append(entry("Good night", "Gute Nacht", dest="german"), owner="a")
+
+    def found(query, **filters):
+        items, _ = store.page("a", query=query, **filters)
+        return [item["original"] for item in items]
+
+    # Words match as prefixes, in any of the three columns, ignoring accents
+    assert found("stat") == ["Where is the train station?"]
+    assert found("cafe") == ["I would like a coffee"]
+    assert found("coffee.") == ["I would like a coffee"]
+    assert found("nacht") == ["Good night"]
+    assert found("train coffee") == []
+    assert found("good", dest_lang="spanish") == []
+    # Quotes in the query are matched literally instead of breaking the FTS syntax
+    assert found('say "hi') == []
+    assert store.count("a", query="i") == 2
+
+
+def test_search_forgets_deleted_entries_and_other_owners(store):
+    store.append(entry("hello world", "hola mundo"), owner="a")
+    store.append(entry("hello there", "hola"), owner="b")
+
+    store.clear(owner="a")
+
+    assert store.page("a", query="hello") == ([], None)
+    assert [item["original"] for item in store.page("b", query="hello")[0]] == ["hello there"]
+    assert store.language_pairs("a") == []
+    assert store.language_pairs("b") == [("english", "spanish", 1)]
+
+    store.append(entry("hello again", "hola otra vez"), owner="a")
+    assert [item["original"] for item in store.page("a", query="hello")[0]] == ["hello again"]
+
+
+@pytest.mark.parametrize("total, limit, sizes", [(25, 10, [10, 10, 5]), (20, 10, [10, 10]), (3, 10, [3]),
+                                                 (0, 10, [0])])
+def test_keyset_pages_cover_every_entry_once(store, total, limit, sizes):
+    store.extend([entry(f"phrase {i}", f"frase {i}") for i in range(total)], owner="a")
+
+    pages, cursor = [], None
+    while True:
+        items, cursor = store.page("a", limit=limit, before_id=cursor)
+        pages.append(items)
+        if cursor is None:
+            break
+
+    assert [len(items) for items in pages] == sizes
+    originals = [item["original"] for items in pages for item in items]
+    assert originals == [f"phrase {i}" for i in reversed(range(total))]
+
+
+def test_search_pages_use_the_same_cursors(store):
+    store.extend([entry(f"{'apple' if i % 3 == 0 else 'pear'} {i}", f"fruta {i}") for i in range(30)], owner="a")
+
+    first, cursor = store.page("a", limit=4, query="apple")
+    second, cursor = store.page("a", limit=4, before_id=cursor, query="apple")
+    third, cursor = store.page("a", limit=4, before_id=cursor, query="apple")
+
+    assert [item["original"] for item in first + second + third] == [f"apple {i}" for i in range(27, -1, -3)]
+    assert cursor is None
+    assert len(list(store.iter_items("a", query="apple", batch_size=3))) == 10
+
+
+def test_iter_all_yields_every_owner_oldest_first(store):
+    store.append(entry("one", "uno"), owner="a")
+    store.append(entry("two", "dos"), owner="b")
+    store.append(entry("three", "tres"), owner="a")
+
+    assert [(owner, item["original"]) for owner, item in store.iter_all(batch_size=2)] == [
+        ("a", "one"), ("b", "two"), ("a", "three"),
+    ]
+
+
+TRICKY = 'She said "hi, there"\nthen left; 50% off, \\o/ ünïcödé'
+
+
+def test_csv_export_escapes_quotes_commas_and_newlines(store):
+    store.append(entry(TRICKY, "Dijo \"hola\", luego\r\nse fue", corrected=TRICKY + "."), owner="a")
+    store.append(entry("plain", "simple"), owner="a")
+
+    rows = list(csv.DictReader(io.StringIO(store.export("csv", owner="a"))))
+
+    assert list(rows[0]) == HISTORY_FIELDS
+    assert [row["original"] for row in rows] == ["plain", TRICKY]
+    assert rows[1]["corrected"] == TRICKY + "."
+    assert rows[1]["translated"] == "Dijo \"hola\", luego\r\nse fue"
+    assert rows[0]["corrected"] == ""
+
+
+def test_jsonl_export_is_one_object_per_line(store):
+    store.append(entry(TRICKY, "¿Qué?\nSí"), owner="a")
+    store.append(entry("other owner", "otro"), owner="b")
+
+    lines = store.export("jsonl", owner="a").splitlines()
+
+    assert len(lines) == 1
+    item = json.loads(lines[0])
+    assert (item["original"], item["translated"]) == (TRICKY, "¿Qué?\nSí")
+    assert "ünïcödé" in lines[0]
@@ -0,0 +1,106 @@
+"""Image intake on generated JPEGs: EXIF orientation, preview bound and crop box mapping."""
+import io
+
+import pytest
+from PIL import Image
+
+from vocalite.image_intake import EXIF_ORIENTATION, ImageIntake, IntakeImage, upload_key
+
+RED, BLUE = (220, 20, 20), (20, 20, 220)
+
+
+def jpeg(width, height, orientation=None):
+    """A JPEG whose stored pixels are red on the left half and blue on the right."""
+    image = Image.new("RGB", (width, height), RED)
+    image.paste(BLUE, (width // 2, 0, width, height))
+    exif = Image.Exif()
+    if orientation is not None:
+        exif[EXIF_ORIENTATION] = orientation
+    buffer = io.BytesIO()
+    image.save(buffer, "JPEG", quality=90, exif=exif)
+    return buffer.getvalue()
+
+
+def color_at(image, xy):
+    return tuple(round(channel / 100) for channel in image.convert("RGB").getpixel(xy))
+
+
+def is_red(image, xy):
+    return color_at(image, xy) == (2, 0, 0)
+
+
+def is_blue(image, xy):
+    return color_at(image, xy) == (0, 0, 2)
+
+
+def test_exif_orientation_is_applied_to_the_preview_size_and_original():
+    # Orientation 6: the camera was turned clockwise, so the stored left half is the upright top
+    intake = IntakeImage("k", jpeg(1600, 800, orientation=6))
+
+    assert intake.size == (800, 1600)
+    assert intake.preview.size == (350, 700)
+    original = intake.original()
+    assert original.size == (800, 1600)
+    assert is_red(original, (400, 100)) and is_blue(original, (400, 1500))
+    assert is_red(intake.preview, (175, 50)) and is_blue(intake.preview, (175, 650))
+
+
+@pytest.mark.parametrize("size", [(3000, 1500), (701, 2400), (4000, 4000)])
+def test_preview_fits_the_cropper_canvas(size):
+    intake = IntakeImage("k", jpeg(*size))
+
+    assert max(intake.preview.size) == 700
+    assert intake.size == size
+    assert intake.scale_x == pytest.approx(intake.scale_y, rel=0.01)
+
+
+def test_small_images_are_not_upscaled():
+    intake = IntakeImage("k", jpeg(300, 120))
+
+    assert intake.preview.size == intake.size == (300, 120)
+    assert (intake.scale_x, intake.scale_y) == (1, 1)
+
+
+def test_preview_crop_box_maps_back_to_original_pixels():
+    intake = IntakeImage("k", jpeg(3000, 1500))
+    assert intake.preview.size == (700, 350)
+
+    # The right half of the preview is the right half of the original
+    box = {"left": 350, "top": 0, "width": 350, "height": 350}
+    assert intake.original_box(box) == (1500, 0, 3000, 1500)
+    crop = intake.crop({"left": 360, "top": 10, "width": 300, "height": 300})
+    assert crop.size == (1286, 1286)
+    assert is_blue(crop, (0, 0)) and is_blue(crop, (1285, 1285))
+
+    assert intake.crop_preview(box).size == (350, 350)
+
+
+def test_crop_boxes_are_clamped_to_the_image():
+    intake = IntakeImage("k", jpeg(1400, 700))
+
+    assert intake.original_box({"left": -20, "top": -5, "width": 900, "height": 900}) == (0, 0, 1400, 700)
+    # A box past the edge still yields at least one pixel
+    assert intake.original_box({"left": 800, "top": 400, "width": 10, "height": 10}) == (1399, 699, 1400, 700)
+
+
+def test_rotated_crop_boxes_map_onto_the_upright_original():
+    intake = IntakeImage("k", jpeg(1600, 800, orientation=6))
+
+    bottom = {"left": 0, "top": 350, "width": 350, "height": 350}
+    assert intake.original_box(bottom) == (0, 800, 800, 1600)
+    assert is_blue(intake.crop(bottom), (400, 400))
+
+
+def test_uploads_are_decoded_once_and_kept_under_budget():
+    first, second = jpeg(1400, 700), jpeg(1000, 1000)
+    intake = ImageIntake(max_bytes=len(first) + 700 * 350 * 3 + 1)
+
+    image = intake.get(first)
+    assert intake.get(first) is image
+    assert image.key == upload_key(first)
+
+    intake.get(second)
+    stats = intake.stats()
+    assert (stats["hits"], stats["misses"], stats["evictions"], stats["entries"]) == (1, 2, 1, 1)
+    assert stats["bytes"] == intake.get(second).nbytes
+    assert intake.get(first) is not image
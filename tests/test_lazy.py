@@ -0,0 +1,113 @@
+"""LazyBackend build-on-first-use, background warm-up, failure retries and the startup report."""
+import threading
+
+import pytest
+
+from vocalite.lazy import LazyBackend, startup_report, unwrap
+
+
+class Translator:
+    def translate(self, text, src, dest):
+        return text.upper()
+
+
+class FlakyBuild:
+    """Fails the first build, then succeeds."""
+
+    def __init__(self):
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if self.calls == 1:
+            raise ConnectionError("offline")
+        return Translator()
+
+
+def test_backend_is_built_on_first_use_only():
+    builds = []
+
+    def build():
+        builds.append(1)
+        return Translator()
+
+    lazy = LazyBackend("test-first-use", build, modules=("json",))
+    assert not lazy.ready
+    assert startup_report()["test-first-use"]["state"] == "idle"
+
+    assert lazy.translate("hola", "es", "en") == "HOLA"
+    assert lazy.translate("adios", "es", "en") == "ADIOS"
+
+    assert lazy.ready and builds == [1]
+    assert isinstance(unwrap(lazy), Translator)
+    plain = Translator()
+    assert unwrap(plain) is plain
+    entry = startup_report()["test-first-use"]
+    assert entry["state"] == "ready" and entry["error"] is None
+    assert entry["import_s"] >= 0 and entry["init_s"] >= 0
+
+
+def test_private_attributes_are_not_forwarded():
+    lazy = LazyBackend("test-private", Translator)
+
+    with pytest.raises(AttributeError):
+        lazy._secret
+    assert not lazy.ready
+
+
+def test_failed_builds_are_recorded_and_retried():
+    build = FlakyBuild()
+    lazy = LazyBackend("test-flaky", build)
+
+    with pytest.raises(ConnectionError):
+        lazy.get()
+    assert startup_report()["test-flaky"] == {"import_s": None, "init_s": None, "state": "failed",
+                                              "error": "offline"}
+
+    assert lazy.translate("x", "en", "es") == "X"
+    assert build.calls == 2
+    assert startup_report()["test-flaky"]["state"] == "ready"
+    assert startup_report()["test-flaky"]["error"] is None
+
+
+def test_missing_module_fails_before_building():
+    lazy = LazyBackend("test-missing", pytest.fail, modules=("vocalite_no_such_module",))
+
+    with pytest.raises(ImportError):
+        lazy.get()
+    assert startup_report()["test-missing"]["state"] == "failed"
+
+
+def test_warm_up_builds_in_the_background_once():
+    release = threading.Event()
+    builds = []
+
+    def build():
+        builds.append(1)
+        release.wait(5)
+        return Translator()
+
+    lazy = LazyBackend("test-warm", build)
+    thread = lazy.warm_up()
+    while not builds:
+        thread.join(0.01)
+
+    assert startup_report()["test-warm"]["state"] == "loading"
+    # Already building: no second thread
+    assert lazy.warm_up() is None
+    release.set()
+    thread.join(5)
+
+    assert lazy.ready and builds == [1]
+    assert lazy.warm_up() is None
+
+
+def test_warm_up_failures_are_swallowed_and_retried_on_use():
+    build = FlakyBuild()
+    lazy = LazyBackend("test-warm-flaky", build)
+
+    lazy.warm_up().join(5)
+
+    assert not lazy.ready
+    assert startup_report()["test-warm-flaky"]["error"] == "offline"
+    assert lazy.translate("y", "en", "es") == "Y"
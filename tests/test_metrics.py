@@ -0,0 +1,124 @@
+"""Metrics export formats: Prometheus text, stage summaries and the JSON lines exporter."""
+import json
+import re
+
+import pytest
+
+from vocalite.metrics import LATENCY_BUCKETS, JsonLinesExporter, Metrics, cache_collector
+
+
+class StubCache:
+    def stats(self):
+        return {"hits": 3, "hit_rate": 0.75, "enabled": True, "path": "/tmp/x"}
+
+
+def test_prometheus_text_format():
+    metrics = Metrics()
+    metrics.inc("cache_hits", cache="translation", pair="en->es")
+    metrics.inc("cache_hits", amount=2, cache="translation", pair="en->es")
+    metrics.inc("upstream_failures", upstream='say "hi"\\now')
+    metrics.observe("translate", 0.003, pair="en->es")
+    metrics.observe("translate", 0.2, error=True, pair="en->es")
+    metrics.add_collector(cache_collector("audio", StubCache()))
+
+    lines = metrics.to_prometheus().splitlines()
+
+    assert "# TYPE vocalite_cache_hits_total counter" in lines
+    assert 'vocalite_cache_hits_total{cache="translation",pair="en->es"} 3' in lines
+    # Quotes and backslashes in label values are escaped
+    assert 'vocalite_upstream_failures_total{upstream="say \\"hi\\"\\\\now"} 1' in lines
+    assert 'vocalite_stage_errors_total{pair="en->es",stage="translate"} 1' in lines
+
+    assert "# TYPE vocalite_stage_duration_seconds histogram" in lines
+    buckets = [line for line in lines if line.startswith("vocalite_stage_duration_seconds_bucket")]
+    assert len(buckets) == len(LATENCY_BUCKETS) + 1
+    assert buckets[0] == 'vocalite_stage_duration_seconds_bucket{stage="translate",pair="en->es",le="0.001"} 0'
+    assert 'le="0.005"} 1' in buckets[2]
+    assert buckets[-1].endswith('le="+Inf"} 2')
+    counts = [int(line.rsplit(" ", 1)[1]) for line in buckets]
+    assert counts == sorted(counts), "buckets are cumulative"
+    assert 'vocalite_stage_duration_seconds_count{stage="translate",pair="en->es"} 2' in lines
+    (total,) = [line for line in lines if line.startswith("vocalite_stage_duration_seconds_sum")]
+    assert float(total.rsplit(" ", 1)[1]) == pytest.approx(0.203)
+
+    # Collected gauges keep only numbers, and never booleans
+    assert "# TYPE vocalite_cache_hits gauge" in lines
+    assert 'vocalite_cache_hits{cache="audio"} 3' in lines
+    assert 'vocalite_cache_hit_rate{cache="audio"} 0.75' in lines
+    assert not any("cache_enabled" in line or "cache_path" in line for line in lines)
+
+    sample = re.compile(r'^[a-z_]+(\{([a-z_]+="([^"\\]|\\.)*",?)+\})? \S+$')
+    assert all(line.startswith("# TYPE ") or sample.match(line) for line in lines)
+
+
+def test_stage_summary_percentiles():
+    metrics = Metrics()
+    for _ in range(90):
+        metrics.observe("tts", 0.004, lang="es")
+    for _ in range(10):
+        metrics.observe("tts", 0.8, lang="es", error=True)
+
+    summary = metrics.stage_summary()["tts"]
+
+    assert (summary["calls"], summary["errors"]) == (100, 10)
+    assert summary["mean_s"] == pytest.approx((90 * 0.004 + 10 * 0.8) / 100)
+    # Estimated within the bucket that holds the quantile, so never outside its bounds
+    assert 0.0025 <= summary["p50_s"] <= 0.005
+    assert 0.5 <= summary["p95_s"] <= 1.0
+    assert 0.5 <= summary["p99_s"] <= 1.0
+
+
+def test_stage_summary_by_labels_and_merged():
+    metrics = Metrics()
+    metrics.observe("translate", 0.004, pair="en->es")
+    metrics.observe("translate", 0.3, pair="en->de")
+    with pytest.raises(RuntimeError):
+        with metrics.timed("ocr"):
+            raise RuntimeError("no tesseract")
+
+    merged = metrics.stage_summary()
+    by_labels = metrics.stage_summary(by_labels=True)
+
+    assert merged["translate"]["calls"] == 2
+    # Merged label sets report the slowest set's percentiles
+    assert merged["translate"]["p50_s"] == by_labels["translate {'pair': 'en->de'}"]["p50_s"]
+    assert by_labels["translate {'pair': 'en->es'}"]["calls"] == 1
+    assert by_labels["ocr"]["errors"] == 1
+    assert Metrics().stage_summary() == {}
+
+
+def test_json_lines_exporter_appends_snapshots(tmp_path):
+    metrics = Metrics()
+    metrics.inc("service_batches")
+    metrics.observe("translate", 0.01, pair="en->es")
+    metrics.add_collector(cache_collector("audio", StubCache()))
+    metrics.add_collector(lambda: 1 / 0)
+    path = tmp_path / "metrics.jsonl"
+    exporter = JsonLinesExporter(metrics, str(path), interval=60)
+
+    exporter.write_once()
+    metrics.inc("service_batches")
+    exporter.write_once()
+
+    snapshots = [json.loads(line) for line in path.read_text(encoding="utf-8").splitlines()]
+    assert len(snapshots) == 2
+    assert set(snapshots[0]) == {"time", "stages", "counters", "gauges"}
+    assert [snapshot["counters"] for snapshot in snapshots] == [
+        [{"name": "service_batches", "labels": {}, "value": 1}],
+        [{"name": "service_batches", "labels": {}, "value": 2}],
+    ]
+    assert snapshots[0]["stages"]["translate {'pair': 'en->es'}"]["calls"] == 1
+    # A failing collector is skipped instead of breaking the export
+    assert {"name": "cache_hits", "labels": {"cache": "audio"}, "value": 3} in snapshots[0]["gauges"]
+
+
+def test_json_lines_exporter_thread_writes_until_stopped(tmp_path):
+    path = tmp_path / "metrics.jsonl"
+    exporter = JsonLinesExporter(Metrics(), str(path), interval=0.01).start()
+
+    exporter._thread.join(0.1)
+    exporter.stop()
+    exporter._thread.join(1)
+
+    assert not exporter._thread.is_alive()
+    assert len(path.read_text(encoding="utf-8").splitlines()) >= 1
@@ -0,0 +1,125 @@
+"""OCR preprocessing stages and the OcrProcessor result cache, on generated page images."""
+import pytest
+from PIL import Image, ImageDraw
+
+from vocalite.ocr import OcrProcessor, adaptive_threshold, estimate_skew, normalize_resolution, preprocess
+
+
+def page(size=(800, 600), background=255, lines=6):
+    """A grayscale page with dark horizontal bars standing in for lines of text."""
+    image = Image.new("L", size, background)
+    draw = ImageDraw.Draw(image)
+    for i in range(lines):
+        top = 60 + i * 80
+        draw.rectangle((80, top, size[0] - 80, top + 20), fill=30)
+    return image
+
+
+class RecordingBackend:
+    def __init__(self):
+        self.calls = []
+
+    def image_to_string(self, image, config=""):
+        self.calls.append((image.size, config))
+        return f"text {len(self.calls)}"
+
+
+@pytest.mark.parametrize("size, dpi, expected", [
+    ((1000, 500), (150, 150), (2000, 1000)),
+    ((1000, 500), None, (2000, 1000)),
+    ((100, 50), (300, 300), (600, 300)),
+    ((4000, 3000), (150, 150), (2400, 1800)),
+])
+def test_normalize_resolution_targets_dpi_within_bounds(size, dpi, expected):
+    image = Image.new("L", size, 255)
+    if dpi:
+        image.info["dpi"] = dpi
+
+    assert normalize_resolution(image).size == expected
+
+
+def test_normalize_resolution_leaves_near_target_images_alone():
+    image = Image.new("L", (1000, 500), 255)
+    image.info["dpi"] = (290, 290)
+
+    assert normalize_resolution(image) is image
+
+
+def test_adaptive_threshold_copes_with_uneven_lighting():
+    # Background brightens left to right; the ink is darker than its surroundings everywhere
+    image = Image.linear_gradient("L").rotate(90).resize((400, 200))
+    image = image.point(lambda v: 100 + v // 2)
+    draw = ImageDraw.Draw(image)
+    draw.rectangle((20, 90, 380, 100), fill=60)
+
+    binary = adaptive_threshold(image)
+
+    assert set(binary.getdata()) == {0, 255}
+    assert binary.getpixel((30, 95)) == binary.getpixel((370, 95)) == 0
+    assert binary.getpixel((30, 20)) == binary.getpixel((370, 20)) == 255
+
+
+def test_estimate_skew_recovers_the_page_angle():
+    skewed = page().rotate(3, resample=Image.BICUBIC, expand=True, fillcolor=255)
+
+    angle = estimate_skew(adaptive_threshold(skewed))
+
+    assert angle == pytest.approx(-3, abs=0.5)
+    assert estimate_skew(adaptive_threshold(page())) == 0
+
+
+def test_preprocess_records_each_stage_and_binarizes():
+    image = page().convert("RGB")
+    image.info["dpi"] = (150, 150)
+    timings = {}
+
+    prepared = preprocess(image, deskew=True, timings=timings)
+
+    assert set(timings) == {"grayscale", "resize", "threshold", "deskew"}
+    assert prepared.mode == "L"
+    assert prepared.size == (1600, 1200)
+    assert set(prepared.getdata()) <= {0, 255}
+
+
+def test_preprocess_can_skip_thresholding():
+    timings = {}
+
+    prepared = preprocess(page(), threshold=False, grayscale=False, timings=timings)
+
+    assert set(timings) == {"resize"}
+    assert len(set(prepared.getdata())) > 2
+
+
+def test_processor_caches_text_by_preprocessed_pixels():
+    backend = RecordingBackend()
+    processor = OcrProcessor(backend, config="--psm 6", deskew=False)
+
+    first, timings = processor.extract(page())
+    # A different image object with the same pixels is a hit and skips the OCR stage
+    second, hit_timings = processor.extract(page().convert("RGB"))
+
+    assert first == second == "text 1"
+    assert "ocr" in timings and "ocr" not in hit_timings
+    assert {"hash", "total"} <= set(hit_timings)
+    assert backend.calls == [((1600, 1200), "--psm 6")]
+    assert processor.stats() == {"hits": 1, "misses": 1, "entries": 1}
+
+    assert processor.image_to_string(page(lines=2)) == "text 2"
+
+
+def test_processor_cache_key_includes_settings_and_is_bounded():
+    backend = RecordingBackend()
+    images = [page(lines=n) for n in range(1, 4)]
+
+    plain = OcrProcessor(backend, cache_size=2)
+    for image in images + images[-1:]:
+        plain.image_to_string(image)
+    assert plain.stats() == {"hits": 1, "misses": 3, "entries": 2}
+    # The oldest page was evicted
+    plain.image_to_string(images[0])
+    assert plain.stats()["misses"] == 4
+
+    prepared = preprocess(images[0])
+    keys = {processor._cache_key(prepared) for processor in
+            [plain, OcrProcessor(backend, config="--psm 7"), OcrProcessor(backend, threshold=False)]}
+    assert len(keys) == 3
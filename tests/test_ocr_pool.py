@@ -0,0 +1,159 @@
+"""TesseractEnginePool config parsing, pickling and the pytesseract fallback, with fake engines."""
+import pickle
+import sys
+import threading
+
+import pytest
+from PIL import Image
+
+from vocalite.backends import TesserocrOCR
+from vocalite.ocr_pool import EngineUnavailable, TesseractEnginePool, parse_tesseract_config
+
+
+class FakeEngine:
+    """A PyTessBaseAPI stand-in that reports the settings it was built with and the image it was given."""
+
+    def __init__(self, lang, oem, psm, variables):
+        self.settings = (lang, oem, psm, variables)
+        self.image = None
+        self.ended = False
+
+    def SetImageBytes(self, data, width, height, bytes_per_pixel, bytes_per_line):
+        assert len(data) == bytes_per_line * height
+        self.image = (width, height, bytes_per_pixel)
+
+    def SetSourceResolution(self, dpi):
+        self.dpi = dpi
+
+    def GetUTF8Text(self):
+        width, height, bands = self.image
+        return f"{self.settings[0]} {width}x{height}x{bands} @{self.dpi}"
+
+    def Clear(self):
+        self.image = None
+
+    def End(self):
+        self.ended = True
+
+
+def fake_factory(lang, oem=None, psm=None, variables=None):
+    return FakeEngine(lang, oem, psm, variables)
+
+
+class RecordingFallback:
+    def __init__(self):
+        self.calls = []
+
+    def image_to_string(self, image, config=""):
+        self.calls.append(config)
+        return "from pytesseract"
+
+
+@pytest.mark.parametrize("config, expected", [
+    ("", (None, None, {})),
+    ("--oem 1 --psm 6", (1, 6, {})),
+    ("--psm=7", (None, 7, {})),
+    ("-c tessedit_char_whitelist=0123456789 -c preserve_interword_spaces=1",
+     (None, None, {"tessedit_char_whitelist": "0123456789", "preserve_interword_spaces": "1"})),
+    ("--psm 6 -c 'tessedit_char_blacklist=| '", (None, 6, {"tessedit_char_blacklist": "| "})),
+])
+def test_parse_tesseract_config(config, expected):
+    assert parse_tesseract_config(config) == expected
+
+
+@pytest.mark.parametrize("config", ["--dpi 300", "--psm six", "--tessdata-dir /tmp", "--psm"])
+def test_config_without_an_engine_equivalent_is_unavailable(config):
+    with pytest.raises(EngineUnavailable):
+        parse_tesseract_config(config)
+
+
+def test_engines_are_reused_per_language_and_config():
+    pool = TesseractEnginePool(size=2, factory=fake_factory)
+    image = Image.new("RGB", (40, 10), "white")
+
+    assert pool.image_to_string(image, "eng", "--psm 6") == "eng 40x10x3 @300"
+    assert pool.image_to_string(image.convert("P"), "eng", "--psm 6") == "eng 40x10x3 @300"
+    assert pool.image_to_string(image.convert("1"), "deu") == "deu 40x10x1 @300"
+
+    stats = pool.stats()
+    assert (stats["calls"], stats["starts"], stats["engines"]) == (3, 2, 2)
+
+
+def test_concurrent_calls_share_at_most_size_engines():
+    created = []
+    lock = threading.Lock()
+
+    def factory(lang, oem=None, psm=None, variables=None):
+        engine = fake_factory(lang, oem, psm, variables)
+        with lock:
+            created.append(engine)
+        return engine
+
+    pool = TesseractEnginePool(size=2, factory=factory)
+    image = Image.new("L", (8, 8), 255)
+    barrier = threading.Barrier(8)
+
+    def work():
+        barrier.wait()
+        for _ in range(5):
+            pool.image_to_string(image)
+
+    threads = [threading.Thread(target=work) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+
+    assert len(created) <= 2
+    assert pool.stats()["calls"] == 40
+
+
+def test_pickle_keeps_only_the_settings():
+    pool = TesseractEnginePool(size=3, checkout_timeout=5, factory=fake_factory)
+    pool.warm_up("eng", count=2, background=False)
+    assert pool.stats()["engines"] == 2
+
+    copy = pickle.loads(pickle.dumps(pool))
+
+    assert (copy.size, copy.checkout_timeout, copy.factory) == (3, 5, fake_factory)
+    stats = copy.stats()
+    assert (stats["engines"], stats["starts"], stats["calls"]) == (0, 0, 0)
+    assert copy.image_to_string(Image.new("L", (4, 4))) == "eng 4x4x1 @300"
+
+
+def test_falls_back_to_pytesseract_when_tesserocr_is_missing(monkeypatch):
+    # A None entry makes "import tesserocr" raise ImportError even where it is installed
+    monkeypatch.setitem(sys.modules, "tesserocr", None)
+    fallback = RecordingFallback()
+    ocr = TesserocrOCR("eng", pool=TesseractEnginePool(size=2), fallback=fallback)
+    image = Image.new("L", (4, 4))
+
+    assert ocr.image_to_string(image, config="--psm 6") == "from pytesseract"
+    assert ocr.image_to_string(image) == "from pytesseract"
+
+    assert fallback.calls == ["--psm 6", ""]
+    stats = ocr.stats()
+    assert stats["fallbacks"] == 2
+    assert stats["available"] is False
+    # Once the import has failed the pool stops trying to start engines
+    assert stats["start_errors"] == 1
+
+
+def test_falls_back_for_options_the_engine_api_lacks():
+    fallback = RecordingFallback()
+    ocr = TesserocrOCR("eng", pool=TesseractEnginePool(size=1, factory=fake_factory), fallback=fallback)
+
+    assert ocr.image_to_string(Image.new("L", (4, 4)), config="--dpi 70") == "from pytesseract"
+    assert ocr.image_to_string(Image.new("L", (4, 4))) == "eng 4x4x1 @300"
+    assert ocr.stats()["fallbacks"] == 1
+
+
+def test_close_ends_idle_engines():
+    pool = TesseractEnginePool(size=2, factory=fake_factory)
+    with pool.checkout("eng") as engine:
+        pass
+
+    pool.close()
+
+    assert engine.ended
+    assert pool.stats()["engines"] == 0
@@ -0,0 +1,33 @@
+"""VocalitePipeline stages against stub backends."""
+from vocalite.pipeline import VocalitePipeline
+
+
+class EchoTranslator:
+    def translate(self, text, src, dest):
+        return f"[{dest}] {text}"
+
+
+class FailingSynthesizer:
+    """Synthesizes every language except those in fail."""
+
+    def __init__(self, fail=()):
+        self.fail = set(fail)
+
+    def synthesize(self, text, lang):
+        if lang in self.fail:
+            raise RuntimeError(f"no voice for {lang}")
+        return text.encode("utf-8")
+
+
+def test_fan_out_keeps_translation_when_tts_fails():
+    pipeline = VocalitePipeline(EchoTranslator(), tts=FailingSynthesizer(fail={"de"}))
+
+    results = {result["dest"]: result for result in pipeline.fan_out("hello", "en", ["es", "de"])}
+
+    assert results["es"]["translated"] == "[es] hello"
+    assert results["es"]["audio"] == b"[es] hello"
+    assert results["es"]["error"] is None and results["es"]["audio_error"] is None
+    assert results["de"]["translated"] == "[de] hello"
+    assert results["de"]["audio"] is None
+    assert results["de"]["error"] is None
+    assert "no voice for de" in str(results["de"]["audio_error"])
@@ -0,0 +1,313 @@
+"""Retries, backoff and circuit breaking against a local HTTP stand-in for the upstreams."""
+import threading
+import time
+import urllib.error
+import urllib.request
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from types import SimpleNamespace
+
+import pytest
+
+from vocalite import resilience
+from vocalite.metrics import Metrics
+from vocalite.resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    ResilientBackend,
+    UpstreamError,
+    raise_for_status,
+)
+
+
+class _Server(ThreadingHTTPServer):
+    daemon_threads = True
+    # Room for every test thread to connect at once
+    request_queue_size = 64
+
+
+class StandIn:
+    """A local upstream answering each request with the next scripted (status, headers, delay) reply."""
+
+    def __init__(self, replies=(), default=(200, {}, 0.0)):
+        self.replies = list(replies)
+        self.default = default
+        self.requests = 0
+        self._lock = threading.Lock()
+        stand_in = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def do_POST(self):
+                self.rfile.read(int(self.headers.get("Content-Length", 0)))
+                with stand_in._lock:
+                    stand_in.requests += 1
+                    status, headers, delay = stand_in.replies.pop(0) if stand_in.replies else stand_in.default
+                time.sleep(delay)
+                body = b'[[["hola",null]]]'
+                try:
+                    self.send_response(status)
+                    for name, value in headers.items():
+                        self.send_header(name, value)
+                    self.send_header("Content-Length", str(len(body)))
+                    self.end_headers()
+                    self.wfile.write(body)
+                except OSError:
+                    pass
+
+            def log_message(self, *args):
+                pass
+
+        self.server = _Server(("127.0.0.1", 0), Handler)
+        self.url = f"http://127.0.0.1:{self.server.server_address[1]}"
+        threading.Thread(target=self.server.serve_forever, daemon=True).start()
+
+    def close(self):
+        self.server.shutdown()
+        self.server.server_close()
+
+
+class UrllibTranslator:
+    """A stand-in client posting to the stand-in with a per-call timeout, raising as the real clients do."""
+
+    def __init__(self, url, timeout=2.0):
+        self.url = url
+        self.timeout = timeout
+
+    def translate(self, text, src, dest):
+        request = urllib.request.Request(self.url, data=text.encode("utf-8"), method="POST")
+        try:
+            with urllib.request.urlopen(request, timeout=self.timeout) as response:
+                return response.read().decode("utf-8")
+        except urllib.error.HTTPError as e:
+            raise_for_status(SimpleNamespace(status_code=e.code, headers=e.headers), "translate")
+
+
+@pytest.fixture
+def stand_in():
+    servers = []
+
+    def start(*replies, default=(200, {}, 0.0)):
+        server = StandIn(replies, default)
+        servers.append(server)
+        return server
+
+    yield start
+    for server in servers:
+        server.close()
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Records ResilientBackend's backoff sleeps instead of sleeping; jitter is pinned to zero."""
+    recorded = []
+    monkeypatch.setattr(resilience, "time", SimpleNamespace(sleep=recorded.append, monotonic=time.monotonic))
+    monkeypatch.setattr(resilience.random, "random", lambda: 0.0)
+    return recorded
+
+
+def counters(metrics):
+    totals = {}
+    for counter in metrics.snapshot()["counters"]:
+        totals[counter["name"]] = totals.get(counter["name"], 0) + counter["value"]
+    return totals
+
+
+def test_transient_errors_are_retried_with_exponential_backoff(stand_in, sleeps):
+    upstream = stand_in((503, {}, 0.0), (502, {}, 0.0))
+    metrics = Metrics()
+    backend = ResilientBackend(UrllibTranslator(upstream.url), "translate", max_retries=2, backoff_s=0.25,
+                               metrics=metrics, name="stand_in")
+
+    assert "hola" in backend.translate("hello", "en", "es")
+    assert upstream.requests == 3
+    assert sleeps == [0.25, 0.5]
+    assert counters(metrics) == {"upstream_failures": 2, "upstream_retries": 2}
+    assert backend.breaker.state == "closed"
+
+
+def test_retries_stop_after_max_retries(stand_in, sleeps):
+    upstream = stand_in(default=(500, {}, 0.0))
+    backend = ResilientBackend(UrllibTranslator(upstream.url), "translate", max_retries=2)
+
+    with pytest.raises(UpstreamError) as raised:
+        backend.translate("hello", "en", "es")
+
+    assert raised.value.status == 500
+    assert upstream.requests == 3
+    assert len(sleeps) == 2
+
+
+@pytest.mark.parametrize("retry_after, expected", [("1.5", 1.5), ("120", 4.0), ("soon", 0.25)])
+def test_retry_after_is_honoured_up_to_max_backoff(stand_in, sleeps, retry_after, expected):
+    upstream = stand_in((429, {"Retry-After": retry_after}, 0.0))
+    backend = ResilientBackend(UrllibTranslator(upstream.url), "translate", backoff_s=0.25, max_backoff_s=4.0)
+
+    backend.translate("hello", "en", "es")
+
+    assert sleeps == [expected]
+    assert upstream.requests == 2
+
+
+def test_client_errors_are_not_retried_and_do_not_count_against_the_breaker(stand_in, sleeps):
+    upstream = stand_in(default=(400, {}, 0.0))
+    breaker = CircuitBreaker(failure_threshold=1)
+    backend = ResilientBackend(UrllibTranslator(upstream.url), "translate", breaker=breaker)
+
+    for _ in range(3):
+        with pytest.raises(UpstreamError):
+            backend.translate("hello", "en", "es")
+
+    assert upstream.requests == 3
+    assert sleeps == []
+    assert breaker.state == "closed"
+    assert breaker.trips == 0
+
+
+def test_per_call_timeout_is_a_transient_failure(stand_in, sleeps):
+    upstream = stand_in((200, {}, 1.0))
+    metrics = Metrics()
+    backend = ResilientBackend(UrllibTranslator(upstream.url, timeout=0.2), "translate", max_retries=1,
+                               metrics=metrics)
+
+    start = time.perf_counter()
+    assert "hola" in backend.translate("hello", "en", "es")
+
+    assert time.perf_counter() - start < 0.9
+    assert upstream.requests == 2
+    assert counters(metrics)["upstream_failures"] == 1
+
+
+def test_breaker_opens_probes_half_open_and_closes(stand_in, sleeps):
+    upstream = stand_in((503, {}, 0.0), (503, {}, 0.0), (503, {}, 0.0))
+    breaker = CircuitBreaker(failure_threshold=2, reset_timeout=0.05)
+    metrics = Metrics()
+    backend = ResilientBackend(UrllibTranslator(upstream.url), "translate", max_retries=0, breaker=breaker,
+                               metrics=metrics)
+
+    for _ in range(2):
+        with pytest.raises(UpstreamError):
+            backend.translate("hello", "en", "es")
+    assert breaker.state == "open"
+    with pytest.raises(CircuitOpenError):
+        backend.translate("hello", "en", "es")
+    assert upstream.requests == 2
+
+    # A failed probe re-opens the circuit straight away
+    time.sleep(0.06)
+    assert breaker.state == "half_open"
+    with pytest.raises(UpstreamError):
+        backend.translate("hello", "en", "es")
+    assert breaker.state == "open"
+    assert breaker.trips == 2
+
+    # A successful probe closes it
+    time.sleep(0.06)
+    assert "hola" in backend.translate("hello", "en", "es")
+    assert breaker.state == "closed"
+    assert upstream.requests == 4
+    assert counters(metrics) == {"upstream_failures": 3, "upstream_rejected": 1}
+
+
+def test_non_transient_probe_releases_the_breaker(stand_in, sleeps):
+    upstream = stand_in((503, {}, 0.0), (404, {}, 0.0))
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    backend = ResilientBackend(UrllibTranslator(upstream.url), "translate", max_retries=0, breaker=breaker)
+
+    with pytest.raises(UpstreamError):
+        backend.translate("hello", "en", "es")
+    assert breaker.state == "open"
+
+    time.sleep(0.06)
+    with pytest.raises(UpstreamError) as raised:
+        backend.translate("hello", "en", "es")
+    assert raised.value.status == 404
+    # The upstream answered, so the circuit closes instead of staying half-open with no probe
+    assert breaker.state == "closed"
+    assert breaker.allow()
+
+
+def test_half_open_lets_exactly_one_concurrent_probe_through(stand_in):
+    upstream = stand_in((503, {}, 0.0), default=(200, {}, 0.1))
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=0.05)
+    backend = ResilientBackend(UrllibTranslator(upstream.url), "translate", max_retries=0, breaker=breaker)
+    with pytest.raises(UpstreamError):
+        backend.translate("hello", "en", "es")
+    time.sleep(0.06)
+
+    threads = 16
+    barrier = threading.Barrier(threads)
+    outcomes = []
+    lock = threading.Lock()
+
+    def call():
+        barrier.wait()
+        try:
+            backend.translate("hello", "en", "es")
+            outcome = "ok"
+        except CircuitOpenError:
+            outcome = "rejected"
+        with lock:
+            outcomes.append(outcome)
+
+    workers = [threading.Thread(target=call) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    assert outcomes.count("ok") == 1
+    assert outcomes.count("rejected") == threads - 1
+    assert upstream.requests == 2
+    assert breaker.state == "closed"
+
+
+def test_concurrent_callers_keep_counters_and_state_consistent(stand_in, sleeps):
+    upstream = stand_in(default=(503, {}, 0.0))
+    breaker = CircuitBreaker(failure_threshold=5, reset_timeout=60)
+    metrics = Metrics()
+    backend = ResilientBackend(UrllibTranslator(upstream.url), "translate", max_retries=0, breaker=breaker,
+                               metrics=metrics)
+    threads, calls = 16, 10
+    barrier = threading.Barrier(threads)
+    outcomes = {"failed": 0, "rejected": 0}
+    lock = threading.Lock()
+
+    def call():
+        barrier.wait()
+        for _ in range(calls):
+            try:
+                backend.translate("hello", "en", "es")
+            except CircuitOpenError:
+                outcome = "rejected"
+            except UpstreamError:
+                outcome = "failed"
+            with lock:
+                outcomes[outcome] += 1
+
+    workers = [threading.Thread(target=call) for _ in range(threads)]
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+
+    totals = counters(metrics)
+    assert outcomes["failed"] + outcomes["rejected"] == threads * calls
+    assert totals["upstream_failures"] == outcomes["failed"] == upstream.requests
+    assert totals["upstream_rejected"] == outcomes["rejected"]
+    # Callers already past allow() when it tripped may still fail, but it trips only once
+    assert outcomes["failed"] >= 5
+    assert breaker.trips == 1
+    assert breaker.state == "open"
+
+
+def test_http_translator_over_a_pooled_session(stand_in, sleeps):
+    pytest.importorskip("requests")
+    from vocalite.backends import GoogleHttpTranslator
+
+    upstream = stand_in((503, {"Retry-After": "1"}, 0.0))
+    translator = GoogleHttpTranslator(upstream.url, session=resilience.pooled_session(pool_size=4),
+                                      timeout=(1, 2))
+    backend = ResilientBackend(translator, "translate", backoff_s=0.25)
+
+    assert backend.translate("hello", "en", "es") == "hola"
+    assert upstream.requests == 2
+    assert sleeps == [1.0]
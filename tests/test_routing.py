@@ -0,0 +1,80 @@
+"""BackendRegistry route matching and LatencyRouter candidate selection."""
+import pytest
+
+from vocalite.backends import DictionaryTranslator
+from vocalite.lazy import LazyBackend
+from vocalite.resilience import ResilientBackend
+from vocalite.routing import BackendRegistry, LatencyRouter
+
+
+class NamedTranslator:
+    def __init__(self, name):
+        self.name = name
+
+    def translate(self, text, src, dest):
+        return f"{self.name}:{text}"
+
+
+def make_registry(routes):
+    registry = BackendRegistry()
+    registry.register("http", NamedTranslator("http"))
+    registry.register("googletrans", NamedTranslator("googletrans"))
+    registry.register("local", DictionaryTranslator(), routed_only=True)
+    registry.set_routes(routes)
+    return registry
+
+
+def test_most_specific_route_wins():
+    registry = make_registry({"en-es": ["googletrans"], "en-*": ["http", "googletrans"], "*": ["http"]})
+
+    assert registry.candidates("en", "es") == ["googletrans"]
+    assert registry.candidates("EN", "fr") == ["http", "googletrans"]
+    assert registry.candidates("de", "fr") == ["http"]
+
+
+def test_unmatched_pair_has_no_candidates_and_a_clear_error():
+    registry = make_registry({"en-es": ["http"]})
+    router = LatencyRouter(registry, hedge=False)
+
+    assert registry.candidates("en", "fr") == []
+    with pytest.raises(LookupError, match="no translation backend is configured for en->fr"):
+        router.translate("hello", "en", "fr")
+    assert router.translate("hello", "en", "es") == "http:hello"
+    router.close()
+
+
+def test_routed_only_backend_serves_only_pairs_that_name_it():
+    assert make_registry({}).candidates("en", "fr") == ["http", "googletrans"]
+    assert make_registry({"en-fr": ["local"], "*": ["http"]}).candidates("en", "fr") == ["local"]
+
+
+def test_strict_backend_declines_pairs_it_has_no_entries_for():
+    registry = BackendRegistry()
+    registry.register("local", DictionaryTranslator({"en-es": {"hello": "hola"}}, strict=True))
+    registry.register("http", NamedTranslator("http"))
+    registry.set_routes({"*": ["local", "http"]})
+
+    assert registry.candidates("en", "es") == ["local", "http"]
+    assert registry.candidates("en", "fr") == ["http"]
+
+
+def test_choosing_candidates_never_builds_lazy_backends():
+    builds = []
+
+    def build():
+        builds.append(1)
+        return DictionaryTranslator({"en-es": {"hello": "hola"}}, strict=True)
+
+    registry = BackendRegistry()
+    registry.register("lazy", LazyBackend("test-routing-lazy", build))
+    registry.register("wrapped", ResilientBackend(LazyBackend("test-routing-wrapped", build), "translate"),
+                      supports=lambda src, dest: dest == "es")
+    router = LatencyRouter(registry, hedge=False)
+
+    assert registry.candidates("en", "es") == ["lazy", "wrapped"]
+    assert router.rank("en", "fr") == ["lazy"]
+    assert builds == []
+
+    assert router.translate("hello", "en", "es") == "hola"
+    assert builds == [1]
+    router.close()
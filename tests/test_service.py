@@ -0,0 +1,110 @@
+"""Service request validation and the JSON lines runner."""
+import asyncio
+import io
+import json
+
+import pytest
+
+from vocalite.backends import DictionaryTranslator
+from vocalite.pipeline import VocalitePipeline
+from vocalite.service import HttpApi, TranslationService, parse_request, run_jsonl
+
+LANGUAGES = {"en": "english", "es": "spanish", "de": "german"}
+
+
+def test_languages_are_accepted_by_name_or_code():
+    request = parse_request({"text": "hi", "input_lang": " English ", "output_lang": "es"}, languages=LANGUAGES)
+
+    assert request["input_lang"] == "english"
+    assert request["output_lang"] == "spanish"
+
+
+@pytest.mark.parametrize("output_lang", ["klingon", "xx", ""])
+def test_unknown_language_is_rejected(output_lang):
+    with pytest.raises(ValueError, match="output_lang"):
+        parse_request({"text": "hi", "input_lang": "english", "output_lang": output_lang}, languages=LANGUAGES)
+
+
+@pytest.mark.parametrize("field", ["grammar_check", "audio"])
+@pytest.mark.parametrize("value", ["false", 0, 1, None, []])
+def test_flags_must_be_json_booleans(field, value):
+    with pytest.raises(ValueError, match=field):
+        parse_request({"text": "hi", "input_lang": "en", "output_lang": "es", field: value}, languages=LANGUAGES)
+
+
+def test_flags_default_when_missing():
+    request = parse_request({"text": "hi", "input_lang": "en", "output_lang": "es", "audio": True},
+                            languages=LANGUAGES)
+
+    assert request["grammar_check"] is True
+    assert request["audio"] is True
+
+
+def test_jsonl_writes_an_error_line_for_an_unknown_language():
+    pipeline = VocalitePipeline(DictionaryTranslator(prefix="[{dest}] "), languages=LANGUAGES)
+    lines = [
+        {"id": "a", "text": "hello", "input_lang": "english", "output_lang": "es", "grammar_check": False},
+        {"id": "b", "text": "hello", "input_lang": "english", "output_lang": "klingon"},
+    ]
+    infile = io.StringIO("".join(json.dumps(line) + "\n" for line in lines))
+    outfile = io.StringIO()
+
+    async def run():
+        async with TranslationService(pipeline, concurrency=2) as service:
+            return await run_jsonl(service, infile, outfile)
+
+    assert asyncio.run(run()) == (2, 1)
+    results = {result["id"]: result for result in map(json.loads, outfile.getvalue().splitlines())}
+    assert results["a"]["translated"] == "[es] hello"
+    assert "klingon" in results["b"]["error"]
+
+
+class FailingGrammar:
+    def correct(self, text, lang_name):
+        raise RuntimeError("LanguageTool is not reachable")
+
+
+def test_grammar_failure_translates_the_typed_text_and_reports_it():
+    pipeline = VocalitePipeline(DictionaryTranslator(prefix="[{dest}] "), grammar=FailingGrammar(),
+                                languages=LANGUAGES)
+    request = parse_request({"id": 7, "text": " hello ", "input_lang": "en", "output_lang": "es"},
+                            languages=LANGUAGES)
+
+    async def run():
+        async with TranslationService(pipeline, concurrency=1) as service:
+            return await service.submit(request)
+
+    result = pipeline.run("hello", "english", "spanish", with_audio=False)
+    assert result["final_input"] == "hello"
+    assert result["corrected"] is None
+    assert result["grammar_error"] == "LanguageTool is not reachable"
+
+    response = asyncio.run(run())
+    assert response["translated"] == "[es] hello"
+    assert response["grammar_error"] == "LanguageTool is not reachable"
+    assert "corrected" not in response
+
+
+@pytest.mark.parametrize("head, status", [
+    (b"GET /" + b"a" * 70_000 + b" HTTP/1.1\r\n\r\n", 400),
+    (b"GET /healthz HTTP/1.1\r\nX-Big: " + b"a" * 70_000 + b"\r\n\r\n", 431),
+])
+def test_over_long_lines_are_answered_before_closing(head, status):
+    pipeline = VocalitePipeline(DictionaryTranslator(), languages=LANGUAGES)
+
+    async def run():
+        async with TranslationService(pipeline) as service:
+            server = await HttpApi(service).serve(port=0)
+            port = server.sockets[0].getsockname()[1]
+            reader, writer = await asyncio.open_connection("127.0.0.1", port)
+            writer.write(head)
+            await writer.drain()
+            response = await reader.read()
+            writer.close()
+            server.close()
+            await server.wait_closed()
+            return response
+
+    response = asyncio.run(run())
+    assert response.startswith(f"HTTP/1.1 {status} ".encode())
+    assert b"Connection: close" in response
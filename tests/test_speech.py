@@ -0,0 +1,225 @@
+"""Voice-activity segmentation and incremental transcription on a generated WAV recording."""
+import io
+import math
+import struct
+import threading
+import time
+import wave
+
+import pytest
+
+from vocalite.speech import (
+    StreamingTranscriber,
+    VoiceActivitySegmenter,
+    pcm_chunks,
+    read_audio_file,
+    split_on_silence,
+    stitch_transcript,
+    timestamped_transcript,
+    transcribe_chunks,
+)
+
+RATE = 16000
+
+
+class UnknownValueError(Exception):
+    """Stands in for speech_recognition's "no words in this segment" error."""
+
+
+def tone(seconds, amplitude=8000, freq=440):
+    count = int(RATE * seconds)
+    return struct.pack(f"<{count}h", *(int(amplitude * math.sin(2 * math.pi * freq * i / RATE))
+                                       for i in range(count)))
+
+
+def silence(seconds):
+    return b"\x00\x00" * int(RATE * seconds)
+
+
+def wav_bytes(pcm):
+    buffer = io.BytesIO()
+    with wave.open(buffer, "wb") as wav:
+        wav.setnchannels(1)
+        wav.setsampwidth(2)
+        wav.setframerate(RATE)
+        wav.writeframes(pcm)
+    return buffer.getvalue()
+
+
+@pytest.fixture
+def recording():
+    """Two utterances (0.3-1.2 s and 2.1-2.7 s) separated by silence, as an uploaded WAV file.
+
+    Every boundary falls on a 30 ms frame edge, so segment times are exact.
+    """
+    pcm = silence(0.3) + tone(0.9) + silence(0.9) + tone(0.6) + silence(0.9)
+    return wav_bytes(pcm)
+
+
+def test_wav_upload_decodes_to_pcm(recording):
+    pcm, sample_rate, sample_width = read_audio_file(recording, "speech.wav")
+
+    assert (sample_rate, sample_width) == (RATE, 2)
+    assert len(pcm) == int(RATE * 3.6) * 2
+
+
+def test_segments_cover_each_utterance_with_padding(recording):
+    pcm, sample_rate, sample_width = read_audio_file(recording, "speech.wav")
+    segmenter = VoiceActivitySegmenter(sample_rate, sample_width, padding_ms=180, min_silence_ms=600)
+
+    segments = []
+    for chunk in pcm_chunks(pcm, sample_rate, sample_width):
+        segments.extend(segmenter.feed(chunk))
+    segments.extend(segmenter.flush())
+
+    # Each segment starts padding_ms before the tone and ends min_silence_ms after it
+    assert [(start, end) for start, end, _ in segments] == [
+        pytest.approx((0.12, 1.8)),
+        pytest.approx((1.92, 3.3)),
+    ]
+    for start, end, segment_pcm in segments:
+        assert len(segment_pcm) == round((end - start) * RATE) * sample_width
+
+
+def test_short_noise_bursts_are_not_segments():
+    pcm = silence(0.3) + tone(0.06) + silence(1.0)
+    segmenter = VoiceActivitySegmenter(RATE, 2, min_speech_ms=250)
+
+    assert segmenter.feed(pcm) + segmenter.flush() == []
+
+
+def test_long_speech_is_cut_at_max_segment():
+    segmenter = VoiceActivitySegmenter(RATE, 2, max_segment_s=0.9, padding_ms=0)
+
+    segments = segmenter.feed(tone(2.1)) + segmenter.flush()
+
+    assert [(start, end) for start, end, _ in segments] == [
+        pytest.approx((0.0, 0.9)), pytest.approx((0.9, 1.8)), pytest.approx((1.8, 2.1)),
+    ]
+
+
+def test_transcripts_arrive_incrementally_in_segment_order(recording):
+    pcm, sample_rate, sample_width = read_audio_file(recording, "speech.wav")
+    first_half, second_half = pcm[: int(RATE * 1.9) * 2], pcm[int(RATE * 1.9) * 2:]
+    more_audio = threading.Event()
+
+    def chunks():
+        yield from pcm_chunks(first_half, sample_rate, sample_width)
+        more_audio.wait(5)
+        yield from pcm_chunks(second_half, sample_rate, sample_width)
+
+    heard = []
+
+    def recognize(audio):
+        heard.append(audio)
+        return f"utterance {len(heard)}"
+
+    transcriber = StreamingTranscriber(recognize, make_audio=lambda pcm, rate, width: len(pcm))
+    transcriber.start(chunks(), sample_rate, sample_width)
+
+    # The first utterance is transcribed while the speaker is still talking
+    deadline = time.monotonic() + 5
+    first = []
+    while not first and time.monotonic() < deadline:
+        first = transcriber.new_transcripts()
+        time.sleep(0.01)
+    assert first == ["utterance 1"]
+    assert transcriber.running
+
+    more_audio.set()
+    transcriber.join(timeout=5)
+
+    assert not transcriber.running
+    assert transcriber.new_transcripts() == ["utterance 2"]
+    assert transcriber.new_transcripts() == []
+    assert transcriber.transcript() == "utterance 1 utterance 2"
+    assert transcriber.errors == []
+
+
+def test_failed_segments_are_reported_and_later_ones_still_transcribed():
+    pcm = tone(0.6) + silence(0.9) + tone(0.6) + silence(0.9) + tone(0.6) + silence(0.9)
+    outcomes = iter([UnknownValueError(), RuntimeError("recognizer quota exceeded"), "third"])
+
+    def recognize(audio):
+        outcome = next(outcomes)
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    transcriber = StreamingTranscriber(recognize, make_audio=lambda pcm, rate, width: pcm)
+    transcriber.start(pcm_chunks(pcm, RATE, 2), RATE, 2).join(timeout=5)
+
+    assert transcriber.transcript() == "third"
+    # A segment with no words is not an error
+    assert [str(error) for error in transcriber.errors] == ["recognizer quota exceeded"]
+
+
+def test_stop_ends_capture_early():
+    def endless():
+        while True:
+            yield silence(0.1)
+
+    transcriber = StreamingTranscriber(lambda audio: "never", make_audio=lambda pcm, rate, width: pcm)
+    transcriber.start(endless(), RATE, 2)
+    transcriber.stop()
+    transcriber.join(timeout=5)
+
+    assert not transcriber.running
+    assert transcriber.transcript() == ""
+
+
+# ---- Long recordings ----
+def test_long_recording_is_split_on_silence_and_capped_at_max_chunk():
+    pcm = silence(0.3) + tone(2.1) + silence(61.5) + tone(0.6) + silence(0.9)
+
+    chunks = split_on_silence(pcm, RATE, 2, max_chunk_s=1.5)
+
+    # The long utterance is cut at max_chunk_s; the minute of silence is dropped
+    assert [(start, end) for start, end, _ in chunks] == [
+        pytest.approx((0.12, 1.62)), pytest.approx((1.62, 3.0)), pytest.approx((63.72, 65.1)),
+    ]
+    assert sum(len(pcm) for _, _, pcm in chunks) == round((1.5 + 1.38 + 1.38) * RATE) * 2
+
+
+def test_chunks_are_retried_on_their_own_and_returned_in_time_order():
+    chunks = [(start, start + 1.0, f"chunk-{start}".encode()) for start in (0.0, 1.0, 2.0, 3.0)]
+    attempts = {}
+    lock = threading.Lock()
+
+    def recognize(pcm):
+        name = pcm.decode()
+        with lock:
+            attempts[name] = attempts.get(name, 0) + 1
+            attempt = attempts[name]
+        if name == "chunk-1.0" and attempt < 3:
+            raise ConnectionError("recognizer unreachable")
+        if name == "chunk-2.0":
+            raise RuntimeError("recognizer quota exceeded")
+        if name == "chunk-3.0":
+            raise UnknownValueError()
+        # The earliest chunk finishes last
+        time.sleep(0.05 if name == "chunk-0.0" else 0)
+        return f"text {name}"
+
+    progress = []
+    results = transcribe_chunks(chunks, RATE, 2, recognize, make_audio=lambda pcm, rate, width: pcm, workers=4,
+                                max_retries=2, backoff_s=0, on_result=lambda result, done, total:
+                                progress.append((done, total)))
+
+    assert [result["start"] for result in results] == [0.0, 1.0, 2.0, 3.0]
+    assert [result["attempts"] for result in results] == [1, 3, 3, 1]
+    assert [result["text"] for result in results] == ["text chunk-0.0", "text chunk-1.0", "", ""]
+    assert str(results[2]["error"]) == "recognizer quota exceeded"
+    assert results[3]["error"] is None
+    assert progress == [(1, 4), (2, 4), (3, 4), (4, 4)]
+
+
+def test_stitched_transcript_keeps_chunk_timestamps():
+    results = [
+        {"start": 0.12, "end": 4.0, "text": "Good morning everyone.", "error": None},
+        {"start": 65.4, "end": 70.0, "text": "", "error": None},
+        {"start": 3725.9, "end": 3730.0, "text": " Let's wrap up. ", "error": None},
+    ]
+
+    assert timestamped_transcript(results) == "[00:00:00] Good morning everyone.\n[01:02:05]  Let's wrap up. "
+    assert stitch_transcript(results) == "Good morning everyone. Let's wrap up."
@@ -0,0 +1,172 @@
+"""TranslationCache single-flight, expiry in both tiers and counters."""
+import threading
+import time
+
+import pytest
+
+from vocalite import translation_cache
+from vocalite.translation_cache import TranslationCache
+
+
+class Clock:
+    """A settable stand-in for the time module the cache reads created/accessed times from."""
+
+    def __init__(self, now=1_000_000.0):
+        self.now = now
+
+    def time(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(translation_cache, "time", clock)
+    return clock
+
+
+class SlowTranslator:
+    """Counts upstream calls; each call waits until released so concurrent callers pile up."""
+
+    def __init__(self, fail=False):
+        self.calls = 0
+        self.fail = fail
+        self.release = threading.Event()
+        self._lock = threading.Lock()
+
+    def __call__(self, text, src, dest):
+        with self._lock:
+            self.calls += 1
+        self.release.wait(5)
+        if self.fail:
+            raise RuntimeError("upstream down")
+        return f"[{dest}] {text}"
+
+
+def run_concurrently(count, call):
+    barrier = threading.Barrier(count)
+    results, errors = [], []
+    lock = threading.Lock()
+
+    def worker():
+        barrier.wait()
+        try:
+            result = call()
+        except Exception as e:
+            with lock:
+                errors.append(e)
+        else:
+            with lock:
+                results.append(result)
+
+    threads = [threading.Thread(target=worker) for _ in range(count)]
+    for thread in threads:
+        thread.start()
+    return threads, results, errors
+
+
+def wait_for_waiters(cache, expected):
+    deadline = time.monotonic() + 5
+    while cache.stats()["coalesced"] < expected and time.monotonic() < deadline:
+        time.sleep(0.005)
+
+
+def test_concurrent_misses_make_exactly_one_upstream_call():
+    cache = TranslationCache()
+    translate = SlowTranslator()
+    threads, results, errors = run_concurrently(
+        16, lambda: cache.get_or_translate("Good morning", "en", "es", translate))
+
+    wait_for_waiters(cache, 15)
+    translate.release.set()
+    for thread in threads:
+        thread.join()
+
+    assert translate.calls == 1
+    assert errors == []
+    assert results == ["[es] Good morning"] * 16
+    stats = cache.stats()
+    assert (stats["misses"], stats["coalesced"], stats["memory_hits"]) == (1, 15, 0)
+
+    assert cache.get_or_translate("Good morning", "en", "es", translate) == "[es] Good morning"
+    assert translate.calls == 1
+    assert cache.stats()["memory_hits"] == 1
+
+
+def test_a_failed_flight_raises_for_every_waiter_and_is_not_cached():
+    cache = TranslationCache()
+    translate = SlowTranslator(fail=True)
+    threads, results, errors = run_concurrently(8, lambda: cache.get_or_translate("hello", "en", "es", translate))
+
+    wait_for_waiters(cache, 7)
+    translate.release.set()
+    for thread in threads:
+        thread.join()
+
+    assert translate.calls == 1
+    assert results == []
+    assert [str(error) for error in errors] == ["upstream down"] * 8
+    assert cache.stats()["upstream_errors"] == 1
+    assert cache.get("hello", "en", "es") is None
+
+    translate.fail = False
+    assert cache.get_or_translate("hello", "en", "es", translate) == "[es] hello"
+    assert translate.calls == 2
+
+
+def test_memory_entries_expire_after_ttl(clock):
+    cache = TranslationCache(ttl_seconds=60)
+    cache.put("hello", "en", "es", "hola")
+
+    clock.now += 59
+    assert cache.get("hello", "en", "es") == "hola"
+
+    # Reads do not extend the lifetime
+    clock.now += 2
+    assert cache.get("hello", "en", "es") is None
+    assert cache.stats()["memory_entries"] == 0
+
+
+def test_disk_entries_expire_and_promotion_keeps_their_age(clock, tmp_path):
+    db_path = str(tmp_path / "translations.sqlite3")
+    TranslationCache(db_path=db_path, ttl_seconds=60).put("hello", "en", "es", "hola")
+
+    clock.now += 50
+    cache = TranslationCache(db_path=db_path, ttl_seconds=60)
+    assert cache.get("hello", "en", "es") == "hola"
+    assert cache.stats()["disk_hits"] == 1
+
+    # The promoted copy expires with the row it came from, not 60 s after promotion
+    clock.now += 11
+    calls = []
+    value = cache.get_or_translate("hello", "en", "es", lambda text, src, dest: calls.append(text) or "hola!")
+    assert value == "hola!"
+    assert calls == ["hello"]
+    stats = cache.stats()
+    assert (stats["memory_hits"], stats["disk_hits"], stats["misses"]) == (0, 1, 1)
+
+
+def test_counters_and_hit_rate(tmp_path):
+    db_path = str(tmp_path / "translations.sqlite3")
+    TranslationCache(db_path=db_path).put("on disk", "en", "es", "en disco")
+    cache = TranslationCache(max_entries=2, db_path=db_path)
+
+    def translate(text, src, dest):
+        return text.upper()
+
+    cache.get_or_translate("on disk", "en", "es", translate)
+    cache.get_or_translate("new", "en", "es", translate)
+    cache.get_or_translate("new", "en", "es", translate)
+    cache.get_or_translate("other", "en", "es", translate)
+
+    stats = cache.stats()
+    assert (stats["memory_hits"], stats["disk_hits"], stats["misses"]) == (1, 1, 2)
+    assert stats["hit_rate"] == pytest.approx(0.5)
+    assert (stats["memory_entries"], stats["memory_capacity"], stats["disk_entries"]) == (2, 2, 3)
+
+
+def test_inputs_differing_only_in_spacing_share_an_entry():
+    cache = TranslationCache()
+    cache.put("Good  morning ", "EN", "es", "Buenos días")
+
+    assert cache.get(" Good morning", "en", "ES") == "Buenos días"
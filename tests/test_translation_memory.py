@@ -0,0 +1,65 @@
+"""TranslationMemory owners and per-call reuse thresholds."""
+import sqlite3
+
+from vocalite.translation_memory import TranslationMemory, _stable_hash, shape, tokenize
+
+
+def shape_hash(text):
+    return _stable_hash("\x1f".join(shape(token) for token in tokenize(text)))
+
+
+def test_lookups_see_own_and_shared_segments_only():
+    tm = TranslationMemory()
+    tm.add("Hello Anna, your order has shipped.", "Hola Anna, tu pedido ha sido enviado.", "en", "es", owner="a")
+    tm.add("Thank you very much for your help.", "Muchas gracias por tu ayuda.", "en", "es")
+
+    assert tm.lookup("Hello Anna, your order has shipped.", "en", "es", owner="b") is None
+    assert tm.reuse("Hello Anna, your order has shipped.", "en", "es", owner="b") is None
+    assert tm.reuse("Hello Anna, your order has shipped.", "en", "es", owner="a") == \
+        "Hola Anna, tu pedido ha sido enviado."
+    assert tm.reuse("Thank you very much for your help.", "en", "es", owner="b") == "Muchas gracias por tu ayuda."
+
+
+def test_owner_segment_wins_over_shared_one():
+    tm = TranslationMemory()
+    tm.add("Good morning", "Buenos días", "en", "es")
+    tm.add("Good morning", "Buen día", "en", "es", owner="a")
+
+    assert tm.lookup("Good morning", "en", "es", owner="a")["target"] == "Buen día"
+    assert tm.lookup("Good morning", "en", "es")["target"] == "Buenos días"
+    assert len(tm) == 2
+
+
+def test_reuse_threshold_can_be_given_per_call():
+    tm = TranslationMemory(reuse_threshold=0.85)
+    tm.add("Hello Anna, your order has shipped.", "Hola Anna, tu pedido ha sido enviado.", "en", "es")
+    text = "Hello Ben, your order has shipped."
+
+    assert 0.85 <= tm.lookup(text, "en", "es")["score"] < 0.95
+    assert tm.reuse(text, "en", "es", threshold=0.95) is None
+    assert tm.reuse(text, "en", "es") == "Hola Ben, tu pedido ha sido enviado."
+    assert tm.reuse_threshold == 0.85
+
+
+def test_memory_without_owners_keeps_only_imported_segments(tmp_path):
+    path = str(tmp_path / "memory.sqlite3")
+    db = sqlite3.connect(path)
+    db.execute(
+        "CREATE TABLE tm_segments (id INTEGER PRIMARY KEY, src TEXT NOT NULL, dest TEXT NOT NULL, "
+        "shape INTEGER NOT NULL, source TEXT NOT NULL, target TEXT NOT NULL, origin TEXT NOT NULL, "
+        "created REAL NOT NULL)"
+    )
+    db.execute("CREATE UNIQUE INDEX idx_tm_shape ON tm_segments (src, dest, shape)")
+    db.executemany(
+        "INSERT INTO tm_segments (src, dest, shape, source, target, origin, created) VALUES (?, ?, ?, ?, ?, ?, 0)",
+        [("en", "es", shape_hash("private text"), "private text", "texto privado", "history"),
+         ("en", "es", shape_hash("Good morning"), "Good morning", "Buenos días", "glossary.tmx")],
+    )
+    db.commit()
+    db.close()
+
+    tm = TranslationMemory(path)
+
+    assert len(tm) == 1
+    assert tm.lookup("private text", "en", "es") is None
+    assert tm.lookup("Good morning", "en", "es")["target"] == "Buenos días"
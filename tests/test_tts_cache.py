@@ -0,0 +1,76 @@
+"""AudioCache byte budget, LRU eviction and the on-disk spill directory."""
+import os
+
+from vocalite.tts_cache import AudioCache, audio_key
+
+
+class CountingSynthesizer:
+    def __init__(self):
+        self.calls = []
+
+    def __call__(self, text, lang):
+        self.calls.append((text, lang))
+        return f"{lang}:{text}".encode("utf-8")
+
+
+def spilled(cache):
+    return sorted(name for name in os.listdir(cache.spill_dir) if name.endswith(".mp3"))
+
+
+def test_memory_stays_under_the_byte_budget_and_evicts_least_recently_used():
+    cache = AudioCache(max_bytes=20)
+    cache.put("a", "en", b"x" * 8)
+    cache.put("b", "en", b"y" * 8)
+    assert cache.get("a", "en") == b"x" * 8
+
+    cache.put("c", "en", b"z" * 8)
+
+    # "b" was the least recently used once "a" had been read
+    assert cache.get("b", "en") is None
+    assert cache.get("a", "en") == b"x" * 8
+    stats = cache.stats()
+    assert (stats["entries"], stats["bytes"], stats["evictions"]) == (2, 16, 1)
+    assert (stats["memory_hits"], stats["misses"]) == (2, 1)
+
+
+def test_clips_over_the_budget_are_never_held_in_memory(tmp_path):
+    cache = AudioCache(max_bytes=10, spill_dir=str(tmp_path))
+
+    cache.put("long", "en", b"x" * 11)
+
+    assert cache.stats()["bytes"] == 0
+    assert spilled(cache) == [f"{audio_key('long', 'en')}.mp3"]
+    assert cache.get("long", "en") == b"x" * 11
+    assert cache.stats()["spill_hits"] == 1
+
+
+def test_evicted_clips_are_served_from_the_spill_directory(tmp_path):
+    synthesize = CountingSynthesizer()
+    cache = AudioCache(max_bytes=12, spill_dir=str(tmp_path), synthesize=synthesize)
+
+    first = cache.get_or_synthesize("hola", "es")
+    cache.get_or_synthesize("adios", "es")
+    assert cache.stats()["spilled"] == 1
+
+    assert cache.get_or_synthesize("hola", "es") == first
+    assert synthesize.calls == [("hola", "es"), ("adios", "es")]
+    stats = cache.stats()
+    assert (stats["spill_hits"], stats["misses"]) == (1, 2)
+    assert stats["hit_rate"] == 1 / 3
+
+
+def test_spill_directory_is_trimmed_oldest_first(tmp_path):
+    cache = AudioCache(max_bytes=8, spill_dir=str(tmp_path), max_spill_bytes=20)
+    for text in ["one", "two", "three"]:
+        cache.put(text, "en", b"x" * 8)
+        for name in spilled(cache):
+            # Back-date existing clips so the order does not depend on timestamp resolution
+            path = os.path.join(cache.spill_dir, name)
+            mtime = os.stat(path).st_mtime - 10
+            os.utime(path, (mtime, mtime))
+
+    cache.put("four", "en", b"x" * 8)
+
+    assert spilled(cache) == sorted(f"{audio_key(text, 'en')}.mp3" for text in ["two", "three"])
+    assert cache.get("one", "en") is None
+    assert cache.get("four", "en") == b"x" * 8
@@ -0,0 +1,29 @@
+"""MP3 piece joining and duration from frame headers."""
+from vocalite.tts_stream import concat_mp3, frame_length, mp3_duration
+
+# MPEG-2 layer III, 32 kbps, 24 kHz mono: the format gTTS returns
+HEADER = bytes([0xFF, 0xF3, 0x44, 0xC4])
+
+
+def frames(count):
+    return (HEADER + b"\0" * (frame_length(HEADER) - 4)) * count
+
+
+def id3_tag():
+    return b"ID3\x04\x00\x00\x00\x00\x00\x04" + b"\0" * 4
+
+
+def test_duration_counts_frames():
+    # 576 samples per MPEG-2 frame at 24 kHz
+    assert round(mp3_duration(frames(100)), 3) == 2.4
+
+
+def test_duration_ignores_id3_tags():
+    assert round(mp3_duration(id3_tag() + frames(50)), 3) == 1.2
+
+
+def test_joined_pieces_last_as_long_as_the_parts():
+    joined = concat_mp3([id3_tag() + frames(30), id3_tag() + frames(20)])
+
+    assert joined == frames(50)
+    assert round(mp3_duration(joined), 3) == 1.2
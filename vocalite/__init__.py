@@ -0,0 +1 @@
+"""Helper modules backing the Vocalite Streamlit app."""
@@ -0,0 +1,279 @@
+"""Default network/OS-backed implementations of the pipeline backends.
+
+Each backend is a small object with one method, so the pipeline can be driven by
+fakes in benchmarks:
+
+- translator: ``translate(text, src, dest) -> str`` (optionally ``supports(src, dest) -> bool``,
+  see ``vocalite.routing`` for routing between several translators)
+- tts: ``synthesize(text, lang) -> bytes``
+- grammar: ``correct(text, lang_name) -> str``
+- ocr: ``image_to_string(image, config="") -> str``
+- recognizer: ``recognize(audio) -> str``
+
+The HTTP-backed translator and synthesizer share a pooled keep-alive session
+and are meant to be wrapped in ``vocalite.resilience.ResilientBackend``.
+"""
+import base64
+import json
+import re
+import threading
+
+from vocalite.chunking import split_chunks
+from vocalite.grammar_pool import LanguageToolPool
+from vocalite.ocr_pool import EngineUnavailable, TesseractEnginePool
+from vocalite.resilience import UpstreamError, pooled_session, raise_for_status
+from vocalite.tts_cache import synthesize_mp3
+from vocalite.tts_stream import concat_mp3
+
+# Language tool mapping for grammar correction
+LANG_TOOL_MAPPING = {
+    'english': 'en-US',
+    'german': 'de-DE',
+    'french': 'fr-FR',
+    'spanish': 'es-ES',
+    'portuguese': 'pt-PT',
+    'italian': 'it-IT',
+    'dutch': 'nl-NL',
+    'polish': 'pl-PL',
+    'russian': 'ru-RU',
+    'arabic': 'ar',
+    'chinese': 'zh-CN',
+    'japanese': 'ja-JP',
+}
+
+
+# (connect, read) timeouts in seconds for the HTTP backends
+DEFAULT_TIMEOUT = (3.05, 10)
+
+
+class GoogleTranslator:
+    """Translates through googletrans.
+
+    googletrans clients keep per-instance token state, so unless a translator is
+    passed in, each thread gets its own client (with its own keep-alive pool).
+    """
+
+    def __init__(self, translator=None, timeout=DEFAULT_TIMEOUT[1]):
+        self.timeout = timeout
+        self._shared = translator
+        self._local = threading.local()
+
+    @property
+    def translator(self):
+        if self._shared is not None:
+            return self._shared
+        translator = getattr(self._local, "translator", None)
+        if translator is None:
+            from googletrans import Translator
+
+            translator = self._local.translator = Translator(timeout=self.timeout)
+        return translator
+
+    def translate(self, text, src, dest):
+        return self.translator.translate(text, src=src, dest=dest).text
+
+
+class GoogleHttpTranslator:
+    """Translates through the public translate_a/single endpoint over a pooled session."""
+
+    def __init__(self, base_url="https://translate.googleapis.com", session=None, timeout=DEFAULT_TIMEOUT):
+        self.url = base_url.rstrip("/") + "/translate_a/single"
+        self.session = session or pooled_session()
+        self.timeout = timeout
+
+    def translate(self, text, src, dest):
+        response = self.session.post(
+            self.url,
+            params={"client": "gtx", "sl": src, "tl": dest, "dt": "t"},
+            data={"q": text},
+            timeout=self.timeout,
+        )
+        raise_for_status(response, "translate")
+        try:
+            sentences = response.json()[0] or []
+        except (ValueError, IndexError, TypeError) as e:
+            raise UpstreamError(f"translate returned an unreadable response: {e}", transient=False) from e
+        return "".join(sentence[0] for sentence in sentences if sentence and sentence[0])
+
+
+class DictionaryTranslator:
+    """Offline translator: whole-phrase, then word-by-word dictionary lookup, echoing unknown words.
+
+    ``dictionary`` maps "src-dest" pairs to {source: target} entries (keys are
+    matched case-insensitively, and a capitalized word keeps its capital).
+    With an empty dictionary it is a pure echo backend, deterministic and free,
+    which is what the tests and benchmarks route to. ``prefix`` is formatted
+    with src and dest and prepended to every result (e.g. "[{dest}] ") so echoed
+    output can be told apart from the input. With ``strict`` it only claims
+    the pairs it has entries for.
+    """
+
+    _WORD = re.compile(r"\w+")
+
+    def __init__(self, dictionary=None, prefix="", strict=False):
+        self.dictionary = {
+            pair.lower(): {source.lower(): target for source, target in entries.items()}
+            for pair, entries in (dictionary or {}).items()
+        }
+        self.prefix = prefix
+        self.strict = strict
+
+    @classmethod
+    def from_file(cls, path, **kwargs):
+        """Loads a {"src-dest": {source: target}} JSON dictionary."""
+        with open(path, encoding="utf-8") as f:
+            return cls(json.load(f), **kwargs)
+
+    def supports(self, src, dest):
+        return not self.strict or f"{src}-{dest}".lower() in self.dictionary
+
+    def translate(self, text, src, dest):
+        entries = self.dictionary.get(f"{src}-{dest}".lower(), {})
+        prefix = self.prefix.format(src=src, dest=dest)
+        phrase = entries.get(text.strip().lower())
+        if phrase is not None:
+            return prefix + phrase
+
+        def word(match):
+            token = match.group(0)
+            target = entries.get(token.lower())
+            if target is None:
+                return token
+            return target[:1].upper() + target[1:] if token[:1].isupper() else target
+
+        return prefix + self._WORD.sub(word, text)
+
+
+# gTTS and googletrans disagree on the case of region-qualified codes
+_TTS_LANG_CODES = {"zh-cn": "zh-CN", "zh-tw": "zh-TW"}
+
+# The batchexecute RPC that gTTS uses; each call speaks at most 100 characters
+_TTS_RPC = "jQ1olc"
+_TTS_MAX_CHARS = 100
+_TTS_AUDIO = re.compile(r'jQ1olc","\[\\"(.*)\\"]')
+
+
+class GoogleHttpSynthesizer:
+    """Synthesizes MP3 audio with the same requests gTTS sends, over a pooled session.
+
+    gTTS opens a new connection for every 100-character piece; this sends the
+    pieces over one keep-alive session with explicit timeouts instead.
+    """
+
+    def __init__(self, base_url="https://translate.google.com", session=None, timeout=(3.05, 15)):
+        self.url = base_url.rstrip("/") + "/_/TranslateWebserverUi/data/batchexecute"
+        self.session = session or pooled_session()
+        self.timeout = timeout
+
+    def _speak(self, text, lang):
+        parameter = json.dumps([text, lang, None, "null"], separators=(",", ":"))
+        rpc = json.dumps([[[_TTS_RPC, parameter, None, "generic"]]], separators=(",", ":"))
+        response = self.session.post(
+            self.url,
+            data={"f.req": rpc},
+            headers={"Content-Type": "application/x-www-form-urlencoded;charset=utf-8"},
+            timeout=self.timeout,
+        )
+        raise_for_status(response, "tts")
+        match = _TTS_AUDIO.search(response.text)
+        if not match:
+            raise UpstreamError(f"tts returned no audio for language {lang!r}", transient=False)
+        return base64.b64decode(match.group(1))
+
+    def synthesize(self, text, lang):
+        lang = _TTS_LANG_CODES.get(lang.lower(), lang)
+        _, chunks = split_chunks(text, max_chars=_TTS_MAX_CHARS)
+        # MP3 frames are self-contained, so the pieces play back-to-back when concatenated
+        return concat_mp3(self._speak(chunk.text, lang) for chunk in chunks if chunk.text.strip())
+
+
+class GTTSSynthesizer:
+    """Synthesizes MP3 audio through gTTS."""
+
+    def synthesize(self, text, lang):
+        return synthesize_mp3(text, lang)
+
+
+class LanguageToolGrammar:
+    """Corrects grammar with pooled LanguageTool instances, falling back to English."""
+
+    def __init__(self, pool=None):
+        self.pool = pool or LanguageToolPool()
+
+    def _with_tool(self, lang_name, use):
+        lang_code = LANG_TOOL_MAPPING.get(lang_name.lower(), 'en-US')
+        try:
+            with self.pool.checkout(lang_code) as lang_tool:
+                return use(lang_tool)
+        except Exception:
+            if lang_code == 'en-US':
+                raise
+            # Fallback to the default English tool if the specific language tool fails
+            with self.pool.checkout('en-US') as lang_tool:
+                return use(lang_tool)
+
+    def correct(self, text, lang_name):
+        return self._with_tool(lang_name, lambda lang_tool: lang_tool.correct(text))
+
+    def matches(self, text, lang_name):
+        """Returns LanguageTool's suggestions as (offset, length, first replacement) edits."""
+        return [
+            (match.offset, match.errorLength, match.replacements[0])
+            for match in self._with_tool(lang_name, lambda lang_tool: lang_tool.check(text))
+            if match.replacements
+        ]
+
+
+class TesseractOCR:
+    """Extracts text from images with pytesseract."""
+
+    def __init__(self, lang=None):
+        self.lang = lang
+
+    def image_to_string(self, image, config=""):
+        import pytesseract
+
+        return pytesseract.image_to_string(image, lang=self.lang, config=config)
+
+
+class TesserocrOCR:
+    """Extracts text with pooled, pre-initialized tesserocr engines, falling back to pytesseract.
+
+    Calls go through TesseractOCR instead when tesserocr is not installed,
+    cannot load the language, or is given a config option it has no API for.
+    """
+
+    def __init__(self, lang=None, pool=None, fallback=None):
+        self.lang = lang
+        self.pool = pool or TesseractEnginePool()
+        self.fallback = fallback or TesseractOCR(lang)
+        self.fallbacks = 0
+
+    def warm_up(self, count=1, background=True):
+        """Starts engines ahead of the first image."""
+        return self.pool.warm_up(self.lang or "eng", count=count, background=background)
+
+    def image_to_string(self, image, config=""):
+        try:
+            return self.pool.image_to_string(image, lang=self.lang or "eng", config=config)
+        except EngineUnavailable:
+            self.fallbacks += 1
+            return self.fallback.image_to_string(image, config=config)
+
+    def stats(self):
+        """Returns the engine pool counters plus how many calls fell back to pytesseract."""
+        return {**self.pool.stats(), "fallbacks": self.fallbacks}
+
+
+class GoogleSpeechRecognizer:
+    """Transcribes captured audio with the SpeechRecognition Google recognizer."""
+
+    def __init__(self, recognizer=None):
+        if recognizer is None:
+            import speech_recognition as sr
+
+            recognizer = sr.Recognizer()
+        self.recognizer = recognizer
+
+    def recognize(self, audio):
+        return self.recognizer.recognize_google(audio)
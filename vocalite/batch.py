@@ -0,0 +1,151 @@
+"""Bulk translation of CSV, TXT and JSONL files on a bounded worker pool."""
+import csv
+import io
+import json
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+SUPPORTED_EXTENSIONS = ["csv", "txt", "jsonl"]
+
+
+class Document:
+    """A parsed upload: rows in original order plus the fields that can be translated."""
+
+    def __init__(self, kind, rows, fields):
+        self.kind = kind
+        self.rows = rows
+        self.fields = fields
+
+    def segments(self, field=None):
+        """Returns the text of every row, in order, for the chosen field."""
+        if self.kind == "txt":
+            return list(self.rows)
+        return [_as_text(row.get(field)) for row in self.rows]
+
+    def render(self, field, translations):
+        """Serializes the document with translations added, keeping the original row order."""
+        if self.kind == "txt":
+            return ("\n".join(translations) + "\n").encode("utf-8")
+
+        target = f"{field}_translated"
+        if self.kind == "csv":
+            out = io.StringIO()
+            writer = csv.DictWriter(out, fieldnames=list(self.fields) + [target])
+            writer.writeheader()
+            for row, translated in zip(self.rows, translations):
+                writer.writerow({**row, target: translated})
+            return out.getvalue().encode("utf-8")
+
+        lines = [json.dumps({**row, target: translated}, ensure_ascii=False)
+                 for row, translated in zip(self.rows, translations)]
+        return ("\n".join(lines) + "\n").encode("utf-8")
+
+
+def _as_text(value):
+    return "" if value is None else str(value)
+
+
+def parse_document(filename, data):
+    """Parses uploaded bytes into a Document based on the file extension."""
+    kind = os.path.splitext(filename)[1].lower().lstrip(".")
+    if kind not in SUPPORTED_EXTENSIONS:
+        raise ValueError(f"Unsupported file type: .{kind}")
+    text = data.decode("utf-8-sig")
+
+    if kind == "csv":
+        reader = csv.DictReader(io.StringIO(text))
+        rows = []
+        for row in reader:
+            # DictReader files surplus cells under a None key, which render could not write back
+            if None in row:
+                raise ValueError(
+                    f"Line {reader.line_num} has {len(reader.fieldnames) + len(row[None])} cells "
+                    f"but the header has {len(reader.fieldnames)}"
+                )
+            rows.append(row)
+        return Document(kind, rows, list(reader.fieldnames or []))
+
+    if kind == "jsonl":
+        rows = []
+        fields = []
+        for line_no, line in enumerate(text.splitlines(), start=1):
+            if not line.strip():
+                continue
+            row = json.loads(line)
+            if not isinstance(row, dict):
+                raise ValueError(f"Line {line_no} is not a JSON object")
+            rows.append(row)
+            for key, value in row.items():
+                if isinstance(value, str) and key not in fields:
+                    fields.append(key)
+        return Document(kind, rows, fields)
+
+    return Document(kind, text.splitlines(), [])
+
+
+class RateLimiter:
+    """Token bucket shared by all workers; a rate of 0 disables limiting."""
+
+    def __init__(self, rate_per_s, burst=1):
+        self.rate_per_s = rate_per_s
+        self.capacity = max(1, burst)
+        self._tokens = float(self.capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        if not self.rate_per_s:
+            return
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate_per_s)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate_per_s
+            time.sleep(wait)
+
+
+def _translate_segment(text, translate_fn, limiter, max_retries, backoff_s):
+    """Translates one segment, retrying it on its own with exponential backoff."""
+    attempt = 0
+    while True:
+        limiter.acquire()
+        try:
+            return translate_fn(text)
+        except Exception:
+            if attempt >= max_retries:
+                raise
+            time.sleep(backoff_s * (2 ** attempt) * (1 + random.random()))
+            attempt += 1
+
+
+def translate_segments(segments, translate_fn, concurrency=4, rate_limit=0, max_retries=2,
+                       backoff_s=0.5, indexes=None):
+    """Translates segments on a bounded pool, yielding (index, translation, error) as each finishes.
+
+    Blank segments are passed through without a call. indexes restricts the work
+    to a subset, which is how failed segments are retried after a job.
+    """
+    limiter = RateLimiter(rate_limit, burst=concurrency)
+    pending = range(len(segments)) if indexes is None else indexes
+    with ThreadPoolExecutor(max_workers=max(1, concurrency)) as pool:
+        futures = {}
+        for index in pending:
+            text = segments[index]
+            if not text.strip():
+                yield index, text, None
+                continue
+            future = pool.submit(_translate_segment, text, translate_fn, limiter, max_retries, backoff_s)
+            futures[future] = index
+        for future in as_completed(futures):
+            index = futures[future]
+            try:
+                yield index, future.result(), None
+            except Exception as e:
+                yield index, None, e
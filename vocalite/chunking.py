@@ -0,0 +1,136 @@
+"""Sentence- and paragraph-aware chunking for long translation inputs."""
+import re
+from concurrent.futures import ThreadPoolExecutor
+
+# googletrans rejects inputs above ~5000 characters; stay well below it
+DEFAULT_MAX_CHARS = 2000
+
+_PARAGRAPH_BREAK = re.compile(r"\n[ \t]*\n\s*")
+_SENTENCE_END = re.compile(r"(?<=[.!?。！？…])[\"')\]»”’]*\s+")
+
+
+class Chunk:
+    """A piece of the input plus the exact whitespace that followed it."""
+
+    def __init__(self, text, trailing=""):
+        self.text = text
+        self.trailing = trailing
+
+    def __repr__(self):
+        return f"Chunk({self.text!r}, {self.trailing!r})"
+
+
+def _split_with_separators(text, pattern):
+    """Splits text on pattern, returning (piece, separator) pairs that rebuild text exactly."""
+    pieces = []
+    pos = 0
+    for match in pattern.finditer(text):
+        # Keep closing quotes/brackets with the sentence they close
+        whitespace = match.group(0).lstrip("\"')]»”’")
+        end = match.end() - len(whitespace)
+        pieces.append((text[pos:end], text[end:match.end()]))
+        pos = match.end()
+    pieces.append((text[pos:], ""))
+    return pieces
+
+
+def _hard_split(sentence, separator, max_chars):
+    """Splits an over-long sentence at spaces (or anywhere, as a last resort)."""
+    parts = []
+    while len(sentence) > max_chars:
+        cut = sentence.rfind(" ", 0, max_chars)
+        if cut <= 0:
+            parts.append((sentence[:max_chars], ""))
+            sentence = sentence[max_chars:]
+        else:
+            parts.append((sentence[:cut], " "))
+            sentence = sentence[cut + 1:]
+    parts.append((sentence, separator))
+    return parts
+
+
+def split_chunks(text, max_chars=DEFAULT_MAX_CHARS):
+    """Splits text into size-capped chunks on sentence and paragraph boundaries.
+
+    Chunks never span a paragraph break, so editing one paragraph leaves the
+    other chunks (and their cache keys) untouched. Returns (prefix, chunks)
+    where prefix is any leading whitespace; ``assemble`` rebuilds the layout.
+    """
+    stripped = text.lstrip()
+    prefix = text[: len(text) - len(stripped)]
+    chunks = []
+    for paragraph, paragraph_sep in _split_with_separators(stripped, _PARAGRAPH_BREAK):
+        body = paragraph.rstrip()
+        paragraph_sep = paragraph[len(body):] + paragraph_sep
+        if not body:
+            if chunks:
+                chunks[-1].trailing += paragraph_sep
+            else:
+                prefix += paragraph_sep
+            continue
+
+        current = ""
+        current_sep = ""
+        for sentence, sentence_sep in _split_with_separators(body, _SENTENCE_END):
+            for piece, piece_sep in _hard_split(sentence, sentence_sep, max_chars):
+                if current and len(current) + len(current_sep) + len(piece) > max_chars:
+                    chunks.append(Chunk(current, current_sep))
+                    current = ""
+                if current:
+                    current += current_sep + piece
+                else:
+                    current = piece
+                current_sep = piece_sep
+        chunks.append(Chunk(current, current_sep + paragraph_sep))
+    return prefix, chunks
+
+
+def split_sentences(text):
+    """Splits text into one chunk per sentence, in the (prefix, chunks) form assemble rebuilds.
+
+    Unlike split_chunks nothing is merged or size-capped, so a one-word edit
+    changes exactly one chunk.
+    """
+    stripped = text.lstrip()
+    prefix = text[: len(text) - len(stripped)]
+    chunks = []
+    for paragraph, paragraph_sep in _split_with_separators(stripped, _PARAGRAPH_BREAK):
+        body = paragraph.rstrip()
+        paragraph_sep = paragraph[len(body):] + paragraph_sep
+        if not body:
+            if chunks:
+                chunks[-1].trailing += paragraph_sep
+            else:
+                prefix += paragraph_sep
+            continue
+        sentences = _split_with_separators(body, _SENTENCE_END)
+        chunks.extend(Chunk(sentence, separator) for sentence, separator in sentences)
+        chunks[-1].trailing += paragraph_sep
+    return prefix, chunks
+
+
+def assemble(prefix, chunks, translations):
+    """Rebuilds the full text from per-chunk translations, keeping the original whitespace."""
+    return prefix + "".join(translated + chunk.trailing for chunk, translated in zip(chunks, translations))
+
+
+def stream_translation(text, translate_fn, max_chars=DEFAULT_MAX_CHARS, max_workers=4):
+    """Translates chunks of text concurrently, yielding the longest finished prefix as it grows.
+
+    translate_fn(chunk_text) is called once per chunk; the last value yielded is
+    the complete translation.
+    """
+    prefix, chunks = split_chunks(text, max_chars)
+    if not chunks:
+        yield text
+        return
+    if len(chunks) == 1:
+        yield assemble(prefix, chunks, [translate_fn(chunks[0].text)])
+        return
+
+    translations = []
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(chunks)))) as pool:
+        futures = [pool.submit(translate_fn, chunk.text) for chunk in chunks]
+        for future in futures:
+            translations.append(future.result())
+            yield assemble(prefix, chunks[: len(translations)], translations)
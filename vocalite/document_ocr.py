@@ -0,0 +1,114 @@
+"""Multi-page document OCR (PDF, multi-frame TIFF) on a process pool."""
+import io
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from PIL import Image, ImageSequence
+
+from vocalite.ocr import preprocess
+
+DOCUMENT_EXTENSIONS = ["pdf", "tif", "tiff"]
+
+# Rendering resolution for PDF pages; matches the OCR preprocessing target
+PDF_RENDER_DPI = 300
+
+
+def _is_pdf(filename, data):
+    return filename.lower().endswith(".pdf") or data[:5] == b"%PDF-"
+
+
+def count_pages(filename, data):
+    """Returns the number of pages without decoding them."""
+    if _is_pdf(filename, data):
+        import pypdfium2 as pdfium
+
+        document = pdfium.PdfDocument(data)
+        try:
+            return len(document)
+        finally:
+            document.close()
+    with Image.open(io.BytesIO(data)) as image:
+        return getattr(image, "n_frames", 1)
+
+
+def iter_pages(filename, data):
+    """Yields page images one at a time, decoding each only when it is requested."""
+    if _is_pdf(filename, data):
+        try:
+            import pypdfium2 as pdfium
+        except ImportError as e:
+            raise RuntimeError("PDF support needs pypdfium2: pip install pypdfium2") from e
+
+        document = pdfium.PdfDocument(data)
+        try:
+            for index in range(len(document)):
+                page = document[index]
+                try:
+                    image = page.render(scale=PDF_RENDER_DPI / 72).to_pil()
+                    image.info["dpi"] = (PDF_RENDER_DPI, PDF_RENDER_DPI)
+                    yield image
+                finally:
+                    page.close()
+        finally:
+            document.close()
+        return
+
+    with Image.open(io.BytesIO(data)) as image:
+        for frame in ImageSequence.Iterator(image):
+            yield frame.copy()
+
+
+def _ocr_page(index, page, backend, config, preprocess_options):
+    """Process-pool worker: preprocesses and OCRs one page."""
+    start = time.perf_counter()
+    text = backend.image_to_string(preprocess(page, **preprocess_options), config=config)
+    return index, text, time.perf_counter() - start
+
+
+def ocr_pages(pages, backend, workers=None, config="", **preprocess_options):
+    """OCRs pages on a process pool, yielding results as each page completes.
+
+    Only about two pages per worker are decoded and in flight at once, so long
+    documents do not need to fit in memory. Each result is a dict with ``page``
+    (0-based), ``text``, ``seconds`` and ``error``.
+    """
+    workers = workers or os.cpu_count() or 1
+    max_pending = workers * 2
+    pages = iter(pages)
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        pending = {}
+        index = 0
+        exhausted = False
+        while pending or not exhausted:
+            while not exhausted and len(pending) < max_pending:
+                try:
+                    page = next(pages)
+                except StopIteration:
+                    exhausted = True
+                    break
+                future = pool.submit(_ocr_page, index, page, backend, config, preprocess_options)
+                pending[future] = index
+                index += 1
+            if not pending:
+                break
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                page_index = pending.pop(future)
+                try:
+                    _, text, seconds = future.result()
+                    yield {"page": page_index, "text": text.strip(), "seconds": seconds, "error": None}
+                except Exception as e:
+                    yield {"page": page_index, "text": "", "seconds": 0.0, "error": e}
+
+
+def summarize_pages(results, wall_s):
+    """Reports per-page timings and overall pages/sec for a finished document."""
+    pages = sorted(results, key=lambda result: result["page"])
+    return {
+        "pages": len(pages),
+        "failed": sum(1 for result in pages if result["error"] is not None),
+        "wall_s": round(wall_s, 3),
+        "pages_per_s": round(len(pages) / wall_s, 2) if wall_s else 0.0,
+        "page_seconds": [round(result["seconds"], 3) for result in pages],
+    }
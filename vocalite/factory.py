@@ -0,0 +1,183 @@
+"""Builds the pipeline with its backends, caches and pools from the VOCALITE_* settings.
+
+The Streamlit page (which keeps each piece in st.cache_resource) and the
+headless service both build through these functions, so they always run
+the same wiring.
+"""
+import os
+
+from vocalite.backends import (
+    DictionaryTranslator,
+    GoogleHttpSynthesizer,
+    GoogleHttpTranslator,
+    GoogleSpeechRecognizer,
+    GoogleTranslator,
+    GTTSSynthesizer,
+    LanguageToolGrammar,
+    TesseractOCR,
+    TesserocrOCR,
+)
+from vocalite.grammar_cache import IncrementalGrammar
+from vocalite.grammar_pool import LanguageToolPool
+from vocalite.lazy import LazyBackend, load_googletrans_languages
+from vocalite.metrics import Metrics, cache_collector
+from vocalite.ocr import OcrProcessor
+from vocalite.pipeline import VocalitePipeline
+from vocalite.resilience import ResilientBackend, pooled_session
+from vocalite.routing import BackendRegistry, LatencyRouter, parse_routes
+from vocalite.translation_cache import TranslationCache
+from vocalite.translation_memory import TranslationMemory
+from vocalite.tts_cache import AudioCache
+
+# Where the persistent caches live; override with VOCALITE_CACHE_DIR
+CACHE_DIR = os.environ.get("VOCALITE_CACHE_DIR", ".vocalite_cache")
+
+# Languages whose grammar tools are started in the background at launch;
+# override with a comma-separated VOCALITE_GRAMMAR_WARMUP (e.g. "en-US,de-DE")
+GRAMMAR_WARMUP_LANGS = [
+    code.strip() for code in os.environ.get("VOCALITE_GRAMMAR_WARMUP", "en-US").split(",") if code.strip()
+]
+
+# Translation memory thresholds (0-1 fuzzy match): reuse a stored translation
+# instead of calling the translator, or just show it as a suggestion
+TM_REUSE_THRESHOLD = float(os.environ.get("VOCALITE_TM_REUSE", "0.85"))
+TM_SUGGEST_THRESHOLD = float(os.environ.get("VOCALITE_TM_SUGGEST", "0.6"))
+
+# Translation backends: "googletrans" (the default), "http" (the same endpoint over a pooled
+# keep-alive session) and "local" (offline dictionary/echo). VOCALITE_TRANSLATE_ROUTES picks
+# them per language pair, e.g. "en-es=http,googletrans;*=googletrans" (pairs no route matches
+# are refused); the router sends each request to the fastest healthy one and hedges requests
+# slower than its usual tail to the next. VOCALITE_TTS picks "gtts" (the default) or "http" for
+# speech. The HTTP clients speak the undocumented endpoints the libraries use, so a change on
+# Google's side fails them with an UpstreamError until they are updated; their endpoints can be
+# pointed at a local stand-in with VOCALITE_TRANSLATE_URL / VOCALITE_TTS_URL.
+TRANSLATOR_CLIENT = os.environ.get("VOCALITE_TRANSLATOR", "googletrans")
+TTS_CLIENT = os.environ.get("VOCALITE_TTS", "gtts")
+TRANSLATE_ROUTES = os.environ.get("VOCALITE_TRANSLATE_ROUTES", f"*={TRANSLATOR_CLIENT}")
+TRANSLATE_DICTIONARY = os.environ.get("VOCALITE_DICTIONARY")
+TRANSLATE_URL = os.environ.get("VOCALITE_TRANSLATE_URL", "https://translate.googleapis.com")
+TTS_URL = os.environ.get("VOCALITE_TTS_URL", "https://translate.google.com")
+
+# OCR engine: "tesserocr" keeps warm in-process Tesseract engines, one per core (and falls back to
+# pytesseract when tesserocr is not installed); "pytesseract" runs the tesseract binary per image
+OCR_ENGINE = os.environ.get("VOCALITE_OCR_ENGINE", "tesserocr")
+
+
+def create_grammar_pool(warm_up=True):
+    """Creates the pool of grammar tools, warming up the configured languages in the background."""
+    pool = LanguageToolPool(max_instances=4, idle_timeout=15 * 60)
+    if warm_up:
+        pool.warm_up(GRAMMAR_WARMUP_LANGS)
+    pool.start_reaper()
+    return pool
+
+
+def create_translation_cache(cache_dir=CACHE_DIR):
+    """Creates the two-tier translation cache, persisted under cache_dir."""
+    return TranslationCache(
+        max_entries=4096,
+        db_path=os.path.join(cache_dir, "translations.sqlite3"),
+        ttl_seconds=30 * 24 * 3600,
+        max_disk_entries=200_000,
+    )
+
+
+def create_audio_cache(cache_dir=CACHE_DIR):
+    """Creates the synthesized audio cache, spilling to cache_dir."""
+    return AudioCache(
+        max_bytes=64 * 1024 * 1024,
+        spill_dir=os.path.join(cache_dir, "audio"),
+    )
+
+
+def create_translation_memory(cache_dir=CACHE_DIR):
+    """Opens the translation memory under cache_dir with the configured thresholds."""
+    return TranslationMemory(
+        os.path.join(cache_dir, "memory.sqlite3"),
+        reuse_threshold=TM_REUSE_THRESHOLD,
+        suggest_threshold=TM_SUGGEST_THRESHOLD,
+    )
+
+
+def create_ocr_engine():
+    """Builds the OCR backend; a tesserocr engine is started here, so a warm-up leaves it ready."""
+    if OCR_ENGINE == "pytesseract":
+        return TesseractOCR()
+    ocr = TesserocrOCR()
+    ocr.warm_up(background=False)
+    return ocr
+
+
+def create_backends(metrics):
+    """Creates lazy backends; each is imported and built on first use or background warm-up."""
+    # One keep-alive connection pool shared by the translation and TTS clients
+    session = LazyBackend("http_session", lambda: pooled_session(pool_size=32), modules=("requests",))
+    registry = BackendRegistry()
+    # Retries with backoff, and fail fast while an upstream keeps failing
+    registry.register("http", ResilientBackend(
+        LazyBackend("translate_http", lambda: GoogleHttpTranslator(TRANSLATE_URL, session=session.get()),
+                    modules=("requests",)),
+        "translate", metrics=metrics, name="translate_http",
+    ))
+    registry.register("googletrans", ResilientBackend(
+        LazyBackend("googletrans", GoogleTranslator, modules=("googletrans",)),
+        "translate", metrics=metrics, name="googletrans",
+    ))
+    # The offline backend echoes unknown words, so it only serves pairs whose route names it
+    registry.register("local", DictionaryTranslator.from_file(TRANSLATE_DICTIONARY) if TRANSLATE_DICTIONARY
+                      else DictionaryTranslator(), routed_only=True)
+    registry.set_routes(parse_routes(TRANSLATE_ROUTES))
+    if TTS_CLIENT == "http":
+        tts = LazyBackend("tts_http", lambda: GoogleHttpSynthesizer(TTS_URL, session=session.get()),
+                          modules=("requests",))
+    else:
+        tts = LazyBackend("gtts", GTTSSynthesizer, modules=("gtts",))
+    return {
+        "translator": LatencyRouter(registry, metrics=metrics),
+        "tts": ResilientBackend(tts, "synthesize", metrics=metrics, name="tts"),
+        "ocr": LazyBackend("ocr_engine", create_ocr_engine),
+        "recognizer": LazyBackend("google_recognizer", GoogleSpeechRecognizer, modules=("speech_recognition",)),
+    }
+
+
+def create_pipeline(backends, grammar_pool, metrics, languages, translation_cache=None, audio_cache=None,
+                    translation_memory=None):
+    """Assembles the pipeline from backends made by create_backends; registers its caches' metrics."""
+    ocr = OcrProcessor(backends["ocr"], cache_size=256, deskew=False)
+    metrics.add_collector(cache_collector("ocr", ocr))
+    # Checks sentence by sentence, so an edit only re-checks the sentences it touched
+    grammar = IncrementalGrammar(LanguageToolGrammar(grammar_pool), max_workers=4)
+    metrics.add_collector(cache_collector("grammar", grammar))
+    return VocalitePipeline(
+        translator=backends["translator"],
+        tts=backends["tts"],
+        grammar=grammar,
+        ocr=ocr,
+        recognizer=backends["recognizer"],
+        languages=languages,
+        translation_cache=translation_cache,
+        audio_cache=audio_cache,
+        metrics=metrics,
+        translation_memory=translation_memory,
+    )
+
+
+def build_pipeline(cache_dir=None, warm_up=False):
+    """Builds a complete pipeline with every cache, as the page does; for headless use."""
+    cache_dir = cache_dir or CACHE_DIR
+    metrics = Metrics()
+    translation_cache = create_translation_cache(cache_dir)
+    audio_cache = create_audio_cache(cache_dir)
+    translation_memory = create_translation_memory(cache_dir)
+    metrics.add_collector(cache_collector("translation", translation_cache))
+    metrics.add_collector(cache_collector("audio", audio_cache))
+    metrics.add_collector(cache_collector("translation_memory", translation_memory))
+    return create_pipeline(
+        create_backends(metrics),
+        create_grammar_pool(warm_up=warm_up),
+        metrics,
+        load_googletrans_languages(),
+        translation_cache=translation_cache,
+        audio_cache=audio_cache,
+        translation_memory=translation_memory,
+    )
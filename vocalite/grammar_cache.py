@@ -0,0 +1,175 @@
+"""Sentence-level grammar checking with cached results, so edits only re-check what changed."""
+import bisect
+import hashlib
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+
+from vocalite.chunking import assemble, split_sentences
+
+
+def apply_edits(text, edits):
+    """Applies (offset, length, replacement) edits left to right, skipping any that overlap an earlier one.
+
+    Mirrors language_tool_python.utils.correct, which applies each match's
+    first replacement.
+    """
+    pieces = []
+    pos = 0
+    for offset, length, replacement in sorted(edits):
+        if offset < pos:
+            continue
+        pieces.append(text[pos:offset])
+        pieces.append(replacement)
+        pos = offset + length
+    pieces.append(text[pos:])
+    return "".join(pieces)
+
+
+def sentence_key(sentence, lang_name):
+    return hashlib.sha1(f"{lang_name.lower()}\x1f{sentence}".encode("utf-8")).hexdigest()
+
+
+class IncrementalGrammar:
+    """Grammar backend that checks text sentence by sentence and caches each sentence's edits.
+
+    Wraps a grammar backend; when it has ``matches(text, lang_name)`` (as
+    LanguageToolGrammar does) the cached result per (sentence, language) is
+    its list of (offset, length, replacement) edits, otherwise it is the
+    backend's ``correct`` output for the sentence. Sentences missing from the
+    cache are checked in parallel on max_workers threads, and the corrected
+    text is rebuilt with the original whitespace.
+
+    Every check has a fixed cost, so with a backend that has ``matches``,
+    neighbouring uncached sentences are sent together in batches of up to
+    batch_chars characters and the edits are split back per sentence. A cold
+    document therefore costs about what one whole-text check does, spread over
+    the workers, while an edit re-checks only the sentence it touched.
+
+    Checks run on executor when one is given (it stays owned by the caller),
+    otherwise on a pool of max_workers threads that ``close`` shuts down.
+    """
+
+    def __init__(self, backend, max_workers=4, max_entries=8192, batch_chars=2000, executor=None):
+        self.backend = backend
+        self.max_workers = max_workers
+        self.batch_chars = batch_chars
+        self.max_entries = max_entries
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._owns_pool = executor is None
+        self._pool = executor or ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="grammar")
+        self._counters = {"sentences": 0, "hits": 0, "checked": 0}
+
+    def _check_sentence(self, sentence, lang_name):
+        corrected = self.backend.correct(sentence, lang_name)
+        return [] if corrected == sentence else [(0, len(sentence), corrected)]
+
+    def _check_batch(self, chunks, lang_name):
+        """Checks consecutive sentences in one call; returns the edits of each sentence."""
+        starts = []
+        text = ""
+        for i, chunk in enumerate(chunks):
+            starts.append(len(text))
+            text += chunk.text + (chunk.trailing if i < len(chunks) - 1 else "")
+        edits = [[] for _ in chunks]
+        for offset, length, replacement in self.backend.matches(text, lang_name):
+            i = bisect.bisect_right(starts, offset) - 1
+            start = starts[i]
+            # An edit reaching across a sentence boundary would not be found sentence by sentence either
+            if offset + length <= start + len(chunks[i].text):
+                edits[i].append((offset - start, length, replacement))
+        return edits
+
+    def _batches(self, keyed, missing):
+        """Groups the positions of uncached (key, chunk) pairs into runs of neighbours of at most batch_chars."""
+        batches = []
+        seen = set()
+        previous = None
+        size = 0
+        for position, (key, chunk) in enumerate(keyed):
+            if key not in missing or key in seen:
+                previous = None
+                continue
+            seen.add(key)
+            if previous == position - 1 and size + len(chunk.text) <= self.batch_chars:
+                batches[-1].append(position)
+                size += len(chunk.text) + len(chunk.trailing)
+            else:
+                batches.append([position])
+                size = len(chunk.text) + len(chunk.trailing)
+            previous = position
+        return batches
+
+    def _get(self, key):
+        with self._lock:
+            edits = self._cache.get(key)
+            if edits is not None:
+                self._cache.move_to_end(key)
+            return edits
+
+    def _put(self, key, edits):
+        with self._lock:
+            self._cache[key] = edits
+            self._cache.move_to_end(key)
+            while len(self._cache) > self.max_entries:
+                self._cache.popitem(last=False)
+
+    def check(self, text, lang_name):
+        """Returns (prefix, sentence chunks, per-sentence edits) for text."""
+        prefix, chunks = split_sentences(text)
+        keys = [sentence_key(chunk.text, lang_name) for chunk in chunks]
+        edits = {key: self._get(key) for key in keys}
+        # A sentence repeated in the text is checked once
+        missing = {key: chunk.text for key, chunk in zip(keys, chunks) if edits[key] is None}
+        if hasattr(self.backend, "matches"):
+            batches = self._batches(list(zip(keys, chunks)), missing)
+            futures = [(batch, self._pool.submit(self._check_batch, [chunks[i] for i in batch], lang_name))
+                       for batch in batches]
+            for batch, future in futures:
+                for position, sentence_edits in zip(batch, future.result()):
+                    edits[keys[position]] = sentence_edits
+                    self._put(keys[position], sentence_edits)
+        else:
+            futures = {key: self._pool.submit(self._check_sentence, sentence, lang_name)
+                       for key, sentence in missing.items()}
+            for key, future in futures.items():
+                edits[key] = future.result()
+                self._put(key, edits[key])
+        with self._lock:
+            self._counters["sentences"] += len(keys)
+            self._counters["checked"] += len(missing)
+            self._counters["hits"] += len(keys) - sum(1 for key in keys if key in missing)
+        return prefix, chunks, [edits[key] for key in keys]
+
+    def matches(self, text, lang_name):
+        """Returns the edits for the whole text, with offsets into text."""
+        prefix, chunks, per_sentence = self.check(text, lang_name)
+        result = []
+        offset = len(prefix)
+        for chunk, edits in zip(chunks, per_sentence):
+            result.extend((offset + start, length, replacement) for start, length, replacement in edits)
+            offset += len(chunk.text) + len(chunk.trailing)
+        return result
+
+    def correct(self, text, lang_name):
+        prefix, chunks, per_sentence = self.check(text, lang_name)
+        corrected = [apply_edits(chunk.text, edits) for chunk, edits in zip(chunks, per_sentence)]
+        return assemble(prefix, chunks, corrected)
+
+    def stats(self):
+        """Returns sentence counters, the share served from cache and the cache size."""
+        with self._lock:
+            stats = dict(self._counters)
+            stats["entries"] = len(self._cache)
+        stats["hit_rate"] = stats["hits"] / stats["sentences"] if stats["sentences"] else 0.0
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._cache.clear()
+
+    def close(self):
+        """Shuts down the worker pool, unless it was passed in."""
+        if self._owns_pool:
+            self._pool.shutdown(wait=False)
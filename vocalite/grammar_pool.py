@@ -0,0 +1,207 @@
+"""Process-wide pool of warm LanguageTool instances, one per language."""
+import threading
+import time
+from contextlib import contextmanager
+
+
+def create_language_tool(lang_code):
+    """Starts a LanguageTool instance for lang_code."""
+    import language_tool_python
+
+    return language_tool_python.LanguageTool(lang_code)
+
+
+class PoolExhausted(RuntimeError):
+    """Raised when every pooled tool is busy and none frees up before the timeout."""
+
+
+class _Slot:
+    """A pooled tool plus its bookkeeping."""
+
+    def __init__(self):
+        self.tool = None
+        self.error = None
+        self.ready = threading.Event()
+        self.in_use = 0
+        self.last_used = time.monotonic()
+
+
+class LanguageToolPool:
+    """Keeps at most max_instances LanguageTool servers alive, evicting the least recently used.
+
+    A checked-out tool may be shared by several threads at once: LanguageTool talks
+    to its local server over HTTP, so concurrent checks against one instance are
+    safe. A tool is never closed while a checkout holds it.
+    """
+
+    def __init__(self, factory=create_language_tool, max_instances=3, idle_timeout=15 * 60,
+                 checkout_timeout=60):
+        self.factory = factory
+        self.max_instances = max_instances
+        self.idle_timeout = idle_timeout
+        self.checkout_timeout = checkout_timeout
+
+        self._slots = {}
+        self._cond = threading.Condition()
+        self._reaper = None
+        self._reaper_stop = threading.Event()
+        self._counters = {"hits": 0, "starts": 0, "start_errors": 0, "evictions": 0}
+
+    def _evict_one_locked(self):
+        """Removes the least recently used idle slot; returns the closed tool or None."""
+        idle = [(slot.last_used, code) for code, slot in self._slots.items()
+                if slot.in_use == 0 and slot.ready.is_set()]
+        if not idle:
+            return None
+        _, code = min(idle)
+        slot = self._slots.pop(code)
+        self._counters["evictions"] += 1
+        return slot.tool
+
+    def _acquire(self, lang_code):
+        deadline = time.monotonic() + self.checkout_timeout
+        to_close = []
+        with self._cond:
+            while True:
+                slot = self._slots.get(lang_code)
+                if slot is not None:
+                    slot.in_use += 1
+                    creator = False
+                    break
+                if len(self._slots) < self.max_instances:
+                    slot = _Slot()
+                    slot.in_use = 1
+                    self._slots[lang_code] = slot
+                    creator = True
+                    break
+                evicted = self._evict_one_locked()
+                if evicted is not None:
+                    to_close.append(evicted)
+                    continue
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    raise PoolExhausted(f"No LanguageTool slot free for {lang_code}")
+                self._cond.wait(remaining)
+        for evicted in to_close:
+            _close_quietly(evicted)
+
+        if creator:
+            try:
+                slot.tool = self.factory(lang_code)
+                with self._cond:
+                    self._counters["starts"] += 1
+            except Exception as e:
+                slot.error = e
+                with self._cond:
+                    self._counters["start_errors"] += 1
+                    self._slots.pop(lang_code, None)
+                    self._cond.notify_all()
+            finally:
+                slot.ready.set()
+        else:
+            slot.ready.wait()
+            if slot.error is None:
+                with self._cond:
+                    self._counters["hits"] += 1
+
+        if slot.error is not None:
+            raise slot.error
+        return slot
+
+    def _release(self, slot):
+        with self._cond:
+            slot.in_use -= 1
+            slot.last_used = time.monotonic()
+            self._cond.notify_all()
+
+    @contextmanager
+    def checkout(self, lang_code):
+        """Yields a warm LanguageTool for lang_code, starting one if needed."""
+        slot = self._acquire(lang_code)
+        try:
+            yield slot.tool
+        finally:
+            self._release(slot)
+
+    def warm_up(self, lang_codes, background=True):
+        """Starts tools for lang_codes ahead of the first request."""
+        def run():
+            for lang_code in lang_codes:
+                try:
+                    with self.checkout(lang_code):
+                        pass
+                except Exception:
+                    # Counted in start_errors; the next checkout retries
+                    pass
+
+        if background:
+            thread = threading.Thread(target=run, name="languagetool-warmup", daemon=True)
+            thread.start()
+            return thread
+        run()
+        return None
+
+    def evict_idle(self):
+        """Closes tools that have not been used for idle_timeout seconds."""
+        cutoff = time.monotonic() - self.idle_timeout
+        to_close = []
+        with self._cond:
+            for code, slot in list(self._slots.items()):
+                if slot.in_use == 0 and slot.ready.is_set() and slot.last_used < cutoff:
+                    to_close.append(self._slots.pop(code).tool)
+                    self._counters["evictions"] += 1
+            self._cond.notify_all()
+        for tool in to_close:
+            _close_quietly(tool)
+        return len(to_close)
+
+    def start_reaper(self, interval=60):
+        """Runs evict_idle every interval seconds on a daemon thread until stop_reaper or close."""
+        if self._reaper is not None and self._reaper.is_alive():
+            return self._reaper
+        self._reaper_stop.clear()
+
+        def run():
+            while not self._reaper_stop.wait(interval):
+                self.evict_idle()
+
+        self._reaper = threading.Thread(target=run, name="languagetool-reaper", daemon=True)
+        self._reaper.start()
+        return self._reaper
+
+    def stop_reaper(self, timeout=None):
+        """Stops the reaper thread, waiting up to timeout seconds for it to exit."""
+        self._reaper_stop.set()
+        reaper = self._reaper
+        if reaper is not None and reaper is not threading.current_thread():
+            reaper.join(timeout)
+        self._reaper = None
+
+    def stats(self):
+        """Returns pool counters and the languages currently loaded."""
+        with self._cond:
+            stats = dict(self._counters)
+            stats["live"] = sorted(code for code, slot in self._slots.items() if slot.tool is not None)
+            stats["in_use"] = sum(slot.in_use for slot in self._slots.values())
+        stats["max_instances"] = self.max_instances
+        return stats
+
+    def close(self):
+        """Stops the reaper and closes every idle tool."""
+        self.stop_reaper()
+        to_close = []
+        with self._cond:
+            for code, slot in list(self._slots.items()):
+                if slot.in_use == 0 and slot.ready.is_set():
+                    to_close.append(self._slots.pop(code).tool)
+        for tool in to_close:
+            _close_quietly(tool)
+
+
+def _close_quietly(tool):
+    if tool is None:
+        return
+    try:
+        tool.close()
+    except Exception:
+        pass
@@ -0,0 +1,260 @@
+"""Persistent translation history in SQLite with a full-text index."""
+import csv
+import io
+import json
+import os
+import sqlite3
+import threading
+import time
+
+HISTORY_FIELDS = ["id", "created", "time", "src_lang", "dest_lang", "original", "corrected", "translated"]
+
+
+def fts_query(text):
+    """Turns free text into an FTS5 query: every word must match as a prefix."""
+    terms = [term.replace('"', '""') for term in text.split()]
+    return " ".join(f'"{term}"*' for term in terms)
+
+
+class HistoryStore:
+    """Append-only translation history with keyset pagination, search, filters and export.
+
+    Entries belong to an ``owner`` (one browser, in the app) and are listed
+    newest first. Pagination uses the last seen id as a cursor, so every page
+    costs the same however deep it is. Search uses an FTS5 index over the
+    original, corrected and translated text when SQLite has FTS5, and falls
+    back to LIKE scans otherwise.
+    """
+
+    def __init__(self, db_path=None):
+        if db_path and db_path != ":memory:":
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(db_path or ":memory:", check_same_thread=False)
+        self._db.row_factory = sqlite3.Row
+        self._lock = threading.Lock()
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS history (
+                    id INTEGER PRIMARY KEY,
+                    owner TEXT NOT NULL,
+                    created REAL NOT NULL,
+                    time TEXT NOT NULL,
+                    src_lang TEXT NOT NULL,
+                    dest_lang TEXT NOT NULL,
+                    original TEXT NOT NULL,
+                    corrected TEXT,
+                    translated TEXT NOT NULL
+                )
+                """
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_history_owner ON history (owner, id)")
+            self._db.execute(
+                "CREATE INDEX IF NOT EXISTS idx_history_pair ON history (owner, src_lang, dest_lang, id)"
+            )
+            # Per-pair counts for the filter picker, kept by triggers so listing them never scans history
+            self._db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS history_pairs (
+                    owner TEXT NOT NULL,
+                    src_lang TEXT NOT NULL,
+                    dest_lang TEXT NOT NULL,
+                    n INTEGER NOT NULL,
+                    PRIMARY KEY (owner, src_lang, dest_lang)
+                )
+                """
+            )
+            self._db.execute(
+                """
+                CREATE TRIGGER IF NOT EXISTS history_pairs_insert AFTER INSERT ON history BEGIN
+                    INSERT INTO history_pairs (owner, src_lang, dest_lang, n)
+                    VALUES (new.owner, new.src_lang, new.dest_lang, 1)
+                    ON CONFLICT (owner, src_lang, dest_lang) DO UPDATE SET n = n + 1;
+                END
+                """
+            )
+            self._db.execute(
+                """
+                CREATE TRIGGER IF NOT EXISTS history_pairs_delete AFTER DELETE ON history BEGIN
+                    UPDATE history_pairs SET n = n - 1
+                    WHERE owner = old.owner AND src_lang = old.src_lang AND dest_lang = old.dest_lang;
+                END
+                """
+            )
+            self.fts = self._create_fts()
+
+    def _create_fts(self):
+        try:
+            self._db.execute(
+                """
+                CREATE VIRTUAL TABLE IF NOT EXISTS history_fts USING fts5(
+                    original, corrected, translated,
+                    content='history', content_rowid='id', tokenize='unicode61 remove_diacritics 2'
+                )
+                """
+            )
+        except sqlite3.OperationalError:
+            return False
+        # External-content index: keep it in step with the table
+        self._db.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS history_fts_insert AFTER INSERT ON history BEGIN
+                INSERT INTO history_fts (rowid, original, corrected, translated)
+                VALUES (new.id, new.original, coalesce(new.corrected, ''), new.translated);
+            END
+            """
+        )
+        self._db.execute(
+            """
+            CREATE TRIGGER IF NOT EXISTS history_fts_delete AFTER DELETE ON history BEGIN
+                INSERT INTO history_fts (history_fts, rowid, original, corrected, translated)
+                VALUES ('delete', old.id, old.original, coalesce(old.corrected, ''), old.translated);
+            END
+            """
+        )
+        return True
+
+    # ---- Writes ----
+    def append(self, item, owner=""):
+        """Stores a history item (as built by build_history_item) and returns its id."""
+        return self.extend([item], owner)[-1]
+
+    def extend(self, items, owner=""):
+        """Stores several history items in one transaction and returns their ids."""
+        now = time.time()
+        rows = [
+            (owner, item.get("created", now), item.get("time", ""), item["src_lang"], item["dest_lang"],
+             item["original"], item.get("corrected"), item["translated"])
+            for item in items
+        ]
+        ids = []
+        with self._lock, self._db:
+            for row in rows:
+                cursor = self._db.execute(
+                    "INSERT INTO history (owner, created, time, src_lang, dest_lang, original, corrected, translated)"
+                    " VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    row,
+                )
+                ids.append(cursor.lastrowid)
+        return ids
+
+    def clear(self, owner=""):
+        """Deletes every entry of owner."""
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM history WHERE owner = ?", (owner,))
+
+    # ---- Reads ----
+    def _where(self, owner, query, src_lang, dest_lang, before_id):
+        """Returns (source, where, params, order column) for a listing or count."""
+        clauses = ["h.owner = ?"]
+        params = [owner]
+        source = "history h"
+        order = "h.id"
+        if query and query.split():
+            if self.fts:
+                # CROSS JOIN keeps the index as the outer loop, so rare terms touch only their
+                # matches and common ones stop after one page (FTS5 walks rowids in order)
+                source = "history_fts f CROSS JOIN history h ON h.id = f.rowid"
+                order = "f.rowid"
+                clauses.append("history_fts MATCH ?")
+                params.append(fts_query(query))
+            else:
+                clauses.append("(h.original LIKE ? OR h.corrected LIKE ? OR h.translated LIKE ?)")
+                params.extend([f"%{query.strip()}%"] * 3)
+        if src_lang:
+            clauses.append("h.src_lang = ?")
+            params.append(src_lang)
+        if dest_lang:
+            clauses.append("h.dest_lang = ?")
+            params.append(dest_lang)
+        if before_id is not None:
+            clauses.append(f"{order} < ?")
+            params.append(before_id)
+        return source, " AND ".join(clauses), params, order
+
+    def page(self, owner="", limit=10, before_id=None, query=None, src_lang=None, dest_lang=None):
+        """Returns (items, next_cursor) for the newest entries older than before_id.
+
+        next_cursor is the before_id for the following page, or None on the last page.
+        """
+        source, where, params, order = self._where(owner, query, src_lang, dest_lang, before_id)
+        with self._lock:
+            rows = self._db.execute(
+                f"SELECT h.* FROM {source} WHERE {where} ORDER BY {order} DESC LIMIT ?",
+                params + [limit + 1],
+            ).fetchall()
+        items = [self._item(row) for row in rows[:limit]]
+        next_cursor = items[-1]["id"] if len(rows) > limit else None
+        return items, next_cursor
+
+    def count(self, owner="", query=None, src_lang=None, dest_lang=None):
+        source, where, params, _ = self._where(owner, query, src_lang, dest_lang, None)
+        with self._lock:
+            return self._db.execute(f"SELECT count(*) FROM {source} WHERE {where}", params).fetchone()[0]
+
+    def language_pairs(self, owner=""):
+        """Returns [(src_lang, dest_lang, count)] for owner, most used first."""
+        with self._lock:
+            rows = self._db.execute(
+                "SELECT src_lang, dest_lang, n FROM history_pairs WHERE owner = ? AND n > 0 ORDER BY n DESC",
+                (owner,),
+            ).fetchall()
+        return [(row["src_lang"], row["dest_lang"], row["n"]) for row in rows]
+
+    def iter_items(self, owner="", query=None, src_lang=None, dest_lang=None, batch_size=1000):
+        """Yields matching entries newest first, fetching batch_size rows at a time."""
+        cursor = None
+        while True:
+            items, cursor = self.page(owner, batch_size, cursor, query, src_lang, dest_lang)
+            yield from items
+            if cursor is None:
+                return
+
+    def iter_all(self, batch_size=1000):
+        """Yields (owner, entry) for every owner's entries oldest first, for bulk consumers such as the translation memory."""
+        last_id = 0
+        while True:
+            with self._lock:
+                rows = self._db.execute(
+                    "SELECT * FROM history WHERE id > ? ORDER BY id LIMIT ?", (last_id, batch_size)
+                ).fetchall()
+            if not rows:
+                return
+            yield from ((row["owner"], self._item(row)) for row in rows)
+            last_id = rows[-1]["id"]
+
+    def export(self, fmt="jsonl", owner="", query=None, src_lang=None, dest_lang=None):
+        """Renders matching entries as JSON lines or CSV text."""
+        items = self.iter_items(owner, query, src_lang, dest_lang)
+        buffer = io.StringIO()
+        if fmt == "csv":
+            writer = csv.DictWriter(buffer, fieldnames=HISTORY_FIELDS, lineterminator="\n")
+            writer.writeheader()
+            writer.writerows(items)
+        else:
+            for item in items:
+                buffer.write(json.dumps(item, ensure_ascii=False) + "\n")
+        return buffer.getvalue()
+
+    @staticmethod
+    def _item(row):
+        item = {
+            "id": row["id"],
+            "created": row["created"],
+            "time": row["time"],
+            "src_lang": row["src_lang"],
+            "dest_lang": row["dest_lang"],
+            "original": row["original"],
+            "translated": row["translated"],
+        }
+        if row["corrected"]:
+            item["corrected"] = row["corrected"]
+        return item
+
+    def close(self):
+        with self._lock:
+            self._db.close()
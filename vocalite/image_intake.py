@@ -0,0 +1,146 @@
+"""Decode-once image intake: uploads are decoded by content hash and cropped on a bounded preview."""
+import hashlib
+import io
+import threading
+from collections import OrderedDict
+
+from PIL import Image, ImageOps
+
+# The cropper draws on a canvas at most 700 px on a side, so a preview this size is shown as is
+DEFAULT_PREVIEW_SIDE = 700
+
+EXIF_ORIENTATION = 0x0112
+
+
+def upload_key(data):
+    """Returns the content address of uploaded image bytes."""
+    return hashlib.sha256(data).hexdigest()
+
+
+def decode_upload(data, draft_side=None):
+    """Decodes image bytes upright according to their EXIF orientation; returns (image, full upright size).
+
+    With draft_side, a JPEG is decoded at the largest DCT reduction (1/2, 1/4
+    or 1/8) that keeps both sides at least draft_side, which is much faster
+    and smaller than a full decode; other formats are decoded in full.
+    """
+    with Image.open(io.BytesIO(data)) as image:
+        size = image.size
+        if image.getexif().get(EXIF_ORIENTATION, 1) in (5, 6, 7, 8):
+            size = size[::-1]
+        if draft_side:
+            image.draft(image.mode, (draft_side, draft_side))
+        # Returns a loaded copy, so nothing keeps a reference to the upload buffer
+        return ImageOps.exif_transpose(image), size
+
+
+def make_preview(image, side=DEFAULT_PREVIEW_SIDE):
+    """Returns image scaled down to fit side x side, or image itself when it already fits."""
+    scale = side / max(image.size)
+    if scale >= 1:
+        return image
+    size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+    return image.resize(size, Image.LANCZOS, reducing_gap=3.0)
+
+
+def image_bytes(image):
+    return image.width * image.height * len(image.getbands())
+
+
+class IntakeImage:
+    """An upload's bytes and upright preview; crop boxes drawn on the preview map back onto the original.
+
+    Only the preview stays decoded. The full-resolution original is decoded
+    when a crop of it is needed for OCR, and not kept.
+    """
+
+    def __init__(self, key, data, preview_side=DEFAULT_PREVIEW_SIDE):
+        self.key = key
+        self.data = data
+        decoded, self.size = decode_upload(data, draft_side=preview_side)
+        self.preview = make_preview(decoded, preview_side)
+        self.scale_x = self.size[0] / self.preview.width
+        self.scale_y = self.size[1] / self.preview.height
+        self.nbytes = len(data) + image_bytes(self.preview)
+
+    @staticmethod
+    def _bounds(box, scale_x, scale_y, size):
+        """Turns a {left, top, width, height} box into a (left, top, right, bottom) tuple clamped to size."""
+        left = min(max(0, round(box["left"] * scale_x)), size[0] - 1)
+        top = min(max(0, round(box["top"] * scale_y)), size[1] - 1)
+        right = min(size[0], max(left + 1, round((box["left"] + box["width"]) * scale_x)))
+        bottom = min(size[1], max(top + 1, round((box["top"] + box["height"]) * scale_y)))
+        return left, top, right, bottom
+
+    def original_box(self, box):
+        """Maps a box in preview pixels to (left, top, right, bottom) in original pixels."""
+        return self._bounds(box, self.scale_x, self.scale_y, self.size)
+
+    def original(self):
+        """Decodes the full-resolution upright original."""
+        return decode_upload(self.data)[0]
+
+    def crop(self, box):
+        """Crops the full-resolution original with a box drawn on the preview, for OCR."""
+        return self.original().crop(self.original_box(box))
+
+    def crop_preview(self, box):
+        """Crops the preview, for showing the selection."""
+        return self.preview.crop(self._bounds(box, 1, 1, self.preview.size))
+
+
+class ImageIntake:
+    """Keeps uploads and their decoded previews under a byte budget, keyed by the hash of their bytes.
+
+    Reruns that see the same upload get the same IntakeImage back without
+    decoding it again; the least recently used ones are dropped once their
+    bytes and preview pixels exceed max_bytes.
+    """
+
+    def __init__(self, max_bytes=256 * 1024 * 1024, preview_side=DEFAULT_PREVIEW_SIDE):
+        self.max_bytes = max_bytes
+        self.preview_side = preview_side
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0, "evictions": 0}
+
+    def get(self, data):
+        """Returns the IntakeImage for uploaded image bytes, decoding them on first sight."""
+        key = upload_key(data)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self._counters["hits"] += 1
+                return entry
+            self._counters["misses"] += 1
+        entry = IntakeImage(key, data, self.preview_side)
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= previous.nbytes
+            self._entries[key] = entry
+            self._size += entry.nbytes
+            # The newest image stays even when it alone is over budget: the session is using it
+            while self._size > self.max_bytes and len(self._entries) > 1:
+                _, old = self._entries.popitem(last=False)
+                self._size -= old.nbytes
+                self._counters["evictions"] += 1
+        return entry
+
+    def stats(self):
+        """Returns hit/miss counters and the bytes held."""
+        with self._lock:
+            stats = dict(self._counters)
+            stats["entries"] = len(self._entries)
+            stats["bytes"] = self._size
+        stats["max_bytes"] = self.max_bytes
+        lookups = stats["hits"] + stats["misses"]
+        stats["hit_rate"] = stats["hits"] / lookups if lookups else 0.0
+        return stats
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
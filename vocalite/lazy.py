@@ -0,0 +1,112 @@
+"""Lazily imported, background-warmable backends plus a startup timing registry."""
+import importlib
+import importlib.util
+import os
+import threading
+import time
+
+# name -> {"import_s", "init_s", "state", "error"} for every LazyBackend created in this process
+_STARTUP = {}
+_STARTUP_LOCK = threading.Lock()
+
+
+def _record(name, **values):
+    with _STARTUP_LOCK:
+        _STARTUP.setdefault(name, {"import_s": None, "init_s": None, "state": "idle", "error": None})
+        _STARTUP[name].update(values)
+
+
+def startup_report():
+    """Returns import/init timings and state for every lazy backend seen so far."""
+    with _STARTUP_LOCK:
+        return {name: dict(entry) for name, entry in _STARTUP.items()}
+
+
+class LazyBackend:
+    """Imports its modules and builds its backend on first use, timing both steps.
+
+    Attribute access is forwarded to the built backend, so a LazyBackend can be
+    handed to the pipeline wherever the real backend is expected. ``warm_up``
+    does the same work on a daemon thread so the first real call finds it ready.
+    """
+
+    def __init__(self, name, build, modules=()):
+        self._name = name
+        self._build = build
+        self._modules = modules
+        self._backend = None
+        self._lock = threading.Lock()
+        _record(name)
+
+    @property
+    def ready(self):
+        return self._backend is not None
+
+    def get(self):
+        """Returns the backend, importing and building it if this is the first use."""
+        if self._backend is not None:
+            return self._backend
+        with self._lock:
+            if self._backend is None:
+                _record(self._name, state="loading")
+                try:
+                    start = time.perf_counter()
+                    for module in self._modules:
+                        importlib.import_module(module)
+                    imported = time.perf_counter()
+                    backend = self._build()
+                    _record(self._name, import_s=imported - start, init_s=time.perf_counter() - imported,
+                            state="ready", error=None)
+                except Exception as e:
+                    _record(self._name, state="failed", error=str(e))
+                    raise
+                self._backend = backend
+        return self._backend
+
+    def warm_up(self):
+        """Builds the backend on a daemon thread unless it is already built or building."""
+        if self._backend is not None or self._lock.locked():
+            return None
+
+        def run():
+            try:
+                self.get()
+            except Exception:
+                # Recorded in the startup report; the next real use retries
+                pass
+
+        thread = threading.Thread(target=run, name=f"warmup-{self._name}", daemon=True)
+        thread.start()
+        return thread
+
+    def __getattr__(self, attr):
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        return getattr(self.get(), attr)
+
+
+def unwrap(backend):
+    """Returns the real backend behind a LazyBackend (needed before pickling it)."""
+    return backend.get() if isinstance(backend, LazyBackend) else backend
+
+
+def load_googletrans_languages():
+    """Returns googletrans.LANGUAGES without importing googletrans (and its HTTP stack).
+
+    The language table lives in googletrans/constants.py, which has no imports of
+    its own, so it is loaded straight from the installed package.
+    """
+    start = time.perf_counter()
+    spec = importlib.util.find_spec("googletrans")
+    languages = None
+    if spec is not None and spec.origin:
+        path = os.path.join(os.path.dirname(spec.origin), "constants.py")
+        constants_spec = importlib.util.spec_from_file_location("_vocalite_googletrans_constants", path)
+        if constants_spec is not None and os.path.exists(path):
+            module = importlib.util.module_from_spec(constants_spec)
+            constants_spec.loader.exec_module(module)
+            languages = getattr(module, "LANGUAGES", None)
+    if languages is None:
+        from googletrans import LANGUAGES as languages
+    _record("languages", import_s=time.perf_counter() - start, init_s=0.0, state="ready")
+    return languages
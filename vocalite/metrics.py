@@ -0,0 +1,226 @@
+"""Low-overhead stage timing, counters and latency histograms with Prometheus/JSON-lines export."""
+import json
+import threading
+import time
+from contextlib import contextmanager
+
+# Histogram upper bounds in seconds (Prometheus "le" buckets); +Inf is implicit
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+
+def _label_key(labels):
+    return tuple(sorted((k, str(v)) for k, v in labels.items() if v is not None))
+
+
+def _format_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ""
+    escaped = ",".join(f'{k}="{str(v).replace(chr(92), chr(92) * 2).replace(chr(34), chr(92) + chr(34))}"'
+                       for k, v in pairs)
+    return "{" + escaped + "}"
+
+
+class _Histogram:
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, seconds):
+        index = 0
+        for bound in LATENCY_BUCKETS:
+            if seconds <= bound:
+                break
+            index += 1
+        self.counts[index] += 1
+        self.sum += seconds
+        self.count += 1
+
+    def quantile(self, q):
+        """Estimates a quantile by interpolating within the bucket that contains it."""
+        if not self.count:
+            return 0.0
+        target = q * self.count
+        seen = 0
+        lower = 0.0
+        for index, bucket_count in enumerate(self.counts):
+            upper = LATENCY_BUCKETS[index] if index < len(LATENCY_BUCKETS) else LATENCY_BUCKETS[-1]
+            if seen + bucket_count >= target and bucket_count:
+                return lower + (upper - lower) * (target - seen) / bucket_count
+            seen += bucket_count
+            lower = upper
+        return LATENCY_BUCKETS[-1]
+
+
+class Metrics:
+    """Process-wide registry of stage calls, errors, latencies and custom counters.
+
+    Every update is a dict lookup and a few additions under one lock, cheap
+    enough to leave on for every request. Collectors are callables returning
+    ``{name: {label_tuple: value}}`` gauges that are read only at export time
+    (used for cache statistics that are tracked elsewhere).
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters = {}
+        self._histograms = {}
+        self._collectors = []
+
+    @contextmanager
+    def timed(self, stage, **labels):
+        """Times the block as one call of stage, counting an error if it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.observe(stage, time.perf_counter() - start, error=True, **labels)
+            raise
+        self.observe(stage, time.perf_counter() - start, **labels)
+
+    def observe(self, stage, seconds, error=False, **labels):
+        """Records one call of stage that took seconds."""
+        key = (stage, _label_key(labels))
+        with self._lock:
+            histogram = self._histograms.get(key)
+            if histogram is None:
+                histogram = self._histograms[key] = _Histogram()
+            histogram.observe(seconds)
+            if error:
+                error_key = ("stage_errors", key[1] + (("stage", stage),))
+                self._counters[error_key] = self._counters.get(error_key, 0) + 1
+
+    def inc(self, name, amount=1, **labels):
+        """Adds amount to a counter."""
+        key = (name, _label_key(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0) + amount
+
+    def add_collector(self, collector):
+        """Registers a callable whose gauges are included in every export."""
+        self._collectors.append(collector)
+
+    def stage_summary(self, by_labels=False):
+        """Returns calls, errors and latency estimates per stage (optionally per label set)."""
+        with self._lock:
+            histograms = {key: (list(h.counts), h.sum, h.count, h.quantile(0.5), h.quantile(0.95), h.quantile(0.99))
+                          for key, h in self._histograms.items()}
+            errors = {key: value for key, value in self._counters.items() if key[0] == "stage_errors"}
+        summary = {}
+        for (stage, labels), (_, total, count, p50, p95, p99) in histograms.items():
+            name = stage if not by_labels or not labels else f"{stage} {dict(labels)}"
+            entry = summary.setdefault(name, {"calls": 0, "errors": 0, "sum_s": 0.0, "p50_s": 0.0,
+                                              "p95_s": 0.0, "p99_s": 0.0})
+            entry["calls"] += count
+            entry["sum_s"] += total
+            entry["errors"] += errors.get(("stage_errors", labels + (("stage", stage),)), 0)
+            # When merging label sets, report the slowest label set's percentiles
+            entry["p50_s"] = max(entry["p50_s"], p50)
+            entry["p95_s"] = max(entry["p95_s"], p95)
+            entry["p99_s"] = max(entry["p99_s"], p99)
+        for entry in summary.values():
+            entry["mean_s"] = entry["sum_s"] / entry["calls"] if entry["calls"] else 0.0
+        return summary
+
+    def _collected(self):
+        gauges = {}
+        for collector in self._collectors:
+            try:
+                for name, series in collector().items():
+                    gauges.setdefault(name, {}).update(series)
+            except Exception:
+                continue
+        return gauges
+
+    def to_prometheus(self, prefix="vocalite"):
+        """Renders every metric in the Prometheus text exposition format."""
+        with self._lock:
+            counters = dict(self._counters)
+            histograms = {key: (list(h.counts), h.sum, h.count) for key, h in self._histograms.items()}
+        lines = []
+
+        by_name = {}
+        for (name, labels), value in counters.items():
+            by_name.setdefault(name, []).append((labels, value))
+        for name, series in sorted(by_name.items()):
+            lines.append(f"# TYPE {prefix}_{name}_total counter")
+            for labels, value in sorted(series):
+                lines.append(f"{prefix}_{name}_total{_format_labels(labels)} {value}")
+
+        metric = f"{prefix}_stage_duration_seconds"
+        lines.append(f"# TYPE {metric} histogram")
+        for (stage, labels), (counts, total, count) in sorted(histograms.items()):
+            key = (("stage", stage),) + labels
+            cumulative = 0
+            for bound, bucket_count in zip(LATENCY_BUCKETS + (float("inf"),), counts):
+                cumulative += bucket_count
+                le = "+Inf" if bound == float("inf") else repr(bound)
+                lines.append(f"{metric}_bucket{_format_labels(key, (('le', le),))} {cumulative}")
+            lines.append(f"{metric}_sum{_format_labels(key)} {total}")
+            lines.append(f"{metric}_count{_format_labels(key)} {count}")
+
+        for name, series in sorted(self._collected().items()):
+            lines.append(f"# TYPE {prefix}_{name} gauge")
+            for labels, value in sorted(series.items()):
+                lines.append(f"{prefix}_{name}{_format_labels(labels)} {value}")
+        return "\n".join(lines) + "\n"
+
+    def snapshot(self):
+        """Returns a JSON-serializable view of every metric."""
+        with self._lock:
+            counters = [{"name": name, "labels": dict(labels), "value": value}
+                        for (name, labels), value in self._counters.items()]
+        gauges = [{"name": name, "labels": dict(labels), "value": value}
+                  for name, series in self._collected().items() for labels, value in series.items()]
+        return {
+            "time": time.time(),
+            "stages": self.stage_summary(by_labels=True),
+            "counters": counters,
+            "gauges": gauges,
+        }
+
+
+class JsonLinesExporter:
+    """Appends a metrics snapshot to a JSON-lines file every interval seconds."""
+
+    def __init__(self, metrics, path, interval=60):
+        self.metrics = metrics
+        self.path = path
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread = None
+
+    def write_once(self):
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps(self.metrics.snapshot(), ensure_ascii=False) + "\n")
+
+    def start(self):
+        def run():
+            while not self._stop.wait(self.interval):
+                try:
+                    self.write_once()
+                except OSError:
+                    continue
+
+        self._thread = threading.Thread(target=run, name="metrics-jsonl", daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._stop.set()
+
+
+def cache_collector(name, cache):
+    """Builds a collector exposing a cache's numeric stats() values as gauges."""
+    def collect():
+        stats = cache.stats()
+        return {
+            f"cache_{key}": {(("cache", name),): value}
+            for key, value in stats.items()
+            if isinstance(value, (int, float)) and not isinstance(value, bool)
+        }
+
+    return collect
@@ -0,0 +1,154 @@
+"""OCR preprocessing (grayscale, DPI-normalizing resize, adaptive threshold, deskew) and a result cache."""
+import hashlib
+import threading
+import time
+from collections import OrderedDict
+
+from PIL import Image, ImageChops, ImageFilter, ImageOps
+
+# Pixel density assumed when an image carries no DPI metadata (phone photos, screenshots)
+DEFAULT_SOURCE_DPI = 150
+
+
+def normalize_resolution(image, target_dpi=300, min_side=600, max_side=2400):
+    """Resizes toward target_dpi, keeping the long side within [min_side, max_side]."""
+    source_dpi = image.info.get("dpi", (DEFAULT_SOURCE_DPI,))[0] or DEFAULT_SOURCE_DPI
+    scale = target_dpi / float(source_dpi)
+    long_side = max(image.size)
+    if long_side * scale > max_side:
+        scale = max_side / long_side
+    elif long_side * scale < min_side:
+        scale = min_side / long_side
+    if abs(scale - 1) < 0.05:
+        return image
+    size = (max(1, round(image.width * scale)), max(1, round(image.height * scale)))
+    return image.resize(size, Image.LANCZOS if scale < 1 else Image.BICUBIC)
+
+
+def adaptive_threshold(gray, radius=15, offset=10):
+    """Binarizes a grayscale image against its local mean, which copes with uneven lighting."""
+    local_mean = gray.filter(ImageFilter.BoxBlur(radius))
+    # Pixels darker than the local mean by more than offset become ink
+    darker = ImageChops.subtract(local_mean, gray)
+    return darker.point(lambda v: 0 if v > offset else 255)
+
+
+def estimate_skew(binary, max_angle=5.0, step=0.5, sample_side=800):
+    """Estimates page skew in degrees by maximizing the variance of the row ink profile."""
+    sample = binary
+    if max(binary.size) > sample_side:
+        scale = sample_side / max(binary.size)
+        sample = binary.resize((max(1, round(binary.width * scale)), max(1, round(binary.height * scale))))
+    inverted = ImageOps.invert(sample)
+
+    best_angle = 0.0
+    best_score = -1.0
+    angle = -max_angle
+    while angle <= max_angle + 1e-9:
+        rotated = inverted.rotate(angle, resample=Image.BILINEAR, expand=True, fillcolor=0)
+        # Averaging each row down to one pixel gives the horizontal projection profile
+        rows = list(rotated.resize((1, rotated.height), Image.BOX).getdata())
+        mean = sum(rows) / len(rows)
+        score = sum((v - mean) ** 2 for v in rows)
+        if score > best_score:
+            best_score = score
+            best_angle = angle
+        angle += step
+    return best_angle
+
+
+def preprocess(image, grayscale=True, threshold=True, target_dpi=300, min_side=600, max_side=2400,
+               deskew=False, timings=None):
+    """Prepares an image for Tesseract; stage durations are added to timings if given."""
+    def timed(name, fn, *args):
+        start = time.perf_counter()
+        result = fn(*args)
+        if timings is not None:
+            timings[name] = time.perf_counter() - start
+        return result
+
+    image = ImageOps.exif_transpose(image)
+    if grayscale or threshold:
+        image = timed("grayscale", lambda img: img.convert("L"), image)
+    image = timed("resize", normalize_resolution, image, target_dpi, min_side, max_side)
+    if threshold:
+        image = timed("threshold", adaptive_threshold, image)
+    if deskew:
+        def straighten(img):
+            angle = estimate_skew(img if threshold else adaptive_threshold(img))
+            if not angle:
+                return img
+            return img.rotate(angle, resample=Image.BICUBIC, expand=True, fillcolor=255)
+
+        image = timed("deskew", straighten, image)
+    return image
+
+
+def image_digest(image, config=""):
+    """Content hash of an image's pixels plus the OCR settings it will be read with."""
+    digest = hashlib.sha256()
+    digest.update(f"{image.mode}:{image.size}:{config}".encode("utf-8"))
+    digest.update(image.tobytes())
+    return digest.hexdigest()
+
+
+class OcrProcessor:
+    """Preprocesses images, runs an OCR backend and caches text by preprocessed-image hash.
+
+    Exposes ``image_to_string`` so it can stand in for the OCR backend of the
+    pipeline.
+    """
+
+    def __init__(self, backend, cache_size=256, config="", **preprocess_options):
+        self.backend = backend
+        self.cache_size = cache_size
+        self.config = config
+        self.preprocess_options = preprocess_options
+        self._cache = OrderedDict()
+        self._lock = threading.Lock()
+        self._counters = {"hits": 0, "misses": 0}
+
+    def _cache_key(self, image):
+        options = ",".join(f"{k}={v}" for k, v in sorted(self.preprocess_options.items()))
+        return image_digest(image, f"{self.config}|{options}")
+
+    def extract(self, image):
+        """Returns (text, timings) where timings holds seconds per stage; cache hits have no "ocr" stage."""
+        timings = {}
+        total_start = time.perf_counter()
+        prepared = preprocess(image, timings=timings, **self.preprocess_options)
+
+        start = time.perf_counter()
+        key = self._cache_key(prepared)
+        timings["hash"] = time.perf_counter() - start
+
+        with self._lock:
+            text = self._cache.get(key)
+            if text is not None:
+                self._cache.move_to_end(key)
+                self._counters["hits"] += 1
+
+        if text is None:
+            start = time.perf_counter()
+            text = self.backend.image_to_string(prepared, config=self.config)
+            timings["ocr"] = time.perf_counter() - start
+            with self._lock:
+                self._counters["misses"] += 1
+                self._cache[key] = text
+                self._cache.move_to_end(key)
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+
+        timings["total"] = time.perf_counter() - total_start
+        return text, timings
+
+    def image_to_string(self, image, config=""):
+        """Returns only the extracted text; the processor's own config is used."""
+        return self.extract(image)[0]
+
+    def stats(self):
+        """Returns cache hit/miss counters."""
+        with self._lock:
+            stats = dict(self._counters)
+            stats["entries"] = len(self._cache)
+        return stats
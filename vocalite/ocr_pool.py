@@ -0,0 +1,215 @@
+"""Pool of long-lived, pre-initialized Tesseract engines (tesserocr), one set per language and config.
+
+pytesseract writes every image to a temp file, starts the tesseract binary,
+which loads its traineddata again, and reads the text back from disk. A
+tesserocr ``PyTessBaseAPI`` loads the traineddata once and then recognizes
+any number of images handed over as pixel buffers, releasing the GIL while
+it works, so a few of them serve concurrent threads.
+"""
+import os
+import queue
+import shlex
+import threading
+from contextlib import ExitStack, contextmanager
+
+# Tesseract's own default when an image carries no resolution; the OCR preprocessing targets it
+DEFAULT_DPI = 300
+
+
+class EngineUnavailable(RuntimeError):
+    """Raised when no persistent engine can serve a request, so the caller should use pytesseract."""
+
+
+def parse_tesseract_config(config):
+    """Splits a pytesseract config string into (oem, psm, variables).
+
+    Only ``--oem N``, ``--psm N`` and ``-c name=value`` have engine API
+    equivalents; anything else raises EngineUnavailable.
+    """
+    oem = psm = None
+    variables = {}
+    tokens = shlex.split(config or "")
+    i = 0
+    while i < len(tokens):
+        token = tokens[i]
+        if token in ("--oem", "--psm", "-c") and i + 1 < len(tokens):
+            value = tokens[i + 1]
+            i += 2
+        elif token.startswith(("--oem=", "--psm=")):
+            token, _, value = token.partition("=")
+            i += 1
+        else:
+            raise EngineUnavailable(f"tesseract option {token!r} has no engine API equivalent")
+        if token == "-c":
+            name, _, setting = value.partition("=")
+            variables[name] = setting
+        elif not value.isdigit():
+            raise EngineUnavailable(f"{token} needs a number, got {value!r}")
+        elif token == "--oem":
+            oem = int(value)
+        else:
+            psm = int(value)
+    return oem, psm, variables
+
+
+def create_engine(lang, oem=None, psm=None, variables=None):
+    """Initializes a tesserocr engine for lang ("eng", "eng+deu") with the given settings."""
+    try:
+        import tesserocr
+    except ImportError as e:
+        raise EngineUnavailable("tesserocr is not installed") from e
+    kwargs = {"lang": lang}
+    if oem is not None:
+        kwargs["oem"] = oem
+    if psm is not None:
+        kwargs["psm"] = psm
+    try:
+        api = tesserocr.PyTessBaseAPI(**kwargs)
+    except RuntimeError as e:
+        # Raised when the traineddata for lang cannot be loaded
+        raise EngineUnavailable(f"tesserocr could not load {lang!r}: {e}") from e
+    for name, value in (variables or {}).items():
+        if not api.SetVariable(name, value):
+            api.End()
+            raise EngineUnavailable(f"tesseract has no variable {name!r}")
+    return api
+
+
+def pixel_buffer(image):
+    """Returns (raw pixels, width, height, bytes per pixel) for an image, as SetImageBytes takes them."""
+    if image.mode not in ("L", "RGB", "RGBA"):
+        image = image.convert("L" if image.mode in ("1", "I", "I;16", "F", "LA") else "RGB")
+    bands = len(image.mode)
+    return image.tobytes(), image.width, image.height, bands
+
+
+class TesseractEnginePool:
+    """Keeps up to ``size`` warm tesserocr engines per (language set, config).
+
+    Engines are created on first demand (or by warm_up) and then reused; a
+    thread checks one out for the length of a call. With more concurrent calls
+    than engines, a call waits up to checkout_timeout for one to come back.
+    Every failure to provide an engine is raised as EngineUnavailable, and
+    once tesserocr turns out not to be importable the pool stops trying.
+
+    Pickling keeps only the settings, so a pool sent to a worker process (as
+    the document OCR process pool does) builds its own engines there and
+    keeps them for every page that worker handles.
+    """
+
+    def __init__(self, size=None, checkout_timeout=60, factory=create_engine):
+        self.size = size or os.cpu_count() or 1
+        self.checkout_timeout = checkout_timeout
+        self.factory = factory
+        self._setup()
+
+    def _setup(self):
+        self._idle = {}
+        self._created = {}
+        self._lock = threading.Lock()
+        self._missing = None
+        self._counters = {"calls": 0, "starts": 0, "start_errors": 0, "waits": 0}
+
+    def __getstate__(self):
+        return {"size": self.size, "checkout_timeout": self.checkout_timeout, "factory": self.factory}
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._setup()
+
+    @contextmanager
+    def checkout(self, lang, config=""):
+        """Yields an idle engine for lang and config, creating one while under size."""
+        if self._missing is not None:
+            raise EngineUnavailable(self._missing)
+        oem, psm, variables = parse_tesseract_config(config)
+        key = (lang, oem, psm, tuple(sorted(variables.items())))
+        with self._lock:
+            idle = self._idle.setdefault(key, queue.LifoQueue())
+            create = idle.empty() and self._created.get(key, 0) < self.size
+            if create:
+                self._created[key] = self._created.get(key, 0) + 1
+        if create:
+            try:
+                engine = self.factory(lang, oem, psm, variables)
+            except Exception as e:
+                with self._lock:
+                    self._created[key] = self._created.get(key, 1) - 1
+                    self._counters["start_errors"] += 1
+                    if isinstance(e, ImportError) or isinstance(e.__cause__, ImportError):
+                        self._missing = str(e)
+                if isinstance(e, EngineUnavailable):
+                    raise
+                raise EngineUnavailable(str(e)) from e
+            with self._lock:
+                self._counters["starts"] += 1
+        else:
+            try:
+                engine = idle.get_nowait()
+            except queue.Empty:
+                with self._lock:
+                    self._counters["waits"] += 1
+                try:
+                    engine = idle.get(timeout=self.checkout_timeout)
+                except queue.Empty:
+                    raise EngineUnavailable(f"no {lang!r} engine came free in {self.checkout_timeout} s") from None
+        try:
+            yield engine
+        finally:
+            idle.put(engine)
+
+    def image_to_string(self, image, lang="eng", config=""):
+        """Recognizes a PIL image with a pooled engine; the pixels are handed over in memory."""
+        data, width, height, bands = pixel_buffer(image)
+        dpi = image.info.get("dpi", (DEFAULT_DPI,))[0] or DEFAULT_DPI
+        with self.checkout(lang, config) as engine:
+            with self._lock:
+                self._counters["calls"] += 1
+            engine.SetImageBytes(data, width, height, bands, width * bands)
+            engine.SetSourceResolution(int(dpi))
+            try:
+                return engine.GetUTF8Text()
+            finally:
+                engine.Clear()
+
+    def warm_up(self, lang="eng", config="", count=1, background=True):
+        """Starts count engines for lang and config ahead of the first request."""
+        def run():
+            try:
+                # Holding them all at once makes each checkout start a separate engine
+                with ExitStack() as stack:
+                    for _ in range(count):
+                        stack.enter_context(self.checkout(lang, config))
+            except Exception:
+                # Counted in start_errors; the next checkout retries
+                pass
+
+        if background:
+            thread = threading.Thread(target=run, name="tesseract-warmup", daemon=True)
+            thread.start()
+            return thread
+        run()
+        return None
+
+    def stats(self):
+        """Returns call and engine counters plus the engines alive per language set."""
+        with self._lock:
+            stats = dict(self._counters)
+            stats["engines"] = sum(self._created.values())
+        stats["size"] = self.size
+        stats["available"] = self._missing is None
+        return stats
+
+    def close(self):
+        """Shuts down every idle engine."""
+        with self._lock:
+            idle, self._idle, self._created = self._idle, {}, {}
+        for engines in idle.values():
+            while True:
+                try:
+                    engines.get_nowait().End()
+                except queue.Empty:
+                    break
+                except Exception:
+                    continue
+
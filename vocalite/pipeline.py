@@ -0,0 +1,263 @@
+"""Headless Vocalite pipeline: grammar, translation, TTS, OCR and speech recognition.
+
+The Streamlit page and the benchmarks both drive this engine; backends are
+swappable (see ``vocalite.backends`` for the default implementations).
+"""
+import datetime
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+from vocalite.chunking import DEFAULT_MAX_CHARS, stream_translation
+from vocalite.metrics import Metrics
+from vocalite.tts_stream import DEFAULT_PIECE_CHARS, concat_mp3, stream_synthesis
+
+
+class VocalitePipeline:
+    """Runs the Vocalite stages against pluggable backends and records per-stage timings."""
+
+    def __init__(self, translator, tts=None, grammar=None, ocr=None, recognizer=None,
+                 languages=None, translation_cache=None, audio_cache=None, metrics=None, translation_memory=None):
+        self.translator = translator
+        self.tts = tts
+        self.grammar = grammar
+        self.ocr = ocr
+        self.recognizer = recognizer
+        self.languages = dict(languages or {})
+        self.translation_cache = translation_cache
+        self.audio_cache = audio_cache
+        self.translation_memory = translation_memory
+        self.metrics = metrics if metrics is not None else Metrics()
+        self._codes_by_name = {}
+        for code, name in self.languages.items():
+            # First code wins for names listed twice (e.g. hebrew: iw/he)
+            self._codes_by_name.setdefault(name.lower(), code)
+
+    def close(self):
+        """Shuts down the worker pools of the stages that keep one (the router and the grammar checker)."""
+        for stage in (self.translator, self.grammar):
+            # Looked up on the class, so a lazy proxy is not built just to be closed
+            close = getattr(type(stage), "close", None)
+            if close is not None:
+                close(stage)
+
+    def get_lang_code(self, lang_name):
+        """Gets the language code from the language name."""
+        return self._codes_by_name.get(lang_name.lower(), 'en')
+
+    # ---- Stages ----
+    def correct_grammar(self, text, lang_name):
+        """Corrects grammar for the given text; returns it unchanged when no grammar backend is set."""
+        if not text or not text.strip() or self.grammar is None:
+            return text
+        with self.metrics.timed("grammar", lang=lang_name.lower()):
+            return self.grammar.correct(text, lang_name)
+
+    def translate(self, text, src, dest, owner="", reuse_threshold=None):
+        """Translates text between language codes, going through the translation cache if any.
+
+        A close enough translation memory match from owner's segments or the
+        shared ones is reused first. It is checked ahead of the cache and never
+        stored in it, since the cache is shared by every owner and threshold.
+        """
+        pair = f"{src}->{dest}"
+
+        def upstream(text, src, dest):
+            with self.metrics.timed("translate_upstream", pair=pair):
+                return self.translator.translate(text, src, dest)
+
+        with self.metrics.timed("translate", pair=pair):
+            if self.translation_memory is not None:
+                with self.metrics.timed("translation_memory", pair=pair):
+                    reused = self.translation_memory.reuse(text, src, dest, owner, reuse_threshold)
+                self.metrics.inc("tm_hits" if reused is not None else "tm_misses", pair=pair)
+                if reused is not None:
+                    return reused
+            if self.translation_cache is None:
+                return upstream(text, src, dest)
+            misses = []
+            translated = self.translation_cache.get_or_translate(
+                text, src, dest, lambda *args: misses.append(True) or upstream(*args)
+            )
+        self.metrics.inc("cache_misses" if misses else "cache_hits", cache="translation", pair=pair)
+        return translated
+
+    def translate_streaming(self, text, src, dest, max_chars=DEFAULT_MAX_CHARS, max_workers=4, owner="",
+                            reuse_threshold=None):
+        """Translates long text chunk by chunk, yielding the finished prefix as it grows.
+
+        Chunks follow sentence and paragraph boundaries and each one is its own
+        cache entry, so editing one paragraph only re-translates that paragraph.
+        """
+        return stream_translation(
+            text, lambda chunk: self.translate(chunk, src, dest, owner, reuse_threshold),
+            max_chars=max_chars, max_workers=max_workers
+        )
+
+    def synthesize(self, text, lang):
+        """Returns MP3 bytes for text, going through the audio cache if any."""
+        with self.metrics.timed("tts", lang=lang):
+            if self.audio_cache is not None:
+                audio_bytes = self.audio_cache.get(text, lang)
+                if audio_bytes is not None:
+                    self.metrics.inc("cache_hits", cache="audio", lang=lang)
+                    return audio_bytes
+                self.metrics.inc("cache_misses", cache="audio", lang=lang)
+            with self.metrics.timed("tts_upstream", lang=lang):
+                audio_bytes = self.tts.synthesize(text, lang)
+            if self.audio_cache is not None:
+                self.audio_cache.put(text, lang, audio_bytes)
+        return audio_bytes
+
+    def synthesize_streaming(self, text, lang, max_chars=DEFAULT_PIECE_CHARS, max_workers=4):
+        """Synthesizes text in sentence-sized pieces concurrently, yielding (index, count, mp3) in order.
+
+        The first piece can be played while the rest are still being
+        synthesized; concat_mp3 of all pieces is the full clip, which is also
+        cached for (text, lang) so a replay is a single cache hit.
+        """
+        if self.audio_cache is not None:
+            audio_bytes = self.audio_cache.get(text, lang)
+            if audio_bytes is not None:
+                self.metrics.inc("cache_hits", cache="audio", lang=lang)
+                yield 0, 1, audio_bytes
+                return
+        start = time.perf_counter()
+        pieces = []
+        for index, count, audio_bytes in stream_synthesis(
+            text, lambda piece: self.synthesize(piece, lang), max_chars=max_chars, max_workers=max_workers
+        ):
+            if index == 0:
+                self.metrics.observe("tts_first_audio", time.perf_counter() - start, lang=lang)
+            pieces.append(audio_bytes)
+            yield index, count, audio_bytes
+        if self.audio_cache is not None and len(pieces) > 1:
+            self.audio_cache.put(text, lang, concat_mp3(pieces))
+
+    def extract_text(self, image):
+        """Runs OCR on an image and returns the stripped text."""
+        with self.metrics.timed("ocr"):
+            return self.ocr.image_to_string(image).strip()
+
+    def extract_text_timed(self, image):
+        """Runs OCR and returns (text, timings), with a per-stage breakdown when the backend provides one."""
+        with self.metrics.timed("ocr"):
+            if hasattr(self.ocr, "extract"):
+                text, timings = self.ocr.extract(image)
+            else:
+                start = time.perf_counter()
+                text = self.ocr.image_to_string(image)
+                timings = {"ocr": time.perf_counter() - start}
+                timings["total"] = timings["ocr"]
+        for stage, seconds in timings.items():
+            if stage != "total":
+                self.metrics.observe(f"ocr.{stage}", seconds)
+        return text.strip(), timings
+
+    def recognize(self, audio):
+        """Transcribes captured audio."""
+        with self.metrics.timed("recognize"):
+            return self.recognizer.recognize(audio)
+
+    # ---- End to end ----
+    def run(self, text, input_lang, output_lang, grammar_check=True, with_audio=True):
+        """Runs the Translate flow for text and returns the result with per-stage timings.
+
+        A failing grammar check does not stop the flow: the text is translated
+        as typed and the failure is returned as ``grammar_error``, as the page
+        shows it next to the translation.
+        """
+        timings = {}
+
+        start = time.perf_counter()
+        src = self.get_lang_code(input_lang)
+        dest = self.get_lang_code(output_lang)
+        timings["lang_code"] = time.perf_counter() - start
+
+        final_input = text.strip()
+        corrected = None
+        grammar_error = None
+        if grammar_check:
+            start = time.perf_counter()
+            try:
+                corrected = self.correct_grammar(final_input, input_lang)
+            except Exception as e:
+                grammar_error = str(e) or type(e).__name__
+            timings["grammar"] = time.perf_counter() - start
+            if corrected and corrected != final_input:
+                final_input = corrected
+
+        start = time.perf_counter()
+        for translated in self.translate_streaming(final_input, src, dest):
+            pass
+        timings["translate"] = time.perf_counter() - start
+
+        audio_bytes = None
+        if with_audio and self.tts is not None:
+            start = time.perf_counter()
+            audio_bytes = self.synthesize(translated, dest)
+            timings["tts"] = time.perf_counter() - start
+
+        timings["total"] = sum(timings.values())
+        return {
+            "input": text,
+            "corrected": corrected,
+            "grammar_error": grammar_error,
+            "final_input": final_input,
+            "src": src,
+            "dest": dest,
+            "translated": translated,
+            "audio": audio_bytes,
+            "timings": timings,
+        }
+
+    def fan_out(self, text, src, dests, with_audio=True, max_workers=None, owner="", reuse_threshold=None):
+        """Translates text into every dest concurrently, yielding each target's result as it finishes.
+
+        Each target runs translate then TTS on its own worker, so wall-clock time
+        tracks the slowest target rather than the sum. Failures are yielded with
+        an ``error`` instead of aborting the other targets; a target whose
+        translation finished but whose TTS failed keeps its translation and
+        reports the failure as ``audio_error``.
+        """
+        def one(dest):
+            timings = {}
+            start = time.perf_counter()
+            translated = self.translate(text, src, dest, owner, reuse_threshold)
+            timings["translate"] = time.perf_counter() - start
+            audio_bytes = audio_error = None
+            if with_audio and self.tts is not None:
+                start = time.perf_counter()
+                try:
+                    audio_bytes = self.synthesize(translated, dest)
+                except Exception as e:
+                    audio_error = e
+                timings["tts"] = time.perf_counter() - start
+            return {"dest": dest, "translated": translated, "audio": audio_bytes, "timings": timings,
+                    "error": None, "audio_error": audio_error}
+
+        if not dests:
+            return
+        with ThreadPoolExecutor(max_workers=max_workers or len(dests)) as pool:
+            futures = {pool.submit(one, dest): dest for dest in dests}
+            for future in as_completed(futures):
+                try:
+                    yield future.result()
+                except Exception as e:
+                    yield {"dest": futures[future], "translated": None, "audio": None, "timings": {}, "error": e,
+                           "audio_error": None}
+
+
+def build_history_item(original, translated, src_lang, dest_lang, corrected=None, now=None):
+    """Builds a translation history entry; corrected is kept only when it differs from original."""
+    now = now or datetime.datetime.now()
+    history_item = {
+        "original": original,
+        "src_lang": src_lang,
+        "translated": translated,
+        "dest_lang": dest_lang,
+        "time": now.strftime("%H:%M:%S")
+    }
+    # Only add corrected field if grammar correction was applied
+    if corrected and corrected != original:
+        history_item["corrected"] = corrected
+    return history_item
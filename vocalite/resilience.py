@@ -0,0 +1,186 @@
+"""Retries, circuit breaking and pooled HTTP sessions for the network backends."""
+import random
+import threading
+import time
+
+
+class UpstreamError(Exception):
+    """An upstream answered with an error status.
+
+    ``transient`` marks errors worth retrying (429 and 5xx); ``retry_after``
+    carries the server's Retry-After hint in seconds when it sent one.
+    """
+
+    def __init__(self, message, status=None, transient=None, retry_after=None):
+        super().__init__(message)
+        self.status = status
+        self.transient = transient if transient is not None else (status == 429 or (status or 0) >= 500)
+        self.retry_after = retry_after
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling the upstream while its circuit breaker is open."""
+
+
+def is_transient(error):
+    """Timeouts, connection failures, 429 and 5xx are transient; everything else is not."""
+    transient = getattr(error, "transient", None)
+    if transient is not None:
+        return transient
+    # requests' exceptions (and socket errors) are all OSErrors; httpx's (googletrans) are not
+    if isinstance(error, (OSError, TimeoutError)):
+        return True
+    name = type(error).__name__
+    return "Timeout" in name or "Connect" in name or name in ("NetworkError", "RemoteProtocolError")
+
+
+class CircuitBreaker:
+    """Fails fast after failure_threshold consecutive transient failures.
+
+    While open, calls are rejected for reset_timeout seconds; after that one
+    probe call is let through (half-open) and its outcome closes or re-opens
+    the circuit.
+    """
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._state = "closed"
+        self._failures = 0
+        self._opened_at = 0.0
+        self._probing = False
+        self._lock = threading.Lock()
+        self.trips = 0
+
+    @property
+    def state(self):
+        with self._lock:
+            if self._state == "open" and time.monotonic() - self._opened_at >= self.reset_timeout:
+                return "half_open"
+            return self._state
+
+    def allow(self):
+        """Returns True if a call may go to the upstream now."""
+        with self._lock:
+            if self._state == "closed":
+                return True
+            if self._state == "open" and time.monotonic() - self._opened_at < self.reset_timeout:
+                return False
+            # Half-open: exactly one probe at a time
+            if self._probing:
+                return False
+            self._state = "half_open"
+            self._probing = True
+            return True
+
+    def record_success(self):
+        with self._lock:
+            self._state = "closed"
+            self._failures = 0
+            self._probing = False
+
+    def record_failure(self):
+        with self._lock:
+            self._failures += 1
+            if self._state == "half_open" or self._failures >= self.failure_threshold:
+                if self._state != "open":
+                    self.trips += 1
+                self._state = "open"
+                self._opened_at = time.monotonic()
+                self._probing = False
+
+    def release(self):
+        """Ends a probe whose outcome says nothing about upstream health (a non-transient error)."""
+        with self._lock:
+            if self._state == "half_open":
+                self._state = "closed"
+                self._failures = 0
+            self._probing = False
+
+
+class ResilientBackend:
+    """Wraps a backend method with retries, exponential backoff with jitter and a circuit breaker.
+
+    ``ResilientBackend(client, "translate")`` exposes ``translate`` with the
+    same signature, so it drops into the pipeline wherever the client would.
+    Other attributes are forwarded to the wrapped client, and the method is
+    looked up per call so a LazyBackend client stays lazy.
+    """
+
+    def __init__(self, client, method, max_retries=2, backoff_s=0.25, max_backoff_s=4.0, breaker=None,
+                 metrics=None, name=None):
+        self.client = client
+        self.method = method
+        self.max_retries = max_retries
+        self.backoff_s = backoff_s
+        self.max_backoff_s = max_backoff_s
+        self.breaker = breaker or CircuitBreaker()
+        self.metrics = metrics
+        self.name = name or method
+
+    def _count(self, event):
+        if self.metrics is not None:
+            self.metrics.inc(f"upstream_{event}", upstream=self.name)
+
+    def call(self, *args, **kwargs):
+        attempt = 0
+        while True:
+            if not self.breaker.allow():
+                self._count("rejected")
+                raise CircuitOpenError(f"{self.name} is temporarily unavailable; try again shortly")
+            attempt += 1
+            try:
+                result = getattr(self.client, self.method)(*args, **kwargs)
+            except Exception as e:
+                if not is_transient(e):
+                    self.breaker.release()
+                    raise
+                self.breaker.record_failure()
+                self._count("failures")
+                if attempt > self.max_retries:
+                    raise
+                delay = min(self.max_backoff_s, self.backoff_s * (2 ** (attempt - 1)) * (1 + random.random()))
+                # Honour Retry-After, but never stall a page for longer than max_backoff_s
+                time.sleep(min(self.max_backoff_s, max(delay, getattr(e, "retry_after", None) or 0)))
+                self._count("retries")
+                continue
+            self.breaker.record_success()
+            return result
+
+    def __getattr__(self, attr):
+        if attr.startswith("_"):
+            raise AttributeError(attr)
+        if attr == self.method:
+            return self.call
+        return getattr(self.client, attr)
+
+
+def pooled_session(pool_size=16, user_agent=None):
+    """Creates a requests Session with a keep-alive connection pool shared by every thread.
+
+    Retries are not configured here; ResilientBackend owns the retry policy so
+    urllib3 and the wrapper do not multiply each other's attempts.
+    """
+    import requests
+    from requests.adapters import HTTPAdapter
+
+    session = requests.Session()
+    adapter = HTTPAdapter(pool_connections=4, pool_maxsize=pool_size, max_retries=0)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if user_agent:
+        session.headers["User-Agent"] = user_agent
+    return session
+
+
+def raise_for_status(response, upstream):
+    """Raises UpstreamError for non-2xx responses, keeping the Retry-After hint."""
+    if response.status_code < 400:
+        return
+    retry_after = response.headers.get("Retry-After")
+    try:
+        retry_after = float(retry_after) if retry_after else None
+    except ValueError:
+        retry_after = None
+    raise UpstreamError(f"{upstream} returned HTTP {response.status_code}", status=response.status_code,
+                        retry_after=retry_after)
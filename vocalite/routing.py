@@ -0,0 +1,277 @@
+"""Translation backend registry and a latency-aware router that hedges slow requests.
+
+Any object with ``translate(text, src, dest)`` is a translation backend; one
+whose class also defines ``supports(src, dest)``, or that is registered with a
+``supports`` callable, can decline language pairs. Backends are registered by
+name, and routes say which of them may serve a language
+pair ("en-es", "en-*", "*-ja" or "*"). A pair no route matches has no
+backends, so it fails with a clear error rather than reaching a backend
+nobody chose for it. ``LatencyRouter`` is itself a
+translator, so it drops into the pipeline wherever a single backend would.
+"""
+import random
+import threading
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+
+def parse_routes(spec):
+    """Parses "en-es=local,http;*=http" into {"en-es": ["local", "http"], "*": ["http"]}."""
+    routes = {}
+    for entry in (spec or "").split(";"):
+        if not entry.strip():
+            continue
+        pair, _, names = entry.partition("=")
+        routes[pair.strip().lower()] = [name.strip() for name in names.split(",") if name.strip()]
+    return routes
+
+
+class BackendRegistry:
+    """Named translation backends and the routes that map language pairs to them."""
+
+    def __init__(self):
+        self._backends = {}
+        self._routes = {}
+        self._routed_only = set()
+        self._supports = {}
+
+    def register(self, name, backend, routed_only=False, supports=None):
+        """Adds (or replaces) a backend under name and returns it.
+
+        A routed_only backend (such as the offline echo) is used only for the
+        pairs whose route names it, never as part of the no-routes default.
+        supports(src, dest) decides which pairs the backend may serve; it
+        defaults to the backend's own supports method when its class defines
+        one. Routing never reads attributes off the backend itself, so a lazy
+        backend is not built just to ask which pairs it handles.
+        """
+        if supports is None and callable(getattr(type(backend), "supports", None)):
+            supports = backend.supports
+        self._backends[name] = backend
+        if supports is None:
+            self._supports.pop(name, None)
+        else:
+            self._supports[name] = supports
+        if routed_only:
+            self._routed_only.add(name)
+        else:
+            self._routed_only.discard(name)
+        return backend
+
+    def get(self, name):
+        return self._backends[name]
+
+    def names(self):
+        return list(self._backends)
+
+    def set_routes(self, routes):
+        """Sets {pair pattern: [backend names]}; unknown names are rejected."""
+        for pattern, names in routes.items():
+            unknown = [name for name in names if name not in self._backends]
+            if unknown:
+                raise ValueError(f"route {pattern!r} names unregistered backends: {', '.join(unknown)}")
+        self._routes = {pattern.lower(): list(names) for pattern, names in routes.items()}
+
+    def routes(self):
+        return dict(self._routes)
+
+    def candidates(self, src, dest):
+        """Returns the backend names configured for the pair (most specific route wins) that support it.
+
+        Without any routes every backend but the routed_only ones is a
+        candidate; with routes, a pair none of them matches has no candidates.
+        """
+        src, dest = src.lower(), dest.lower()
+        for pattern in (f"{src}-{dest}", f"{src}-*", f"*-{dest}", "*"):
+            if pattern in self._routes:
+                names = self._routes[pattern]
+                break
+        else:
+            if self._routes:
+                return []
+            names = [name for name in self._backends if name not in self._routed_only]
+        return [name for name in names if name not in self._supports or self._supports[name](src, dest)]
+
+
+class RollingStats:
+    """Latency and outcome of a backend's last ``window`` calls."""
+
+    def __init__(self, window=200):
+        self._calls = deque(maxlen=window)
+        self._lock = threading.Lock()
+        self.total = 0
+
+    def record(self, seconds, ok):
+        with self._lock:
+            self._calls.append((seconds, ok))
+            self.total += 1
+
+    def snapshot(self):
+        with self._lock:
+            calls = list(self._calls)
+            total = self.total
+        latencies = sorted(seconds for seconds, ok in calls if ok)
+        errors = sum(1 for _, ok in calls if not ok)
+
+        def pct(p):
+            return latencies[min(len(latencies) - 1, int(p * len(latencies)))] if latencies else None
+
+        return {
+            "total": total,
+            "calls": len(calls),
+            "errors": errors,
+            "error_rate": errors / len(calls) if calls else 0.0,
+            "p50_s": pct(0.5),
+            "p95_s": pct(0.95),
+        }
+
+
+class LatencyRouter:
+    """Sends each translation to the backend with the best recent latency and error rate.
+
+    Backends are ranked by their rolling median latency, inflated by their
+    error rate; ones with fewer than ``min_samples`` recent calls are tried
+    first so every configured backend gets measured, and ``explore`` of the
+    requests go to another candidate so a backend that recovers is noticed.
+
+    When the chosen backend has not answered within the hedge deadline, the
+    request is also sent to the next backend and the first answer wins. The
+    deadline is ``hedge_after`` seconds when set, otherwise the primary's
+    rolling p95 (at least ``min_hedge_s``), so only its tail gets hedged. A
+    backend that fails hands the request to the next one straight away.
+    """
+
+    def __init__(self, registry, hedge=True, hedge_after=None, min_hedge_s=0.05, error_penalty=10.0,
+                 min_samples=5, explore=0.02, window=200, max_workers=32, metrics=None, seed=None):
+        self.registry = registry
+        self.hedge = hedge
+        self.hedge_after = hedge_after
+        self.min_hedge_s = min_hedge_s
+        self.error_penalty = error_penalty
+        self.min_samples = min_samples
+        self.explore = explore
+        self.window = window
+        self.metrics = metrics
+        self._stats = {}
+        self._stats_lock = threading.Lock()
+        self._rng = random.Random(seed)
+        self._pool = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="translate-route")
+        self._counters = {"requests": 0, "hedged": 0, "hedge_wins": 0, "failovers": 0, "failed": 0}
+        self._counter_lock = threading.Lock()
+
+    # ---- Statistics ----
+    def _backend_stats(self, name):
+        with self._stats_lock:
+            stats = self._stats.get(name)
+            if stats is None:
+                stats = self._stats[name] = RollingStats(self.window)
+            return stats
+
+    def _count(self, event, **labels):
+        with self._counter_lock:
+            self._counters[event] += 1
+        if self.metrics is not None:
+            self.metrics.inc(f"router_{event}", **labels)
+
+    def _score(self, name):
+        snapshot = self._backend_stats(name).snapshot()
+        if snapshot["calls"] < self.min_samples:
+            return -1.0
+        if snapshot["p50_s"] is None:
+            # Every recent call failed: last resort until exploration shows it has recovered
+            return float("inf")
+        return snapshot["p50_s"] * (1 + self.error_penalty * snapshot["error_rate"])
+
+    def rank(self, src, dest):
+        """Returns the candidate backend names for the pair, best first."""
+        names = self.registry.candidates(src, dest)
+        # Stable sort keeps the configured order among equals (and among unmeasured backends)
+        ranked = sorted(names, key=self._score)
+        if len(ranked) > 1 and self._rng.random() < self.explore:
+            other = self._rng.randrange(1, len(ranked))
+            ranked[0], ranked[other] = ranked[other], ranked[0]
+        return ranked
+
+    def _deadline(self, name):
+        if self.hedge_after is not None:
+            return self.hedge_after
+        p95 = self._backend_stats(name).snapshot()["p95_s"]
+        return max(self.min_hedge_s, p95) if p95 is not None else None
+
+    # ---- Translation ----
+    def _call(self, name, text, src, dest):
+        start = time.perf_counter()
+        try:
+            result = self.registry.get(name).translate(text, src, dest)
+        except Exception:
+            self._backend_stats(name).record(time.perf_counter() - start, False)
+            raise
+        self._backend_stats(name).record(time.perf_counter() - start, True)
+        return result
+
+    def translate(self, text, src, dest):
+        order = self.rank(src, dest)
+        if not order:
+            raise LookupError(
+                f"no translation backend is configured for {src}->{dest}; "
+                f"add a route for {src}-{dest} or a '*' route"
+            )
+        self._count("requests", backend=order[0])
+        pending = {}
+        launched = []
+
+        def launch():
+            name = order[len(launched)]
+            launched.append(name)
+            pending[self._pool.submit(self._call, name, text, src, dest)] = name
+
+        launch()
+        deadline = self._deadline(order[0]) if self.hedge else None
+        started = time.monotonic()
+        hedged = False
+        last_error = None
+        while pending:
+            timeout = None
+            if deadline is not None and not hedged and len(launched) < len(order):
+                timeout = max(0.0, deadline - (time.monotonic() - started))
+            done, _ = wait(pending, timeout=timeout, return_when=FIRST_COMPLETED)
+            if not done:
+                # The primary is slower than its usual tail: race the next backend against it
+                hedged = True
+                self._count("hedged", backend=order[len(launched)])
+                launch()
+                continue
+            for future in done:
+                name = pending.pop(future)
+                try:
+                    result = future.result()
+                except Exception as e:
+                    last_error = e
+                    continue
+                if name != order[0]:
+                    self._count("hedge_wins" if hedged else "failovers", backend=name)
+                return result
+            if not pending and len(launched) < len(order):
+                launch()
+        self._count("failed", backend=order[0])
+        raise last_error
+
+    # ---- Lifecycle and reporting ----
+    def warm_up(self):
+        """Starts background warm-up of every routed backend that supports it."""
+        names = {name for route in self.registry.routes().values() for name in route} or set(self.registry.names())
+        for name in names:
+            warm_up = getattr(self.registry.get(name), "warm_up", None)
+            if callable(warm_up):
+                warm_up()
+
+    def stats(self):
+        """Returns router counters plus rolling stats per backend."""
+        with self._counter_lock:
+            stats = dict(self._counters)
+        stats["backends"] = {name: self._backend_stats(name).snapshot() for name in self.registry.names()}
+        return stats
+
+    def close(self):
+        self._pool.shutdown(wait=False)
@@ -0,0 +1,464 @@
+"""Headless Vocalite service: the Translate flow over an asyncio HTTP API or JSON lines on stdin.
+
+    python -m vocalite.service serve --port 8080
+    python -m vocalite.service cli < requests.jsonl > results.jsonl
+
+A request is a JSON object such as::
+
+    {"id": 7, "text": "Hello there", "input_lang": "english", "output_lang": "spanish",
+     "grammar_check": true, "audio": false}
+
+Languages are the names the page's pickers show ("spanish"), or their codes
+("es"); anything else is rejected. Each request runs
+VocalitePipeline.run, the same steps as the page's Translate button (grammar
+correction, language codes, translation, optional TTS). The result carries
+the id, language codes, translation, corrected input (when grammar changed
+it), per-stage timings and, when asked for, the MP3 as base64.
+
+HTTP routes:
+
+- ``POST /v1/translate``: one request object, or an array of them (answered
+  with ``{"results": [...]}``); 400 for invalid requests, 503 with
+  Retry-After while the queue is full, 502 when the pipeline fails
+- ``GET /healthz``: queue and request counters
+- ``GET /metrics``: pipeline metrics in the Prometheus text format
+"""
+import argparse
+import asyncio
+import base64
+import json
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+MAX_TEXT_CHARS = 20_000
+MAX_BODY_BYTES = 1024 * 1024
+
+_REASONS = {200: "OK", 400: "Bad Request", 404: "Not Found", 405: "Method Not Allowed", 411: "Length Required",
+            413: "Payload Too Large", 431: "Request Header Fields Too Large", 502: "Bad Gateway",
+            503: "Service Unavailable"}
+
+
+class Overloaded(Exception):
+    """Raised when a request arrives while the service's queue is full."""
+
+
+def parse_language(value, field, languages=None):
+    """Returns the language name for a name or code given in field; raises ValueError for an unknown one.
+
+    languages maps codes to names, as VocalitePipeline.languages does; when it
+    is empty any name is accepted.
+    """
+    if not isinstance(value, str) or not value.strip():
+        raise ValueError(f'"{field}" must be a language name, e.g. "english"')
+    value = value.strip().lower()
+    if not languages or value in languages.values():
+        return value
+    if value in languages:
+        return languages[value]
+    raise ValueError(f'"{field}" is not a supported language name or code: {value!r}')
+
+
+def parse_flag(obj, field, default):
+    """Returns the boolean in field, or default when it is missing; raises ValueError for anything else."""
+    value = obj.get(field, default)
+    if not isinstance(value, bool):
+        raise ValueError(f'"{field}" must be true or false')
+    return value
+
+
+def parse_request(obj, default_id=None, languages=None):
+    """Validates one request object and fills in defaults; raises ValueError when it is unusable.
+
+    Languages are checked against languages (code -> name) and returned as names.
+    """
+    if not isinstance(obj, dict):
+        raise ValueError("a request must be a JSON object")
+    text = obj.get("text")
+    if not isinstance(text, str) or not text.strip():
+        raise ValueError('"text" must be a non-empty string')
+    if len(text) > MAX_TEXT_CHARS:
+        raise ValueError(f'"text" is longer than {MAX_TEXT_CHARS} characters')
+    return {
+        "id": obj.get("id", default_id),
+        "text": text,
+        "input_lang": parse_language(obj.get("input_lang"), "input_lang", languages),
+        "output_lang": parse_language(obj.get("output_lang"), "output_lang", languages),
+        "grammar_check": parse_flag(obj, "grammar_check", True),
+        "audio": parse_flag(obj, "audio", False),
+    }
+
+
+def request_key(request):
+    """Identifies requests that one pipeline run can answer."""
+    return (request["text"], request["input_lang"], request["output_lang"], request["grammar_check"],
+            request["audio"])
+
+
+def format_result(request, result):
+    """Turns a VocalitePipeline.run result into the JSON-ready response for request."""
+    response = {
+        "id": request["id"],
+        "src": result["src"],
+        "dest": result["dest"],
+        "translated": result["translated"],
+        "timings_ms": {stage: round(seconds * 1000, 3) for stage, seconds in result["timings"].items()},
+    }
+    if result["corrected"] and result["corrected"] != result["input"].strip():
+        response["corrected"] = result["corrected"]
+    if result.get("grammar_error"):
+        response["grammar_error"] = result["grammar_error"]
+    if request["audio"] and result["audio"] is not None:
+        response["audio_mp3_base64"] = base64.b64encode(result["audio"]).decode("ascii")
+    return response
+
+
+class TranslationService:
+    """Runs Translate-flow requests on a pipeline with bounded concurrency, batching and backpressure.
+
+    Requests wait in a queue of at most max_queue. ``enqueue(wait=False)``
+    raises Overloaded when it is full (the HTTP API answers 503), while
+    ``enqueue()`` waits for room (the JSONL reader stops reading).
+
+    A dispatcher takes up to batch_size queued requests at a time, giving a
+    batch batch_wait seconds to fill, and runs each distinct request in the
+    batch once, so identical requests that arrive together share one pipeline
+    run. At most ``concurrency`` runs are in flight, each on a worker thread
+    (the pipeline's backends block); while they are all busy the dispatcher
+    stops taking requests, so the queue absorbs bursts and then pushes back.
+    """
+
+    def __init__(self, pipeline, concurrency=8, max_queue=256, batch_size=16, batch_wait=0.002):
+        self.pipeline = pipeline
+        self.concurrency = concurrency
+        self.max_queue = max_queue
+        self.batch_size = batch_size
+        self.batch_wait = batch_wait
+        self._queue = None
+        self._slots = None
+        self._executor = None
+        self._dispatcher = None
+        self._tasks = set()
+        self._counters = {"accepted": 0, "rejected": 0, "completed": 0, "failed": 0, "batches": 0,
+                          "coalesced": 0, "running": 0}
+
+    async def start(self):
+        self._queue = asyncio.Queue(self.max_queue)
+        self._slots = asyncio.Semaphore(self.concurrency)
+        self._executor = ThreadPoolExecutor(max_workers=self.concurrency, thread_name_prefix="service")
+        self._dispatcher = asyncio.create_task(self._dispatch())
+        return self
+
+    async def close(self):
+        """Stops taking requests and waits for the pipeline runs in flight."""
+        if self._dispatcher is not None:
+            self._dispatcher.cancel()
+            await asyncio.gather(self._dispatcher, return_exceptions=True)
+        if self._tasks:
+            await asyncio.gather(*self._tasks, return_exceptions=True)
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+    async def __aenter__(self):
+        return await self.start()
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    # ---- Submitting ----
+    def room(self):
+        """Returns how many more requests the queue takes right now."""
+        return self.max_queue - self._queue.qsize()
+
+    async def enqueue(self, request, wait=True):
+        """Queues a parsed request and returns the future of its response."""
+        future = asyncio.get_running_loop().create_future()
+        job = (request, future, time.perf_counter())
+        if wait:
+            await self._queue.put(job)
+        else:
+            try:
+                self._queue.put_nowait(job)
+            except asyncio.QueueFull:
+                self._counters["rejected"] += 1
+                self.pipeline.metrics.inc("service_rejected")
+                raise Overloaded(f"queue is full ({self.max_queue} requests waiting)") from None
+        self._counters["accepted"] += 1
+        return future
+
+    async def enqueue_all(self, requests):
+        """Queues every request or, when they do not all fit, none of them (raising Overloaded)."""
+        if len(requests) > self.room():
+            self._counters["rejected"] += len(requests)
+            self.pipeline.metrics.inc("service_rejected", amount=len(requests))
+            raise Overloaded(f"{len(requests)} requests do not fit in the queue ({self.room()} free)")
+        return [await self.enqueue(request, wait=False) for request in requests]
+
+    async def submit(self, request, wait=True):
+        """Queues a parsed request and waits for its response."""
+        return await (await self.enqueue(request, wait=wait))
+
+    # ---- Dispatching ----
+    async def _next_batch(self):
+        batch = [await self._queue.get()]
+        if self.batch_wait and self._queue.qsize() < self.batch_size - 1:
+            await asyncio.sleep(self.batch_wait)
+        while len(batch) < self.batch_size:
+            try:
+                batch.append(self._queue.get_nowait())
+            except asyncio.QueueEmpty:
+                break
+        return batch
+
+    async def _dispatch(self):
+        while True:
+            batch = await self._next_batch()
+            groups = {}
+            for job in batch:
+                groups.setdefault(request_key(job[0]), []).append(job)
+            self._counters["batches"] += 1
+            self._counters["coalesced"] += len(batch) - len(groups)
+            self.pipeline.metrics.inc("service_batches")
+            self.pipeline.metrics.inc("service_batched_requests", amount=len(batch))
+            for jobs in groups.values():
+                # Waiting for a free slot here is what leaves later requests in the queue
+                await self._slots.acquire()
+                task = asyncio.create_task(self._run(jobs))
+                self._tasks.add(task)
+                task.add_done_callback(self._tasks.discard)
+
+    async def _run(self, jobs):
+        request = jobs[0][0]
+        started = time.perf_counter()
+        for _, _, queued_at in jobs:
+            self.pipeline.metrics.observe("service_queue", started - queued_at)
+        self._counters["running"] += 1
+        try:
+            result = await asyncio.get_running_loop().run_in_executor(
+                self._executor, lambda: self.pipeline.run(
+                    request["text"], request["input_lang"], request["output_lang"],
+                    grammar_check=request["grammar_check"], with_audio=request["audio"],
+                ))
+            error = None
+        except Exception as e:
+            result, error = None, e
+        finally:
+            self._counters["running"] -= 1
+            self._slots.release()
+        self.pipeline.metrics.observe("service_run", time.perf_counter() - started, error=error is not None)
+        for job_request, future, _ in jobs:
+            self._counters["failed" if error is not None else "completed"] += 1
+            if future.done():
+                continue
+            if error is not None:
+                future.set_exception(error)
+            else:
+                future.set_result(format_result(job_request, result))
+
+    def stats(self):
+        """Returns request counters plus the current queue depth."""
+        stats = dict(self._counters)
+        stats["queued"] = self._queue.qsize() if self._queue is not None else 0
+        stats["max_queue"] = self.max_queue
+        stats["concurrency"] = self.concurrency
+        return stats
+
+
+# ---- HTTP ----
+class HttpApi:
+    """A small HTTP/1.1 front end (keep-alive, Content-Length JSON bodies) for a TranslationService."""
+
+    def __init__(self, service, idle_timeout=30.0):
+        self.service = service
+        self.idle_timeout = idle_timeout
+
+    async def serve(self, host="127.0.0.1", port=8080):
+        """Starts listening; returns the asyncio server."""
+        return await asyncio.start_server(self._connection, host, port)
+
+    async def _connection(self, reader, writer):
+        try:
+            while True:
+                try:
+                    request_line = await asyncio.wait_for(reader.readline(), self.idle_timeout)
+                except asyncio.TimeoutError:
+                    break
+                except (ValueError, asyncio.LimitOverrunError):
+                    # readline gives up on a line longer than the reader's limit (64 KiB)
+                    await self._write(writer, self._json(400, {"error": "request line is too long"}), False)
+                    break
+                if not request_line:
+                    break
+                method, _, rest = request_line.decode("latin-1").strip().partition(" ")
+                path = rest.partition(" ")[0].split("?", 1)[0]
+                headers = {}
+                try:
+                    while True:
+                        line = await reader.readline()
+                        if line in (b"\r\n", b"\n", b""):
+                            break
+                        name, _, value = line.decode("latin-1").partition(":")
+                        headers[name.strip().lower()] = value.strip()
+                except (ValueError, asyncio.LimitOverrunError):
+                    await self._write(writer, self._json(431, {"error": "a header line is too long"}), False)
+                    break
+                response = await self._respond(method, path, headers, reader)
+                keep_alive = headers.get("connection", "").lower() != "close" and response[0] not in (411, 413)
+                await self._write(writer, response, keep_alive)
+                if not keep_alive:
+                    break
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            writer.close()
+
+    @staticmethod
+    async def _write(writer, response, keep_alive):
+        status, body, content_type, extra = response
+        head = [f"HTTP/1.1 {status} {_REASONS.get(status, '')}", f"Content-Type: {content_type}",
+                f"Content-Length: {len(body)}", "Connection: " + ("keep-alive" if keep_alive else "close")]
+        head.extend(f"{name}: {value}" for name, value in extra.items())
+        writer.write(("\r\n".join(head) + "\r\n\r\n").encode("latin-1") + body)
+        await writer.drain()
+
+    async def _respond(self, method, path, headers, reader):
+        """Returns (status, body bytes, content type, extra headers)."""
+        if path == "/healthz" and method == "GET":
+            return self._json(200, {"status": "ok", **self.service.stats()})
+        if path == "/metrics" and method == "GET":
+            text = self.service.pipeline.metrics.to_prometheus()
+            return 200, text.encode("utf-8"), "text/plain; version=0.0.4", {}
+        if path != "/v1/translate":
+            return self._json(404, {"error": f"no route for {path}"})
+        if method != "POST":
+            return self._json(405, {"error": "use POST"})
+        if not headers.get("content-length", "").isdigit():
+            return self._json(411, {"error": "send a Content-Length body"})
+        length = int(headers["content-length"])
+        if length > MAX_BODY_BYTES:
+            return self._json(413, {"error": f"body is larger than {MAX_BODY_BYTES} bytes"})
+        try:
+            payload = json.loads(await reader.readexactly(length))
+            batch = isinstance(payload, list)
+            languages = self.service.pipeline.languages
+            requests = [parse_request(obj, default_id=i, languages=languages)
+                        for i, obj in enumerate(payload if batch else [payload])]
+        except ValueError as e:
+            return self._json(400, {"error": str(e)})
+        if not requests:
+            return self._json(200, {"results": []})
+        try:
+            futures = await self.service.enqueue_all(requests)
+        except Overloaded as e:
+            return self._json(503, {"error": f"server is busy, retry later: {e}"}, {"Retry-After": "1"})
+        results = await asyncio.gather(*futures, return_exceptions=True)
+        if not batch:
+            if isinstance(results[0], Exception):
+                return self._json(502, {"id": requests[0]["id"], "error": str(results[0])})
+            return self._json(200, results[0])
+        return self._json(200, {"results": [
+            {"id": request["id"], "error": str(result)} if isinstance(result, Exception) else result
+            for request, result in zip(requests, results)
+        ]})
+
+    @staticmethod
+    def _json(status, obj, extra=None):
+        return status, json.dumps(obj, ensure_ascii=False).encode("utf-8"), "application/json", extra or {}
+
+
+# ---- JSON lines ----
+async def run_jsonl(service, infile, outfile):
+    """Answers one JSON request per input line with one JSON line, in completion order.
+
+    Reading stops while the queue is full. Returns (lines, errors).
+    """
+    loop = asyncio.get_running_loop()
+    pending = set()
+    counts = {"lines": 0, "errors": 0}
+
+    def write(obj):
+        if "error" in obj:
+            counts["errors"] += 1
+        outfile.write(json.dumps(obj, ensure_ascii=False) + "\n")
+        outfile.flush()
+
+    async def finish(request, future):
+        try:
+            write(await future)
+        except Exception as e:
+            write({"id": request["id"], "error": str(e)})
+
+    while True:
+        line = await loop.run_in_executor(None, infile.readline)
+        if not line:
+            break
+        if not line.strip():
+            continue
+        counts["lines"] += 1
+        default_id = counts["lines"] - 1
+        obj = None
+        try:
+            obj = json.loads(line)
+            request = parse_request(obj, default_id=default_id, languages=service.pipeline.languages)
+        except ValueError as e:
+            # Echo the request's own id when it got as far as being a JSON object
+            write({"id": obj.get("id", default_id) if isinstance(obj, dict) else default_id, "error": str(e)})
+            continue
+        future = await service.enqueue(request)
+        task = asyncio.create_task(finish(request, future))
+        pending.add(task)
+        task.add_done_callback(pending.discard)
+    if pending:
+        await asyncio.gather(*pending)
+    return counts["lines"], counts["errors"]
+
+
+# ---- Entry point ----
+async def _serve(pipeline, args):
+    async with TranslationService(pipeline, args.concurrency, args.max_queue, args.batch_size,
+                                  args.batch_wait_ms / 1000) as service:
+        server = await HttpApi(service).serve(args.host, args.port)
+        print(f"Vocalite service listening on http://{args.host}:{args.port}", file=sys.stderr)
+        async with server:
+            await server.serve_forever()
+
+
+async def _cli(pipeline, args):
+    async with TranslationService(pipeline, args.concurrency, args.max_queue, args.batch_size,
+                                  args.batch_wait_ms / 1000) as service:
+        start = time.perf_counter()
+        lines, errors = await run_jsonl(service, sys.stdin, sys.stdout)
+        elapsed = time.perf_counter() - start
+    print(f"{lines} requests, {errors} errors in {elapsed:.2f} s ({lines / elapsed if elapsed else 0:.1f}/s)",
+          file=sys.stderr)
+    return 1 if errors else 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("mode", choices=["serve", "cli"])
+    parser.add_argument("--host", default="127.0.0.1")
+    parser.add_argument("--port", type=int, default=8080)
+    parser.add_argument("--concurrency", type=int, default=8, help="pipeline runs in flight")
+    parser.add_argument("--max-queue", type=int, default=256, help="requests waiting before the API answers 503")
+    parser.add_argument("--batch-size", type=int, default=16)
+    parser.add_argument("--batch-wait-ms", type=float, default=2.0)
+    args = parser.parse_args(argv)
+    # Imported here so that importing the service does not load every backend module
+    from vocalite.factory import build_pipeline
+
+    pipeline = build_pipeline()
+    try:
+        if args.mode == "serve":
+            try:
+                asyncio.run(_serve(pipeline, args))
+            except KeyboardInterrupt:
+                pass
+            return 0
+        return asyncio.run(_cli(pipeline, args))
+    finally:
+        pipeline.close()
+
+
+if __name__ == "__main__":
+    sys.exit(main())
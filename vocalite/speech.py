@@ -0,0 +1,337 @@
+"""Voice-activity segmentation and incremental transcription for microphone and audio files."""
+import io
+import queue
+import random
+import threading
+import time
+import wave
+from array import array
+from concurrent.futures import ThreadPoolExecutor, as_completed
+
+try:
+    import audioop
+except ImportError:  # Removed from the standard library in Python 3.13
+    audioop = None
+
+_TYPECODES = {1: "b", 2: "h", 4: "i"}
+
+
+def frame_rms(pcm, sample_width):
+    """Root-mean-square energy of a block of signed little-endian PCM."""
+    if audioop is not None:
+        return audioop.rms(pcm, sample_width)
+    samples = array(_TYPECODES[sample_width])
+    samples.frombytes(pcm[: len(pcm) - len(pcm) % sample_width])
+    if not samples:
+        return 0
+    return int((sum(s * s for s in samples) / len(samples)) ** 0.5)
+
+
+def to_audio_data(pcm, sample_rate, sample_width):
+    """Wraps raw PCM in a speech_recognition AudioData for the recognizer."""
+    import speech_recognition as sr
+
+    return sr.AudioData(pcm, sample_rate, sample_width)
+
+
+class VoiceActivitySegmenter:
+    """Cuts a PCM stream into speech segments separated by silence.
+
+    Energy above an adaptive threshold (a multiple of the tracked noise floor,
+    never below energy_threshold) counts as speech. A segment ends after
+    min_silence_ms of silence or when it reaches max_segment_s, and keeps
+    padding_ms of audio on either side so words are not clipped.
+    """
+
+    def __init__(self, sample_rate, sample_width, frame_ms=30, energy_threshold=300,
+                 noise_multiplier=2.5, min_silence_ms=600, min_speech_ms=250, max_segment_s=15,
+                 padding_ms=200):
+        self.sample_rate = sample_rate
+        self.sample_width = sample_width
+        self.frame_bytes = int(sample_rate * frame_ms / 1000) * sample_width
+        self.frame_s = frame_ms / 1000
+        self.energy_threshold = energy_threshold
+        self.noise_multiplier = noise_multiplier
+        self.min_silence_frames = max(1, min_silence_ms // frame_ms)
+        self.min_speech_frames = max(1, min_speech_ms // frame_ms)
+        self.max_segment_frames = max(1, int(max_segment_s * 1000 // frame_ms))
+        self.padding_frames = padding_ms // frame_ms
+
+        self.noise_floor = None
+        self._buffer = b""
+        self._history = []
+        self._segment = []
+        self._speech_frames = 0
+        self._silent_run = 0
+        self._position = 0
+        self._segment_start = 0
+
+    def _threshold(self):
+        if self.noise_floor is None:
+            return self.energy_threshold
+        return max(self.energy_threshold, self.noise_floor * self.noise_multiplier)
+
+    def _finish(self):
+        """Closes the current segment; returns (start_s, end_s, pcm) or None if it was too short."""
+        frames = self._segment
+        speech = self._speech_frames
+        start = self._segment_start
+        self._segment = []
+        self._speech_frames = 0
+        self._silent_run = 0
+        if speech < self.min_speech_frames:
+            return None
+        return start * self.frame_s, (start + len(frames)) * self.frame_s, b"".join(frames)
+
+    def feed(self, pcm):
+        """Adds PCM bytes and returns the list of segments completed by them."""
+        self._buffer += pcm
+        finished = []
+        while len(self._buffer) >= self.frame_bytes:
+            frame = self._buffer[: self.frame_bytes]
+            self._buffer = self._buffer[self.frame_bytes:]
+            energy = frame_rms(frame, self.sample_width)
+            is_speech = energy > self._threshold()
+
+            if self._segment:
+                self._segment.append(frame)
+                if is_speech:
+                    self._speech_frames += 1
+                    self._silent_run = 0
+                else:
+                    self._silent_run += 1
+                if self._silent_run >= self.min_silence_frames or len(self._segment) >= self.max_segment_frames:
+                    segment = self._finish()
+                    if segment:
+                        finished.append(segment)
+            elif is_speech:
+                self._segment_start = self._position - len(self._history)
+                self._segment = self._history + [frame]
+                self._speech_frames = 1
+                self._history = []
+            else:
+                # Track the noise floor with a slow moving average of quiet frames
+                self.noise_floor = energy if self.noise_floor is None else 0.95 * self.noise_floor + 0.05 * energy
+                self._history.append(frame)
+                if len(self._history) > self.padding_frames:
+                    self._history.pop(0)
+            self._position += 1
+        return finished
+
+    def flush(self):
+        """Returns the trailing segment, if any, once the stream has ended."""
+        if self._buffer:
+            self._segment.append(self._buffer)
+            self._buffer = b""
+        if not self._segment:
+            return []
+        segment = self._finish()
+        return [segment] if segment else []
+
+
+def read_audio_file(data, filename=""):
+    """Decodes WAV (stdlib) or FLAC/AIFF (speech_recognition) bytes into (pcm, sample_rate, sample_width)."""
+    if not filename.lower().endswith((".flac", ".aiff", ".aif")):
+        with wave.open(io.BytesIO(data), "rb") as wav:
+            pcm = wav.readframes(wav.getnframes())
+            if wav.getnchannels() > 1:
+                if audioop is None:
+                    raise ValueError("Stereo WAV files need audioop; please upload a mono recording")
+                pcm = audioop.tomono(pcm, wav.getsampwidth(), 0.5, 0.5)
+            if wav.getsampwidth() == 1:
+                # 8-bit WAV is unsigned; the segmenter expects signed samples
+                pcm = bytes((b - 128) & 0xFF for b in pcm)
+            return pcm, wav.getframerate(), wav.getsampwidth()
+
+    import speech_recognition as sr
+
+    with sr.AudioFile(io.BytesIO(data)) as source:
+        audio = sr.Recognizer().record(source)
+    return audio.frame_data, audio.sample_rate, audio.sample_width
+
+
+def pcm_chunks(pcm, sample_rate, sample_width, chunk_ms=100):
+    """Splits PCM into fixed-size chunks, as if it were arriving from a microphone."""
+    size = int(sample_rate * chunk_ms / 1000) * sample_width
+    for start in range(0, len(pcm), size):
+        yield pcm[start:start + size]
+
+
+def microphone_chunks(sr_module, stop_event):
+    """Yields raw PCM chunks from the default microphone until stop_event is set.
+
+    The first item is (sample_rate, sample_width) so the caller can size its
+    segmenter before audio arrives.
+    """
+    microphone = sr_module.Microphone()
+    with microphone as source:
+        yield source.SAMPLE_RATE, source.SAMPLE_WIDTH
+        while not stop_event.is_set():
+            yield source.stream.read(source.CHUNK)
+
+
+class StreamingTranscriber:
+    """Captures audio on one thread and transcribes voice segments on another.
+
+    Transcripts are appended in segment order as each finishes, so callers can
+    poll ``new_transcripts`` (or ``transcript``) while the speaker is still
+    talking.
+    """
+
+    def __init__(self, recognize, make_audio=to_audio_data, **segmenter_options):
+        self.recognize = recognize
+        self.make_audio = make_audio
+        self.segmenter_options = segmenter_options
+        self.errors = []
+        self._transcripts = []
+        self._delivered = 0
+        self._segments = queue.Queue()
+        self._stop = threading.Event()
+        self._lock = threading.Lock()
+        self._threads = []
+
+    @property
+    def stop_event(self):
+        return self._stop
+
+    @property
+    def running(self):
+        return any(thread.is_alive() for thread in self._threads)
+
+    def start(self, chunks, sample_rate, sample_width):
+        """Starts capturing from an iterator of PCM chunks."""
+        segmenter = VoiceActivitySegmenter(sample_rate, sample_width, **self.segmenter_options)
+
+        def capture():
+            try:
+                for chunk in chunks:
+                    if self._stop.is_set():
+                        break
+                    for segment in segmenter.feed(chunk):
+                        self._segments.put(segment)
+                for segment in segmenter.flush():
+                    self._segments.put(segment)
+            except Exception as e:
+                self.errors.append(e)
+            finally:
+                self._segments.put(None)
+
+        def transcribe():
+            while True:
+                segment = self._segments.get()
+                if segment is None:
+                    break
+                start_s, end_s, pcm = segment
+                try:
+                    text = self.recognize(self.make_audio(pcm, sample_rate, sample_width))
+                except Exception as e:
+                    # speech_recognition raises UnknownValueError for segments with no words
+                    if type(e).__name__ != "UnknownValueError":
+                        self.errors.append(e)
+                    continue
+                if text:
+                    with self._lock:
+                        self._transcripts.append({"start": start_s, "end": end_s, "text": text})
+
+        self._threads = [
+            threading.Thread(target=capture, name="speech-capture", daemon=True),
+            threading.Thread(target=transcribe, name="speech-transcribe", daemon=True),
+        ]
+        for thread in self._threads:
+            thread.start()
+        return self
+
+    def stop(self):
+        """Stops capturing; segments already queued are still transcribed."""
+        self._stop.set()
+
+    def join(self, timeout=None):
+        for thread in self._threads:
+            thread.join(timeout)
+
+    def new_transcripts(self):
+        """Returns transcript pieces that arrived since the previous call."""
+        with self._lock:
+            fresh = self._transcripts[self._delivered:]
+            self._delivered = len(self._transcripts)
+        return [piece["text"] for piece in fresh]
+
+    def transcript(self):
+        """Returns everything transcribed so far."""
+        with self._lock:
+            return " ".join(piece["text"] for piece in self._transcripts)
+
+
+def start_microphone_transcriber(sr_module, recognize, **segmenter_options):
+    """Starts a StreamingTranscriber fed by the default microphone."""
+    transcriber = StreamingTranscriber(recognize, **segmenter_options)
+    chunks = microphone_chunks(sr_module, transcriber.stop_event)
+    sample_rate, sample_width = next(chunks)
+    return transcriber.start(chunks, sample_rate, sample_width)
+
+
+# ---- Long recordings ----
+def split_on_silence(pcm, sample_rate, sample_width, max_chunk_s=30, **segmenter_options):
+    """Splits a whole recording into speech chunks of at most max_chunk_s, dropping the silence."""
+    segmenter = VoiceActivitySegmenter(sample_rate, sample_width, max_segment_s=max_chunk_s, **segmenter_options)
+    chunks = []
+    for chunk in pcm_chunks(pcm, sample_rate, sample_width, chunk_ms=1000):
+        chunks.extend(segmenter.feed(chunk))
+    chunks.extend(segmenter.flush())
+    return chunks
+
+
+def _transcribe_chunk(chunk, recognize, make_audio, sample_rate, sample_width, max_retries, backoff_s):
+    """Transcribes one chunk, retrying it on its own; silence-only chunks come back empty."""
+    start_s, end_s, pcm = chunk
+    attempt = 0
+    while True:
+        attempt += 1
+        try:
+            text = recognize(make_audio(pcm, sample_rate, sample_width))
+            return {"start": start_s, "end": end_s, "text": text or "", "error": None, "attempts": attempt}
+        except Exception as e:
+            if type(e).__name__ == "UnknownValueError":
+                return {"start": start_s, "end": end_s, "text": "", "error": None, "attempts": attempt}
+            if attempt > max_retries:
+                return {"start": start_s, "end": end_s, "text": "", "error": e, "attempts": attempt}
+            time.sleep(backoff_s * (2 ** (attempt - 1)) * (1 + random.random()))
+
+
+def transcribe_chunks(chunks, sample_rate, sample_width, recognize, make_audio=to_audio_data, workers=4,
+                      max_retries=2, backoff_s=0.5, on_result=None):
+    """Transcribes chunks concurrently and returns the results in time order.
+
+    on_result(result, done, total) is called from the calling thread as each
+    chunk finishes, which is how the page shows progress.
+    """
+    results = []
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        futures = [
+            pool.submit(_transcribe_chunk, chunk, recognize, make_audio, sample_rate, sample_width,
+                        max_retries, backoff_s)
+            for chunk in chunks
+        ]
+        for future in as_completed(futures):
+            results.append(future.result())
+            if on_result is not None:
+                on_result(results[-1], len(results), len(futures))
+    return sorted(results, key=lambda result: result["start"])
+
+
+def format_timestamp(seconds):
+    minutes, seconds = divmod(int(seconds), 60)
+    hours, minutes = divmod(minutes, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+
+
+def timestamped_transcript(results):
+    """Renders ordered chunk results as "[hh:mm:ss] text" lines."""
+    return "\n".join(
+        f"[{format_timestamp(result['start'])}] {result['text']}" for result in results if result["text"]
+    )
+
+
+def stitch_transcript(results):
+    """Joins ordered chunk results into plain text."""
+    return " ".join(result["text"].strip() for result in results if result["text"].strip())
@@ -0,0 +1,270 @@
+"""Two-tier translation cache: an in-process LRU in front of an on-disk SQLite store."""
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+import unicodedata
+from collections import OrderedDict
+
+_HORIZONTAL_WS = re.compile(r"[ \t\u00a0]+")
+
+
+def normalize_text(text):
+    """Normalizes text so trivially different inputs share one cache entry."""
+    text = unicodedata.normalize("NFC", text or "")
+    lines = [_HORIZONTAL_WS.sub(" ", line).strip() for line in text.strip().splitlines()]
+    return "\n".join(lines)
+
+
+def cache_key(text, src, dest):
+    """Builds the cache key for an already normalized text and language pair."""
+    raw = f"{src.lower()}\x1f{dest.lower()}\x1f{text}"
+    return hashlib.sha256(raw.encode("utf-8")).hexdigest()
+
+
+class _Flight:
+    """An upstream call in progress that other callers can wait on."""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class TranslationCache:
+    """Caches translations in memory and on disk, collapsing concurrent identical misses.
+
+    Entries expire ttl_seconds after they were translated, in either tier.
+    """
+
+    def __init__(self, max_entries=2048, db_path=None, ttl_seconds=7 * 24 * 3600,
+                 max_disk_entries=100_000, evict_every=256):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.max_disk_entries = max_disk_entries
+        self.evict_every = evict_every
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._flights = {}
+        self._writes_since_evict = 0
+        self._counters = {
+            "memory_hits": 0,
+            "disk_hits": 0,
+            "misses": 0,
+            "coalesced": 0,
+            "upstream_errors": 0,
+            "disk_evictions": 0,
+        }
+
+        self._db = None
+        self._db_lock = threading.Lock()
+        if db_path:
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._db = sqlite3.connect(db_path, check_same_thread=False)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS translations (
+                    key TEXT PRIMARY KEY,
+                    src TEXT NOT NULL,
+                    dest TEXT NOT NULL,
+                    translated TEXT NOT NULL,
+                    created REAL NOT NULL,
+                    accessed REAL NOT NULL
+                )
+                """
+            )
+            self._db.execute("CREATE INDEX IF NOT EXISTS idx_translations_accessed ON translations (accessed)")
+            self._db.commit()
+
+    # ---- Memory tier ----
+    def _memory_get(self, key):
+        """Returns the (translation, created) entry for key, or None when it is missing or expired."""
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is None:
+                return None
+            if self.ttl_seconds and time.time() - entry[1] > self.ttl_seconds:
+                del self._memory[key]
+                return None
+            self._memory.move_to_end(key)
+            return entry
+
+    def _memory_put(self, key, value, created=None):
+        """Stores value; a row promoted from disk keeps its created time, so it expires on schedule."""
+        with self._lock:
+            self._memory[key] = (value, time.time() if created is None else created)
+            self._memory.move_to_end(key)
+            while len(self._memory) > self.max_entries:
+                self._memory.popitem(last=False)
+
+    # ---- Disk tier ----
+    def _disk_get(self, key):
+        """Returns the (translation, created) row for key, or None when it is missing or expired."""
+        if self._db is None:
+            return None
+        now = time.time()
+        with self._db_lock:
+            row = self._db.execute(
+                "SELECT translated, created FROM translations WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None
+            translated, created = row
+            if self.ttl_seconds and now - created > self.ttl_seconds:
+                self._db.execute("DELETE FROM translations WHERE key = ?", (key,))
+                self._db.commit()
+                return None
+            self._db.execute("UPDATE translations SET accessed = ? WHERE key = ?", (now, key))
+            self._db.commit()
+            return translated, created
+
+    def _disk_put(self, key, src, dest, value):
+        if self._db is None:
+            return
+        now = time.time()
+        with self._db_lock:
+            self._db.execute(
+                "INSERT OR REPLACE INTO translations (key, src, dest, translated, created, accessed) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, src, dest, value, now, now),
+            )
+            self._writes_since_evict += 1
+            if self._writes_since_evict >= self.evict_every:
+                self._writes_since_evict = 0
+                self._evict_disk(now)
+            self._db.commit()
+
+    def _evict_disk(self, now):
+        """Drops expired rows, then the least recently used rows above the size cap."""
+        removed = 0
+        if self.ttl_seconds:
+            removed += self._db.execute(
+                "DELETE FROM translations WHERE created < ?", (now - self.ttl_seconds,)
+            ).rowcount
+        (count,) = self._db.execute("SELECT COUNT(*) FROM translations").fetchone()
+        overflow = count - self.max_disk_entries
+        if overflow > 0:
+            removed += self._db.execute(
+                "DELETE FROM translations WHERE key IN "
+                "(SELECT key FROM translations ORDER BY accessed ASC LIMIT ?)",
+                (overflow,),
+            ).rowcount
+        with self._lock:
+            self._counters["disk_evictions"] += removed
+
+    # ---- Public API ----
+    def get(self, text, src, dest):
+        """Returns the cached translation or None, checking memory first and then disk."""
+        key = cache_key(normalize_text(text), src, dest)
+        entry = self._memory_get(key)
+        if entry is not None:
+            with self._lock:
+                self._counters["memory_hits"] += 1
+            return entry[0]
+        entry = self._disk_get(key)
+        if entry is None:
+            return None
+        self._memory_put(key, *entry)
+        with self._lock:
+            self._counters["disk_hits"] += 1
+        return entry[0]
+
+    def put(self, text, src, dest, translated):
+        """Stores a translation in both tiers."""
+        key = cache_key(normalize_text(text), src, dest)
+        self._memory_put(key, translated)
+        self._disk_put(key, src, dest, translated)
+
+    def get_or_translate(self, text, src, dest, translate_fn):
+        """Returns a cached translation or calls translate_fn(text, src, dest) once per key.
+
+        Concurrent callers asking for the same key while a call is in flight wait for
+        that call instead of issuing their own. Only the key is normalized:
+        translate_fn gets text as given, so runs of spaces and line breaks
+        inside it reach the translator, and texts that differ only in that
+        spacing share the translation of whichever was translated first.
+        """
+        key = cache_key(normalize_text(text), src, dest)
+
+        entry = self._memory_get(key)
+        if entry is not None:
+            with self._lock:
+                self._counters["memory_hits"] += 1
+            return entry[0]
+
+        with self._lock:
+            flight = self._flights.get(key)
+            leader = flight is None
+            if leader:
+                flight = _Flight()
+                self._flights[key] = flight
+            else:
+                self._counters["coalesced"] += 1
+
+        if not leader:
+            flight.event.wait()
+            if flight.error is not None:
+                raise flight.error
+            return flight.result
+
+        try:
+            entry = self._disk_get(key)
+            if entry is not None:
+                value = entry[0]
+                self._memory_put(key, *entry)
+                with self._lock:
+                    self._counters["disk_hits"] += 1
+            else:
+                with self._lock:
+                    self._counters["misses"] += 1
+                value = translate_fn(text, src, dest)
+                self._memory_put(key, value)
+                self._disk_put(key, src, dest, value)
+            flight.result = value
+            return value
+        except Exception as e:
+            with self._lock:
+                self._counters["upstream_errors"] += 1
+            flight.error = e
+            raise
+        finally:
+            with self._lock:
+                self._flights.pop(key, None)
+            flight.event.set()
+
+    def stats(self):
+        """Returns hit/miss counters and tier sizes."""
+        with self._lock:
+            stats = dict(self._counters)
+            stats["memory_entries"] = len(self._memory)
+        stats["memory_capacity"] = self.max_entries
+        stats["disk_entries"] = 0
+        if self._db is not None:
+            with self._db_lock:
+                (stats["disk_entries"],) = self._db.execute("SELECT COUNT(*) FROM translations").fetchone()
+        lookups = stats["memory_hits"] + stats["disk_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["memory_hits"] + stats["disk_hits"]) / lookups if lookups else 0.0
+        return stats
+
+    def clear(self):
+        """Empties both tiers."""
+        with self._lock:
+            self._memory.clear()
+        if self._db is not None:
+            with self._db_lock:
+                self._db.execute("DELETE FROM translations")
+                self._db.commit()
+
+    def close(self):
+        """Closes the on-disk store."""
+        if self._db is not None:
+            with self._db_lock:
+                self._db.close()
+                self._db = None
@@ -0,0 +1,347 @@
+"""Translation memory: fuzzy lookup of previously translated segments.
+
+Segments are indexed by a MinHash signature of their word set, split into LSH
+bands and stored in SQLite, so a lookup is a handful of primary-key probes
+however many segments there are. Candidates sharing a band are scored with a
+token-level edit ratio (the "fuzzy match %" of translation tools) and, when
+the only differences are tokens that were copied verbatim into the stored
+translation (names, numbers, codes), the stored translation is adapted by
+swapping those tokens.
+"""
+import csv
+import hashlib
+import io
+import os
+import re
+import sqlite3
+import struct
+import threading
+import time
+import xml.etree.ElementTree as ET
+from collections import Counter
+from difflib import SequenceMatcher
+
+from vocalite.translation_cache import normalize_text
+
+_TOKEN = re.compile(r"\w+|[^\w\s]")
+_XML_LANG = "{http://www.w3.org/XML/1998/namespace}lang"
+
+
+def tokenize(text):
+    """Splits text into word and punctuation tokens."""
+    return _TOKEN.findall(text)
+
+
+def shape(token):
+    """Lowercases a token and folds every number to '#', so numbers never block a match."""
+    token = token.lower()
+    return "#" if any(ch.isdigit() for ch in token) else token
+
+
+def _stable_hash(data):
+    """Signed 64-bit hash that is the same in every process (unlike hash())."""
+    if isinstance(data, str):
+        data = data.encode("utf-8")
+    return int.from_bytes(hashlib.blake2b(data, digest_size=8).digest(), "big", signed=True)
+
+
+def adapt_translation(stored_source, stored_target, text):
+    """Rewrites stored_target for text when they differ only by tokens copied into the target.
+
+    Returns None when some difference cannot be carried over (a token was
+    inserted or removed, or the replaced token does not appear verbatim in the
+    stored translation).
+    """
+    old, new = tokenize(stored_source), tokenize(text)
+    matcher = SequenceMatcher(None, [t.lower() for t in old], [t.lower() for t in new], autojunk=False)
+    swaps = {}
+    for tag, i1, i2, j1, j2 in matcher.get_opcodes():
+        if tag == "equal":
+            continue
+        if tag != "replace" or i2 - i1 != j2 - j1:
+            return None
+        for before, after in zip(old[i1:i2], new[j1:j2]):
+            if swaps.get(before, after) != after:
+                return None
+            swaps[before] = after
+    if not swaps:
+        return stored_target
+    pattern = re.compile(r"(?<!\w)(" + "|".join(map(re.escape, sorted(swaps, key=len, reverse=True))) + r")(?!\w)")
+    found = set(pattern.findall(stored_target))
+    if found != set(swaps):
+        return None
+    return pattern.sub(lambda m: swaps[m.group(1)], stored_target)
+
+
+class TranslationMemory:
+    """Persistent store of (source, target) segments per language pair with fuzzy lookup.
+
+    ``lookup`` returns the best stored segment whose similarity reaches
+    ``suggest_threshold``; ``reuse`` returns a translation only when the match
+    reaches ``reuse_threshold`` and the stored translation can be adapted to
+    the new text, which is what lets the pipeline skip the upstream call.
+    Segments that differ only in numbers share one entry, so template-heavy
+    input does not grow the index.
+
+    Segments belong to an ``owner`` (one browser, in the app); the default
+    owner "" holds shared segments. Lookups for an owner see that owner's
+    segments and the shared ones only.
+    """
+
+    def __init__(self, db_path=None, reuse_threshold=0.85, suggest_threshold=0.6, num_perm=32, bands=8,
+                 max_candidates=8, max_segment_chars=1000):
+        if num_perm % bands:
+            raise ValueError("num_perm must be a multiple of bands")
+        self.reuse_threshold = reuse_threshold
+        self.suggest_threshold = suggest_threshold
+        self.num_perm = num_perm
+        self.bands = bands
+        self.rows = num_perm // bands
+        self.max_candidates = max_candidates
+        self.max_segment_chars = max_segment_chars
+        self._counters = {"lookups": 0, "exact_hits": 0, "fuzzy_hits": 0, "misses": 0, "reused": 0}
+        self._counter_lock = threading.Lock()
+
+        if db_path and db_path != ":memory:":
+            directory = os.path.dirname(db_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+        self._db = sqlite3.connect(db_path or ":memory:", check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._db:
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute("PRAGMA synchronous=NORMAL")
+            self._db.execute(
+                """
+                CREATE TABLE IF NOT EXISTS tm_segments (
+                    id INTEGER PRIMARY KEY,
+                    src TEXT NOT NULL,
+                    dest TEXT NOT NULL,
+                    shape INTEGER NOT NULL,
+                    source TEXT NOT NULL,
+                    target TEXT NOT NULL,
+                    origin TEXT NOT NULL,
+                    created REAL NOT NULL,
+                    owner TEXT NOT NULL DEFAULT ''
+                )
+                """
+            )
+            self._db.execute(
+                "CREATE TABLE IF NOT EXISTS tm_bands (key INTEGER NOT NULL, segment INTEGER NOT NULL, "
+                "PRIMARY KEY (key, segment)) WITHOUT ROWID"
+            )
+            columns = {row[1] for row in self._db.execute("PRAGMA table_info(tm_segments)")}
+            if "owner" not in columns:
+                # Older memories mixed every browser's history; keep only the shared imports
+                self._db.execute("ALTER TABLE tm_segments ADD COLUMN owner TEXT NOT NULL DEFAULT ''")
+                self._db.execute(
+                    "DELETE FROM tm_bands WHERE segment IN (SELECT id FROM tm_segments WHERE origin = 'history')"
+                )
+                self._db.execute("DELETE FROM tm_segments WHERE origin = 'history'")
+                self._db.execute("DROP INDEX IF EXISTS idx_tm_shape")
+            self._db.execute(
+                "CREATE UNIQUE INDEX IF NOT EXISTS idx_tm_owner_shape ON tm_segments (owner, src, dest, shape)"
+            )
+            # Kept in step by add_many/clear so stats() never counts the table
+            (self._segments,) = self._db.execute("SELECT count(*) FROM tm_segments").fetchone()
+
+    # ---- Hashing ----
+    def _signature(self, shapes):
+        """MinHash of the word set: num_perm independent 32-bit hashes per word, minimum per position."""
+        words = {token for token in shapes if token[0].isalnum() or token == "#"}
+        if not words:
+            return None
+        layout = f">{self.num_perm}I"
+        vectors = [struct.unpack(layout, hashlib.shake_128(word.encode("utf-8")).digest(4 * self.num_perm))
+                   for word in words]
+        return [min(column) for column in zip(*vectors)]
+
+    def _band_keys(self, signature, src, dest, owner=""):
+        rows = self.rows
+        # Shared segments keep the owner-less prefix, so their keys predate owners
+        prefix = (f"{src}\x1f{dest}\x1f{owner}\x1f" if owner else f"{src}\x1f{dest}\x1f").encode("utf-8")
+        layout = f">B{rows}I"
+        return [
+            _stable_hash(prefix + struct.pack(layout, band, *signature[band * rows:(band + 1) * rows]))
+            for band in range(self.bands)
+        ]
+
+    # ---- Writes ----
+    def add(self, source, target, src, dest, origin="history", owner=""):
+        """Stores one segment; returns True when it was stored."""
+        return self.add_many([(source, target)], src, dest, origin, owner) == 1
+
+    def add_many(self, pairs, src, dest, origin="history", owner=""):
+        """Stores (source, target) pairs for one language pair and owner in a transaction; returns how many were kept.
+
+        A segment whose shape (lowercased, numbers folded) is already stored
+        for the owner replaces that entry, so the latest translation of a
+        template wins.
+        """
+        rows = []
+        for source, target in pairs:
+            source, target = normalize_text(source), normalize_text(target)
+            if not source or not target or len(source) > self.max_segment_chars:
+                continue
+            shapes = [shape(token) for token in tokenize(source)]
+            rows.append((source, target, _stable_hash("\x1f".join(shapes)), self._signature(shapes)))
+        now = time.time()
+        with self._lock, self._db:
+            for source, target, shape_hash, signature in rows:
+                existing = self._db.execute(
+                    "SELECT id FROM tm_segments WHERE owner = ? AND src = ? AND dest = ? AND shape = ?",
+                    (owner, src, dest, shape_hash),
+                ).fetchone()
+                if existing is not None:
+                    self._db.execute(
+                        "UPDATE tm_segments SET source = ?, target = ?, origin = ?, created = ? WHERE id = ?",
+                        (source, target, origin, now, existing[0]),
+                    )
+                    continue
+                segment = self._db.execute(
+                    "INSERT INTO tm_segments (src, dest, shape, source, target, origin, created, owner) "
+                    "VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (src, dest, shape_hash, source, target, origin, now, owner),
+                ).lastrowid
+                self._segments += 1
+                if signature is not None:
+                    self._db.executemany(
+                        "INSERT OR IGNORE INTO tm_bands (key, segment) VALUES (?, ?)",
+                        [(key, segment) for key in self._band_keys(signature, src, dest, owner)],
+                    )
+        return len(rows)
+
+    def clear(self):
+        with self._lock, self._db:
+            self._db.execute("DELETE FROM tm_bands")
+            self._db.execute("DELETE FROM tm_segments")
+            self._segments = 0
+
+    # ---- Reads ----
+    def _candidates(self, shapes, shape_hash, src, dest, owner=""):
+        """Returns [(id, source, target, origin)] for the exact shape or the segments sharing most bands.
+
+        Only owner's segments and the shared ones are candidates; an exact
+        shape stored by owner wins over a shared one.
+        """
+        owners = (owner, "") if owner else ("",)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT id, source, target, origin FROM tm_segments "
+                f"WHERE owner IN ({','.join('?' * len(owners))}) AND src = ? AND dest = ? AND shape = ? "
+                "ORDER BY owner DESC LIMIT 1",
+                (*owners, src, dest, shape_hash),
+            ).fetchone()
+            if row is not None:
+                return [row]
+            signature = self._signature(shapes)
+            if signature is None:
+                return []
+            keys = [key for each in owners for key in self._band_keys(signature, src, dest, each)]
+            # Cap every bucket so a template with thousands of variants stays a bounded probe
+            probe = " UNION ALL ".join(
+                "SELECT * FROM (SELECT segment FROM tm_bands WHERE key = ? LIMIT ?)" for _ in keys
+            )
+            params = [value for key in keys for value in (key, self.max_candidates)]
+            hits = Counter(segment for (segment,) in self._db.execute(probe, params))
+            if not hits:
+                return []
+            best = [segment for segment, _ in hits.most_common(self.max_candidates)]
+            return self._db.execute(
+                f"SELECT id, source, target, origin FROM tm_segments WHERE id IN ({','.join('?' * len(best))})",
+                best,
+            ).fetchall()
+
+    def lookup(self, text, src, dest, owner=""):
+        """Returns owner's best match (or the best shared one) at or above suggest_threshold, or None.
+
+        A match is a dict with the stored ``source`` and ``target``, the
+        ``score`` (0-1), ``adapted`` (the target rewritten for text, or None
+        when it cannot be) and the ``origin`` of the segment.
+        """
+        text = normalize_text(text)
+        if not text or len(text) > self.max_segment_chars:
+            return None
+        shapes = [shape(token) for token in tokenize(text)]
+        shape_hash = _stable_hash("\x1f".join(shapes))
+        best = None
+        for segment, source, target, origin in self._candidates(shapes, shape_hash, src, dest, owner):
+            score = SequenceMatcher(None, shapes, [shape(t) for t in tokenize(source)], autojunk=False).ratio()
+            if best is None or score > best["score"]:
+                best = {"id": segment, "source": source, "target": target, "score": score, "origin": origin}
+        if best is not None and best["score"] < self.suggest_threshold:
+            best = None
+        if best is not None:
+            best["adapted"] = adapt_translation(best["source"], best["target"], text)
+        with self._counter_lock:
+            self._counters["lookups"] += 1
+            if best is None:
+                self._counters["misses"] += 1
+            else:
+                self._counters["exact_hits" if best["score"] == 1.0 else "fuzzy_hits"] += 1
+        return best
+
+    def reuse(self, text, src, dest, owner="", threshold=None):
+        """Returns a stored translation adapted to text when it is similar enough to reuse, else None.
+
+        threshold overrides reuse_threshold for this call, so each session can
+        pick its own without changing the shared memory.
+        """
+        threshold = self.reuse_threshold if threshold is None else threshold
+        match = self.lookup(text, src, dest, owner)
+        if match is None or match["score"] < threshold or match["adapted"] is None:
+            return None
+        with self._counter_lock:
+            self._counters["reused"] += 1
+        return match["adapted"]
+
+    def __len__(self):
+        return self._segments
+
+    def stats(self):
+        """Returns lookup counters, hit and reuse rates, and the number of stored segments."""
+        with self._counter_lock:
+            stats = dict(self._counters)
+        stats["segments"] = len(self)
+        lookups = stats["lookups"]
+        stats["hit_rate"] = (lookups - stats["misses"]) / lookups if lookups else 0.0
+        stats["reuse_rate"] = stats["reused"] / lookups if lookups else 0.0
+        return stats
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+
+def _lang_matches(tag, code):
+    tag, code = tag.lower().replace("_", "-"), code.lower()
+    return tag == code or tag.split("-")[0] == code.split("-")[0]
+
+
+def parse_bilingual(filename, data, src, dest):
+    """Reads (source, target) pairs from a TMX, CSV or TSV file given as bytes.
+
+    TMX units are matched to src and dest by their xml:lang (en-US matches en).
+    CSV and TSV files use the first two columns, skipping a source,target
+    header if there is one.
+    """
+    if filename.lower().endswith(".tmx"):
+        pairs = []
+        for unit in ET.fromstring(data).iter("tu"):
+            texts = {}
+            for variant in unit.iter("tuv"):
+                lang = variant.get(_XML_LANG) or variant.get("lang") or ""
+                segment = variant.find("seg")
+                if segment is not None:
+                    texts[lang] = "".join(segment.itertext())
+            source = next((t for lang, t in texts.items() if _lang_matches(lang, src)), None)
+            target = next((t for lang, t in texts.items() if _lang_matches(lang, dest)), None)
+            if source and target:
+                pairs.append((source, target))
+        return pairs
+    text = data.decode("utf-8-sig")
+    delimiter = "\t" if filename.lower().endswith(".tsv") else ","
+    rows = [row for row in csv.reader(io.StringIO(text), delimiter=delimiter) if len(row) >= 2]
+    if rows and [cell.strip().lower() for cell in rows[0][:2]] == ["source", "target"]:
+        rows = rows[1:]
+    return [(row[0], row[1]) for row in rows]
@@ -0,0 +1,149 @@
+"""Content-addressed, byte-budgeted cache for synthesized speech."""
+import hashlib
+import io
+import os
+import threading
+from collections import OrderedDict
+
+
+def synthesize_mp3(text, lang):
+    """Synthesizes text with gTTS straight into memory and returns the MP3 bytes."""
+    from gtts import gTTS
+
+    buffer = io.BytesIO()
+    gTTS(text, lang=lang).write_to_fp(buffer)
+    return buffer.getvalue()
+
+
+def audio_key(text, lang):
+    """Returns the content address for a (text, lang) pair."""
+    return hashlib.sha256(f"{lang.lower()}\x1f{text}".encode("utf-8")).hexdigest()
+
+
+class AudioCache:
+    """Keeps synthesized audio in memory under a byte budget, spilling evicted clips to disk."""
+
+    def __init__(self, max_bytes=64 * 1024 * 1024, spill_dir=None, max_spill_bytes=512 * 1024 * 1024,
+                 synthesize=synthesize_mp3):
+        self.max_bytes = max_bytes
+        self.spill_dir = spill_dir
+        self.max_spill_bytes = max_spill_bytes
+        self.synthesize = synthesize
+
+        self._entries = OrderedDict()
+        self._size = 0
+        self._lock = threading.Lock()
+        self._counters = {"memory_hits": 0, "spill_hits": 0, "misses": 0, "evictions": 0, "spilled": 0}
+
+        if spill_dir:
+            os.makedirs(spill_dir, exist_ok=True)
+
+    def _spill_path(self, key):
+        return os.path.join(self.spill_dir, f"{key}.mp3")
+
+    def _store(self, key, data):
+        """Inserts data under key and evicts least recently used clips over budget."""
+        evicted = []
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self._size -= len(previous)
+            if len(data) > self.max_bytes:
+                evicted.append((key, data))
+            else:
+                self._entries[key] = data
+                self._size += len(data)
+                while self._size > self.max_bytes:
+                    old_key, old_data = self._entries.popitem(last=False)
+                    self._size -= len(old_data)
+                    evicted.append((old_key, old_data))
+            self._counters["evictions"] += len(evicted)
+        for old_key, old_data in evicted:
+            self._spill(old_key, old_data)
+
+    def _spill(self, key, data):
+        if not self.spill_dir:
+            return
+        path = self._spill_path(key)
+        if not os.path.exists(path):
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+            with self._lock:
+                self._counters["spilled"] += 1
+        self._trim_spill()
+
+    def _trim_spill(self):
+        """Deletes the oldest spilled clips once the spill directory is over budget."""
+        files = []
+        total = 0
+        for entry in os.scandir(self.spill_dir):
+            if entry.name.endswith(".mp3"):
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+                total += stat.st_size
+        if total <= self.max_spill_bytes:
+            return
+        for _, size, path in sorted(files):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                continue
+            total -= size
+            if total <= self.max_spill_bytes:
+                break
+
+    def get(self, text, lang):
+        """Returns cached audio bytes or None."""
+        key = audio_key(text, lang)
+        with self._lock:
+            data = self._entries.get(key)
+            if data is not None:
+                self._entries.move_to_end(key)
+                self._counters["memory_hits"] += 1
+                return data
+        if self.spill_dir:
+            try:
+                with open(self._spill_path(key), "rb") as f:
+                    data = f.read()
+            except FileNotFoundError:
+                data = None
+            if data is not None:
+                with self._lock:
+                    self._counters["spill_hits"] += 1
+                self._store(key, data)
+                return data
+        with self._lock:
+            self._counters["misses"] += 1
+        return None
+
+    def put(self, text, lang, data):
+        """Stores audio bytes for (text, lang)."""
+        self._store(audio_key(text, lang), data)
+
+    def get_or_synthesize(self, text, lang):
+        """Returns audio for (text, lang), synthesizing and caching it on a miss."""
+        data = self.get(text, lang)
+        if data is not None:
+            return data
+        data = self.synthesize(text, lang)
+        self.put(text, lang, data)
+        return data
+
+    def stats(self):
+        """Returns hit/miss counters and the current memory footprint."""
+        with self._lock:
+            stats = dict(self._counters)
+            stats["entries"] = len(self._entries)
+            stats["bytes"] = self._size
+        stats["max_bytes"] = self.max_bytes
+        lookups = stats["memory_hits"] + stats["spill_hits"] + stats["misses"]
+        stats["hit_rate"] = (stats["memory_hits"] + stats["spill_hits"]) / lookups if lookups else 0.0
+        return stats
+
+    def clear(self):
+        """Drops every clip held in memory."""
+        with self._lock:
+            self._entries.clear()
+            self._size = 0
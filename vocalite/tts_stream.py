@@ -0,0 +1,99 @@
+"""Sentence-level streaming speech synthesis and MP3 concatenation without re-encoding.
+
+An MP3 stream is a sequence of self-contained frames, so pieces synthesized
+separately play back-to-back once their ID3 tags and Xing/Info header frames
+(which describe a single file's length) are removed.
+"""
+from concurrent.futures import ThreadPoolExecutor
+
+from vocalite.chunking import split_chunks
+
+# Pieces this size are one or two sentences: short enough that the first one comes back quickly
+DEFAULT_PIECE_CHARS = 200
+
+_BITRATES_KBPS = {
+    1: [0, 32, 40, 48, 56, 64, 80, 96, 112, 128, 160, 192, 224, 256, 320],
+    2: [0, 8, 16, 24, 32, 40, 48, 56, 64, 80, 96, 112, 128, 144, 160],
+}
+_SAMPLE_RATES = {3: (44100, 48000, 32000), 2: (22050, 24000, 16000), 0: (11025, 12000, 8000)}
+
+
+def strip_id3(data):
+    """Removes leading ID3v2 tags and a trailing ID3v1 tag."""
+    while len(data) >= 10 and data[:3] == b"ID3":
+        size = (data[6] << 21) | (data[7] << 14) | (data[8] << 7) | data[9]
+        footer = 10 if data[5] & 0x10 else 0
+        data = data[10 + size + footer:]
+    if len(data) >= 128 and data[-128:-125] == b"TAG":
+        data = data[:-128]
+    return data
+
+
+def frame_length(header):
+    """Returns the length of the MPEG layer III frame starting with these 4 bytes, or None."""
+    if len(header) < 4 or header[0] != 0xFF or (header[1] & 0xE0) != 0xE0:
+        return None
+    version = (header[1] >> 3) & 0x03  # 3: MPEG1, 2: MPEG2, 0: MPEG2.5
+    layer = (header[1] >> 1) & 0x03  # 1: layer III
+    bitrate_index = header[2] >> 4
+    rate_index = (header[2] >> 2) & 0x03
+    if version == 1 or layer != 1 or bitrate_index in (0, 15) or rate_index == 3:
+        return None
+    bitrate = _BITRATES_KBPS[1 if version == 3 else 2][bitrate_index] * 1000
+    sample_rate = _SAMPLE_RATES[version][rate_index]
+    padding = (header[2] >> 1) & 0x01
+    return (144 if version == 3 else 72) * bitrate // sample_rate + padding
+
+
+def iter_frames(data):
+    """Yields (offset, length) of consecutive frames; stops at the first byte that is not a frame."""
+    pos = 0
+    while pos < len(data):
+        length = frame_length(data[pos:pos + 4])
+        if not length or pos + length > len(data):
+            return
+        yield pos, length
+        pos += length
+
+
+def strip_info_frame(data):
+    """Drops a leading Xing/Info frame, whose frame count would be wrong once pieces are joined."""
+    for offset, length in iter_frames(data):
+        frame = data[offset:offset + length]
+        if b"Xing" in frame[:48] or b"Info" in frame[:48]:
+            return data[:offset] + data[offset + length:]
+        break
+    return data
+
+
+def mp3_duration(data):
+    """Returns the playing time of an MP3 stream in seconds, counted from its frame headers."""
+    data = strip_info_frame(strip_id3(data))
+    seconds = 0.0
+    for offset, _ in iter_frames(data):
+        version = (data[offset + 1] >> 3) & 0x03
+        sample_rate = _SAMPLE_RATES[version][(data[offset + 2] >> 2) & 0x03]
+        seconds += (1152 if version == 3 else 576) / sample_rate
+    return seconds
+
+
+def concat_mp3(pieces):
+    """Joins separately synthesized MP3 pieces into one playable stream."""
+    return b"".join(strip_info_frame(strip_id3(piece)) for piece in pieces)
+
+
+def stream_synthesis(text, synthesize_fn, max_chars=DEFAULT_PIECE_CHARS, max_workers=4):
+    """Synthesizes text in sentence-sized pieces concurrently, yielding (index, count, audio) in order.
+
+    Piece i is yielded as soon as it and every piece before it are ready, so
+    playback can start after the first one.
+    """
+    _, chunks = split_chunks(text, max_chars)
+    pieces = [chunk.text for chunk in chunks if chunk.text.strip()]
+    if len(pieces) <= 1:
+        yield 0, 1, synthesize_fn(text)
+        return
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(pieces)))) as pool:
+        futures = [pool.submit(synthesize_fn, piece) for piece in pieces]
+        for index, future in enumerate(futures):
+            yield index, len(pieces), future.result()